@@ -0,0 +1,137 @@
+"""Logging overhead per dispatched task.
+
+Runs the TaskManager add/dispatch cycle with no-op tasks (no gap or bias
+delay, a small backlog kept queued) under several logging setups, with
+console output sent to /dev/null:
+
+* ``disabled``: logging.disable(), the floor.
+* ``warning``: root level WARNING, so INFO/DEBUG calls are skipped.
+* ``info``: INFO written synchronously.
+* ``info-sampled``: INFO with repetitive task messages sampled.
+* ``info-queue``: INFO written by the background queue listener.
+* ``debug``: DEBUG written synchronously (queue dumps included).
+
+Usage::
+
+    python -m benchmarks.logging_overhead --tasks 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from bot.task_manager import Task, TaskManager, TaskType
+from utils.logging import setup_logging, shutdown_logging
+
+# Tasks kept queued so each dispatch also sorts and (at DEBUG) dumps a queue
+BACKLOG = 8
+
+Scenario = Tuple[str, Callable[[], None]]
+
+
+def _scenarios() -> List[Scenario]:
+    """Build the logging setups to compare."""
+    return [
+        ("disabled", lambda: (setup_logging(use_colors=False), logging.disable(logging.CRITICAL))),
+        ("warning", lambda: setup_logging(logging.WARNING, use_colors=False)),
+        ("info", lambda: setup_logging(use_colors=False)),
+        ("info-sampled", lambda: setup_logging(use_colors=False, sample_limit=10)),
+        ("info-queue", lambda: setup_logging(use_colors=False, queue_size=100_000)),
+        ("debug", lambda: setup_logging(logging.DEBUG, use_colors=False)),
+    ]
+
+
+async def _noop() -> Dict[str, Any]:
+    """Task body that does nothing."""
+    return {}
+
+
+def _task(i: int) -> Task:
+    """Build a never-expiring no-op task."""
+    return Task(func=_noop, expire_at=float("inf"), info=f"bench task {i}", tag=TaskType.CMD)
+
+
+async def dispatch(tasks: int) -> float:
+    """Time the add/dispatch cycle.
+
+    Args:
+        tasks: Number of tasks to dispatch.
+
+    Returns:
+        Mean microseconds per dispatched task.
+    """
+    manager = TaskManager(task_gap=0, task_bias=0)
+    for i in range(BACKLOG):
+        manager.add_task(_task(i))
+
+    start = time.perf_counter()
+    for i in range(tasks):
+        manager.add_task(_task(i))
+        await manager.check_and_execute()
+    return (time.perf_counter() - start) / tasks * 1e6
+
+
+def run(tasks: int = 20000) -> Dict[str, float]:
+    """Run every scenario.
+
+    Args:
+        tasks: Tasks dispatched per scenario.
+
+    Returns:
+        Mapping of scenario name to microseconds per task.
+    """
+    results: Dict[str, float] = {}
+    stdout = sys.stdout
+    with open(os.devnull, "w") as devnull:
+        for name, configure in _scenarios():
+            sys.stdout = devnull
+            try:
+                configure()
+                results[name] = asyncio.run(dispatch(tasks))
+            finally:
+                shutdown_logging()
+                logging.disable(logging.NOTSET)
+                sys.stdout = stdout
+    setup_logging()
+    return results
+
+
+def format_report(results: Dict[str, float]) -> str:
+    """Format benchmark results as text.
+
+    Args:
+        results: Output of run().
+
+    Returns:
+        Human readable report.
+    """
+    floor = results.get("disabled", 0.0)
+    lines = [f"{'logging':<14} {'us/task':>9} {'overhead':>9}"]
+    for name, us in results.items():
+        lines.append(f"{name:<14} {us:>9.1f} {us - floor:>9.1f}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Logging overhead per dispatched task")
+    parser.add_argument("--tasks", type=int, default=20000, help="Tasks per scenario")
+    parser.add_argument("--json", default=None, help="Write results to a JSON file")
+    args = parser.parse_args()
+
+    results = run(args.tasks)
+    print(format_report(results))
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
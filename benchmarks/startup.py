@@ -0,0 +1,281 @@
+"""Bot cold-start benchmark.
+
+Measures, in fresh interpreters:
+
+* ``import``: ``python -X importtime -c "import main"``, with the slowest
+  modules by cumulative time and whether the ML libraries were pulled in.
+* ``setup``: time until ``setup_hook`` returns (cogs loaded, controller
+  started) and until the captcha model finishes loading in the background.
+  No Discord connection is made.
+* ``ready`` (``--live`` only): launch ``main.py`` with the ``config.json``
+  in the current directory and wait for the first ``on_ready`` log line.
+
+Usage::
+
+    python -m benchmarks.startup --model ./model/captcha.onnx --runs 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Modules that must not be imported before the captcha model is needed
+DEFERRED_MODULES = ("numpy", "PIL", "onnxruntime")
+
+IMPORTTIME_REGEX = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+READY_REGEX = re.compile(r"Ready in ([\d.]+)s")
+
+RESULT_PREFIX = "STARTUP_RESULT "
+
+# Script run in a fresh interpreter to time startup without logging in
+SETUP_SCRIPT = """
+import asyncio, json, os, sys, tempfile, time
+start = time.perf_counter()
+from bot import Config
+from main import ISeKaiZBot
+
+async def run():
+    state_store = os.path.join(tempfile.mkdtemp(), "state.db")
+    config = Config(token="", channel_id="0", captcha_model=sys.argv[1], state_store=state_store)
+    t0 = time.perf_counter()
+    async with ISeKaiZBot(config) as bot:
+        await bot.setup_hook()
+        setup = time.perf_counter() - start
+        ready = None
+        if bot.captcha_ai is not None and await bot.captcha_ai.wait_ready(120):
+            ready = time.perf_counter() - start
+    result = {"imports": t0 - start, "setup_hook": setup, "model_ready": ready}
+    print(sys.argv[2] + json.dumps(result))
+
+asyncio.run(run())
+"""
+
+
+@dataclass
+class ImportRecord:
+    """One line of ``-X importtime`` output."""
+
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def _env() -> Dict[str, str]:
+    """Get the environment for child interpreters (repo on the path)."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(ROOT), env.get("PYTHONPATH")]))
+    return env
+
+
+def parse_importtime(stderr: str) -> List[ImportRecord]:
+    """Parse ``-X importtime`` output.
+
+    Args:
+        stderr: Standard error of the profiled interpreter.
+
+    Returns:
+        One record per imported module, in import order.
+    """
+    records = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_REGEX.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            records.append(
+                ImportRecord(module, int(self_us), int(cumulative_us), len(indent) // 2)
+            )
+    return records
+
+
+def profile_imports(module: str = "main", top: int = 15) -> Dict[str, Any]:
+    """Profile importing a module in a fresh interpreter.
+
+    Args:
+        module: Module to import.
+        top: Number of slowest modules to report.
+
+    Returns:
+        Dict with the total import time, slowest modules and the
+        deferred modules that were imported anyway.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=tempfile.gettempdir(),
+        env=_env(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    records = parse_importtime(proc.stderr)
+    total = next((r.cumulative_us for r in records if r.module == module and r.depth == 0), 0)
+    imported = {r.module.split(".")[0] for r in records}
+    slowest = sorted(records, key=lambda r: r.self_us, reverse=True)[:top]
+
+    return {
+        "total_ms": total / 1000,
+        "modules": len(records),
+        "slowest": [{"module": r.module, "self_ms": r.self_us / 1000} for r in slowest],
+        "deferred_imported": [m for m in DEFERRED_MODULES if m in imported],
+    }
+
+
+def time_setup(model_path: str) -> Dict[str, Optional[float]]:
+    """Time the bot's startup up to setup_hook and model readiness.
+
+    Runs in a scratch directory so no user data is touched.
+
+    Args:
+        model_path: Captcha model to load.
+
+    Returns:
+        Seconds since interpreter start for imports, setup_hook and the
+        model becoming ready (None if it failed to load).
+    """
+    model_path = str(Path(model_path).resolve())
+    with tempfile.TemporaryDirectory() as workdir:
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-c", SETUP_SCRIPT, model_path, RESULT_PREFIX],
+            cwd=workdir,
+            env=_env(),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        wall = time.perf_counter() - start
+    line = next(l for l in proc.stdout.splitlines() if l.startswith(RESULT_PREFIX))
+    result = json.loads(line[len(RESULT_PREFIX) :])
+    result["process"] = wall
+    return result
+
+
+def time_ready(timeout: float = 120.0) -> Optional[float]:
+    """Start the real bot and wait for its first on_ready.
+
+    Args:
+        timeout: Seconds to wait for the ready log line.
+
+    Returns:
+        Seconds from launch to on_ready, or None on timeout.
+    """
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, str(ROOT / "main.py"), "--no-auto-start"],
+        env=_env(),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    )
+    try:
+        for line in proc.stdout:
+            if READY_REGEX.search(line):
+                return time.perf_counter() - start
+            if time.perf_counter() - start > timeout:
+                break
+        return None
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def _summary(values: List[Optional[float]]) -> Optional[Dict[str, float]]:
+    """Summarize repeated timings (None if any run failed)."""
+    if not values or any(v is None for v in values):
+        return None
+    return {
+        "median": statistics.median(values),
+        "min": min(values),
+        "max": max(values),
+    }
+
+
+def run(model: str, runs: int = 3, live: bool = False, top: int = 15) -> Dict[str, Any]:
+    """Run the startup benchmark.
+
+    Args:
+        model: Captcha model path.
+        runs: Repetitions of each timed phase.
+        live: Also measure time to on_ready with the real config.
+        top: Number of slowest imports to report.
+
+    Returns:
+        Benchmark results.
+    """
+    results: Dict[str, Any] = {"import": profile_imports(top=top)}
+
+    setups = [time_setup(model) for _ in range(runs)]
+    results["setup"] = {
+        key: _summary([s[key] for s in setups])
+        for key in ("imports", "setup_hook", "model_ready", "process")
+    }
+
+    if live:
+        results["ready"] = _summary([time_ready() for _ in range(runs)])
+
+    return results
+
+
+def format_report(results: Dict[str, Any]) -> str:
+    """Format benchmark results as text.
+
+    Args:
+        results: Output of run().
+
+    Returns:
+        Human readable report.
+    """
+    imports = results["import"]
+    lines = [
+        f"import main: {imports['total_ms']:.1f} ms ({imports['modules']} modules)",
+        f"deferred modules imported: {', '.join(imports['deferred_imported']) or 'none'}",
+        "slowest imports (self time):",
+    ]
+    lines += [f"  {m['self_ms']:8.1f} ms  {m['module']}" for m in imports["slowest"]]
+
+    lines.append("startup (seconds since interpreter start, median [min-max]):")
+    phases = dict(results["setup"])
+    if "ready" in results:
+        phases["on_ready"] = results["ready"]
+    for phase, summary in phases.items():
+        if summary is None:
+            lines.append(f"  {phase:<12} failed")
+        else:
+            lines.append(
+                f"  {phase:<12} {summary['median']:.3f} "
+                f"[{summary['min']:.3f}-{summary['max']:.3f}]"
+            )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Bot cold-start benchmark")
+    parser.add_argument("--model", default="./model/captcha.onnx", help="Captcha model path")
+    parser.add_argument("--runs", type=int, default=3, help="Repetitions per phase")
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to list")
+    parser.add_argument("--live", action="store_true", help="Also time on_ready (logs in)")
+    parser.add_argument("--json", default=None, help="Write results to a JSON file")
+    args = parser.parse_args()
+
+    results = run(args.model, args.runs, args.live, args.top)
+    print(format_report(results))
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
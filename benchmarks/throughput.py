@@ -0,0 +1,473 @@
+"""Message-handling throughput.
+
+Measures, with logging at ERROR (the cogs warn about every captcha and full
+queue they see):
+
+* ``cogs``: messages per second through ``ISeKaiZBot`` and every cog
+  listener, per message class (battle, profession, retainer, verification
+  and noise from other channels and users). The messages are the ones the
+  simulator's game produces; each is dispatched as a gateway event and its
+  listeners run to completion before the next one, on a virtual-time loop
+  so the bot's random delays cost no wall time. Outbound sends and clicks
+  go nowhere.
+* ``extractor``: ``message_extractor`` per message class.
+* ``task_manager``: ``TaskManager.add_task`` and ``_execute_next`` with
+  no-op tasks at several queue sizes.
+* ``nms``: ``CaptchaAI._nms`` on a synthetic model output (skipped when
+  numpy is not installed).
+
+Results can be written to JSON to compare commits::
+
+    python -m benchmarks.throughput --rounds 50 --json throughput.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import copy
+import json
+import logging
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from bot.event_manager import BotState
+from bot.task_manager import Task, TaskManager, TaskType
+from main import ISeKaiZBot
+from simulator.clock import VirtualClock, run as run_virtual
+from simulator.fakes import FakeChannel, FakeGuild, FakeMessage, FakeUser, next_id
+from simulator.game import GameSettings, IsekaidGame
+from simulator.runner import (
+    CHANNEL_ID,
+    GUILD_ID,
+    NOISE_CHANNEL_ID,
+    PLAYER_ID,
+    PLAYER_NAME,
+    SimCaptchaSolver,
+    build_config,
+    connect_bot,
+)
+from utils.helpers import message_extractor
+from utils.logging import setup_logging
+from utils.metrics import MetricsRegistry
+
+MESSAGE_CLASSES = ("battle", "profession", "retainer", "noise", "verification")
+
+QUEUE_SIZES = (1, 10, 100, 1000)
+
+# Task types with a high enough limit to fill the largest queue
+QUEUE_TASK_TYPES = (TaskType.CMD, TaskType.TREASURE, TaskType.VERIFY)
+
+# Boxes the model outputs for a 160px input (20x20 + 10x10 + 5x5 anchors)
+NMS_BOXES = 525
+NMS_CLASSES = 10
+
+SEED = 1
+
+# A gateway event: ("message", (message,)) or ("message_edit", (before, after))
+Event = Tuple[str, Tuple[Any, ...]]
+
+
+class _Scene:
+    """The simulated game played by a script to collect one class of messages."""
+
+    def __init__(self, **settings: Any) -> None:
+        settings.setdefault("captcha_chance", 0.0)
+        settings.setdefault("emoji_chance", 0.0)
+        self.settings = GameSettings(**settings)
+        self.player = FakeUser(PLAYER_ID, PLAYER_NAME)
+        self.channel = FakeChannel(
+            CHANNEL_ID, "isekaid", guild=FakeGuild(GUILD_ID), author=self.player
+        )
+        self.game = IsekaidGame(self.player, self.channel, self.settings, rng=random.Random(SEED))
+        self.events: List[Event] = []
+        self.game.on_message = lambda message: self.events.append(("message", (message,)))
+        self.game.on_edit = lambda before, after: self.events.append(
+            ("message_edit", (before, copy.copy(after)))
+        )
+        self.channel.on_send = self.game.receive
+
+    def last(self) -> FakeMessage:
+        """Get the game's latest message."""
+        return next(args[-1] for name, args in reversed(self.events) if name == "message")
+
+    async def send(self, content: str, wait: float = 1.0) -> None:
+        """Send a command as the player."""
+        await self.channel.send(content)
+        await asyncio.sleep(wait)
+
+    async def click(self, message: FakeMessage, index: int, wait: float = 1.0) -> None:
+        """Click a button in a message's first row."""
+        await message.components[0].children[index].click()
+        await asyncio.sleep(wait)
+
+    async def finish(self) -> List[Event]:
+        """Stop the game and detach the messages from it."""
+        await self.game.stop()
+        self.channel.on_send = None
+        for _, args in self.events:
+            for message in args:
+                _detach(message)
+        return self.events
+
+
+def _detach(message: FakeMessage) -> None:
+    """Make a message's buttons and selects do nothing."""
+
+    async def noop(*args: Any) -> None:
+        pass
+
+    for row in message.components:
+        for child in row.children:
+            if hasattr(child, "on_choose"):
+                child.on_choose = noop
+            else:
+                child.on_click = noop
+
+
+async def _battle() -> List[Event]:
+    """Battle windows, battle starts and victories."""
+    scene = _Scene(battle_seconds=5)
+    for _ in range(3):
+        await scene.send("$map")
+        await scene.click(scene.last(), 0, wait=scene.settings.battle_seconds + 2)
+    return await scene.finish()
+
+
+async def _profession() -> List[Event]:
+    """Profession windows and their completion edits."""
+    scene = _Scene(profession_seconds=10)
+    for command in ("$mine", "$fish", "$forage"):
+        await scene.send(command)
+        await scene.click(scene.last(), 0, wait=scene.settings.profession_seconds + 2)
+    return await scene.finish()
+
+
+async def _retainer() -> List[Event]:
+    """Hired worker pages and collection."""
+    scene = _Scene(workers=3)
+    await asyncio.sleep(2 * 3600)
+    await scene.send("$hired")
+    page = scene.last()
+    for index in (2, 1, 2, 1, 2, 1):
+        await scene.click(page, index)
+    return await scene.finish()
+
+
+async def _verification() -> List[Event]:
+    """Captchas, wrong and right answers, and emoji checks."""
+    scene = _Scene(captcha_chance=1.0)
+    await scene.send("$map")
+    await scene.send("0000000")
+    await scene.send("$verify")
+    image = scene.last().embeds[0].image
+    code = scene.game.captcha_code(image.url) if image is not None else None
+    assert code is not None, "the game did not show a captcha"
+    await scene.send(code)
+    scene.game.settings.captcha_chance = 0.0
+    scene.game.settings.emoji_chance = 1.0
+    await scene.send("$forage")
+    return await scene.finish()
+
+
+async def _noise(battle: List[Event]) -> List[Event]:
+    """Isekaid messages in another channel and other users chatting."""
+    channel = FakeChannel(NOISE_CHANNEL_ID, "other", guild=FakeGuild(GUILD_ID))
+    events: List[Event] = []
+    for name, args in battle:
+        if name == "message":
+            message = copy.copy(args[0])
+            message.id, message.channel = next_id(), channel
+            events.append(("message", (message,)))
+    others = [FakeUser(next_id(), f"user{i}") for i in range(3)]
+    for i, text in enumerate(("gg", "$map", "anyone selling ore?", "lol", "$hired")):
+        author = others[i % len(others)]
+        events.append(("message", (FakeMessage(next_id(), channel, author, content=text),)))
+    return events
+
+
+async def build_corpus() -> Dict[str, List[Event]]:
+    """Collect the benchmark's messages from the simulated game.
+
+    Returns:
+        Gateway events per message class.
+    """
+    corpus = {
+        "battle": await _battle(),
+        "profession": await _profession(),
+        "retainer": await _retainer(),
+        "verification": await _verification(),
+    }
+    corpus["noise"] = await _noise(corpus["battle"])
+    return {name: corpus[name] for name in MESSAGE_CLASSES}
+
+
+async def _dispatch(bot: ISeKaiZBot, events: Sequence[Event], rounds: int) -> float:
+    """Dispatch events and wait for their listeners.
+
+    Returns:
+        Wall seconds taken.
+    """
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for name, args in events:
+            before = asyncio.all_tasks()
+            bot.dispatch(name, *args)
+            listeners = asyncio.all_tasks() - before
+            if listeners:
+                await asyncio.gather(*listeners, return_exceptions=True)
+    return time.perf_counter() - started
+
+
+async def cog_throughput(corpus: Dict[str, List[Event]], rounds: int) -> Dict[str, Any]:
+    """Measure messages per second through the cogs per message class.
+
+    Args:
+        corpus: Output of build_corpus().
+        rounds: Times each class's events are dispatched.
+
+    Returns:
+        Events, seconds, messages per second and microseconds per message
+        per class.
+    """
+    results: Dict[str, Any] = {}
+    user = FakeUser(PLAYER_ID, PLAYER_NAME)
+    # The bot's own sends go nowhere
+    channel = FakeChannel(CHANNEL_ID, "isekaid", guild=FakeGuild(GUILD_ID), author=user)
+    with tempfile.TemporaryDirectory(prefix="isekaiz-bench-") as state_dir:
+        async with ISeKaiZBot(build_config(state_dir)) as bot:
+            await connect_bot(bot, user, channel, SimCaptchaSolver(None))
+            for name, events in corpus.items():
+                random.seed(SEED)
+                bot.controller.update_state(BotState.INIT)
+                seconds = await _dispatch(bot, events, rounds)
+                count = len(events) * rounds
+                results[name] = {
+                    "events": count,
+                    "seconds": seconds,
+                    "messages_per_second": count / seconds if seconds else 0.0,
+                    "us_per_message": seconds / count * 1e6 if count else 0.0,
+                }
+    return results
+
+
+def extractor_cost(corpus: Dict[str, List[Event]], rounds: int) -> Dict[str, float]:
+    """Measure message_extractor per message class.
+
+    Args:
+        corpus: Output of build_corpus().
+        rounds: Times each class's messages are extracted.
+
+    Returns:
+        Microseconds per call per class.
+    """
+    results: Dict[str, float] = {}
+    for name, events in corpus.items():
+        messages = [args[-1] for _, args in events]
+        started = time.perf_counter()
+        for _ in range(rounds):
+            for message in messages:
+                message_extractor(message)
+        results[name] = (time.perf_counter() - started) / (rounds * len(messages)) * 1e6
+    return results
+
+
+async def _noop() -> Dict[str, Any]:
+    """Task body that does nothing."""
+    return {}
+
+
+def _fill(manager: TaskManager, count: int) -> None:
+    """Queue never-expiring no-op tasks of the high-limit types."""
+    for i in range(count):
+        tag = QUEUE_TASK_TYPES[i % len(QUEUE_TASK_TYPES)]
+        manager.add_task(Task(func=_noop, expire_at=float("inf"), info=f"bench {i}", tag=tag))
+
+
+async def task_manager_cost(
+    sizes: Sequence[int] = QUEUE_SIZES, operations: int = 100, repeat: int = 20
+) -> Dict[str, Dict[str, float]]:
+    """Measure add_task and _execute_next at several queue sizes.
+
+    Args:
+        sizes: Queue sizes to measure at.
+        operations: Calls timed per repetition (the queue grows or shrinks
+            by this much around the size).
+        repeat: Repetitions with a fresh manager.
+
+    Returns:
+        Microseconds per call, keyed by operation and queue size.
+    """
+    add: Dict[str, float] = {}
+    execute: Dict[str, float] = {}
+    for size in sizes:
+        add_seconds = execute_seconds = 0.0
+        for _ in range(repeat):
+            manager = TaskManager(task_gap=0, task_bias=0, metrics=MetricsRegistry())
+            _fill(manager, size)
+            tasks = [
+                Task(func=_noop, expire_at=float("inf"), info=f"bench {i}", tag=TaskType.CMD)
+                for i in range(operations)
+            ]
+            started = time.perf_counter()
+            for task in tasks:
+                manager.add_task(task)
+            add_seconds += time.perf_counter() - started
+
+            started = time.perf_counter()
+            for _ in range(operations):
+                await manager._execute_next()
+            execute_seconds += time.perf_counter() - started
+        add[str(size)] = add_seconds / (repeat * operations) * 1e6
+        execute[str(size)] = execute_seconds / (repeat * operations) * 1e6
+    return {"add_task": add, "execute_next": execute}
+
+
+def synthetic_output(digits: int = 4, boxes: int = NMS_BOXES, seed: int = SEED) -> Any:
+    """Build a model output with a few digits, each hit by several anchors.
+
+    Args:
+        digits: Digits in the fake captcha.
+        boxes: Anchor boxes in the output.
+        seed: Random seed.
+
+    Returns:
+        Array of shape [1, 4 + NMS_CLASSES, boxes].
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    output = np.zeros((1, 4 + NMS_CLASSES, boxes), dtype=np.float32)
+    output[0, :2] = rng.uniform(0, 160, (2, boxes))
+    output[0, 2:4] = rng.uniform(4, 20, (2, boxes))
+    output[0, 4:] = rng.uniform(0, 0.15, (NMS_CLASSES, boxes))
+    for digit in range(digits):
+        anchors = rng.choice(boxes, 8, replace=False)
+        x, label = 20 + digit * 35, rng.integers(NMS_CLASSES)
+        output[0, 0, anchors] = x + rng.normal(0, 1, 8)
+        output[0, 1, anchors] = 80 + rng.normal(0, 1, 8)
+        output[0, 2:4, anchors] = 30
+        output[0, 4 + label, anchors] = rng.uniform(0.5, 0.95, 8)
+    return output
+
+
+def nms_cost(repeat: int = 50, boxes: int = NMS_BOXES) -> Optional[Dict[str, float]]:
+    """Measure CaptchaAI._nms on a synthetic output.
+
+    Args:
+        repeat: Calls timed.
+        boxes: Anchor boxes in the output.
+
+    Returns:
+        Box count, detections kept and milliseconds per call, or None if
+        numpy is not installed.
+    """
+    try:
+        output = synthetic_output(boxes=boxes)
+    except ImportError:
+        return None
+    from services.captcha_service import CaptchaAI
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        ai = CaptchaAI(
+            Path(model_dir) / "captcha.onnx", load_model=False, metrics=MetricsRegistry()
+        )
+        confidences, _, _ = ai._nms(output, ai.IOU_THRESHOLD, ai.CONF_THRESHOLD)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            ai._nms(output, ai.IOU_THRESHOLD, ai.CONF_THRESHOLD)
+        seconds = time.perf_counter() - started
+    return {"boxes": boxes, "detections": len(confidences), "ms": seconds / repeat * 1e3}
+
+
+def run(
+    rounds: int = 20,
+    sizes: Sequence[int] = QUEUE_SIZES,
+    nms_repeat: int = 50,
+    progress: Callable[[str], None] = lambda stage: None,
+) -> Dict[str, Any]:
+    """Run every benchmark.
+
+    Args:
+        rounds: Times each message class is dispatched (extracted 50x more).
+        sizes: Queue sizes for the TaskManager benchmark.
+        nms_repeat: _nms calls timed.
+        progress: Called with each stage's name before it runs.
+
+    Returns:
+        Benchmark results.
+    """
+    progress("corpus")
+    corpus = run_virtual(build_corpus(), VirtualClock())
+    progress("cogs")
+    results: Dict[str, Any] = {
+        "cogs": run_virtual(cog_throughput(corpus, rounds), VirtualClock()),
+    }
+    progress("extractor")
+    results["extractor"] = extractor_cost(corpus, rounds * 50)
+    progress("task_manager")
+    results["task_manager"] = asyncio.run(task_manager_cost(sizes))
+    progress("nms")
+    results["nms"] = nms_cost(nms_repeat)
+    return results
+
+
+def format_report(results: Dict[str, Any]) -> str:
+    """Format benchmark results as text.
+
+    Args:
+        results: Output of run().
+
+    Returns:
+        Human readable report.
+    """
+    lines = [f"{'message class':<14} {'events':>7} {'msg/s':>9} {'us/msg':>9} {'extract us':>11}"]
+    for name, cog in results["cogs"].items():
+        lines.append(
+            f"{name:<14} {cog['events']:>7} {cog['messages_per_second']:>9,.0f} "
+            f"{cog['us_per_message']:>9.1f} {results['extractor'].get(name, 0.0):>11.2f}"
+        )
+
+    manager = results["task_manager"]
+    lines.append(f"{'queue size':<14} {'add_task us':>12} {'execute us':>11}")
+    for size, us in manager["add_task"].items():
+        lines.append(f"{size:<14} {us:>12.2f} {manager['execute_next'][size]:>11.2f}")
+
+    nms = results["nms"]
+    if nms is None:
+        lines.append("_nms: skipped (numpy not installed)")
+    else:
+        lines.append(
+            f"_nms: {nms['ms']:.2f} ms ({nms['boxes']} boxes, {nms['detections']} kept)"
+        )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Message-handling throughput")
+    parser.add_argument("--rounds", type=int, default=20, help="Dispatches per message class")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=list(QUEUE_SIZES), help="TaskManager queue sizes"
+    )
+    parser.add_argument("--nms-repeat", type=int, default=50, help="_nms calls timed")
+    parser.add_argument("--json", default=None, help="Write results to a JSON file")
+    args = parser.parse_args()
+
+    setup_logging(logging.ERROR, use_colors=False)
+    results = run(
+        args.rounds,
+        args.sizes,
+        args.nms_repeat,
+        progress=lambda stage: print(f"running {stage}...", flush=True),
+    )
+    print(format_report(results))
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -47,6 +47,36 @@ class Config:
     treasure_guild: str = ""
     exp_food: str = "sushi-roll"
     captcha_model: str = "./model/captcha.onnx"
+    captcha_batch_size: int = 8        # max images per inference run
+    captcha_batch_wait: int = 5        # milliseconds to wait for a batch to fill
+    captcha_socket: str = ""           # captcha service socket ("" = in-process)
+    captcha_cache_size: int = 256      # captcha images kept in the result cache
+    captcha_model_int8: str = ""       # quantized model ("" = FP32 only)
+    captcha_max_accuracy_drop: float = 0.02  # max INT8 sequence accuracy loss
+    captcha_eval_dir: str = ""         # labelled images to verify INT8 on
+    captcha_dataset_dir: str = ""      # record solved captchas ("" = off)
+    captcha_dataset_max_mb: int = 200  # dataset size budget before rotation
+    account: str = "default"           # name this account's state is stored under
+    state_store: str = "state.db"      # state file (.db = SQLite, else JSON)
+    journal_dir: str = ""              # outcome journal directory ("" = off)
+    log_queue_size: int = 0            # log on a background thread (0 = off)
+    log_drop_policy: str = "drop_new"  # full log queue: drop_new or drop_oldest
+    log_sample_limit: int = 0          # repetitive task logs per interval (0 = all)
+    log_sample_interval: int = 60      # seconds
+    log_file: str = ""                 # log file ("" = console only)
+    log_format: str = "text"           # log file format: text or json
+    log_max_mb: int = 0                # rotate the log file at this size (0 = never)
+    log_rotate_hours: int = 0          # rotate the log file at this age (0 = never)
+    log_backup_count: int = 0          # rotated log files kept (0 = all)
+    metrics_port: int = 0              # localhost Prometheus endpoint (0 = off)
+    loop_lag_threshold: int = 100      # ms of event loop lag reported as a stall (0 = off)
+    loop_debug: bool = False           # asyncio debug slow-callback reports
+    trace_capacity: int = 256          # recent message traces kept (0 = off)
+    # Minutes between tracemalloc memory samples (0 = on demand). Tracing keeps
+    # 5 frames per allocation and slows the bot while on: always with periodic
+    # samples, on demand only from one !memory to the next
+    memory_sample_minutes: int = 0
+    record_dir: str = ""               # anonymized Isekaid traffic recordings ("" = off)
     sell_equip: List[EquipGrade] = field(default_factory=lambda: ["F", "E", "D"])
     trust_usr: List[str] = field(default_factory=list)
     craft_channel_id: str = ""
@@ -91,6 +121,33 @@ class Config:
             treasure_guild=data.get("treasureGuild", ""),
             exp_food=data.get("expFood", "sushi-roll"),
             captcha_model=data.get("captchaModel", "./model/captcha.onnx"),
+            captcha_batch_size=data.get("captchaBatchSize", 8),
+            captcha_batch_wait=data.get("captchaBatchWait", 5),
+            captcha_socket=data.get("captchaSocket", ""),
+            captcha_cache_size=data.get("captchaCacheSize", 256),
+            captcha_model_int8=data.get("captchaModelInt8", ""),
+            captcha_max_accuracy_drop=data.get("captchaMaxAccuracyDrop", 0.02),
+            captcha_eval_dir=data.get("captchaEvalDir", ""),
+            captcha_dataset_dir=data.get("captchaDatasetDir", ""),
+            captcha_dataset_max_mb=data.get("captchaDatasetMaxMb", 200),
+            account=data.get("account", "default"),
+            state_store=data.get("stateStore", "state.db"),
+            journal_dir=data.get("journalDir", ""),
+            log_queue_size=data.get("logQueueSize", 0),
+            log_drop_policy=data.get("logDropPolicy", "drop_new"),
+            log_sample_limit=data.get("logSampleLimit", 0),
+            log_sample_interval=data.get("logSampleInterval", 60),
+            log_file=data.get("logFile", ""),
+            log_format=data.get("logFormat", "text"),
+            log_max_mb=data.get("logMaxMb", 0),
+            log_rotate_hours=data.get("logRotateHours", 0),
+            log_backup_count=data.get("logBackupCount", 0),
+            metrics_port=data.get("metricsPort", 0),
+            loop_lag_threshold=data.get("loopLagThreshold", 100),
+            loop_debug=data.get("loopDebug", False),
+            trace_capacity=data.get("traceCapacity", 256),
+            memory_sample_minutes=data.get("memorySampleMinutes", 0),
+            record_dir=data.get("recordDir", ""),
             sell_equip=data.get("sellEquip", ["F", "E", "D"]),
             trust_usr=data.get("trustUsr", []),
             craft_channel_id=data.get("craftChannelId", ""),
@@ -112,6 +169,33 @@ class Config:
             "treasureGuild": self.treasure_guild,
             "expFood": self.exp_food,
             "captchaModel": self.captcha_model,
+            "captchaBatchSize": self.captcha_batch_size,
+            "captchaBatchWait": self.captcha_batch_wait,
+            "captchaSocket": self.captcha_socket,
+            "captchaCacheSize": self.captcha_cache_size,
+            "captchaModelInt8": self.captcha_model_int8,
+            "captchaMaxAccuracyDrop": self.captcha_max_accuracy_drop,
+            "captchaEvalDir": self.captcha_eval_dir,
+            "captchaDatasetDir": self.captcha_dataset_dir,
+            "captchaDatasetMaxMb": self.captcha_dataset_max_mb,
+            "account": self.account,
+            "stateStore": self.state_store,
+            "journalDir": self.journal_dir,
+            "logQueueSize": self.log_queue_size,
+            "logDropPolicy": self.log_drop_policy,
+            "logSampleLimit": self.log_sample_limit,
+            "logSampleInterval": self.log_sample_interval,
+            "logFile": self.log_file,
+            "logFormat": self.log_format,
+            "logMaxMb": self.log_max_mb,
+            "logRotateHours": self.log_rotate_hours,
+            "logBackupCount": self.log_backup_count,
+            "metricsPort": self.metrics_port,
+            "loopLagThreshold": self.loop_lag_threshold,
+            "loopDebug": self.loop_debug,
+            "traceCapacity": self.trace_capacity,
+            "memorySampleMinutes": self.memory_sample_minutes,
+            "recordDir": self.record_dir,
             "sellEquip": self.sell_equip,
             "trustUsr": self.trust_usr,
             "craftChannelId": self.craft_channel_id,
@@ -3,6 +3,9 @@
 from __future__ import annotations
 
 import asyncio
+import functools
+import time
+import weakref
 from typing import Any, Dict, Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -12,13 +15,37 @@ from bot.config import Config
 from bot.player import Player, PlayerState
 from bot.event_manager import BotEventManager, BotState
 from bot.task_manager import Task, TaskManager, TaskType, get_default_rank
-from utils.logging import get_logger
+from utils.logging import get_logger, set_log_context
+from utils.metrics import REGISTRY, MetricsRegistry
 
 logger = get_logger(__name__)
 
 # Timer interval in seconds
 TIMER_INTERVAL = 60
 
+TIMER_KEYS = ("map", "prof", "verify")
+
+# Metric names
+STATE_METRIC = "bot_state"
+STATE_SECONDS_METRIC = "bot_state_seconds"
+TIMER_REFRESH_METRIC = "timer_refreshes_total"
+
+# Controllers reporting their state into each registry. Held weakly so the
+# state gauges sum over live controllers without keeping any of them alive.
+_STATE_SOURCES: "weakref.WeakKeyDictionary[MetricsRegistry, weakref.WeakSet[Controller]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _in_state(controllers: "weakref.WeakSet[Controller]", state: BotState) -> int:
+    """Count the controllers currently in a state."""
+    return sum(1 for controller in controllers if controller._current_state == state)
+
+
+def _seconds_in_state(controllers: "weakref.WeakSet[Controller]", state: BotState) -> float:
+    """Add up the time controllers have spent in a state."""
+    return sum(controller.state_seconds(state) for controller in controllers)
+
 
 class Controller:
     """Central controller that orchestrates all bot operations.
@@ -27,15 +54,23 @@ class Controller:
     recurring timers (map, profession, verify).
     """
 
-    def __init__(self, player: Player, config: Config) -> None:
+    def __init__(
+        self,
+        player: Player,
+        config: Config,
+        metrics: Optional[MetricsRegistry] = None,
+    ) -> None:
         """Initialize the controller.
 
         Args:
             player: The player state object.
             config: Bot configuration.
+            metrics: Registry for state and timer metrics (the process-wide
+                one by default).
         """
         self.player = player
         self.config = config
+        metrics = metrics or REGISTRY
 
         # Initialize task manager with config values
         self.task_manager = TaskManager(
@@ -43,6 +78,7 @@ class Controller:
             task_gap=config.task_gap,
             task_bias=config.task_bias,
             retry_count=config.retry_count,
+            metrics=metrics,
         )
 
         # Initialize event manager
@@ -60,6 +96,74 @@ class Controller:
         self._timers: Dict[str, asyncio.Task] = {}
         self._check_task: Optional[asyncio.Task] = None
 
+        # Time spent in each state, excluding the current stay
+        self._state_seconds: Dict[BotState, float] = {}
+        self._state_since = time.monotonic()
+        self._setup_metrics(metrics)
+
+    def _setup_metrics(self, registry: MetricsRegistry) -> None:
+        """Register the state gauges and timer refresh counters.
+
+        Args:
+            registry: Registry to create the metrics in.
+        """
+        self._register_state(registry)
+        self._timer_refreshes = {
+            key: registry.counter(TIMER_REFRESH_METRIC, "Timer (re)starts", {"timer": key})
+            for key in TIMER_KEYS
+        }
+
+    def _register_state(self, registry: MetricsRegistry) -> None:
+        """Add this controller to the registry's state gauges.
+
+        Every controller sharing a registry (one per bot) is counted, instead
+        of the last one created replacing the others.
+
+        Args:
+            registry: Registry holding the gauges.
+        """
+        controllers = _STATE_SOURCES.get(registry)
+        if controllers is None:
+            controllers = _STATE_SOURCES[registry] = weakref.WeakSet()
+            for state in BotState:
+                labels = {"state": state.value}
+                registry.gauge(STATE_METRIC, "Bots in each state", labels).set_function(
+                    functools.partial(_in_state, controllers, state)
+                )
+                registry.gauge(
+                    STATE_SECONDS_METRIC, "Seconds spent in each bot state", labels
+                ).set_function(functools.partial(_seconds_in_state, controllers, state))
+        controllers.add(self)
+
+    def state_seconds(self, state: BotState) -> float:
+        """Get the total time spent in a state.
+
+        Args:
+            state: State to report.
+
+        Returns:
+            Seconds spent in the state, including the current stay.
+        """
+        seconds = self._state_seconds.get(state, 0.0)
+        if state == self._current_state:
+            seconds += time.monotonic() - self._state_since
+        return seconds
+
+    def _enter_state(self, new_state: BotState) -> None:
+        """Record a state change for the state metrics.
+
+        Args:
+            new_state: The state being entered.
+        """
+        now = time.monotonic()
+        if self._current_state is not None:
+            elapsed = now - self._state_since
+            self._state_seconds[self._current_state] = (
+                self._state_seconds.get(self._current_state, 0.0) + elapsed
+            )
+        self._state_since = now
+        self._current_state = new_state
+
     async def start(self) -> None:
         """Start the controller's task execution loop."""
         logger.info("Controller starting...")
@@ -107,7 +211,7 @@ class Controller:
         if isinstance(result, dict):
             new_state = result.get("state")
             if new_state and new_state != self._current_state:
-                self._current_state = new_state
+                self._enter_state(new_state)
                 await self.event_manager.emit(new_state)
 
     def add_task(self, task: Task, timer_key: Optional[str] = None) -> bool:
@@ -138,7 +242,8 @@ class Controller:
         if self._current_state != new_state:
             logger.info(f"Changing state to: {new_state.value}")
             self.player.state = PlayerState(new_state.value)
-            self._current_state = new_state
+            set_log_context(state=new_state.value)
+            self._enter_state(new_state)
             # Create task to emit event (non-blocking)
             asyncio.create_task(self.event_manager.emit(new_state))
 
@@ -151,6 +256,8 @@ class Controller:
             key: Timer key ('map', 'prof', 'verify').
         """
         self._cancel_timer(key)
+        if key in self._timer_refreshes:
+            self._timer_refreshes[key].inc()
 
         if key == "map":
             self._timers[key] = asyncio.create_task(
@@ -65,7 +65,7 @@ class BotEventManager:
         Args:
             state: The state event to emit.
         """
-        logger.debug(f"Emitting state: {state.value}")
+        logger.debug("Emitting state: %s", state.value)
         self._current_state = state
 
         for callback in self._listeners[state]:
@@ -86,7 +86,7 @@ class BotEventManager:
         Note:
             This should be used carefully. Prefer emit() when in async context.
         """
-        logger.debug(f"Emitting state (sync): {state.value}")
+        logger.debug("Emitting state (sync): %s", state.value)
         self._current_state = state
 
         for callback in self._listeners[state]:
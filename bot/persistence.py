@@ -0,0 +1,233 @@
+"""Crash-safe, non-blocking persistence for small JSON state files."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Default delay used to collapse bursts of saves into one write
+DEFAULT_SAVE_DELAY = 1.0
+
+
+def atomic_write_text(path: str | Path, text: str) -> None:
+    """Replace a file's contents atomically.
+
+    The text is written to a temporary file in the same directory, flushed
+    to disk and renamed over the target, so readers (and a crash) only
+    ever see the old or the new contents.
+
+    Args:
+        path: File to write.
+        text: New contents.
+
+    Raises:
+        OSError: If the file cannot be written.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+    # Persist the rename itself (not supported on every platform)
+    try:
+        dir_fd = os.open(path.parent, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+
+def atomic_write_json(path: str | Path, data: Any, indent: Optional[int] = 2) -> None:
+    """Serialize data to JSON and write it atomically.
+
+    Args:
+        path: File to write.
+        data: JSON-serializable data.
+        indent: JSON indentation (None for compact output).
+
+    Raises:
+        OSError: If the file cannot be written.
+    """
+    atomic_write_text(path, json.dumps(data, indent=indent))
+
+
+def quarantine(path: str | Path) -> Optional[Path]:
+    """Move an unreadable file aside so it is not overwritten.
+
+    Args:
+        path: File to move.
+
+    Returns:
+        New path of the file, or None if it could not be moved.
+    """
+    path = Path(path)
+    target = path.with_name(f"{path.name}.corrupt-{int(time.time())}")
+    try:
+        os.replace(path, target)
+    except OSError as e:
+        logger.error(f"Could not move aside {path}: {e}")
+        return None
+    return target
+
+
+class DebouncedWriter:
+    """Writes the latest snapshot of some state, off the event loop.
+
+    Saves scheduled within ``delay`` seconds of each other are collapsed
+    into a single call of ``write`` in the default executor. Writes run
+    one at a time and in order. ``flush()`` writes anything pending
+    immediately and must be awaited on shutdown. Without a running event
+    loop, saves are written synchronously.
+    """
+
+    def __init__(
+        self,
+        write: Callable[[Any], None],
+        delay: float = DEFAULT_SAVE_DELAY,
+        merge: bool = False,
+        path: Optional[Path] = None,
+    ) -> None:
+        """Initialize the writer.
+
+        Args:
+            write: Function persisting a snapshot (called from a worker thread).
+            delay: Seconds to wait for more saves before writing.
+            merge: Treat snapshots as dicts and merge them until written
+                (for batching several keys into one write) instead of
+                replacing the pending snapshot.
+            path: File ``write`` saves to, if any (for callers to compare).
+        """
+        self._write_fn = write
+        self.path = path
+        self.delay = delay
+        self._merge = merge
+        self._pending: Any = None
+        self._has_pending = False
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._in_flight: Optional[asyncio.Future] = None
+
+        # Statistics
+        self.scheduled: int = 0
+        self.writes: int = 0
+
+    @classmethod
+    def for_json(
+        cls,
+        path: str | Path,
+        delay: float = DEFAULT_SAVE_DELAY,
+        indent: Optional[int] = 2,
+    ) -> "DebouncedWriter":
+        """Create a writer saving snapshots to a JSON file atomically.
+
+        Args:
+            path: File to write.
+            delay: Seconds to wait for more saves before writing.
+            indent: JSON indentation (None for compact output).
+
+        Returns:
+            Writer for the file (its path is available as ``path``).
+        """
+        return cls(lambda data: atomic_write_json(path, data, indent), delay, path=Path(path))
+
+    @property
+    def pending(self) -> bool:
+        """Check if a save is waiting to be (or being) written."""
+        return self._has_pending or self._in_flight is not None
+
+    def schedule(self, data: Any) -> None:
+        """Schedule a save of a state snapshot.
+
+        Args:
+            data: Snapshot to write (merged into the pending one in merge mode).
+        """
+        self.scheduled += 1
+        if self._merge and self._has_pending:
+            self._pending.update(data)
+        else:
+            self._pending = dict(data) if self._merge else data
+        self._has_pending = True
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write(self._take_pending())
+            return
+
+        if self._timer is None:
+            self._timer = loop.call_later(self.delay, self._start_write)
+
+    async def flush(self) -> None:
+        """Write any pending save now and wait for all writes to finish."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._has_pending or self._in_flight is not None:
+            if self._in_flight is None:
+                self._start_write()
+            in_flight = self._in_flight
+            if in_flight is not None:
+                await asyncio.shield(in_flight)
+
+    def _start_write(self) -> None:
+        """Hand the pending snapshot to the executor (one write at a time)."""
+        self._timer = None
+        if not self._has_pending or self._in_flight is not None:
+            return  # a running write starts the next one when done
+
+        future = asyncio.get_running_loop().run_in_executor(
+            None, self._write, self._take_pending()
+        )
+        self._in_flight = future
+        future.add_done_callback(self._on_written)
+
+    def _on_written(self, future: asyncio.Future) -> None:
+        """Start the next write if saves arrived while writing."""
+        self._in_flight = None
+        if self._has_pending and self._timer is None:
+            self._start_write()
+
+    def _take_pending(self) -> Any:
+        """Detach the pending snapshot."""
+        data = self._pending
+        self._pending = None
+        self._has_pending = False
+        return data
+
+    def _write(self, data: Any) -> None:
+        """Persist a snapshot, logging failures.
+
+        Args:
+            data: Snapshot to write.
+        """
+        try:
+            self._write_fn(data)
+        except Exception as e:
+            logger.error(f"Error saving state: {e}")
+            return
+        self.writes += 1
@@ -11,6 +11,8 @@ from typing import Any, Optional, TYPE_CHECKING
 if TYPE_CHECKING:
     import discord
 
+from bot.persistence import DebouncedWriter, atomic_write_json, quarantine
+from bot.state_store import DEFAULT_ACCOUNT, StateStore, migrate_legacy
 from utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -48,26 +50,42 @@ class UserData:
         try:
             if path.exists():
                 with path.open("r", encoding="utf-8") as f:
-                    data = json.load(f)
-                return cls(
-                    last_eat_at=data.get("last_eat_at", 0),
-                    zone_index=data.get("zone_index", 0),
-                )
-        except (json.JSONDecodeError, OSError) as e:
+                    return cls.from_dict(json.load(f))
+        except json.JSONDecodeError as e:
+            # Keep the damaged file for recovery instead of overwriting it
+            moved = quarantine(path)
+            logger.error(f"User data is corrupt ({e}), moved to {moved}; starting from defaults")
+        except OSError as e:
             logger.warning(f"User data not found or invalid, creating default. Reason: {e}")
 
         return cls()
 
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "UserData":
+        """Build user data from its serialized form.
+
+        Args:
+            data: Dictionary produced by to_dict().
+
+        Returns:
+            UserData instance (missing keys use defaults).
+        """
+        return cls(
+            last_eat_at=data.get("last_eat_at", 0),
+            zone_index=data.get("zone_index", 0),
+        )
+
     def save(self, path: str | Path = "user_data.json") -> None:
         """Save user data to file.
 
+        Writes atomically and blocks until done; prefer
+        Player.save_user_data() on the event loop.
+
         Args:
             path: Path to save the user data JSON file.
         """
-        path = Path(path)
         try:
-            with path.open("w", encoding="utf-8") as f:
-                json.dump(self.to_dict(), f, indent=2)
+            atomic_write_json(path, self.to_dict())
         except OSError as e:
             logger.error(f"Error saving user data: {e}")
 
@@ -91,6 +109,7 @@ class Player:
     channel: Optional["discord.TextChannel"] = None
     channel_id: str = ""
     username: str = ""
+    account: str = DEFAULT_ACCOUNT
 
     # Message references for current activities
     battle_msg: Optional["discord.Message"] = None
@@ -103,7 +122,9 @@ class Player:
     enable_battle: bool = True
 
     # Persistent data
-    user_data: UserData = field(default_factory=UserData.load)
+    user_data: UserData = field(default_factory=UserData)
+    store: Optional[StateStore] = field(default=None, repr=False, compare=False)
+    _writer: Optional[DebouncedWriter] = field(default=None, repr=False, compare=False)
 
     def is_stopped(self) -> bool:
         """Check if the player is in a stopped state.
@@ -125,24 +146,52 @@ class Player:
         self.sell = 0
 
     def save_user_data(self, path: str | Path = "user_data.json") -> None:
-        """Save persistent user data to disk.
+        """Schedule a save of persistent user data.
+
+        The write happens atomically off the event loop; saves made in
+        quick succession are collapsed into one. Call flush_user_data()
+        before exiting.
 
         Args:
-            path: Path to save the user data JSON file.
+            path: Path to save the user data JSON file (ignored when the
+                player has a state store).
         """
-        self.user_data.save(path)
+        if self.store is not None:
+            self.store.writer.schedule({(self.account, self.channel_id): self.user_data.to_dict()})
+            return
+        if self._writer is None or self._writer.path != Path(path):
+            self._writer = DebouncedWriter.for_json(path)
+        self._writer.schedule(self.user_data.to_dict())
+
+    async def flush_user_data(self) -> None:
+        """Write any pending user data save and wait for it to finish."""
+        if self.store is not None:
+            await self.store.writer.flush()
+        if self._writer is not None:
+            await self._writer.flush()
 
     @classmethod
-    def create(cls, channel_id: str = "") -> "Player":
+    def create(
+        cls,
+        channel_id: str = "",
+        account: str = DEFAULT_ACCOUNT,
+        store: Optional[StateStore] = None,
+    ) -> "Player":
         """Create a new Player instance with loaded user data.
 
         Args:
             channel_id: Discord channel ID for the bot to operate in.
+            account: Account name the user data is stored under.
+            store: State store to load from and save to; without one the
+                single-account user_data.json file is used.
 
         Returns:
             New Player instance.
         """
-        return cls(
-            channel_id=channel_id,
-            user_data=UserData.load(),
-        )
+        if store is None:
+            user_data = UserData.load()
+        else:
+            data = store.load(account, channel_id) or migrate_legacy(store, account, channel_id)
+            user_data = UserData.from_dict(data or {})
+
+        return cls(channel_id=channel_id, account=account, user_data=user_data, store=store)
@@ -0,0 +1,316 @@
+"""Persistent per-account state shared by several bots or processes.
+
+State is a small JSON-serializable dict keyed by (account, channel), so
+any number of accounts can persist into one store without clobbering
+each other. Two backends are available, chosen by file suffix in
+open_store():
+
+- ``SqliteStateStore`` (``.db``/``.sqlite``/``.sqlite3``): one row per
+  key in a WAL-mode database; concurrent processes can read while one
+  writes, and writers wait on each other instead of failing.
+- ``JsonStateStore`` (anything else): a single JSON document rewritten
+  atomically under a file lock, merging other processes' keys.
+
+Saves go through ``StateStore.writer``, which collapses bursts and
+commits every dirty key of the store in one transaction.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+fcntl: Optional[ModuleType]
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock for the JSON backend
+    fcntl = None
+
+from bot.persistence import DebouncedWriter, atomic_write_json, quarantine
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# (account, channel_id)
+StateKey = Tuple[str, str]
+
+DEFAULT_ACCOUNT = "default"
+LEGACY_USER_DATA = "user_data.json"
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+# Seconds a SQLite writer waits for another process's transaction
+SQLITE_BUSY_TIMEOUT = 10.0
+
+
+class StateStore(ABC):
+    """Interface of a keyed store for per-account state."""
+
+    def __init__(self, path: str | Path) -> None:
+        """Initialize the store.
+
+        Args:
+            path: Backing file.
+        """
+        self.path = Path(path)
+        self._writer: Optional[DebouncedWriter] = None
+
+    @abstractmethod
+    def load(self, account: str, channel_id: str) -> Optional[Dict[str, Any]]:
+        """Read the state of one account and channel.
+
+        Args:
+            account: Account name.
+            channel_id: Discord channel ID.
+
+        Returns:
+            The stored state, or None if there is none.
+        """
+
+    @abstractmethod
+    def save_many(self, states: Mapping[StateKey, Dict[str, Any]]) -> None:
+        """Write several states in a single commit.
+
+        Args:
+            states: Mapping of (account, channel_id) to state.
+        """
+
+    @abstractmethod
+    def keys(self) -> List[StateKey]:
+        """List the stored (account, channel_id) keys."""
+
+    def save(self, account: str, channel_id: str, data: Dict[str, Any]) -> None:
+        """Write the state of one account and channel immediately.
+
+        Args:
+            account: Account name.
+            channel_id: Discord channel ID.
+            data: State to store.
+        """
+        self.save_many({(account, channel_id): data})
+
+    @property
+    def writer(self) -> DebouncedWriter:
+        """Get the store's debounced writer.
+
+        Schedule ``{(account, channel_id): data}`` on it; pending states of
+        every account are merged and committed together off the event loop.
+        """
+        if self._writer is None:
+            self._writer = DebouncedWriter(self.save_many, merge=True)
+        return self._writer
+
+    def close(self) -> None:
+        """Release the backing resources."""
+
+
+class JsonStateStore(StateStore):
+    """State store backed by one JSON document.
+
+    Every write re-reads the file under an exclusive lock and only replaces
+    the keys being saved, so processes sharing the file keep each other's
+    accounts.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        """Initialize the store.
+
+        Args:
+            path: JSON file.
+        """
+        super().__init__(path)
+        self._lock = threading.Lock()
+
+    def load(self, account: str, channel_id: str) -> Optional[Dict[str, Any]]:
+        """Read the state of one account and channel."""
+        return self._read().get(self._key(account, channel_id))
+
+    def save_many(self, states: Mapping[StateKey, Dict[str, Any]]) -> None:
+        """Write several states in a single file replacement."""
+        with self._locked():
+            document = self._read()
+            for (account, channel_id), data in states.items():
+                document[self._key(account, channel_id)] = data
+            atomic_write_json(self.path, {"states": document})
+
+    def keys(self) -> List[StateKey]:
+        """List the stored (account, channel_id) keys."""
+        keys = (key.partition("/") for key in self._read())
+        return [(account, channel_id) for account, _, channel_id in keys]
+
+    @staticmethod
+    def _key(account: str, channel_id: str) -> str:
+        """Build the document key of an account and channel."""
+        return f"{account}/{channel_id}"
+
+    def _read(self) -> Dict[str, Any]:
+        """Read all states, moving a damaged file aside."""
+        try:
+            with self.path.open("r", encoding="utf-8") as f:
+                return json.load(f).get("states", {})
+        except FileNotFoundError:
+            return {}
+        except (ValueError, AttributeError) as e:
+            moved = quarantine(self.path)
+            logger.error(f"State file is corrupt ({e}), moved to {moved}")
+            return {}
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Hold the thread lock and, where supported, a file lock."""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            lock_path = self.path.with_name(self.path.name + ".lock")
+            with lock_path.open("a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class SqliteStateStore(StateStore):
+    """State store backed by a SQLite database in WAL mode."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS state (
+            account    TEXT    NOT NULL,
+            channel_id TEXT    NOT NULL,
+            data       TEXT    NOT NULL,
+            updated_at INTEGER NOT NULL,
+            PRIMARY KEY (account, channel_id)
+        )
+    """
+    SELECT = "SELECT data FROM state WHERE account = ? AND channel_id = ?"
+    UPSERT = """
+        INSERT INTO state (account, channel_id, data, updated_at) VALUES (?, ?, ?, ?)
+        ON CONFLICT (account, channel_id)
+        DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at
+    """
+    KEYS = "SELECT account, channel_id FROM state ORDER BY account, channel_id"
+
+    def __init__(self, path: str | Path) -> None:
+        """Open (or create) the database.
+
+        Args:
+            path: Database file.
+        """
+        super().__init__(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Statements are parameterized, so sqlite3 reuses their compiled form
+        self._conn = sqlite3.connect(
+            self.path,
+            timeout=SQLITE_BUSY_TIMEOUT,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=16,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(self.SCHEMA)
+
+    def load(self, account: str, channel_id: str) -> Optional[Dict[str, Any]]:
+        """Read the state of one account and channel."""
+        with self._lock:
+            row = self._conn.execute(self.SELECT, (account, channel_id)).fetchone()
+        if row is None:
+            return None
+        try:
+            return json.loads(row[0])
+        except ValueError as e:
+            logger.error(f"Stored state of {account}/{channel_id} is corrupt: {e}")
+            return None
+
+    def save_many(self, states: Mapping[StateKey, Dict[str, Any]]) -> None:
+        """Write several states in a single transaction."""
+        now = int(time.time())
+        rows = [
+            (account, channel_id, json.dumps(data, separators=(",", ":")), now)
+            for (account, channel_id), data in states.items()
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(self.UPSERT, rows)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def keys(self) -> List[StateKey]:
+        """List the stored (account, channel_id) keys."""
+        with self._lock:
+            return [tuple(row) for row in self._conn.execute(self.KEYS)]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+_stores: Dict[Path, StateStore] = {}
+
+
+def open_store(path: str | Path) -> StateStore:
+    """Open the state store at a path, shared within the process.
+
+    Args:
+        path: Backing file; SQLite for .db/.sqlite/.sqlite3, JSON otherwise.
+
+    Returns:
+        The store for the path (the same instance for every caller).
+    """
+    path = Path(path).resolve()
+    if path not in _stores:
+        if path.suffix.lower() in SQLITE_SUFFIXES:
+            _stores[path] = SqliteStateStore(path)
+        else:
+            _stores[path] = JsonStateStore(path)
+    return _stores[path]
+
+
+def migrate_legacy(
+    store: StateStore,
+    account: str,
+    channel_id: str,
+    legacy_path: str | Path = LEGACY_USER_DATA,
+) -> Optional[Dict[str, Any]]:
+    """Move a single-account user data file into a store.
+
+    The file is imported only if the store has no state for the key yet,
+    and is renamed to ``<name>.migrated`` afterwards so it is not imported
+    into another account.
+
+    Args:
+        store: Destination store.
+        account: Account the file belongs to.
+        channel_id: Channel the file belongs to.
+        legacy_path: Old user data file.
+
+    Returns:
+        The imported state, or None if there was nothing to import.
+    """
+    legacy_path = Path(legacy_path)
+    if not legacy_path.exists() or store.load(account, channel_id) is not None:
+        return None
+
+    try:
+        data = json.loads(legacy_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        logger.warning(f"Cannot migrate {legacy_path}: {e}")
+        return None
+
+    store.save(account, channel_id, data)
+    legacy_path.replace(legacy_path.with_name(legacy_path.name + ".migrated"))
+    logger.info(f"Migrated {legacy_path} into {store.path} as {account}/{channel_id}")
+    return data
@@ -3,15 +3,42 @@
 from __future__ import annotations
 
 import asyncio
+import functools
+import logging
 import time
+import weakref
 from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any, Awaitable, Callable, Dict, List, Optional
 
-from utils.logging import get_logger
+from utils.logging import get_logger, log_context
+from utils.metrics import REGISTRY, Counter, Histogram, MetricsRegistry
+from utils.tracing import TRACER, current_trace
 
 logger = get_logger(__name__)
 
+# Metric names (labelled by task_type)
+QUEUE_DEPTH_METRIC = "task_queue_depth"
+QUEUE_WAIT_METRIC = "task_queue_wait_ms"
+EXECUTE_METRIC = "task_execute_ms"
+EXPIRED_METRIC = "task_expired_total"
+REJECTED_METRIC = "task_rejected_total"
+FAILED_METRIC = "task_failed_total"
+
+# Queue waits include the task gap and bias, so they run to minutes
+QUEUE_WAIT_BUCKETS_MS = (100, 500, 1000, 2500, 5000, 10000, 30000, 60000, 120000, 300000)
+
+# Task managers reporting queue depth into each registry. Held weakly so the
+# depth gauges sum over live managers without keeping any of them alive.
+_DEPTH_SOURCES: "weakref.WeakKeyDictionary[MetricsRegistry, weakref.WeakSet[TaskManager]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _queued(managers: "weakref.WeakSet[TaskManager]", task_type: "TaskType") -> int:
+    """Count the queued tasks of a type across task managers."""
+    return sum(manager._task_type_counter.get(task_type, 0) for manager in managers)
+
 
 class TaskType(str, Enum):
     """Types of tasks with their identifiers."""
@@ -99,6 +126,8 @@ class Task:
     tag: TaskType = TaskType.CMD
     rank: int = field(default=5)
     retry: int = 0
+    enqueued_at: float = field(default=0.0, repr=False, compare=False)  # Monotonic seconds
+    trace_id: Optional[str] = field(default_factory=current_trace, repr=False, compare=False)
 
     def __post_init__(self) -> None:
         """Set default rank based on task type if not specified."""
@@ -135,6 +164,7 @@ class TaskManager:
         task_gap: int = 2000,
         task_bias: int = 3000,
         retry_count: int = 2,
+        metrics: Optional[MetricsRegistry] = None,
     ) -> None:
         """Initialize the TaskManager.
 
@@ -143,6 +173,7 @@ class TaskManager:
             task_gap: Minimum milliseconds between task executions.
             task_bias: Random additional delay (0 to bias) between tasks.
             retry_count: Maximum retry attempts for failed tasks.
+            metrics: Registry for queue metrics (the process-wide one by default).
         """
         self._queue: List[Task] = []
         self._task_type_counter: Dict[TaskType, int] = {}
@@ -153,6 +184,56 @@ class TaskManager:
         self._callback = on_task_complete
         self._lock = asyncio.Lock()
         self._running = False
+        self._setup_metrics(metrics or REGISTRY)
+
+    def _setup_metrics(self, registry: MetricsRegistry) -> None:
+        """Create the per task type metrics up front so hot paths only index dicts.
+
+        Args:
+            registry: Registry to create the metrics in.
+        """
+        self._wait_ms: Dict[TaskType, Histogram] = {}
+        self._execute_ms: Dict[TaskType, Histogram] = {}
+        self._expired: Dict[TaskType, Counter] = {}
+        self._rejected: Dict[TaskType, Counter] = {}
+        self._failed: Dict[TaskType, Counter] = {}
+        for task_type in TaskType:
+            labels = {"task_type": task_type.value}
+            self._wait_ms[task_type] = registry.histogram(
+                QUEUE_WAIT_METRIC, "Time from enqueue to execution", QUEUE_WAIT_BUCKETS_MS, labels
+            )
+            self._execute_ms[task_type] = registry.histogram(
+                EXECUTE_METRIC, "Task execution time", labels=labels
+            )
+            self._expired[task_type] = registry.counter(
+                EXPIRED_METRIC, "Tasks dropped because they expired", labels
+            )
+            self._rejected[task_type] = registry.counter(
+                REJECTED_METRIC, "Tasks rejected by the type limit", labels
+            )
+            self._failed[task_type] = registry.counter(
+                FAILED_METRIC, "Task executions that raised", labels
+            )
+        self._register_depth(registry)
+
+    def _register_depth(self, registry: MetricsRegistry) -> None:
+        """Add this manager to the registry's queue depth gauges.
+
+        Every manager sharing a registry (one per bot) is counted, instead
+        of the last one created replacing the others.
+
+        Args:
+            registry: Registry holding the gauges.
+        """
+        managers = _DEPTH_SOURCES.get(registry)
+        if managers is None:
+            managers = _DEPTH_SOURCES[registry] = weakref.WeakSet()
+            for task_type in TaskType:
+                labels = {"task_type": task_type.value}
+                registry.gauge(QUEUE_DEPTH_METRIC, "Queued tasks", labels).set_function(
+                    functools.partial(_queued, managers, task_type)
+                )
+        managers.add(self)
 
     @property
     def queue_size(self) -> int:
@@ -173,17 +254,19 @@ class TaskManager:
         Returns:
             True if the task was added, False if rejected due to limits.
         """
-        logger.info(f"Try add task: <{task.info}>")
+        logger.info("Try add task: <%s>", task.info)
 
         # Check task type limit
         current_count = self._task_type_counter.get(task.tag, 0)
         if current_count >= get_task_limit(task.tag):
-            logger.warning(f"Add fail: task limit reached for {task.tag.value}")
+            logger.warning("Add fail: task limit reached for %s", task.tag.value)
+            self._rejected[task.tag].inc()
             return False
 
+        task.enqueued_at = time.monotonic()
         self._queue.append(task)
         self._task_type_counter[task.tag] = current_count + 1
-        logger.info(f"Add task success: <{task.info}>")
+        logger.info("Add task success: <%s>", task.info)
         return True
 
     def _priority_aging(self) -> None:
@@ -193,11 +276,11 @@ class TaskManager:
 
     def _log_queue_status(self) -> None:
         """Log the current queue status for debugging."""
-        if not self._queue:
+        if not self._queue or not logger.isEnabledFor(logging.DEBUG):
             return
         logger.debug("Task queue info:")
         for task in self._queue:
-            logger.debug(f"> {task.rank:3d} - {task.info}")
+            logger.debug("> %3d - %s", task.rank, task.info)
 
     async def _delay(self, min_ms: int, max_delta_ms: int, reason: str = "") -> None:
         """Apply a random delay.
@@ -211,7 +294,7 @@ class TaskManager:
 
         delay_ms = min_ms + random.randint(0, max_delta_ms)
         if delay_ms > 0:
-            logger.debug(f"Delaying {delay_ms}ms {reason}")
+            logger.debug("Delaying %dms %s", delay_ms, reason)
             await asyncio.sleep(delay_ms / 1000)
 
     async def check_and_execute(self) -> None:
@@ -246,34 +329,61 @@ class TaskManager:
                 0, self._task_type_counter.get(task.tag, 1) - 1
             )
 
-            logger.info(f"Checking task <{task.info}>")
+            logger.info("Checking task <%s>", task.info)
+            if task.trace_id is not None and task.enqueued_at:
+                dequeued = time.time()
+                queued = time.monotonic() - task.enqueued_at
+                TRACER.record("queue", dequeued - queued, dequeued, task.trace_id, task=task.info)
 
             # Check expiration
             time_now_ms = time.time() * 1000
             if task.is_expired(time_now_ms):
-                logger.warning(f"Task expired: <{task.info}>")
+                logger.warning("Task expired: <%s>", task.info)
+                self._expired[task.tag].inc()
                 continue
 
             # Check if it will expire before expected execution
             expected_execute_time = self._last_execute_at + self._gap + self._bias / 2
             if task.is_expired(expected_execute_time):
-                logger.warning(f"Task will expire before execution: <{task.info}>")
+                logger.warning("Task will expire before execution: <%s>", task.info)
+                self._expired[task.tag].inc()
                 continue
 
-            # Apply task gap delay if needed
-            time_since_last = time_now_ms - self._last_execute_at
-            if time_since_last < self._gap:
-                gap_delay = self._gap - time_since_last
-                logger.debug(f"Task gap delay: {gap_delay}ms")
-                await asyncio.sleep(gap_delay / 1000)
+            # Apply task gap and bias delays, then execute the task; its
+            # spans join the trace of the message that created it
+            with TRACER.activate(task.trace_id):
+                time_since_last = time_now_ms - self._last_execute_at
+                if time_since_last < self._gap:
+                    gap_delay = self._gap - time_since_last
+                    logger.debug("Task gap delay: %dms", gap_delay)
+                    with TRACER.span("gap_wait"):
+                        await asyncio.sleep(gap_delay / 1000)
+
+                with TRACER.span("bias_wait"):
+                    await self._delay(0, self._bias, "(Task Bias)")
+
+                started = time.monotonic()
+                if task.enqueued_at:
+                    self._wait_ms[task.tag].observe((started - task.enqueued_at) * 1000)
+                with TRACER.span("execute", task=task.info):
+                    await self._run(task)
 
-            # Apply random bias delay
-            await self._delay(0, self._bias, "(Task Bias)")
+            # Only execute one task per call
+            break
 
-            # Execute the task
+    async def _run(self, task: Task) -> None:
+        """Run a task, its completion callback and any retry.
+
+        Args:
+            task: The task to run.
+        """
+        started = time.monotonic()
+        # The task's logs carry its type and the message that created it
+        with log_context(task_type=task.tag.value, message_id=task.trace_id):
             try:
                 result = await task.func()
                 self._last_execute_at = time.time() * 1000
+                self._execute_ms[task.tag].observe((time.monotonic() - started) * 1000)
 
                 # Call completion callback if set
                 if self._callback:
@@ -281,20 +391,18 @@ class TaskManager:
                     if asyncio.iscoroutine(callback_result):
                         await callback_result
 
-                logger.info(f"Task completed: <{task.info}>")
+                logger.info("Task completed: <%s>", task.info)
 
             except Exception as e:
-                logger.error(f"Task failed: <{task.info}> - {e}")
+                logger.error("Task failed: <%s> - %s", task.info, e)
+                self._failed[task.tag].inc()
 
                 # Retry if attempts remaining
                 if task.retry < self._retry_count:
                     task.retry += 1
-                    logger.info(f"Retrying task (attempt {task.retry + 1}): <{task.info}>")
+                    logger.info("Retrying task (attempt %d): <%s>", task.retry + 1, task.info)
                     self.add_task(task)
 
-            # Only execute one task per call
-            break
-
     def clear(self) -> None:
         """Clear all tasks from the queue."""
         self._queue.clear()
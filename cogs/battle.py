@@ -8,9 +8,11 @@ from typing import TYPE_CHECKING
 import discord
 from discord.ext import commands
 
+from bot.config import BATTLE_ZONES
 from bot.event_manager import BotState
 from bot.task_manager import Task, TaskType, get_default_rank
 from utils.helpers import message_extractor, is_from_isekaid, is_in_channel
+from utils.journal import KIND_BATTLE, parse_gains
 from utils.logging import get_logger
 
 if TYPE_CHECKING:
@@ -138,7 +140,15 @@ class Battle(commands.Cog):
         """
         # Parse item gains from embed fields
         for field in data.fields:
-            logger.info(f"Gain: {field.get('name', '')} - {field.get('value', '')}")
+            logger.info("Gain: %s - %s", field.get("name", ""), field.get("value", ""))
+
+        items, gold = parse_gains(data.fields)
+        self.bot.item_logger.log_gains(items, gold)
+
+        if self.bot.journal:
+            zone_index = self.bot.player.user_data.zone_index
+            zone = BATTLE_ZONES[zone_index] if 0 <= zone_index < len(BATTLE_ZONES) else ""
+            self.bot.journal.record_gains(KIND_BATTLE, zone, items, gold)
 
 
 async def setup(bot: "ISeKaiZBot") -> None:
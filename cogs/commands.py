@@ -1,20 +1,31 @@
-"""Bot control commands cog (!start, !stop, !autolevel)."""
+"""Bot control commands cog (!start, !stop, !autolevel, !captcha)."""
 
 from __future__ import annotations
 
+import asyncio
+import time
+from pathlib import Path
 from typing import TYPE_CHECKING
 
 import discord
 from discord.ext import commands
 
 from bot.event_manager import BotState
-from utils.logging import get_logger
+from utils.logging import YIELD_WINDOWS, get_logger
+from utils.profiler import DEFAULT_PROFILE_DIR, SamplingProfiler
+from utils.tracing import TRACER
 
 if TYPE_CHECKING:
     from main import ISeKaiZBot
 
 logger = get_logger(__name__)
 
+# File written by !trace
+TRACE_EXPORT_PATH = "traces.json"
+
+# Longest !profile run in seconds
+MAX_PROFILE_SECONDS = 300
+
 
 class Commands(commands.Cog):
     """Cog for handling bot control commands.
@@ -29,6 +40,7 @@ class Commands(commands.Cog):
             bot: The bot instance.
         """
         self.bot = bot
+        self._profiling = False
 
     @commands.command(name="start")
     async def start_bot(self, ctx: commands.Context) -> None:
@@ -117,6 +129,147 @@ class Commands(commands.Cog):
 
         await ctx.reply(status_msg)
 
+    @commands.command(name="yield")
+    async def show_yield(self, ctx: commands.Context) -> None:
+        """Show items, gold and exp per hour over the rolling windows.
+
+        Args:
+            ctx: Command context.
+        """
+        if ctx.author.id != self.bot.user.id:
+            return
+
+        lines = [f"{'window':<7} {'items/h':>9} {'gold/h':>10} {'exp/h':>10}"]
+        for window in YIELD_WINDOWS:
+            rates = self.bot.item_logger.rates(window)
+            lines.append(
+                f"{window:<7} {rates['items']:>9.1f} {rates['gold']:>10.0f} {rates['exp']:>10.0f}"
+            )
+
+        await ctx.reply("```\n" + "\n".join(lines) + "\n```")
+
+    @commands.command(name="loop")
+    async def show_loop_stats(self, ctx: commands.Context) -> None:
+        """Show event loop lag and the worst stalls.
+
+        Args:
+            ctx: Command context.
+        """
+        if ctx.author.id != self.bot.user.id:
+            return
+
+        monitor = self.bot.loop_monitor
+        if not monitor:
+            await ctx.reply("Loop monitor disabled")
+            return
+
+        await ctx.reply("```\n" + monitor.format() + "\n```")
+
+    @commands.command(name="trace")
+    async def export_traces(self, ctx: commands.Context) -> None:
+        """Export recent message traces and show the latest ones.
+
+        Args:
+            ctx: Command context.
+        """
+        if ctx.author.id != self.bot.user.id:
+            return
+
+        count = await asyncio.to_thread(TRACER.export, TRACE_EXPORT_PATH)
+        lines = [f"{count} traces written to {TRACE_EXPORT_PATH}"]
+        recent = TRACER.format()
+        if recent:
+            lines.append(recent)
+
+        await ctx.reply("```\n" + "\n".join(lines) + "\n```")
+
+    @commands.command(name="profile")
+    async def run_profiler(self, ctx: commands.Context, seconds: float = 10.0) -> None:
+        """Sample the whole process for a while and show the hottest functions.
+
+        Args:
+            ctx: Command context.
+            seconds: Time to profile for (capped at MAX_PROFILE_SECONDS).
+        """
+        if ctx.author.id != self.bot.user.id:
+            return
+        if self._profiling:
+            await ctx.reply("A profile is already running")
+            return
+
+        seconds = min(max(seconds, 1.0), MAX_PROFILE_SECONDS)
+        await ctx.reply(f"Profiling for {seconds:.0f}s...")
+        self._profiling = True
+        try:
+            profiler = SamplingProfiler()
+            await profiler.profile(seconds)
+        finally:
+            self._profiling = False
+
+        name = f"profile-{time.strftime('%Y%m%d-%H%M%S')}.collapsed"
+        path = await asyncio.to_thread(profiler.write_collapsed, Path(DEFAULT_PROFILE_DIR) / name)
+        logger.info("Profile written to %s", path)
+        await ctx.reply(f"```\nWritten to {path}\n{profiler.format_top()}\n```")
+
+    @commands.command(name="memory")
+    async def show_memory(self, ctx: commands.Context, action: str = "") -> None:
+        """Sample memory use and show growth since the baseline.
+
+        The first call starts tracemalloc and takes the baseline; ``!memory
+        reset`` moves the baseline to now. Without periodic sampling
+        (``memorySampleMinutes`` 0), tracemalloc only runs from that first
+        call until the next sample, then stops again.
+
+        Args:
+            ctx: Command context.
+            action: "reset" to reset the baseline.
+        """
+        if ctx.author.id != self.bot.user.id:
+            return
+
+        memory = self.bot.memory
+        on_demand = not self.bot.config.memory_sample_minutes
+        if action == "reset":
+            await asyncio.to_thread(memory.reset_baseline)
+            await ctx.reply("Memory baseline reset")
+            return
+
+        if on_demand and not memory.tracing:
+            await asyncio.to_thread(memory.start)
+            await ctx.reply("Tracing memory, run `!memory` again to see the growth")
+            return
+
+        try:
+            await asyncio.to_thread(memory.sample)
+        finally:
+            if on_demand:
+                # Tracing slows every allocation, so it is not left on
+                memory.stop()
+        await ctx.reply("```\n" + memory.format() + "\n```")
+
+    @commands.command(name="captcha")
+    async def show_captcha_stats(self, ctx: commands.Context) -> None:
+        """Show captcha pipeline timings and counters.
+
+        Args:
+            ctx: Command context.
+        """
+        if ctx.author.id != self.bot.user.id:
+            return
+
+        captcha_ai = self.bot.captcha_ai
+        if not captcha_ai:
+            await ctx.reply("Captcha AI not available")
+            return
+
+        lines = [captcha_ai.metrics.format("captcha_") or "No captchas solved yet"]
+        cache = captcha_ai.cache
+        lines.append(f"cache: {cache.hits} hits, {cache.misses} misses")
+        if captcha_ai.batcher is not None:
+            lines.append(f"batches: {captcha_ai.batcher.batches_run} run")
+
+        await ctx.reply("```\n" + "\n".join(lines) + "\n```")
+
 
 async def setup(bot: "ISeKaiZBot") -> None:
     """Setup function for loading the cog.
@@ -11,6 +11,7 @@ from discord.ext import commands
 
 from bot.task_manager import Task, TaskType, get_default_rank
 from utils.helpers import message_extractor, is_from_isekaid, is_in_channel
+from utils.journal import KIND_SELL
 from utils.logging import get_logger
 
 if TYPE_CHECKING:
@@ -63,13 +64,13 @@ class Inventory(commands.Cog):
         if "Equipment Sold" not in data.title:
             return False
 
-        # Log gains
-        self._log_sell_gains(data)
-
         # Extract gold gained
         gold_match = re.search(r"You gained ([\d,]+)", data.desc.replace(",", ""))
         gold_gained = int(gold_match.group(1).replace(",", "")) if gold_match else 0
 
+        # Log gains
+        self._log_sell_gains(data, gold_gained)
+
         # If low gold gained, move to next tier
         if gold_gained < 10000:
             self.bot.player.sell += 1
@@ -99,13 +100,20 @@ class Inventory(commands.Cog):
 
         return True
 
-    def _log_sell_gains(self, data) -> None:
+    def _log_sell_gains(self, data, gold: int) -> None:
         """Log gold gained from selling.
 
         Args:
             data: Extracted embed data.
+            gold: Gold gained.
         """
-        logger.info(f"Sold equipment: {data.desc}")
+        logger.info("Sold equipment: %s", data.desc)
+        self.bot.item_logger.log_gold(gold)
+
+        if self.bot.journal:
+            sell_equip = self.bot.config.sell_equip
+            tier = sell_equip[self.bot.player.sell] if self.bot.player.sell < len(sell_equip) else ""
+            self.bot.journal.record(KIND_SELL, item=f"Equipment {tier}".strip(), gold=gold)
 
 
 async def setup(bot: "ISeKaiZBot") -> None:
@@ -11,6 +11,7 @@ from discord.ext import commands
 
 from bot.task_manager import Task, TaskType, get_default_rank
 from utils.helpers import message_extractor, is_from_isekaid, is_in_channel
+from utils.journal import KIND_PROFESSION, parse_gains
 from utils.logging import get_logger
 
 if TYPE_CHECKING:
@@ -116,14 +117,14 @@ class Profession(commands.Cog):
 
         # Profession completed
         if any(title in data.title for title in PROFESSION_DONE_TITLES):
-            logger.info(f"Profession finish ({data.title})")
+            logger.info("Profession finish (%s)", data.title)
             self.bot.controller.refresh_timer("prof")
             self._log_profession_gains(data)
             return True
 
         # Profession started
         if data.title in PROFESSION_START_TITLES:
-            logger.info(f"Profession start ({data.title})")
+            logger.info("Profession start (%s)", data.title)
             self.bot.controller.refresh_timer("prof")
             return True
 
@@ -158,7 +159,13 @@ class Profession(commands.Cog):
             data: Extracted embed data.
         """
         for field in data.fields:
-            logger.info(f"Gain: {field.get('name', '')} - {field.get('value', '')}")
+            logger.info("Gain: %s - %s", field.get("name", ""), field.get("value", ""))
+
+        items, gold = parse_gains(data.fields)
+        self.bot.item_logger.log_gains(items, gold)
+
+        if self.bot.journal:
+            self.bot.journal.record_gains(KIND_PROFESSION, self.bot.config.profession, items, gold)
 
 
 async def setup(bot: "ISeKaiZBot") -> None:
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import logging
 import re
 import time
 from typing import TYPE_CHECKING
@@ -11,6 +12,7 @@ from discord.ext import commands
 
 from bot.task_manager import Task, TaskType, get_default_rank
 from utils.helpers import message_extractor
+from utils.journal import KIND_RETAINER, parse_number
 from utils.logging import get_logger
 
 if TYPE_CHECKING:
@@ -21,6 +23,9 @@ logger = get_logger(__name__)
 # Pattern to match retainer elapsed time (handles newlines in embed)
 ELAPSED_REGEX = re.compile(r"Time elapsed: (\d+) hours?\s+Materials produced:", re.DOTALL)
 
+# Pattern to match the produced material count
+PRODUCED_REGEX = re.compile(r"Materials produced:\s*([\d,]+)")
+
 
 class Retainer(commands.Cog):
     """Cog for handling retainer (hired) messages.
@@ -47,7 +52,8 @@ class Retainer(commands.Cog):
             return
 
         data = message_extractor(message)
-        logger.debug(f"Retainer checking new message: {data.desc[:100] if data.desc else 'No desc'}...")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Retainer checking new message: %s...", data.desc[:100] if data.desc else "No desc")
         await self._handle_retainer_update(message, data)
 
     @commands.Cog.listener()
@@ -61,7 +67,8 @@ class Retainer(commands.Cog):
             return
 
         data = message_extractor(message)
-        logger.debug(f"Retainer checking edited message: {data.desc[:100] if data.desc else 'No desc'}...")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Retainer checking edited message: %s...", data.desc[:100] if data.desc else "No desc")
         await self._handle_retainer_update(message, data)
 
     async def _handle_retainer_update(
@@ -85,24 +92,31 @@ class Retainer(commands.Cog):
 
         match = ELAPSED_REGEX.search(data.desc)
         if not match:
-            logger.debug(f"Retainer: Regex didn't match desc: {data.desc[:150]!r}")
+            logger.debug("Retainer: Regex didn't match desc: %r", data.desc[:150])
             return False
 
         elapsed_hours = match.group(1)
-        logger.debug(f"Retainer: Matched elapsed hours = {elapsed_hours}")
+        logger.debug("Retainer: Matched elapsed hours = %s", elapsed_hours)
 
         # If elapsed is not 0, collect materials
         if elapsed_hours != "0":
-            logger.info(f"Retainer has items to collect ({elapsed_hours}h). Attempting to harvest.")
+            logger.info("Retainer has items to collect (%sh). Attempting to harvest.", elapsed_hours)
+            produced = PRODUCED_REGEX.search(data.desc)
+            quantity = parse_number(produced.group(1)) if produced else 0
 
             async def collect_materials() -> dict:
                 try:
                     if message.components:
-                        logger.debug(f"Components found: {len(message.components)} rows")
+                        logger.debug("Components found: %d rows", len(message.components))
                         if message.components[0].children and len(message.components[0].children) > 2:
                             # Button index 2 is "Collect"
                             await message.components[0].children[2].click()
                             logger.info("Harvest material success")
+                            self.bot.item_logger.log_gain("Materials", quantity)
+                            if self.bot.journal:
+                                self.bot.journal.record(
+                                    KIND_RETAINER, item="Materials", quantity=quantity
+                                )
                         else:
                             logger.error(f"Expected 3+ buttons, found {len(message.components[0].children) if message.components[0].children else 0}")
                     else:
@@ -127,7 +141,7 @@ class Retainer(commands.Cog):
         async def next_page() -> dict:
             try:
                 if message.components:
-                    logger.debug(f"Components found: {len(message.components)} rows")
+                    logger.debug("Components found: %d rows", len(message.components))
                     if message.components[0].children and len(message.components[0].children) > 1:
                         # Button index 1 is "Next Page"
                         await message.components[0].children[1].click()
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 import time
 from typing import TYPE_CHECKING, Optional
 
@@ -27,6 +28,9 @@ EMOJI_MAP = {
     "1285436059227783238": "Battle",
 }
 
+# Seconds to wait for a captcha model still loading in the background
+MODEL_READY_TIMEOUT = 30.0
+
 
 class Verification(commands.Cog):
     """Cog for handling verification messages.
@@ -41,6 +45,13 @@ class Verification(commands.Cog):
             bot: The bot instance.
         """
         self.bot = bot
+        # Captcha answer being computed in the background, keyed by image URL
+        self._prefetch: Optional[asyncio.Task] = None
+        self._prefetch_url: Optional[str] = None
+
+    def cog_unload(self) -> None:
+        """Cancel any captcha still being solved."""
+        self._drop_prefetch()
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message) -> None:
@@ -93,6 +104,9 @@ class Verification(commands.Cog):
         # Verification failed, retry
         if "Please Try doing $verify again." in data.desc:
             logger.info("Verification failed, trying again...")
+            if self.bot.captcha_ai and self.bot.player.verify_img:
+                self.bot.captcha_ai.mark_bad(self.bot.player.verify_img)
+            self._drop_prefetch()
             await self.bot.controller._verify_recursion()
             return True
 
@@ -105,6 +119,8 @@ class Verification(commands.Cog):
         # Verification successful
         if "Successfully Verified." in data.desc:
             logger.info(">>>VERIFICATION SUCCESSFUL - Resuming Bot<<<")
+            if self.bot.captcha_ai and self.bot.player.verify_img:
+                self.bot.captcha_ai.mark_verified(self.bot.player.verify_img)
             self.bot.player.channel = message.channel
             self.bot.controller.update_state(BotState.INIT)
             return True
@@ -175,13 +191,26 @@ class Verification(commands.Cog):
             logger.error("Captcha AI not available - manual verification required")
             return
 
-        # Create captcha solving task
+        # Start solving now so the answer is ready when the send slot comes
+        if self.bot.player.verify_img:
+            self._start_prefetch(self.bot.player.verify_img)
+
+        # Create captcha sending task
         async def solve_captcha() -> dict:
             if not self.bot.player.verify_img:
                 return {}
 
-            result = await self.bot.captcha_ai.predict(self.bot.player.verify_img)
-            logger.info(f"Captcha AI Result: {result}")
+            prefetch = self._start_prefetch(self.bot.player.verify_img)
+            try:
+                # Shielded so dropping the prefetch does not cancel this task
+                result = await asyncio.shield(prefetch)
+            except asyncio.CancelledError:
+                if not prefetch.cancelled():
+                    raise
+                # A retry or a newer captcha replaced this one
+                logger.info("Captcha solve dropped, not sending an answer")
+                return {}
+            logger.info("Captcha AI Result: %s", result)
 
             if result and self.bot.player.channel:
                 await self.bot.player.channel.send(result)
@@ -197,6 +226,47 @@ class Verification(commands.Cog):
         )
         self.bot.controller.add_task(task, "verify")
 
+    def _start_prefetch(self, img_url: str) -> asyncio.Task:
+        """Start solving a captcha in the background (once per image).
+
+        Args:
+            img_url: URL of the captcha image.
+
+        Returns:
+            Task resolving to the predicted digits.
+        """
+        if self._prefetch is None or self._prefetch_url != img_url:
+            self._drop_prefetch()
+            self._prefetch = asyncio.create_task(self._solve(img_url))
+            self._prefetch_url = img_url
+        return self._prefetch
+
+    def _drop_prefetch(self) -> None:
+        """Forget the current background solve (cancelling it if running)."""
+        if self._prefetch is not None and not self._prefetch.done():
+            self._prefetch.cancel()
+        self._prefetch = None
+        self._prefetch_url = None
+
+    async def _solve(self, img_url: str) -> str:
+        """Download and solve a captcha image.
+
+        Args:
+            img_url: URL of the captcha image.
+
+        Returns:
+            Predicted digits (empty string on failure).
+        """
+        captcha_ai = self.bot.captcha_ai
+        if captcha_ai is None:
+            return ""
+
+        # The model may still be loading if the captcha came right after startup
+        if not await captcha_ai.wait_ready(MODEL_READY_TIMEOUT):
+            logger.warning("Captcha AI model not ready, trying anyway")
+
+        return await captcha_ai.predict(img_url)
+
 
 async def setup(bot: "ISeKaiZBot") -> None:
     """Setup function for loading the cog.
@@ -2,19 +2,36 @@ from __future__ import annotations
 
 import asyncio
 import sys
+import time
 from pathlib import Path
 
+# Process start reference for startup timing (before the heavy imports)
+STARTED_AT = time.perf_counter()
+
 import discord
 from discord.ext import commands
 
 from bot import Config, Controller, Player
+from bot.state_store import open_store
 from services import CaptchaAI
+from services.captcha_dataset import CaptchaDataset
+from services.captcha_quant import select_model
 from utils import get_logger, setup_logging
+from utils.logging import ItemLogger, bind_log_context, set_log_context, shutdown_logging
+from utils.journal import Journal
+from utils.loop_monitor import LoopMonitor
+from utils.memory import MemorySampler
+from utils.metrics_server import MetricsServer
+from utils.tracing import TRACER
+from utils.traffic import KIND_EDIT, KIND_MESSAGE, TrafficRecorder
 
 # Setup logging
 setup_logging()
 logger = get_logger(__name__)
 
+# Seconds between saves of the item yield statistics
+ITEM_STATS_INTERVAL = 300.0
+
 # ASCII art welcome banner
 WELCOME_BANNER = """
  _       __     __                        
@@ -40,22 +57,80 @@ class ISeKaiZBot(commands.Bot):
         super().__init__(command_prefix="!", self_bot=True)
 
         self.config = config
-        self.player: Player = Player.create(config.channel_id)
+        self.player: Player = Player.create(
+            config.channel_id,
+            account=config.account,
+            store=open_store(config.state_store),
+        )
         self.player.enable_battle = config.enable_battle
         self.controller: Controller = Controller(self.player, config)
+        self.journal: Journal | None = (
+            Journal(config.journal_dir, config.account) if config.journal_dir else None
+        )
+        self.item_logger = ItemLogger()
+        stats = self.player.store.load(config.account, self._item_stats_key)
+        if stats:
+            self.item_logger.restore(stats)
+        self._item_stats_saver: asyncio.Task | None = None
         self.captcha_ai: CaptchaAI | None = None
+        self._captcha_loader: asyncio.Task | None = None
+        self.metrics_server: MetricsServer | None = None
+        self.loop_monitor: LoopMonitor | None = (
+            LoopMonitor(threshold_ms=config.loop_lag_threshold, debug=config.loop_debug)
+            if config.loop_lag_threshold
+            else None
+        )
+
+        self.memory = MemorySampler(
+            interval=config.memory_sample_minutes * 60,
+            counters={
+                "cached_messages": lambda: len(self.cached_messages),
+                "queued_tasks": lambda: self.controller.task_manager.queue_size,
+                "player_messages": lambda: sum(
+                    msg is not None for msg in (self.player.battle_msg, self.player.prof_msg)
+                ),
+                "tracked_items": lambda: self.item_logger.item_count,
+                "traces": lambda: len(TRACER.traces()),
+            },
+        )
+        self._memory_sampler: asyncio.Task | None = None
+        self.recorder: TrafficRecorder | None = (
+            TrafficRecorder(
+                config.record_dir,
+                config.channel_id,
+                config.treasure_guild,
+                header={"profession": config.profession, "enableBattle": config.enable_battle},
+            )
+            if config.record_dir
+            else None
+        )
 
         # Store channel reference
         self._target_channel: discord.TextChannel | None = None
 
     async def setup_hook(self) -> None:
         """Called when the bot is starting up."""
-        # Load captcha AI model
+        # Create captcha AI; the model loads in the background while the
+        # gateway connects (Verification waits for it if needed)
         try:
-            self.captcha_ai = await CaptchaAI.create(self.config.captcha_model)
-            logger.info("Captcha AI model loaded successfully")
+            self.captcha_ai = await CaptchaAI.create(
+                self.config.captcha_model,
+                batch_size=self.config.captcha_batch_size,
+                batch_wait_ms=self.config.captcha_batch_wait,
+                socket_path=self.config.captcha_socket or None,
+                cache_size=self.config.captcha_cache_size,
+                load_model=False,
+            )
+            if self.config.captcha_dataset_dir and self.captcha_ai.dataset is None:
+                self.captcha_ai.dataset = CaptchaDataset(
+                    self.config.captcha_dataset_dir,
+                    max_bytes=self.config.captcha_dataset_max_mb * 1024 * 1024,
+                )
+            # With a service the daemon picks and loads its own model
+            if not self.captcha_ai.uses_service:
+                self._captcha_loader = asyncio.create_task(self._load_captcha_model())
         except Exception as e:
-            logger.error(f"Failed to load Captcha AI model: {e}")
+            logger.error(f"Failed to create Captcha AI: {e}")
             logger.warning("Bot will run without captcha solving capability")
 
         # Load cogs
@@ -64,6 +139,57 @@ class ISeKaiZBot(commands.Bot):
         # Start controller
         await self.controller.start()
 
+        self._item_stats_saver = asyncio.create_task(self._save_item_stats_periodically())
+
+        if self.loop_monitor:
+            self.loop_monitor.start()
+        if self.config.memory_sample_minutes:
+            self._memory_sampler = asyncio.create_task(self.memory.run())
+        if self.config.metrics_port:
+            await self._start_metrics_server()
+
+    async def _start_metrics_server(self) -> None:
+        """Serve metrics on localhost."""
+        server = MetricsServer(self.config.metrics_port)
+        try:
+            await server.start()
+        except Exception as e:
+            logger.error(f"Failed to start metrics endpoint: {e}")
+            return
+        self.metrics_server = server
+
+    @property
+    def _item_stats_key(self) -> str:
+        """Get the state store channel key of the item yield statistics."""
+        return f"{self.config.channel_id}:items"
+
+    def _save_item_stats(self) -> None:
+        """Schedule a save of the item yield statistics."""
+        key = (self.config.account, self._item_stats_key)
+        self.player.store.writer.schedule({key: self.item_logger.snapshot()})
+
+    async def _save_item_stats_periodically(self) -> None:
+        """Save the item yield statistics so rates survive restarts."""
+        while True:
+            await asyncio.sleep(ITEM_STATS_INTERVAL)
+            self._save_item_stats()
+
+    async def _load_captcha_model(self) -> None:
+        """Select and load the captcha model without blocking startup."""
+        try:
+            model_path = await asyncio.to_thread(
+                select_model,
+                self.config.captcha_model,
+                self.config.captcha_model_int8 or None,
+                self.config.captcha_max_accuracy_drop,
+                self.config.captcha_eval_dir or None,
+            )
+            await self.captcha_ai.load(model_path)
+            logger.info(f"Captcha AI model loaded in {time.perf_counter() - STARTED_AT:.2f}s")
+        except Exception as e:
+            logger.error(f"Failed to load Captcha AI model: {e}")
+            logger.warning("Bot will run without captcha solving capability")
+
     async def _load_cogs(self) -> None:
         """Load all cog extensions."""
         cogs = [
@@ -96,9 +222,12 @@ class ISeKaiZBot(commands.Bot):
         """Called when the bot is ready."""
         print(WELCOME_BANNER)
         logger.info(f"Logged in as {self.user.name}")
+        logger.info(f"Ready in {time.perf_counter() - STARTED_AT:.2f}s")
 
         # Store username in player
         self.player.username = self.user.name
+        if self.recorder:
+            self.recorder.set_player(self.user.name, self.user.id)
 
         # Get target channel
         self._target_channel = self.get_channel(int(self.config.channel_id))
@@ -114,18 +243,47 @@ class ISeKaiZBot(commands.Bot):
         else:
             logger.warning(f"Could not find channel: {self.config.channel_id}")
 
+    def dispatch(self, event_name: str, /, *args, **kwargs) -> None:
+        """Dispatch an event, tracing messages in our channel.
+
+        Listener tasks created for the event inherit the trace, so every
+        step from the message to the resulting action is recorded under the
+        message id.
+
+        Args:
+            event_name: Event name without the ``on_`` prefix.
+            *args: Event arguments.
+            **kwargs: Event keyword arguments.
+        """
+        trace_id = None
+        if event_name in ("message", "message_edit") and args:
+            message = args[-1]
+            if str(getattr(message.channel, "id", "")) == self.config.channel_id:
+                trace_id = message.id
+        with TRACER.activate(trace_id):
+            super().dispatch(event_name, *args, **kwargs)
+
+    async def _run_event(self, coro, event_name: str, *args, **kwargs) -> None:
+        """Run an event listener inside a span of the current trace."""
+        with TRACER.span(getattr(coro, "__qualname__", event_name), event=event_name):
+            await super()._run_event(coro, event_name, *args, **kwargs)
+
     async def on_message(self, message: discord.Message) -> None:
         """Handle incoming messages.
 
         Args:
             message: The received message.
         """
+        if self.recorder:
+            self.recorder.record(KIND_MESSAGE, message)
+
         # Process commands first (for our own commands)
         await self.process_commands(message)
 
         # Dispatch custom event for Isekaid messages in our channel
         if str(message.channel.id) == self.config.channel_id:
             if message.author and message.author.name == "Isekaid":
+                bind_log_context(message_id=message.id)
                 logger.debug("Isekaid new message detected, dispatching event")
                 self.dispatch("isekaid_message", message)
 
@@ -140,13 +298,17 @@ class ISeKaiZBot(commands.Bot):
             before: Message before edit.
             after: Message after edit.
         """
+        if self.recorder:
+            self.recorder.record(KIND_EDIT, after)
+
         # Filter to only our channel and Isekaid messages
         if str(after.channel.id) != self.config.channel_id:
             return
         if not after.author or after.author.name != "Isekaid":
             return
 
-        logger.debug(f"Isekaid message edit detected, dispatching event")
+        bind_log_context(message_id=after.id)
+        logger.debug("Isekaid message edit detected, dispatching event")
         # Dispatch custom event for cogs to handle
         self.dispatch("isekaid_message_edit", after)
 
@@ -154,6 +316,24 @@ class ISeKaiZBot(commands.Bot):
         """Clean up when bot is closing."""
         logger.info("Bot shutting down...")
         await self.controller.stop()
+        if self._item_stats_saver:
+            self._item_stats_saver.cancel()
+        self._save_item_stats()
+        await self.player.flush_user_data()
+        if self.journal:
+            self.journal.flush()
+        if self.recorder:
+            self.recorder.close()
+        if self._captcha_loader and not self._captcha_loader.done():
+            self._captcha_loader.cancel()
+        if self.captcha_ai:
+            await self.captcha_ai.close()
+        if self.loop_monitor:
+            await self.loop_monitor.stop()
+        if self._memory_sampler:
+            self._memory_sampler.cancel()
+        if self.metrics_server:
+            await self.metrics_server.close()
         await super().close()
 
 
@@ -171,6 +351,20 @@ async def main() -> None:
         logger.error(f"Failed to load config: {e}")
         sys.exit(1)
 
+    setup_logging(
+        log_file=config.log_file or None,
+        queue_size=config.log_queue_size,
+        drop_policy=config.log_drop_policy,
+        sample_limit=config.log_sample_limit,
+        sample_interval=config.log_sample_interval,
+        log_format=config.log_format,
+        max_bytes=config.log_max_mb * 1024 * 1024,
+        rotate_seconds=config.log_rotate_hours * 3600,
+        backup_count=config.log_backup_count,
+    )
+    set_log_context(account=config.account)
+    TRACER.capacity = config.trace_capacity
+
     # Create and run bot
     bot = ISeKaiZBot(config)
 
@@ -183,6 +377,7 @@ async def main() -> None:
         logger.info("Received keyboard interrupt")
     finally:
         await bot.close()
+        shutdown_logging()
 
 
 if __name__ == "__main__":
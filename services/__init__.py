@@ -1,5 +1,6 @@
 """Services module."""
 
+from .captcha_cache import CaptchaResult
 from .captcha_service import CaptchaAI
 
-__all__ = ["CaptchaAI"]
+__all__ = ["CaptchaAI", "CaptchaResult"]
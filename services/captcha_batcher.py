@@ -0,0 +1,180 @@
+"""Micro-batching front-end for captcha model inference."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, Callable, List, Optional, Set, Tuple
+
+from utils.logging import get_logger
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = get_logger(__name__)
+
+# Type alias for the batched inference function ([N, 3, H, W] -> [N, ...])
+InferenceFunc = Callable[["np.ndarray"], "np.ndarray"]
+
+# ONNX Runtime error text for an input batch larger than a fixed batch dimension
+BATCH_DIMENSION_ERRORS = ("invalid dimensions for input", "index: 0 got:")
+
+
+def is_batch_dimension_error(error: Exception) -> bool:
+    """Check if an inference error means the model has a fixed batch size.
+
+    Args:
+        error: Exception raised by a batched inference run.
+
+    Returns:
+        True if the input's batch dimension was rejected.
+    """
+    message = str(error).lower()
+    return any(fragment in message for fragment in BATCH_DIMENSION_ERRORS)
+
+
+class CaptchaBatcher:
+    """Gathers concurrent inference requests into a single batched run.
+
+    Requests are held for up to ``max_wait_ms`` or until ``max_batch``
+    images are pending, then stacked into one ``[N, 3, H, W]`` tensor and
+    run in the default executor. Each caller receives its own ``[1, ...]``
+    slice of the output, so post-processing stays per image.
+    """
+
+    def __init__(
+        self,
+        run_fn: InferenceFunc,
+        max_batch: int = 8,
+        max_wait_ms: float = 5.0,
+    ) -> None:
+        """Initialize the batcher.
+
+        Args:
+            run_fn: Function running inference on a stacked input tensor.
+            max_batch: Maximum number of images per inference run.
+            max_wait_ms: Maximum time to hold a request waiting for company.
+        """
+        self._run_fn = run_fn
+        self._max_batch = max(1, max_batch)
+        self._max_wait = max(0.0, max_wait_ms) / 1000
+        self._pending: List[Tuple[np.ndarray, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._batching_supported = True
+        self._running: Set[asyncio.Task] = set()
+
+        # Statistics
+        self.batches_run: int = 0
+        self.images_run: int = 0
+
+    @property
+    def pending(self) -> int:
+        """Get the number of requests waiting for the next batch."""
+        return len(self._pending)
+
+    @property
+    def mean_batch_size(self) -> float:
+        """Get the average number of images per inference run."""
+        return self.images_run / self.batches_run if self.batches_run else 0.0
+
+    async def submit(self, input_tensor: np.ndarray) -> np.ndarray:
+        """Queue one image for inference and wait for its output.
+
+        Args:
+            input_tensor: Input tensor with shape [1, 3, H, W].
+
+        Returns:
+            Model output for this image with a leading batch dimension of 1.
+        """
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+        self._pending.append((input_tensor, future))
+
+        if not self._batching_supported or len(self._pending) >= self._max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self._max_wait, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        """Dispatch all pending requests as one batch."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if not self._pending:
+            return
+
+        batch = self._pending[: self._max_batch]
+        self._pending = self._pending[self._max_batch :]
+        task = asyncio.create_task(self._run_batch(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+        # Requests beyond max_batch start a fresh wait window
+        if self._pending:
+            loop = asyncio.get_running_loop()
+            self._flush_handle = loop.call_later(self._max_wait, self._flush)
+
+    async def close(self) -> None:
+        """Run queued requests now and wait for every running batch.
+
+        Draining rather than cancelling keeps callers sharing the batcher
+        (several bots, one model) from losing answers.
+        """
+        while self._pending:
+            self._flush()
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._running:
+            await asyncio.gather(*list(self._running), return_exceptions=True)
+
+    async def _run_batch(self, batch: List[Tuple[np.ndarray, asyncio.Future]]) -> None:
+        """Run inference for a batch and resolve each request's future.
+
+        Args:
+            batch: List of (input tensor, future) pairs.
+        """
+        loop = asyncio.get_running_loop()
+        tensors = [tensor for tensor, _ in batch]
+
+        try:
+            if len(tensors) == 1:
+                outputs = [await loop.run_in_executor(None, self._run_fn, tensors[0])]
+            else:
+                import numpy as np
+
+                stacked = np.concatenate(tensors, axis=0)
+                try:
+                    output = await loop.run_in_executor(None, self._run_fn, stacked)
+                    outputs = [output[i : i + 1] for i in range(len(tensors))]
+                except Exception as e:
+                    # Models exported with a fixed batch dimension reject N > 1;
+                    # anything else may be transient, so only this batch is split
+                    if is_batch_dimension_error(e):
+                        logger.warning(f"Model has a fixed batch size, batching disabled: {e}")
+                        self._batching_supported = False
+                    else:
+                        logger.warning(f"Batched inference failed, running per image: {e}")
+                    outputs = [
+                        await loop.run_in_executor(None, self._run_fn, tensor)
+                        for tensor in tensors
+                    ]
+        except asyncio.CancelledError:
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.batches_run += 1
+        self.images_run += len(tensors)
+        logger.debug("Captcha batch inference: %d image(s)", len(tensors))
+
+        for (_, future), output in zip(batch, outputs):
+            if not future.done():
+                future.set_result(output)
@@ -0,0 +1,401 @@
+"""Offline captcha benchmark and accuracy harness.
+
+Runs the CaptchaAI pipeline over a directory of labelled captcha images
+with image loading swapped for local file reads, and reports per-stage
+latency percentiles, throughput, digit/sequence accuracy and a digit
+confusion matrix for one or more ONNX Runtime session configurations::
+
+    python -m services.captcha_bench ./captchas --model ./model/captcha.onnx \\
+        --configs default,1-thread,no-opt --json bench.json
+
+Images are labelled by their file name: the leading digits of the stem
+are the expected answer (``0429.png``, ``0429_3f2a.png``). A directory
+recorded by CaptchaDataset can be used too; its verified captchas are
+labelled with the accepted answer.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import re
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from services.captcha_dataset import is_dataset, verified_samples
+from services.captcha_service import CaptchaAI
+from utils.logging import get_logger, setup_logging
+
+logger = get_logger(__name__)
+
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".bmp", ".gif", ".webp"}
+LABEL_REGEX = re.compile(r"^(\d+)")
+
+# Pipeline stages timed individually, in execution order
+STAGES = ("load", "decode", "resize", "tensor", "inference", "nms")
+
+# Named ONNX Runtime session configurations to compare
+SESSION_PRESETS: Dict[str, Dict[str, Any]] = {
+    "default": {},
+    "1-thread": {"intra_op_num_threads": 1, "inter_op_num_threads": 1},
+    "2-threads": {"intra_op_num_threads": 2, "inter_op_num_threads": 1},
+    "4-threads": {"intra_op_num_threads": 4, "inter_op_num_threads": 1},
+    "no-opt": {"graph_optimization_level": "disable"},
+    "basic-opt": {"graph_optimization_level": "basic"},
+    "parallel": {"execution_mode": "parallel"},
+}
+
+# Confusion matrix column for digits the model did not produce
+MISSING = "-"
+
+
+@dataclass
+class Sample:
+    """A labelled captcha image on disk."""
+
+    path: Path
+    label: str
+
+
+@dataclass
+class BenchResult:
+    """Measurements for one session configuration."""
+
+    config: str
+    stage_ms: Dict[str, List[float]] = field(default_factory=lambda: {s: [] for s in STAGES})
+    total_ms: List[float] = field(default_factory=list)
+    pairs: List[Tuple[str, str]] = field(default_factory=list)  # (label, prediction)
+    wall_s: float = 0.0
+    batched_wall_s: float = 0.0
+    concurrency: int = 1
+
+    def summary(self) -> Dict[str, Any]:
+        """Summarize the measurements as a JSON-serializable dict."""
+        digit_acc, seq_acc = accuracy(self.pairs)
+        n = len(self.pairs)
+        return {
+            "config": self.config,
+            "samples": n,
+            "stages_ms": {
+                stage: latency_summary(values) for stage, values in self.stage_ms.items()
+            },
+            "total_ms": latency_summary(self.total_ms),
+            "throughput": n / self.wall_s if self.wall_s else 0.0,
+            "batched_throughput": n / self.batched_wall_s if self.batched_wall_s else None,
+            "concurrency": self.concurrency,
+            "digit_accuracy": digit_acc,
+            "sequence_accuracy": seq_acc,
+            "confusion": confusion_matrix(self.pairs),
+        }
+
+
+class LocalCaptchaAI(CaptchaAI):
+    """CaptchaAI that loads images from local paths instead of the CDN."""
+
+    async def _download(self, img_url: str) -> bytes:
+        """Read an image file from disk.
+
+        Args:
+            img_url: Local file path.
+
+        Returns:
+            Encoded image file contents.
+        """
+        return Path(img_url).read_bytes()
+
+
+def load_dataset(directory: str | Path, limit: Optional[int] = None) -> List[Sample]:
+    """Collect labelled captcha images from a directory.
+
+    Args:
+        directory: Directory containing captcha images, or a recorded
+            captcha dataset.
+        limit: Optional maximum number of samples.
+
+    Returns:
+        Samples sorted by file name (dataset samples oldest first);
+        unlabelled files are skipped.
+    """
+    if is_dataset(directory):
+        samples = [Sample(path=path, label=label) for path, label in verified_samples(directory)]
+        return samples[:limit] if limit is not None else samples
+
+    samples = []
+    for path in sorted(Path(directory).iterdir()):
+        if path.suffix.lower() not in IMAGE_SUFFIXES:
+            continue
+        match = LABEL_REGEX.match(path.stem)
+        if not match:
+            logger.warning(f"Skipping unlabelled image: {path.name}")
+            continue
+        samples.append(Sample(path=path, label=match.group(1)))
+        if limit is not None and len(samples) >= limit:
+            break
+    return samples
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Compute a percentile with linear interpolation.
+
+    Args:
+        values: Sample values.
+        q: Percentile in [0, 100].
+
+    Returns:
+        The interpolated percentile (0.0 for no values).
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * q / 100
+    lower = int(pos)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (pos - lower)
+
+
+def latency_summary(values: Sequence[float]) -> Dict[str, float]:
+    """Summarize latency samples in milliseconds.
+
+    Args:
+        values: Latencies in milliseconds.
+
+    Returns:
+        Dict with mean, p50, p90, p99 and max.
+    """
+    return {
+        "mean": sum(values) / len(values) if values else 0.0,
+        "p50": percentile(values, 50),
+        "p90": percentile(values, 90),
+        "p99": percentile(values, 99),
+        "max": max(values) if values else 0.0,
+    }
+
+
+def accuracy(pairs: Sequence[Tuple[str, str]]) -> Tuple[float, float]:
+    """Compute digit and sequence accuracy.
+
+    Digits are compared position by position against the label; missing
+    or extra digits count as wrong.
+
+    Args:
+        pairs: (label, prediction) pairs.
+
+    Returns:
+        Tuple of (digit accuracy, sequence accuracy).
+    """
+    if not pairs:
+        return 0.0, 0.0
+    correct_digits = 0
+    total_digits = 0
+    correct_sequences = 0
+    for label, prediction in pairs:
+        total_digits += max(len(label), len(prediction))
+        correct_digits += sum(1 for a, b in zip(label, prediction) if a == b)
+        correct_sequences += label == prediction
+    return correct_digits / total_digits if total_digits else 0.0, correct_sequences / len(pairs)
+
+
+def confusion_matrix(pairs: Sequence[Tuple[str, str]]) -> Dict[str, Dict[str, int]]:
+    """Count predicted digits for each true digit.
+
+    Args:
+        pairs: (label, prediction) pairs.
+
+    Returns:
+        Nested dict ``matrix[true][predicted]``; a prediction shorter than
+        its label is counted under the ``"-"`` column.
+    """
+    columns = [str(d) for d in range(10)] + [MISSING]
+    matrix = {str(d): {c: 0 for c in columns} for d in range(10)}
+    for label, prediction in pairs:
+        for i, true_digit in enumerate(label):
+            predicted = prediction[i] if i < len(prediction) else MISSING
+            matrix.setdefault(true_digit, {c: 0 for c in columns})
+            matrix[true_digit][predicted] = matrix[true_digit].get(predicted, 0) + 1
+    return matrix
+
+
+def _elapsed_ms(start: float) -> float:
+    """Milliseconds elapsed since a perf_counter timestamp."""
+    return (time.perf_counter() - start) * 1000
+
+
+async def run_config(
+    model_path: str | Path,
+    samples: Sequence[Sample],
+    config: str,
+    warmup: int = 3,
+    concurrency: int = 1,
+) -> BenchResult:
+    """Benchmark one session configuration.
+
+    Each sample is first run stage by stage to time the pipeline, then
+    through ``predict_result`` end to end for accuracy. With concurrency
+    above 1, a final pass submits requests concurrently so the batcher
+    can group them.
+
+    Args:
+        model_path: Path to the ONNX model file.
+        samples: Labelled images.
+        config: Name of a SESSION_PRESETS entry.
+        warmup: Number of untimed inference runs before measuring.
+        concurrency: Concurrent requests in the batched pass.
+
+    Returns:
+        BenchResult with the measurements.
+    """
+    ai = LocalCaptchaAI(model_path, session_options=SESSION_PRESETS[config])
+    result = BenchResult(config=config, concurrency=concurrency)
+
+    for sample in samples[:warmup]:
+        img = ai._preprocess(ai._decode(sample.path.read_bytes()))
+        ai._run_inference(ai._image_to_tensor(img))
+
+    # Staged pass: time every step of the pipeline
+    start_wall = time.perf_counter()
+    for sample in samples:
+        start_total = time.perf_counter()
+
+        start = time.perf_counter()
+        data = await ai._download(str(sample.path))
+        result.stage_ms["load"].append(_elapsed_ms(start))
+
+        start = time.perf_counter()
+        img = ai._decode(data)
+        result.stage_ms["decode"].append(_elapsed_ms(start))
+
+        start = time.perf_counter()
+        img = ai._preprocess(img)
+        result.stage_ms["resize"].append(_elapsed_ms(start))
+
+        start = time.perf_counter()
+        tensor = ai._image_to_tensor(img)
+        result.stage_ms["tensor"].append(_elapsed_ms(start))
+
+        start = time.perf_counter()
+        output = ai._run_inference(tensor)
+        result.stage_ms["inference"].append(_elapsed_ms(start))
+
+        start = time.perf_counter()
+        ai._decode_detections(*ai._nms(output))
+        result.stage_ms["nms"].append(_elapsed_ms(start))
+
+        result.total_ms.append(_elapsed_ms(start_total))
+    result.wall_s = time.perf_counter() - start_wall
+
+    # End-to-end pass through the real predict pipeline
+    for sample in samples:
+        ai.cache.clear()
+        prediction = await ai.predict_result(str(sample.path))
+        result.pairs.append((sample.label, prediction.text))
+
+    # Batched pass: concurrent requests share inference runs
+    if concurrency > 1:
+        ai.cache.clear()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def solve(sample: Sample) -> None:
+            async with semaphore:
+                await ai.predict_result(str(sample.path))
+
+        start_wall = time.perf_counter()
+        await asyncio.gather(*(solve(sample) for sample in samples))
+        result.batched_wall_s = time.perf_counter() - start_wall
+
+    return result
+
+
+def format_report(summaries: Sequence[Dict[str, Any]], show_confusion: bool = True) -> str:
+    """Render benchmark summaries as plain text.
+
+    Args:
+        summaries: Output of BenchResult.summary() for each configuration.
+        show_confusion: Whether to include confusion matrices.
+
+    Returns:
+        Multi-line report.
+    """
+    lines = []
+    for summary in summaries:
+        lines.append(f"== {summary['config']} ({summary['samples']} samples) ==")
+        lines.append(f"{'stage':<10} {'mean':>8} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}")
+        rows = list(summary["stages_ms"].items()) + [("total", summary["total_ms"])]
+        for stage, stats in rows:
+            lines.append(
+                f"{stage:<10} {stats['mean']:8.2f} {stats['p50']:8.2f} "
+                f"{stats['p90']:8.2f} {stats['p99']:8.2f} {stats['max']:8.2f}"
+            )
+        lines.append(f"throughput: {summary['throughput']:.1f} img/s (sequential)")
+        if summary["batched_throughput"] is not None:
+            lines.append(
+                f"throughput: {summary['batched_throughput']:.1f} img/s "
+                f"(concurrency {summary['concurrency']})"
+            )
+        lines.append(f"digit accuracy:    {summary['digit_accuracy']:.2%}")
+        lines.append(f"sequence accuracy: {summary['sequence_accuracy']:.2%}")
+
+        if show_confusion:
+            matrix = summary["confusion"]
+            columns = [str(d) for d in range(10)] + [MISSING]
+            lines.append("confusion (rows = true, columns = predicted):")
+            lines.append("    " + "".join(f"{c:>5}" for c in columns))
+            for true_digit in sorted(matrix):
+                counts = matrix[true_digit]
+                lines.append(f"{true_digit:>3} " + "".join(f"{counts.get(c, 0):>5}" for c in columns))
+        lines.append("")
+    return "\n".join(lines)
+
+
+async def run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """Run the benchmark for every requested configuration.
+
+    Args:
+        args: Parsed command-line arguments.
+
+    Returns:
+        Summaries for each configuration.
+    """
+    samples = load_dataset(args.directory, args.limit)
+    if not samples:
+        raise SystemExit(f"No labelled images found in {args.directory}")
+
+    summaries = []
+    for config in args.configs.split(","):
+        if config not in SESSION_PRESETS:
+            raise SystemExit(f"Unknown config '{config}'. Choose from: {', '.join(SESSION_PRESETS)}")
+        result = await run_config(args.model, samples, config, args.warmup, args.concurrency)
+        summaries.append(result.summary())
+    return summaries
+
+
+def main() -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Offline captcha benchmark")
+    parser.add_argument("directory", help="Directory of labelled captcha images")
+    parser.add_argument("--model", default="./model/captcha.onnx", help="ONNX model path")
+    parser.add_argument(
+        "--configs",
+        default="default",
+        help=f"Comma-separated session presets ({', '.join(SESSION_PRESETS)})",
+    )
+    parser.add_argument("--warmup", type=int, default=3, help="Untimed warm-up runs")
+    parser.add_argument("--concurrency", type=int, default=1, help="Concurrent requests in batched pass")
+    parser.add_argument("--limit", type=int, default=None, help="Maximum number of images")
+    parser.add_argument("--json", dest="json_path", default=None, help="Write results to a JSON file")
+    parser.add_argument("--no-confusion", action="store_true", help="Omit confusion matrices")
+    args = parser.parse_args()
+
+    setup_logging()
+    summaries = asyncio.run(run(args))
+    print(format_report(summaries, show_confusion=not args.no_confusion))
+
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(summaries, indent=2), encoding="utf-8")
+        print(f"Results written to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
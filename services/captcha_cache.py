@@ -0,0 +1,160 @@
+"""Content-addressed cache of captcha predictions."""
+
+from __future__ import annotations
+
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, List, Optional
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+
+@dataclass
+class CaptchaResult:
+    """Prediction for one captcha image."""
+
+    text: str = ""
+    confidences: List[float] = field(default_factory=list)
+    digest: str = ""  # hash of the decoded pixels
+    bad: bool = False  # answer was rejected by Isekaid
+    cached: bool = False
+    ambiguous: bool = False  # missing, extra or low-confidence digits
+    near_misses: int = 0  # detections scoring just below the confidence threshold
+
+
+def image_digest(img: "Image.Image") -> str:
+    """Hash the decoded pixels of an image.
+
+    Re-encoded copies of the same captcha hash identically even when their
+    file bytes or URLs differ.
+
+    Args:
+        img: Decoded PIL Image.
+
+    Returns:
+        Hex digest of the image mode, size and pixel data.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{img.mode}:{img.size[0]}x{img.size[1]}".encode("ascii"))
+    h.update(img.tobytes())
+    return h.hexdigest()
+
+
+class CaptchaCache:
+    """Bounded LRU cache of predictions keyed by URL and pixel digest.
+
+    Results are stored once per digest; URLs are aliases pointing at a
+    digest, so a re-served image is found either before downloading (same
+    URL) or right after decoding (same pixels).
+    """
+
+    def __init__(self, max_entries: int = 256) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of distinct images kept.
+        """
+        self._max_entries = max(1, max_entries)
+        self._results: OrderedDict[str, CaptchaResult] = OrderedDict()
+        self._urls: OrderedDict[str, str] = OrderedDict()
+
+        # Statistics
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    @property
+    def hit_rate(self) -> float:
+        """Get the fraction of lookups answered from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get(self, url: str, digest: Optional[str] = None) -> Optional[CaptchaResult]:
+        """Look up a prediction by URL and optionally by pixel digest.
+
+        A lookup by URL alone only records hits, since the caller still has
+        the digest lookup to try; passing the digest records the final hit
+        or miss.
+
+        Args:
+            url: Captcha image URL.
+            digest: Hash of the decoded pixels, if already known.
+
+        Returns:
+            The cached result, or None on a miss.
+        """
+        key = self._urls.get(url)
+        if key is None and digest is not None:
+            key = digest if digest in self._results else None
+            if key is not None:
+                self._link(url, key)
+
+        result = self._results.get(key) if key is not None else None
+        if result is not None:
+            self._results.move_to_end(key)
+            self.hits += 1
+        elif digest is not None:
+            self.misses += 1
+        return result
+
+    def put(self, url: str, result: CaptchaResult) -> None:
+        """Store a prediction.
+
+        Args:
+            url: Captcha image URL.
+            result: Prediction with its digest set.
+        """
+        if not result.digest:
+            return
+
+        existing = self._results.get(result.digest)
+        if existing is not None and existing.bad:
+            # Never forget that an answer was rejected
+            result.bad = True
+        self._results[result.digest] = result
+        self._results.move_to_end(result.digest)
+        self._link(url, result.digest)
+
+        while len(self._results) > self._max_entries:
+            old_digest, _ = self._results.popitem(last=False)
+            for old_url in [u for u, d in self._urls.items() if d == old_digest]:
+                del self._urls[old_url]
+
+    def mark_bad(self, url: str) -> bool:
+        """Mark the answer cached for an image as rejected.
+
+        Args:
+            url: Captcha image URL.
+
+        Returns:
+            True if a cached result was marked.
+        """
+        key = self._urls.get(url)
+        result = self._results.get(key) if key is not None else None
+        if result is None:
+            return False
+        result.bad = True
+        return True
+
+    def clear(self) -> None:
+        """Remove all entries and reset statistics."""
+        self._results.clear()
+        self._urls.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def _link(self, url: str, digest: str) -> None:
+        """Point a URL at a digest, bounding the alias table.
+
+        Args:
+            url: Captcha image URL.
+            digest: Hash of the decoded pixels.
+        """
+        self._urls[url] = digest
+        self._urls.move_to_end(url)
+        while len(self._urls) > self._max_entries * 4:
+            self._urls.popitem(last=False)
@@ -0,0 +1,306 @@
+"""On-disk dataset of solved captchas and their outcomes.
+
+Each captcha image is stored once (named by its pixel digest) together
+with a compact JSON-lines index::
+
+    <root>/segment-000001/images/<digest>.png
+    <root>/segment-000001/index.jsonl
+
+Index lines are append-only. A ``captcha`` line records the prediction
+and an ``outcome`` line records what Isekaid answered (``verified`` or
+``retry``); readers merge them by digest. The active segment rolls over
+once it exceeds its size share, and the oldest segments are deleted to
+keep the whole dataset under ``max_bytes``.
+
+Verified captchas are labelled samples for the offline benchmark
+(``python -m services.captcha_bench <root>``) and for retraining.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+from services.captcha_cache import CaptchaResult
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+INDEX_NAME = "index.jsonl"
+IMAGES_DIR = "images"
+SEGMENT_PREFIX = "segment-"
+SEGMENT_REGEX = re.compile(rf"^{SEGMENT_PREFIX}(\d+)$")
+
+# Outcomes recorded after a captcha answer was submitted
+OUTCOME_VERIFIED = "verified"
+OUTCOME_RETRY = "retry"
+
+# File signatures used to keep the original image format
+IMAGE_SIGNATURES = (
+    (b"\x89PNG", ".png"),
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"GIF8", ".gif"),
+    (b"BM", ".bmp"),
+)
+
+# URLs remembered to attach outcomes to the right image
+MAX_TRACKED_URLS = 64
+
+
+def image_suffix(data: bytes) -> str:
+    """Guess an image file suffix from its contents.
+
+    Args:
+        data: Encoded image bytes.
+
+    Returns:
+        File suffix including the dot (".img" if unknown).
+    """
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return ".webp"
+    for signature, suffix in IMAGE_SIGNATURES:
+        if data.startswith(signature):
+            return suffix
+    return ".img"
+
+
+def is_dataset(directory: str | Path) -> bool:
+    """Check if a directory uses the captcha dataset layout.
+
+    Args:
+        directory: Directory to inspect.
+
+    Returns:
+        True if it contains at least one dataset segment.
+    """
+    directory = Path(directory)
+    return directory.is_dir() and any(
+        SEGMENT_REGEX.match(p.name) and p.is_dir() for p in directory.iterdir()
+    )
+
+
+def _segments(root: Path) -> List[Tuple[int, Path]]:
+    """List dataset segments, oldest first."""
+    if not root.is_dir():
+        return []
+    segments = []
+    for path in root.iterdir():
+        match = SEGMENT_REGEX.match(path.name)
+        if match and path.is_dir():
+            segments.append((int(match.group(1)), path))
+    return sorted(segments)
+
+
+def read_index(root: str | Path) -> Dict[str, Dict[str, Any]]:
+    """Read and merge the index of every segment.
+
+    Args:
+        root: Dataset root directory.
+
+    Returns:
+        Mapping of digest to its record (with ``path`` resolved and the
+        latest ``outcome``, if any).
+    """
+    records: Dict[str, Dict[str, Any]] = {}
+    for _, segment in _segments(Path(root)):
+        index_path = segment / INDEX_NAME
+        if not index_path.exists():
+            continue
+        with index_path.open(encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # torn last line after a crash
+                digest = entry.get("digest")
+                if not digest:
+                    continue
+                if entry.get("type") == "captcha":
+                    entry["path"] = str(segment / IMAGES_DIR / entry["file"])
+                    records[digest] = {**records.get(digest, {}), **entry}
+                elif entry.get("type") == "outcome" and digest in records:
+                    records[digest]["outcome"] = entry["outcome"]
+    return records
+
+
+def verified_samples(root: str | Path) -> Iterator[Tuple[Path, str]]:
+    """Yield images whose submitted answer was accepted.
+
+    Args:
+        root: Dataset root directory.
+
+    Yields:
+        Tuples of (image path, correct digits), oldest first.
+    """
+    for record in read_index(root).values():
+        if record.get("outcome") == OUTCOME_VERIFIED and Path(record["path"]).exists():
+            yield Path(record["path"]), record["prediction"]
+
+
+def dataset_images(root: str | Path) -> Iterator[Path]:
+    """Yield every stored image, labelled or not.
+
+    Args:
+        root: Dataset root directory.
+
+    Yields:
+        Image paths, oldest segment first.
+    """
+    for _, segment in _segments(Path(root)):
+        images = segment / IMAGES_DIR
+        if images.is_dir():
+            yield from sorted(images.iterdir())
+
+
+class CaptchaDataset:
+    """Records captcha images, predictions and outcomes to disk.
+
+    Writes are small and synchronous; call them from a worker thread when
+    running on the event loop.
+    """
+
+    def __init__(
+        self,
+        root: str | Path,
+        max_bytes: int = 200 * 1024 * 1024,
+        max_segments: int = 10,
+    ) -> None:
+        """Initialize the dataset, loading known digests from disk.
+
+        Args:
+            root: Dataset root directory.
+            max_bytes: Total size budget across all segments.
+            max_segments: Number of segments the budget is split into.
+        """
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.max_segments = max(2, max_segments)
+        self._segment_bytes = max(1, max_bytes // self.max_segments)
+        self._lock = threading.Lock()
+        self._urls: OrderedDict[str, str] = OrderedDict()
+
+        # Digest -> segment directory, for deduplication and deletion
+        self._digests: Dict[str, Path] = {}
+        for digest, record in read_index(self.root).items():
+            self._digests[digest] = Path(record["path"]).parent.parent
+
+        segments = _segments(self.root)
+        self._segment_id = segments[-1][0] if segments else 0
+        self._segment_size = self._measure(segments[-1][1]) if segments else 0
+        if not segments:
+            self._roll()
+
+    def __len__(self) -> int:
+        """Get the number of stored images."""
+        return len(self._digests)
+
+    def add(self, img_url: str, data: bytes, result: CaptchaResult) -> bool:
+        """Store a captcha image and its prediction.
+
+        Args:
+            img_url: URL the image was served from (used to attach the
+                outcome later).
+            data: Encoded image bytes.
+            result: Prediction with its pixel digest.
+
+        Returns:
+            True if the image was new and written.
+        """
+        if not result.digest:
+            return False
+
+        with self._lock:
+            self._track(img_url, result.digest)
+            if result.digest in self._digests:
+                return False
+
+            if self._segment_size >= self._segment_bytes:
+                self._roll()
+
+            segment = self._segment_path(self._segment_id)
+            file_name = result.digest + image_suffix(data)
+            (segment / IMAGES_DIR / file_name).write_bytes(data)
+            self._append(
+                segment,
+                {
+                    "type": "captcha",
+                    "digest": result.digest,
+                    "file": file_name,
+                    "prediction": result.text,
+                    "confidences": [round(c, 4) for c in result.confidences],
+                    "ts": int(time.time()),
+                },
+            )
+            self._segment_size += len(data)
+            self._digests[result.digest] = segment
+            return True
+
+    def record_outcome(self, img_url: str, outcome: str) -> bool:
+        """Record how Isekaid answered the prediction for an image.
+
+        Args:
+            img_url: URL of the answered captcha image.
+            outcome: OUTCOME_VERIFIED or OUTCOME_RETRY.
+
+        Returns:
+            True if the image is known and the outcome was written.
+        """
+        with self._lock:
+            digest = self._urls.get(img_url)
+            segment = self._digests.get(digest) if digest else None
+            if segment is None or not segment.exists():
+                return False
+            self._append(
+                segment,
+                {"type": "outcome", "digest": digest, "outcome": outcome, "ts": int(time.time())},
+            )
+            return True
+
+    @property
+    def size_bytes(self) -> int:
+        """Get the total size of the dataset on disk."""
+        return sum(self._measure(path) for _, path in _segments(self.root))
+
+    def _track(self, img_url: str, digest: str) -> None:
+        """Remember which image a URL served (bounded)."""
+        self._urls[img_url] = digest
+        self._urls.move_to_end(img_url)
+        while len(self._urls) > MAX_TRACKED_URLS:
+            self._urls.popitem(last=False)
+
+    def _append(self, segment: Path, entry: Dict[str, Any]) -> None:
+        """Append one line to a segment's index."""
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with (segment / INDEX_NAME).open("a", encoding="utf-8") as f:
+            f.write(line)
+        if segment == self._segment_path(self._segment_id):
+            self._segment_size += len(line)
+
+    def _roll(self) -> None:
+        """Start a new segment and drop the oldest ones over budget."""
+        self._segment_id += 1
+        segment = self._segment_path(self._segment_id)
+        (segment / IMAGES_DIR).mkdir(parents=True, exist_ok=True)
+        self._segment_size = 0
+
+        segments = _segments(self.root)
+        while len(segments) > self.max_segments:
+            _, oldest = segments.pop(0)
+            self._digests = {d: s for d, s in self._digests.items() if s != oldest}
+            shutil.rmtree(oldest, ignore_errors=True)
+            logger.info(f"Captcha dataset rotated out {oldest.name}")
+
+    def _segment_path(self, segment_id: int) -> Path:
+        """Get the directory of a segment."""
+        return self.root / f"{SEGMENT_PREFIX}{segment_id:06d}"
+
+    @staticmethod
+    def _measure(path: Path) -> int:
+        """Get the size of all files under a directory."""
+        return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
@@ -0,0 +1,342 @@
+"""INT8 quantization of the captcha model with accuracy gating.
+
+Produce an INT8 model, calibrated on local captcha images, and record how
+its accuracy compares with the FP32 model::
+
+    python -m services.captcha_quant quantize --model ./model/captcha.onnx \\
+        --out ./model/captcha.int8.onnx --mode static --calib ./captchas \\
+        --eval ./captchas-labelled
+
+The comparison is saved next to the INT8 model (``<model>.report.json``),
+with the SHA-256 of both model files. At startup, select_model() only picks
+the INT8 model when its sequence accuracy is within the configured drop of
+FP32 and the report matches the current files, re-evaluating on the spot
+when a labelled directory is configured. Quantization needs the ``onnx``
+package (``pip install onnx``); loading a quantized model does not.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import random
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from services.captcha_bench import IMAGE_SUFFIXES, Sample, accuracy, load_dataset
+from services.captcha_dataset import dataset_images, is_dataset
+from services.captcha_service import CaptchaAI
+from utils.logging import get_logger, setup_logging
+from utils.metrics import MetricsRegistry
+
+logger = get_logger(__name__)
+
+QUANT_MODES = ("dynamic", "static")
+
+
+def report_path(int8_path: str | Path) -> Path:
+    """Get the path of the accuracy report stored next to an INT8 model.
+
+    Args:
+        int8_path: Path to the INT8 model.
+
+    Returns:
+        Path of the JSON report.
+    """
+    int8_path = Path(int8_path)
+    return int8_path.with_name(int8_path.name + ".report.json")
+
+
+def model_digest(path: str | Path) -> str:
+    """Hash a model file.
+
+    Args:
+        path: Path to the model.
+
+    Returns:
+        Hex SHA-256 of the file contents.
+    """
+    h = hashlib.sha256()
+    with Path(path).open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class _CalibrationReader:
+    """Feeds preprocessed captcha images to ONNX Runtime's calibrator."""
+
+    def __init__(self, preprocessor: CaptchaAI, input_name: str, paths: Sequence[Path]) -> None:
+        self._preprocessor = preprocessor
+        self._input_name = input_name
+        self._paths = iter(paths)
+
+    def get_next(self) -> Optional[Dict[str, Any]]:
+        path = next(self._paths, None)
+        if path is None:
+            return None
+        img = self._preprocessor._preprocess(self._preprocessor._decode(path.read_bytes()))
+        return {self._input_name: self._preprocessor._image_to_tensor(img)}
+
+
+def _calibration_images(directory: str | Path, limit: int) -> List[Path]:
+    """Pick calibration images from a directory (labels are not needed).
+
+    Args:
+        directory: Directory of captcha images.
+        limit: Maximum number of images.
+
+    Returns:
+        A reproducible random sample of image paths.
+    """
+    candidates = dataset_images(directory) if is_dataset(directory) else Path(directory).iterdir()
+    paths = sorted(p for p in candidates if p.suffix.lower() in IMAGE_SUFFIXES)
+    random.Random(0).shuffle(paths)
+    return paths[:limit]
+
+
+def quantize_model(
+    model_path: str | Path,
+    output_path: str | Path,
+    mode: str = "static",
+    calib_dir: Optional[str | Path] = None,
+    calib_limit: int = 200,
+) -> Path:
+    """Quantize the FP32 captcha model to INT8.
+
+    Args:
+        model_path: Path to the FP32 ONNX model.
+        output_path: Where to write the INT8 model.
+        mode: "dynamic" (weights only) or "static" (weights and
+            activations, calibrated on ``calib_dir``).
+        calib_dir: Directory of captcha images for static calibration.
+        calib_limit: Maximum number of calibration images.
+
+    Returns:
+        Path of the INT8 model.
+
+    Raises:
+        ValueError: If the mode is unknown or calibration images are missing.
+        RuntimeError: If the quantization tooling is not installed.
+    """
+    if mode not in QUANT_MODES:
+        raise ValueError(f"Unknown quantization mode: {mode}")
+
+    try:
+        from onnxruntime.quantization import (
+            CalibrationDataReader,
+            QuantFormat,
+            QuantType,
+            quantize_dynamic,
+            quantize_static,
+        )
+    except ImportError as e:
+        raise RuntimeError(f"Quantization requires the onnx package (pip install onnx): {e}")
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    if mode == "dynamic":
+        quantize_dynamic(str(model_path), str(output_path), weight_type=QuantType.QInt8)
+    else:
+        if not calib_dir:
+            raise ValueError("Static quantization needs a calibration image directory")
+        paths = _calibration_images(calib_dir, calib_limit)
+        if not paths:
+            raise ValueError(f"No calibration images found in {calib_dir}")
+
+        preprocessor = CaptchaAI(model_path)
+
+        class Reader(_CalibrationReader, CalibrationDataReader):
+            pass
+
+        reader = Reader(preprocessor, preprocessor._input_name, paths)
+        quantize_static(
+            str(model_path),
+            str(output_path),
+            reader,
+            quant_format=QuantFormat.QDQ,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            per_channel=True,
+        )
+        logger.info(f"Calibrated on {len(paths)} images")
+
+    logger.info(f"INT8 model written to {output_path} ({mode})")
+    return output_path
+
+
+def evaluate_model(model_path: str | Path, samples: Sequence[Sample]) -> Dict[str, float]:
+    """Measure a model's accuracy on labelled images.
+
+    Args:
+        model_path: Path to the ONNX model.
+        samples: Labelled captcha images.
+
+    Returns:
+        Dict with digit_accuracy, sequence_accuracy and samples.
+    """
+    # Private registry so offline evaluation does not count as live captchas
+    ai = CaptchaAI(model_path, metrics=MetricsRegistry())
+    pairs = [(s.label, ai.predict_image_sync(s.path.read_bytes()).text) for s in samples]
+    digit_acc, seq_acc = accuracy(pairs)
+    return {"digit_accuracy": digit_acc, "sequence_accuracy": seq_acc, "samples": len(pairs)}
+
+
+def compare_models(
+    fp32_path: str | Path,
+    int8_path: str | Path,
+    eval_dir: str | Path,
+    limit: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Evaluate the FP32 and INT8 models on the same labelled images.
+
+    Args:
+        fp32_path: Path to the FP32 model.
+        int8_path: Path to the INT8 model.
+        eval_dir: Directory of labelled captcha images.
+        limit: Optional maximum number of images.
+
+    Returns:
+        Report dict with both accuracies and the sequence accuracy drop.
+
+    Raises:
+        ValueError: If no labelled images are found.
+    """
+    samples = load_dataset(eval_dir, limit)
+    if not samples:
+        raise ValueError(f"No labelled images found in {eval_dir}")
+
+    fp32 = evaluate_model(fp32_path, samples)
+    int8 = evaluate_model(int8_path, samples)
+    return {
+        "fp32_model": str(fp32_path),
+        "int8_model": str(int8_path),
+        "fp32_sha256": model_digest(fp32_path),
+        "int8_sha256": model_digest(int8_path),
+        "fp32": fp32,
+        "int8": int8,
+        "accuracy_drop": fp32["sequence_accuracy"] - int8["sequence_accuracy"],
+    }
+
+
+def save_report(report: Dict[str, Any]) -> Path:
+    """Write a comparison report next to its INT8 model.
+
+    Args:
+        report: Output of compare_models().
+
+    Returns:
+        Path of the written report.
+    """
+    path = report_path(report["int8_model"])
+    path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return path
+
+
+def select_model(
+    fp32_path: str | Path,
+    int8_path: Optional[str | Path] = None,
+    max_drop: float = 0.02,
+    eval_dir: Optional[str | Path] = None,
+) -> Path:
+    """Choose between the FP32 and INT8 models based on accuracy.
+
+    The INT8 model is used only if its sequence accuracy is at most
+    ``max_drop`` below FP32, measured on ``eval_dir`` when given or taken
+    from the saved report otherwise (which must have been made for the
+    current model files). Any doubt falls back to FP32.
+
+    Args:
+        fp32_path: Path to the FP32 model.
+        int8_path: Optional path to the INT8 model.
+        max_drop: Largest acceptable sequence accuracy drop (0.02 = 2 points).
+        eval_dir: Optional directory of labelled captcha images.
+
+    Returns:
+        Path of the model to load.
+    """
+    fp32_path = Path(fp32_path)
+    if not int8_path:
+        return fp32_path
+
+    int8_path = Path(int8_path)
+    if not int8_path.exists():
+        logger.warning(f"INT8 model not found: {int8_path}, using FP32")
+        return fp32_path
+
+    try:
+        if eval_dir:
+            report = compare_models(fp32_path, int8_path, eval_dir)
+            save_report(report)
+        else:
+            report = json.loads(report_path(int8_path).read_text(encoding="utf-8"))
+            if (
+                report.get("fp32_sha256") != model_digest(fp32_path)
+                or report.get("int8_sha256") != model_digest(int8_path)
+            ):
+                raise ValueError("report was made for other model files")
+        drop = float(report["accuracy_drop"])
+    except (OSError, ValueError, RuntimeError, KeyError, TypeError) as e:
+        logger.warning(f"Cannot verify INT8 model accuracy ({e}), using FP32")
+        return fp32_path
+
+    if drop > max_drop:
+        logger.warning(
+            f"INT8 model accuracy drop {drop:.2%} exceeds {max_drop:.2%}, using FP32"
+        )
+        return fp32_path
+
+    logger.info(f"Using INT8 captcha model (accuracy drop {drop:.2%})")
+    return int8_path
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    """Print a comparison report."""
+    for name in ("fp32", "int8"):
+        stats = report[name]
+        print(
+            f"{name}: digit {stats['digit_accuracy']:.2%}, "
+            f"sequence {stats['sequence_accuracy']:.2%} ({stats['samples']} samples)"
+        )
+    print(f"sequence accuracy drop: {report['accuracy_drop']:.2%}")
+
+
+def main() -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Captcha model INT8 quantization")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    quant = sub.add_parser("quantize", help="Produce an INT8 model")
+    quant.add_argument("--model", default="./model/captcha.onnx", help="FP32 model path")
+    quant.add_argument("--out", default="./model/captcha.int8.onnx", help="INT8 model path")
+    quant.add_argument("--mode", choices=QUANT_MODES, default="static")
+    quant.add_argument("--calib", default=None, help="Calibration image directory")
+    quant.add_argument("--calib-limit", type=int, default=200, help="Max calibration images")
+    quant.add_argument("--eval", default=None, help="Labelled image directory for the report")
+
+    compare = sub.add_parser("compare", help="Compare FP32 and INT8 accuracy")
+    compare.add_argument("--model", default="./model/captcha.onnx", help="FP32 model path")
+    compare.add_argument("--int8", default="./model/captcha.int8.onnx", help="INT8 model path")
+    compare.add_argument("--eval", required=True, help="Labelled image directory")
+    compare.add_argument("--limit", type=int, default=None, help="Max images")
+
+    args = parser.parse_args()
+    setup_logging()
+
+    if args.command == "quantize":
+        int8_path = quantize_model(args.model, args.out, args.mode, args.calib, args.calib_limit)
+        eval_dir = args.eval or (args.calib if args.mode == "static" else None)
+        if eval_dir:
+            report = compare_models(args.model, int8_path, eval_dir)
+            print(f"Report written to {save_report(report)}")
+            _print_report(report)
+    else:
+        report = compare_models(args.model, args.int8, args.eval, args.limit)
+        print(f"Report written to {save_report(report)}")
+        _print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,410 @@
+"""Local captcha solver daemon and client over a Unix domain socket.
+
+Wire format (all integers big-endian)::
+
+    header  = version:u8 | kind:u8 | request_id:u32 | length:u32
+    payload = `length` bytes
+
+Requests use ``kind`` as an opcode (predict carries the raw image bytes),
+responses use it as a status. A successful prediction is encoded as::
+
+    flags:u8 | count:u8 | digits:count ASCII bytes | confidences:count float32
+
+where ``flags`` marks an ambiguous answer (bit 0) or one Isekaid rejected
+before (bit 1); the client adds the image digest itself. An error carries
+a UTF-8 message. Request ids let one connection carry many in-flight
+predictions, so the daemon can batch them together.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import struct
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+from services.captcha_cache import CaptchaResult
+from utils.errors import CaptchaError
+from utils.logging import get_logger
+
+if TYPE_CHECKING:
+    from services.captcha_service import CaptchaAI
+
+logger = get_logger(__name__)
+
+PROTOCOL_VERSION = 3
+HEADER = struct.Struct("!BBII")
+
+# Request opcodes
+OP_PING = 1
+OP_PREDICT = 2
+
+# Response statuses
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+# Result flags
+FLAG_AMBIGUOUS = 0x01
+FLAG_BAD = 0x02
+
+# Largest accepted payload (captcha images are a few KB)
+MAX_PAYLOAD = 8 * 1024 * 1024
+
+DEFAULT_SOCKET_PATH = "/tmp/isekaiz-captcha.sock"
+
+
+def pack_frame(kind: int, request_id: int, payload: bytes = b"") -> bytes:
+    """Encode a protocol frame.
+
+    Args:
+        kind: Opcode (requests) or status (responses).
+        request_id: Identifier echoed back in the response.
+        payload: Frame body.
+
+    Returns:
+        Encoded frame bytes.
+    """
+    return HEADER.pack(PROTOCOL_VERSION, kind, request_id, len(payload)) + payload
+
+
+def pack_result(result: CaptchaResult) -> bytes:
+    """Encode a prediction as a response payload.
+
+    Args:
+        result: Prediction to encode.
+
+    Returns:
+        Encoded payload bytes.
+    """
+    text = result.text.encode("ascii")
+    confidences = list(result.confidences[: len(text)])
+    confidences += [0.0] * (len(text) - len(confidences))
+    flags = (FLAG_AMBIGUOUS if result.ambiguous else 0) | (FLAG_BAD if result.bad else 0)
+    return bytes([flags, len(text)]) + text + struct.pack(f"!{len(text)}f", *confidences)
+
+
+def unpack_result(payload: bytes) -> CaptchaResult:
+    """Decode a prediction response payload.
+
+    Args:
+        payload: Encoded payload bytes.
+
+    Returns:
+        Decoded prediction.
+
+    Raises:
+        CaptchaError: If the payload is malformed.
+    """
+    if len(payload) < 2:
+        raise CaptchaError("Empty captcha result payload")
+    flags, count = payload[0], payload[1]
+    if len(payload) != 2 + count * 5:
+        raise CaptchaError(f"Malformed captcha result payload ({len(payload)} bytes)")
+    text = payload[2 : 2 + count].decode("ascii")
+    confidences = list(struct.unpack(f"!{count}f", payload[2 + count :]))
+    return CaptchaResult(
+        text=text,
+        confidences=confidences,
+        bad=bool(flags & FLAG_BAD),
+        ambiguous=bool(flags & FLAG_AMBIGUOUS),
+    )
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Tuple[int, int, bytes]:
+    """Read and decode one protocol frame.
+
+    Args:
+        reader: Stream to read from.
+
+    Returns:
+        Tuple of (kind, request_id, payload).
+
+    Raises:
+        asyncio.IncompleteReadError: If the peer closed the connection.
+        CaptchaError: If the frame is malformed.
+    """
+    header = await reader.readexactly(HEADER.size)
+    version, kind, request_id, length = HEADER.unpack(header)
+    if version != PROTOCOL_VERSION:
+        raise CaptchaError(f"Unsupported captcha protocol version: {version}")
+    if length > MAX_PAYLOAD:
+        raise CaptchaError(f"Captcha frame too large: {length} bytes")
+    payload = await reader.readexactly(length) if length else b""
+    return kind, request_id, payload
+
+
+class CaptchaServer:
+    """Serves captcha predictions from a single in-process model.
+
+    Every connected bot shares the same model session (and its batcher),
+    so the model's memory is paid once per host.
+    """
+
+    def __init__(self, engine: "CaptchaAI", socket_path: str | Path = DEFAULT_SOCKET_PATH) -> None:
+        """Initialize the server.
+
+        Args:
+            engine: Captcha solver running inference in this process.
+            socket_path: Filesystem path of the Unix domain socket.
+        """
+        self.engine = engine
+        self.socket_path = Path(socket_path)
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        """Bind the socket and start accepting connections.
+
+        Raises:
+            CaptchaError: If another daemon is listening on the socket.
+        """
+        if self.socket_path.exists():
+            await self._remove_stale_socket()
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._server = await asyncio.start_unix_server(
+            self._handle_connection, path=str(self.socket_path)
+        )
+        # The default path is in a world-writable directory
+        os.chmod(self.socket_path, 0o600)
+        logger.info(f"Captcha service listening on {self.socket_path}")
+
+    async def serve_forever(self) -> None:
+        """Start the server (if needed) and serve until cancelled."""
+        if self._server is None:
+            await self.start()
+        assert self._server is not None
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        """Stop accepting connections and remove the socket file."""
+        if self._server is None:
+            return  # never bound, the socket file is not ours
+        self._server.close()
+        await self._server.wait_closed()
+        self._server = None
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+
+    async def _remove_stale_socket(self) -> None:
+        """Remove a socket file left behind by a previous run.
+
+        Raises:
+            CaptchaError: If a daemon still answers on the socket.
+        """
+        try:
+            _, writer = await asyncio.open_unix_connection(str(self.socket_path))
+        except ConnectionRefusedError:
+            self.socket_path.unlink()
+            return
+        writer.close()
+        await writer.wait_closed()
+        raise CaptchaError(f"Captcha service already running on {self.socket_path}")
+
+    async def _handle_connection(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        """Serve requests from one client connection.
+
+        Args:
+            reader: Connection read stream.
+            writer: Connection write stream.
+        """
+        write_lock = asyncio.Lock()
+        in_flight = set()
+
+        try:
+            while True:
+                try:
+                    kind, request_id, payload = await read_frame(reader)
+                except asyncio.IncompleteReadError:
+                    break
+
+                # Handle requests concurrently so pipelined predictions batch
+                task = asyncio.create_task(
+                    self._handle_request(kind, request_id, payload, writer, write_lock)
+                )
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+        except CaptchaError as e:
+            logger.warning(f"Dropping captcha client: {e}")
+        finally:
+            for task in in_flight:
+                task.cancel()
+            writer.close()
+
+    async def _handle_request(
+        self,
+        kind: int,
+        request_id: int,
+        payload: bytes,
+        writer: asyncio.StreamWriter,
+        write_lock: asyncio.Lock,
+    ) -> None:
+        """Execute one request and write its response.
+
+        Args:
+            kind: Request opcode.
+            request_id: Identifier to echo back.
+            payload: Request body.
+            writer: Connection write stream.
+            write_lock: Lock serializing writes on this connection.
+        """
+        if kind == OP_PING:
+            frame = pack_frame(STATUS_OK, request_id)
+        elif kind == OP_PREDICT:
+            try:
+                result = await self.engine.predict_image(payload)
+                frame = pack_frame(STATUS_OK, request_id, pack_result(result))
+            except Exception as e:
+                frame = pack_frame(STATUS_ERROR, request_id, str(e).encode("utf-8"))
+        else:
+            frame = pack_frame(STATUS_ERROR, request_id, f"Unknown opcode: {kind}".encode("utf-8"))
+
+        async with write_lock:
+            writer.write(frame)
+            await writer.drain()
+
+
+class CaptchaClient:
+    """Client for a local captcha service.
+
+    Keeps one connection open and multiplexes concurrent requests over it.
+    Any transport failure is raised as ``ConnectionError`` so callers can
+    fall back to in-process inference.
+    """
+
+    def __init__(self, socket_path: str | Path = DEFAULT_SOCKET_PATH, timeout: float = 10.0) -> None:
+        """Initialize the client.
+
+        Args:
+            socket_path: Filesystem path of the service's Unix socket.
+            timeout: Seconds to wait for a response before giving up.
+        """
+        self.socket_path = Path(socket_path)
+        self._timeout = timeout
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._next_id = 0
+        self._connect_lock = asyncio.Lock()
+
+    @property
+    def connected(self) -> bool:
+        """Check if the client has an open connection."""
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def ping(self) -> None:
+        """Check that the service is reachable.
+
+        Raises:
+            ConnectionError: If the service cannot be reached.
+        """
+        await self._request(OP_PING)
+
+    async def predict(self, image: bytes) -> CaptchaResult:
+        """Request a prediction for raw captcha image bytes.
+
+        Args:
+            image: Encoded image file contents.
+
+        Returns:
+            Predicted digits and their confidences.
+
+        Raises:
+            ConnectionError: If the service cannot be reached.
+            CaptchaError: If the service failed to solve the image.
+        """
+        payload = await self._request(OP_PREDICT, image)
+        return unpack_result(payload)
+
+    async def close(self) -> None:
+        """Close the connection and fail outstanding requests."""
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            self._reader_task = None
+        self._reset(ConnectionError("Captcha client closed"))
+
+    async def _connect(self) -> None:
+        """Open the connection if it is not already open."""
+        async with self._connect_lock:
+            if self.connected:
+                return
+            try:
+                self._reader, self._writer = await asyncio.open_unix_connection(
+                    str(self.socket_path)
+                )
+            except OSError as e:
+                raise ConnectionError(f"Captcha service unreachable: {e}") from e
+            self._reader_task = asyncio.create_task(self._read_loop(self._reader))
+            logger.info(f"Connected to captcha service at {self.socket_path}")
+
+    async def _request(self, kind: int, payload: bytes = b"") -> bytes:
+        """Send a request and wait for its response.
+
+        Args:
+            kind: Request opcode.
+            payload: Request body.
+
+        Returns:
+            Response body.
+        """
+        await self._connect()
+        assert self._writer is not None
+
+        self._next_id = (self._next_id + 1) & 0xFFFFFFFF
+        request_id = self._next_id
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+
+        try:
+            self._writer.write(pack_frame(kind, request_id, payload))
+            await self._writer.drain()
+            status, body = await asyncio.wait_for(future, self._timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            self._reset(ConnectionError(f"Captcha service request failed: {e}"))
+            raise ConnectionError(f"Captcha service request failed: {e}") from e
+        finally:
+            self._pending.pop(request_id, None)
+
+        if status != STATUS_OK:
+            raise CaptchaError(body.decode("utf-8", errors="replace"))
+        return body
+
+    async def _read_loop(self, reader: asyncio.StreamReader) -> None:
+        """Dispatch responses to their waiting requests.
+
+        Args:
+            reader: Connection read stream.
+        """
+        try:
+            while True:
+                status, request_id, payload = await read_frame(reader)
+                future = self._pending.get(request_id)
+                if future is not None and not future.done():
+                    future.set_result((status, payload))
+        except asyncio.CancelledError:
+            raise
+        except (asyncio.IncompleteReadError, OSError, CaptchaError) as e:
+            logger.warning(f"Captcha service connection lost: {e}")
+            self._reset(ConnectionError("Captcha service connection lost"))
+
+    def _reset(self, error: Exception) -> None:
+        """Drop the connection and fail all outstanding requests.
+
+        Args:
+            error: Exception delivered to waiting requests.
+        """
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = None
+        self._writer = None
+
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self._pending.clear()
@@ -1,44 +1,131 @@
-"""Captcha AI service using ONNX model for digit recognition."""
+"""Captcha AI service using ONNX model for digit recognition.
+
+Can also run as a standalone local daemon that loads the model once per
+host and serves every bot process over a Unix domain socket::
+
+    python -m services.captcha_service --model ./model/captcha.onnx
+"""
 
 from __future__ import annotations
 
-import numpy as np
+import argparse
+import asyncio
+import importlib.util
+import io
+import time
+from dataclasses import replace
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import TYPE_CHECKING, Any, Dict, Tuple, Optional
 
-from utils.logging import get_logger
-
-logger = get_logger(__name__)
+from services.captcha_batcher import CaptchaBatcher
+from services.captcha_cache import CaptchaCache, CaptchaResult, image_digest
+from services.captcha_dataset import OUTCOME_RETRY, OUTCOME_VERIFIED, CaptchaDataset
+from services.captcha_server import DEFAULT_SOCKET_PATH, CaptchaClient, CaptchaServer
+from utils.logging import get_logger, setup_logging
+from utils.metrics import REGISTRY, MetricsRegistry
 
-# Try to import dependencies
-try:
-    import onnxruntime as ort
+if TYPE_CHECKING:
+    import numpy as np
     from PIL import Image
-    import aiohttp
-    import io
 
-    DEPENDENCIES_AVAILABLE = True
-except ImportError as e:
-    logger.warning(f"Captcha service dependencies not available: {e}")
-    DEPENDENCIES_AVAILABLE = False
+logger = get_logger(__name__)
+
+# Heavy dependencies are imported on first use to keep bot startup fast;
+# only check that they are installed here (onnxruntime is checked on load)
+DEPENDENCIES = ("numpy", "PIL", "aiohttp")
+DEPENDENCIES_AVAILABLE = all(importlib.util.find_spec(name) for name in DEPENDENCIES)
+if not DEPENDENCIES_AVAILABLE:
+    logger.warning("Captcha service dependencies not available")
+
+
+# Session settings accepted by CaptchaAI(session_options=...)
+SESSION_OPTION_KEYS = (
+    "intra_op_num_threads",
+    "inter_op_num_threads",
+    "graph_optimization_level",
+    "execution_mode",
+)
+GRAPH_OPTIMIZATION_LEVELS = {
+    "disable": "ORT_DISABLE_ALL",
+    "basic": "ORT_ENABLE_BASIC",
+    "extended": "ORT_ENABLE_EXTENDED",
+    "all": "ORT_ENABLE_ALL",
+}
+EXECUTION_MODES = {
+    "sequential": "ORT_SEQUENTIAL",
+    "parallel": "ORT_PARALLEL",
+}
+
+# Pipeline metrics (stage histograms are in milliseconds)
+STAGE_METRIC = "captcha_{}_ms"
+PIPELINE_STAGES = ("download", "decode", "resize", "tensor", "inference", "nms", "service")
+PREDICTIONS_METRIC = "captcha_predictions_total"
+FAILURES_METRIC = "captcha_failures_total"
+EMPTY_METRIC = "captcha_empty_total"
+BELOW_THRESHOLD_METRIC = "captcha_below_threshold_total"
+AMBIGUOUS_METRIC = "captcha_ambiguous_total"
+SECOND_PASS_METRIC = "captcha_second_pass_total"
+RESOLVED_METRIC = "captcha_resolved_total"
+DIGITS_METRIC = "captcha_digits"
+TOTAL_METRIC = "captcha_total_ms"
+
+# Boxes scoring between this and the NMS threshold count as near misses
+NEAR_MISS_CONFIDENCE = 0.1
 
 
 class CaptchaAI:
     """AI-powered captcha solver using ONNX model.
 
     Uses an ONNX object detection model to recognize digits in captcha images.
+    Concurrent predictions are micro-batched into a single inference run.
+
+    When a service socket is configured, predictions are delegated to the
+    local captcha daemon and the model is only loaded in-process if the
+    daemon cannot be reached.
     """
 
     # Image size expected by the model
     IMG_SIZE = 160
     # Maximum number of digits in captcha
     MAX_LABEL_SIZE = 4
-
-    def __init__(self, model_path: str | Path) -> None:
+    # NMS thresholds for the first pass
+    CONF_THRESHOLD = 0.25
+    IOU_THRESHOLD = 0.5
+    # Retry thresholds for ambiguous results (missing or overlapping digits)
+    RELAXED_CONF_THRESHOLD = 0.1
+    STRICT_IOU_THRESHOLD = 0.3
+    # Digits scoring below this make a result ambiguous
+    MIN_DIGIT_CONFIDENCE = 0.5
+
+    # Instances shared by model path (one session per model per process)
+    _instances: Dict[str, "CaptchaAI"] = {}
+
+    def __init__(
+        self,
+        model_path: str | Path,
+        batch_size: int = 8,
+        batch_wait_ms: float = 5.0,
+        socket_path: Optional[str | Path] = None,
+        cache_size: int = 256,
+        session_options: Optional[Dict[str, Any]] = None,
+        load_model: bool = True,
+        metrics: Optional[MetricsRegistry] = None,
+    ) -> None:
         """Initialize the CaptchaAI with an ONNX model.
 
         Args:
             model_path: Path to the ONNX model file.
+            batch_size: Maximum number of images per inference run.
+            batch_wait_ms: Maximum time to wait for a batch to fill.
+            socket_path: Optional captcha service socket to use before
+                falling back to in-process inference.
+            cache_size: Maximum number of images in the result cache.
+            session_options: Optional ONNX Runtime session settings (see
+                SESSION_OPTION_KEYS).
+            load_model: Load the model now rather than in the background
+                (see load()) or on the first in-process prediction.
+            metrics: Registry for stage timings and counters (defaults to
+                the process-wide registry).
 
         Raises:
             FileNotFoundError: If the model file doesn't exist.
@@ -51,20 +138,143 @@ class CaptchaAI:
             )
 
         self.model_path = Path(model_path)
+        self._batch_size = batch_size
+        self._batch_wait_ms = batch_wait_ms
+        self._session: Optional[Any] = None  # onnxruntime.InferenceSession
+        self._batcher: Optional[CaptchaBatcher] = None
+        self._client = CaptchaClient(socket_path) if socket_path else None
+        self._cache = CaptchaCache(cache_size)
+        self._session_options = dict(session_options or {})
+        self._load_task: Optional[asyncio.Future] = None
+        self.metrics = metrics or REGISTRY
+        # Optional recorder of solved captchas and their outcomes
+        self.dataset: Optional[CaptchaDataset] = None
+        self._ready = asyncio.Event()
+
+        # Without a service the model is required up front
+        if self._client is None and load_model:
+            self._load_model()
+            self._ready.set()
+
+    @property
+    def ready(self) -> bool:
+        """Check if predictions can be served without waiting for a load."""
+        return self._client is not None or self._session is not None
+
+    async def load(self, model_path: Optional[str | Path] = None) -> None:
+        """Load the model in a worker thread without blocking the event loop.
+
+        Concurrent calls share one load. Waiters in wait_ready() are woken
+        once loading finishes, whether it succeeded or not.
+
+        Args:
+            model_path: Optional model to load instead of the configured one
+                (e.g. a quantized variant). Ignored if already loading.
+
+        Raises:
+            FileNotFoundError: If the model file doesn't exist.
+            RuntimeError: If ONNX runtime fails to load the model.
+        """
+        if self._session is not None:
+            self._ready.set()
+            return
+
+        if self._load_task is None:
+            if model_path is not None:
+                self.model_path = Path(model_path)
+            self._load_task = asyncio.ensure_future(asyncio.to_thread(self._load_model))
+
+        task = self._load_task
+        try:
+            await asyncio.shield(task)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Allow a later call to retry
+            if self._load_task is task:
+                self._load_task = None
+            raise
+        finally:
+            if task.done():
+                self._ready.set()
+
+    async def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Wait for a background model load to finish.
+
+        Args:
+            timeout: Maximum seconds to wait (None waits indefinitely).
+
+        Returns:
+            True if predictions can be served, False if loading failed or
+            did not finish in time.
+        """
+        if self.ready:
+            return True
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return self.ready
+
+    def _load_model(self) -> None:
+        """Load the ONNX model into an in-process inference session.
+
+        Raises:
+            FileNotFoundError: If the model file doesn't exist.
+            RuntimeError: If ONNX runtime fails to load the model.
+        """
         if not self.model_path.exists():
-            raise FileNotFoundError(f"Model file not found: {model_path}")
+            raise FileNotFoundError(f"Model file not found: {self.model_path}")
 
         try:
-            self._session = ort.InferenceSession(
+            import onnxruntime as ort
+        except ImportError as e:
+            raise RuntimeError(f"onnxruntime not available: {e}")
+
+        try:
+            session = ort.InferenceSession(
                 str(self.model_path),
+                sess_options=self._build_session_options(ort),
                 providers=["CPUExecutionProvider"],
             )
-            self._input_name = self._session.get_inputs()[0].name
-            self._output_name = self._session.get_outputs()[0].name
-            logger.info(f"Captcha AI model loaded: {model_path}")
+            self._input_name = session.get_inputs()[0].name
+            self._output_name = session.get_outputs()[0].name
+            self._session = session
+            logger.info(f"Captcha AI model loaded: {self.model_path}")
         except Exception as e:
             raise RuntimeError(f"Failed to load ONNX model: {e}")
 
+        self._batcher = CaptchaBatcher(
+            self._timed_inference,
+            max_batch=self._batch_size,
+            max_wait_ms=self._batch_wait_ms,
+        )
+
+    def _build_session_options(self, ort: Any) -> Any:
+        """Build ONNX Runtime session options from the configured settings.
+
+        Args:
+            ort: The imported onnxruntime module.
+
+        Returns:
+            An ``onnxruntime.SessionOptions`` instance.
+        """
+        options = ort.SessionOptions()
+        settings = self._session_options
+
+        if "intra_op_num_threads" in settings:
+            options.intra_op_num_threads = int(settings["intra_op_num_threads"])
+        if "inter_op_num_threads" in settings:
+            options.inter_op_num_threads = int(settings["inter_op_num_threads"])
+        if "graph_optimization_level" in settings:
+            level = GRAPH_OPTIMIZATION_LEVELS[settings["graph_optimization_level"]]
+            options.graph_optimization_level = getattr(ort.GraphOptimizationLevel, level)
+        if "execution_mode" in settings:
+            mode = EXECUTION_MODES[settings["execution_mode"]]
+            options.execution_mode = getattr(ort.ExecutionMode, mode)
+
+        return options
+
     async def predict(self, img_url: str) -> str:
         """Predict the captcha digits from an image URL.
 
@@ -72,52 +282,418 @@ class CaptchaAI:
             img_url: URL of the captcha image.
 
         Returns:
-            String of predicted digits (empty string on failure).
+            String of predicted digits (empty string on failure or when
+            the only known answer for this image was already rejected).
+        """
+        result = await self.predict_result(img_url)
+        return "" if result.bad else result.text
+
+    async def predict_result(self, img_url: str) -> CaptchaResult:
+        """Predict the captcha digits and confidences from an image URL.
+
+        Args:
+            img_url: URL of the captcha image.
+
+        Returns:
+            CaptchaResult (empty text on failure).
+        """
+        self.metrics.counter(PREDICTIONS_METRIC, "Captcha predictions requested").inc()
+        start = time.perf_counter()
+        stage = "cache"
+        try:
+            # Same URL as an earlier captcha: skip the download entirely
+            cached = self._cache.get(img_url)
+            if cached is not None:
+                return self._from_cache(cached)
+
+            stage = "download"
+            with self._stage_timer(stage):
+                data = await self._download(img_url)
+            stage = "decode"
+            with self._stage_timer(stage):
+                img = self._decode(data)
+                digest = image_digest(img)
+
+            # Same pixels served under a new URL
+            cached = self._cache.get(img_url, digest)
+            if cached is not None:
+                self._record_sample(img_url, data, cached)
+                return self._from_cache(cached)
+
+            result: Optional[CaptchaResult] = None
+            if self._client is not None:
+                stage = "service"
+                try:
+                    with self._stage_timer(stage):
+                        result = await self._client.predict(data)
+                    logger.debug("Captcha prediction (service): %s", result.text)
+                except ConnectionError as e:
+                    logger.warning(f"{e}; falling back to in-process inference")
+
+            if result is None:
+                stage = "inference"
+                result = await self._solve(img)
+
+            self._record_result(result)
+            result.digest = digest
+            self._cache.put(img_url, result)
+            self._record_sample(img_url, data, result)
+            return result
+
+        except Exception as e:
+            self.metrics.counter(FAILURES_METRIC, "Captcha predictions that raised").inc()
+            logger.error(f"Captcha prediction failed during {stage}: {e}")
+            return CaptchaResult()
+
+        finally:
+            self.metrics.histogram(TOTAL_METRIC, "Captcha prediction time").observe(
+                (time.perf_counter() - start) * 1000
+            )
+
+    def _stage_timer(self, stage: str):
+        """Time a pipeline stage into its histogram.
+
+        Args:
+            stage: Stage name (one of PIPELINE_STAGES).
+
+        Returns:
+            Context manager recording the elapsed milliseconds.
+        """
+        return self.metrics.timer(STAGE_METRIC.format(stage), f"Captcha {stage} time")
+
+    def _record_result(self, result: CaptchaResult) -> None:
+        """Count the outcome of a fresh (uncached) prediction.
+
+        Args:
+            result: Prediction to record.
+        """
+        self.metrics.histogram(
+            DIGITS_METRIC, "Digits found per captcha", buckets=range(self.MAX_LABEL_SIZE + 1)
+        ).observe(len(result.text))
+        if not result.text:
+            self.metrics.counter(EMPTY_METRIC, "Captcha predictions with no digits").inc()
+        if result.near_misses:
+            self.metrics.counter(
+                BELOW_THRESHOLD_METRIC, "Detections scoring just below the threshold"
+            ).inc(result.near_misses)
+        if result.ambiguous:
+            self.metrics.counter(AMBIGUOUS_METRIC, "Captchas still ambiguous after retries").inc()
+            logger.warning(
+                f"Captcha answer {result.text!r} is doubtful "
+                f"(confidences {[round(c, 2) for c in result.confidences]})"
+            )
+
+    async def predict_image(self, data: bytes) -> CaptchaResult:
+        """Predict the captcha digits from encoded image bytes.
+
+        Args:
+            data: Encoded image file contents.
+
+        Returns:
+            CaptchaResult with the predicted digits.
+
+        Raises:
+            RuntimeError: If the model cannot be loaded.
+        """
+        return await self._solve(self._decode(data))
+
+    def predict_image_sync(self, data: bytes) -> CaptchaResult:
+        """Predict the captcha digits synchronously, without batching.
+
+        Intended for offline tools (evaluation, calibration) running
+        outside the event loop.
+
+        Args:
+            data: Encoded image file contents.
+
+        Returns:
+            CaptchaResult with the predicted digits.
+        """
+        if self._session is None:
+            self._load_model()
+
+        img = self._decode(data)
+        output = self._run_inference(self._image_to_tensor(self._preprocess(img)))
+        result = self._postprocess(output)
+
+        if result.ambiguous:
+            enhanced = self._preprocess(self._enhance(img))
+            retry = self._postprocess(self._run_inference(self._image_to_tensor(enhanced)))
+            result = self._pick(result, retry)
+        return result
+
+    def mark_bad(self, img_url: str) -> bool:
+        """Record that the answer submitted for an image was rejected.
+
+        Args:
+            img_url: URL of the captcha image.
+
+        Returns:
+            True if a cached prediction was marked.
+        """
+        marked = self._cache.mark_bad(img_url)
+        if marked:
+            logger.info("Captcha answer rejected, will not resubmit it")
+        if self.dataset is not None:
+            self._in_background(self.dataset.record_outcome, img_url, OUTCOME_RETRY)
+        return marked
+
+    def mark_verified(self, img_url: str) -> None:
+        """Record that the answer submitted for an image was accepted.
+
+        Args:
+            img_url: URL of the captcha image.
+        """
+        if self.dataset is not None:
+            self._in_background(self.dataset.record_outcome, img_url, OUTCOME_VERIFIED)
+
+    def _record_sample(self, img_url: str, data: bytes, result: CaptchaResult) -> None:
+        """Save a solved image to the dataset, if one is configured.
+
+        Args:
+            img_url: URL of the captcha image.
+            data: Encoded image bytes.
+            result: Prediction for the image.
         """
+        if self.dataset is not None:
+            self._in_background(self.dataset.add, img_url, data, result)
+
+    def _in_background(self, func: Any, *args: Any) -> None:
+        """Run a dataset write in the default executor without waiting.
+
+        Args:
+            func: Function to run.
+            *args: Arguments for the function.
+        """
+
+        def run() -> None:
+            try:
+                func(*args)
+            except Exception as e:
+                logger.warning(f"Captcha dataset write failed: {e}")
+
         try:
-            # Download and preprocess image
-            img = await self._get_image(img_url)
+            asyncio.get_running_loop().run_in_executor(None, run)
+        except RuntimeError:
+            run()  # no event loop (offline tools)
+
+    def _from_cache(self, cached: CaptchaResult) -> CaptchaResult:
+        """Build the result returned for a cache hit.
+
+        Args:
+            cached: Result stored in the cache.
+
+        Returns:
+            Copy of the cached result flagged as cached.
+        """
+        if cached.bad:
+            logger.warning("Captcha image already answered wrongly, skipping resubmission")
+        else:
+            logger.debug("Captcha prediction (cached): %s", cached.text)
+        return replace(cached, confidences=list(cached.confidences), cached=True)
+
+    async def _solve(self, img: Image.Image) -> CaptchaResult:
+        """Run the in-process model on a decoded image.
+
+        Args:
+            img: Decoded PIL Image (RGB).
+
+        Returns:
+            CaptchaResult with the predicted digits.
+        """
+        if self._batcher is None:
+            await self.load()
+
+        result = await self._infer(img)
+
+        # Rather spend another inference than submit a doubtful answer
+        if result.ambiguous:
+            self.metrics.counter(SECOND_PASS_METRIC, "Captchas re-run with enhanced contrast").inc()
+            retry = await self._infer(self._enhance(img))
+            result = self._pick(result, retry)
+
+        logger.debug("Captcha prediction: %s", result.text)
+        return result
+
+    async def _infer(self, img: Image.Image) -> CaptchaResult:
+        """Run one batched inference and post-process its output.
+
+        Args:
+            img: Decoded PIL Image (RGB).
+
+        Returns:
+            CaptchaResult with the predicted digits.
+        """
+        with self._stage_timer("resize"):
+            img = self._preprocess(img)
+        with self._stage_timer("tensor"):
             input_tensor = self._image_to_tensor(img)
 
-            # Run inference
-            output = self._run_inference(input_tensor)
+        # Run inference (batched with any concurrent requests; the inference
+        # stage times the model run itself, not the wait for the batch)
+        if self._batcher is None:
+            raise RuntimeError("Captcha AI model not loaded")
+        output = await self._batcher.submit(input_tensor)
 
-            # Post-process with NMS
-            _, labels, boxes = self._nms(output)
+        with self._stage_timer("nms"):
+            return self._postprocess(output)
 
-            # Order labels by x-position (left to right)
-            indices = list(range(len(labels)))
-            indices.sort(key=lambda i: boxes[i * 4])
+    def _postprocess(self, output: np.ndarray) -> CaptchaResult:
+        """Decode model output, retrying NMS with other thresholds if ambiguous.
 
-            # Build result string
-            result = ""
-            for i in indices[: self.MAX_LABEL_SIZE]:
-                result += str(labels[i])
+        Too few digits retries with a lower confidence threshold; too many
+        overlapping detections retries with a stricter IoU threshold. Both
+        reuse the same model output, so they cost no extra inference. The
+        result's near misses are counted at the threshold of the pass kept.
 
-            logger.debug(f"Captcha prediction: {result}")
-            return result
+        Args:
+            output: Model output tensor for one image.
 
-        except Exception as e:
-            logger.error(f"Captcha prediction failed: {e}")
-            return ""
+        Returns:
+            The more convincing of the decoded results.
+        """
+        result = self._decode_detections(
+            *self._nms(output, self.IOU_THRESHOLD, self.CONF_THRESHOLD)
+        )
+        conf_threshold = self.CONF_THRESHOLD
+        if result.ambiguous:
+            if len(result.text) < self.MAX_LABEL_SIZE:
+                thresholds = (self.IOU_THRESHOLD, self.RELAXED_CONF_THRESHOLD)
+            else:
+                thresholds = (self.STRICT_IOU_THRESHOLD, self.CONF_THRESHOLD)
+            retry = self._decode_detections(*self._nms(output, *thresholds))
+            result = self._pick(result, retry)
+            if result is retry:
+                conf_threshold = thresholds[1]
+
+        result.near_misses = self._near_misses(output, conf_threshold)
+        return result
+
+    def _near_misses(self, output: np.ndarray, conf_threshold: float) -> int:
+        """Count boxes scoring between NEAR_MISS_CONFIDENCE and a threshold.
+
+        Args:
+            output: Model output tensor for one image.
+            conf_threshold: Confidence threshold the detections were kept at.
+
+        Returns:
+            Number of near-miss boxes.
+        """
+        scores = output[0, 4:, :].max(axis=0)
+        return int(((scores > NEAR_MISS_CONFIDENCE) & (scores <= conf_threshold)).sum())
+
+    def _pick(self, result: CaptchaResult, retry: CaptchaResult) -> CaptchaResult:
+        """Choose between a result and its retry.
+
+        Args:
+            result: Original (ambiguous) result.
+            retry: Result of the retry pass.
+
+        Returns:
+            The result with the full digit count and the highest weakest
+            digit confidence, preferring unambiguous results.
+        """
+
+        def score(r: CaptchaResult) -> Tuple[bool, bool, float]:
+            return (
+                not r.ambiguous,
+                len(r.text) == self.MAX_LABEL_SIZE,
+                min(r.confidences, default=0.0),
+            )
+
+        if score(retry) > score(result):
+            if not retry.ambiguous:
+                self.metrics.counter(RESOLVED_METRIC, "Ambiguous captchas resolved").inc()
+            logger.debug("Captcha retry pass: %r -> %r", result.text, retry.text)
+            return retry
+        return result
 
-    async def _get_image(self, img_url: str) -> Image.Image:
-        """Download and preprocess an image from URL.
+    def _enhance(self, img: Image.Image) -> Image.Image:
+        """Build an alternative rendering of a captcha for a second pass.
+
+        Args:
+            img: Decoded PIL Image (RGB).
+
+        Returns:
+            Grayscale, contrast-stretched copy of the image (RGB).
+        """
+        from PIL import ImageOps
+
+        return ImageOps.autocontrast(img.convert("L"), cutoff=2).convert("RGB")
+
+    def _decode_detections(
+        self,
+        confidences: np.ndarray,
+        labels: np.ndarray,
+        boxes: np.ndarray,
+    ) -> CaptchaResult:
+        """Turn NMS detections into a digit string.
+
+        Args:
+            confidences: Confidence of each detection.
+            labels: Digit label of each detection.
+            boxes: Flattened [x1, y1, x2, y2] box of each detection.
+
+        Returns:
+            CaptchaResult with digits ordered left to right, flagged as
+            ambiguous if digits are missing, extra or weak.
+        """
+        # Order labels by x-position (left to right)
+        indices = list(range(len(labels)))
+        indices.sort(key=lambda i: boxes[i * 4])
+
+        # Build result string
+        result = ""
+        for i in indices[: self.MAX_LABEL_SIZE]:
+            result += str(labels[i])
+
+        digit_confidences = [float(confidences[i]) for i in indices[: self.MAX_LABEL_SIZE]]
+        ambiguous = (
+            len(labels) != self.MAX_LABEL_SIZE
+            or min(digit_confidences, default=0.0) < self.MIN_DIGIT_CONFIDENCE
+        )
+        return CaptchaResult(text=result, confidences=digit_confidences, ambiguous=ambiguous)
+
+    async def _download(self, img_url: str) -> bytes:
+        """Download an image from URL.
 
         Args:
             img_url: URL of the image.
 
         Returns:
-            Preprocessed PIL Image.
+            Encoded image file contents.
         """
+        import aiohttp
+
         async with aiohttp.ClientSession() as session:
             async with session.get(img_url) as response:
                 if response.status != 200:
                     raise RuntimeError(f"Failed to download image: HTTP {response.status}")
-                data = await response.read()
+                return await response.read()
+
+    def _decode(self, data: bytes) -> Image.Image:
+        """Decode image bytes.
+
+        Args:
+            data: Encoded image file contents.
+
+        Returns:
+            Decoded PIL Image (RGB).
+        """
+        from PIL import Image
+
+        return Image.open(io.BytesIO(data)).convert("RGB")
 
-        # Open image
-        img = Image.open(io.BytesIO(data)).convert("RGB")
+    def _preprocess(self, img: Image.Image) -> Image.Image:
+        """Resize and pad an image to the model input size.
+
+        Args:
+            img: Decoded PIL Image (RGB).
+
+        Returns:
+            Preprocessed PIL Image.
+        """
+        from PIL import Image
 
         # Resize maintaining aspect ratio
         width, height = img.size
@@ -145,6 +721,8 @@ class CaptchaAI:
         Returns:
             Numpy array with shape [1, 3, H, W] in float32.
         """
+        import numpy as np
+
         # Convert to numpy array [H, W, 3]
         img_array = np.array(img, dtype=np.float32)
 
@@ -159,15 +737,29 @@ class CaptchaAI:
 
         return img_array
 
+    def _timed_inference(self, input_tensor: np.ndarray) -> np.ndarray:
+        """Run ONNX inference into the inference stage timer (batcher entry point).
+
+        Args:
+            input_tensor: Input tensor with shape [N, 3, H, W].
+
+        Returns:
+            Model output tensor with a leading batch dimension of N.
+        """
+        with self._stage_timer("inference"):
+            return self._run_inference(input_tensor)
+
     def _run_inference(self, input_tensor: np.ndarray) -> np.ndarray:
         """Run ONNX inference.
 
         Args:
-            input_tensor: Input tensor with shape [1, 3, H, W].
+            input_tensor: Input tensor with shape [N, 3, H, W].
 
         Returns:
-            Model output tensor.
+            Model output tensor with a leading batch dimension of N.
         """
+        if self._session is None:
+            raise RuntimeError("Captcha AI model not loaded")
         outputs = self._session.run(
             [self._output_name],
             {self._input_name: input_tensor},
@@ -190,6 +782,8 @@ class CaptchaAI:
         Returns:
             Tuple of (confidences, labels, boxes) arrays.
         """
+        import numpy as np
+
         # Output shape: [1, num_classes+4, num_boxes]
         # Transpose to [num_boxes, num_classes+4]
         dims = output.shape
@@ -281,14 +875,130 @@ class CaptchaAI:
 
         return confidences, labels, boxes
 
+    @property
+    def batcher(self) -> Optional[CaptchaBatcher]:
+        """Get the inference batcher (None until a model is loaded)."""
+        return self._batcher
+
+    @property
+    def cache(self) -> CaptchaCache:
+        """Get the prediction cache (exposes hits, misses and hit_rate)."""
+        return self._cache
+
+    @property
+    def uses_service(self) -> bool:
+        """Check if predictions are delegated to the captcha service."""
+        return self._client is not None
+
+    async def close(self) -> None:
+        """Close the connection to the captcha service and the batcher, if any."""
+        if self._client is not None:
+            await self._client.close()
+        if self._batcher is not None:
+            await self._batcher.close()
+
     @classmethod
-    async def create(cls, model_path: str | Path) -> "CaptchaAI":
+    async def create(
+        cls,
+        model_path: str | Path,
+        batch_size: int = 8,
+        batch_wait_ms: float = 5.0,
+        socket_path: Optional[str | Path] = None,
+        cache_size: int = 256,
+        load_model: bool = True,
+    ) -> "CaptchaAI":
         """Async factory method for creating CaptchaAI instance.
 
+        Bots running in the same process share one instance per model, so
+        captchas from several accounts are batched together.
+
         Args:
             model_path: Path to the ONNX model file.
+            batch_size: Maximum number of images per inference run.
+            batch_wait_ms: Maximum time to wait for a batch to fill.
+            socket_path: Optional captcha service socket.
+            cache_size: Maximum number of images in the result cache.
+            load_model: Load the model now (False defers it to load()).
 
         Returns:
             Initialized CaptchaAI instance.
         """
-        return cls(model_path)
+        key = f"{Path(model_path).resolve()}|{socket_path or ''}"
+        instance = cls._instances.get(key)
+        if instance is None:
+            instance = cls(
+                model_path,
+                batch_size=batch_size,
+                batch_wait_ms=batch_wait_ms,
+                socket_path=socket_path,
+                cache_size=cache_size,
+                load_model=load_model,
+            )
+            cls._instances[key] = instance
+        return instance
+
+
+async def serve(
+    model_path: str | Path,
+    socket_path: str | Path = DEFAULT_SOCKET_PATH,
+    batch_size: int = 8,
+    batch_wait_ms: float = 5.0,
+    int8_path: Optional[str | Path] = None,
+    max_accuracy_drop: float = 0.02,
+    eval_dir: Optional[str | Path] = None,
+) -> None:
+    """Load the model and serve predictions until cancelled.
+
+    Args:
+        model_path: Path to the ONNX model file.
+        socket_path: Filesystem path of the Unix domain socket.
+        batch_size: Maximum number of images per inference run.
+        batch_wait_ms: Maximum time to wait for a batch to fill.
+        int8_path: Optional INT8 model, used if accurate enough.
+        max_accuracy_drop: Largest acceptable INT8 sequence accuracy drop.
+        eval_dir: Optional labelled images to verify the INT8 model on.
+    """
+    from services.captcha_quant import select_model
+
+    model_path = await asyncio.to_thread(
+        select_model, model_path, int8_path, max_accuracy_drop, eval_dir
+    )
+    engine = CaptchaAI(model_path, batch_size=batch_size, batch_wait_ms=batch_wait_ms)
+    server = CaptchaServer(engine, socket_path)
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main() -> None:
+    """Command-line entry point for the captcha service daemon."""
+    parser = argparse.ArgumentParser(description="ISeKaiZ captcha solver service")
+    parser.add_argument("--model", default="./model/captcha.onnx", help="ONNX model path")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH, help="Unix socket path")
+    parser.add_argument("--batch-size", type=int, default=8, help="Max images per inference")
+    parser.add_argument("--batch-wait", type=float, default=5.0, help="Batch wait in ms")
+    parser.add_argument("--int8", default=None, help="INT8 model path (used if accurate enough)")
+    parser.add_argument("--max-drop", type=float, default=0.02, help="Max INT8 accuracy drop")
+    parser.add_argument("--eval-dir", default=None, help="Labelled images to verify INT8 on")
+    args = parser.parse_args()
+
+    setup_logging()
+    try:
+        asyncio.run(
+            serve(
+                args.model,
+                args.socket,
+                args.batch_size,
+                args.batch_wait,
+                args.int8,
+                args.max_drop,
+                args.eval_dir,
+            )
+        )
+    except KeyboardInterrupt:
+        logger.info("Captcha service stopped")
+
+
+if __name__ == "__main__":
+    main()
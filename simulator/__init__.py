@@ -0,0 +1,24 @@
+"""Offline Isekaid game simulator.
+
+Plays the Isekaid side of the game against the real bot, on a virtual-time
+event loop so hours of play finish in seconds::
+
+    python -m simulator --hours 6 --seed 1
+"""
+
+from simulator.clock import VirtualClock, VirtualTimeLoop, run
+from simulator.game import GameSettings, GameStats, IsekaidGame
+from simulator.runner import SimCaptchaSolver, Simulation, SimulationResult, simulate
+
+__all__ = [
+    "GameSettings",
+    "GameStats",
+    "IsekaidGame",
+    "SimCaptchaSolver",
+    "Simulation",
+    "SimulationResult",
+    "VirtualClock",
+    "VirtualTimeLoop",
+    "run",
+    "simulate",
+]
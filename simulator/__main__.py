@@ -0,0 +1,61 @@
+"""Command-line entry point: ``python -m simulator``."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+from pathlib import Path
+
+from simulator.game import GameSettings
+from simulator.runner import simulate
+from utils.logging import setup_logging
+
+
+def main() -> None:
+    """Run a simulation and print what happened."""
+    parser = argparse.ArgumentParser(description="Play the bot against a simulated Isekaid")
+    parser.add_argument("--hours", type=float, default=6.0, help="Game hours to simulate")
+    parser.add_argument(
+        "--speed", type=float, default=0.0, help="Game seconds per real second (0 = max)"
+    )
+    parser.add_argument("--seed", type=int, default=None, help="Random seed")
+    parser.add_argument(
+        "--profession", default="mine", choices=["none", "mine", "fish", "forage"]
+    )
+    parser.add_argument("--auto-level", action="store_true", help="Start with auto-level on")
+    parser.add_argument(
+        "--captcha-chance", type=float, default=None, help="Captcha chance per command"
+    )
+    parser.add_argument(
+        "--captcha-accuracy", type=float, default=0.95, help="Solver accuracy"
+    )
+    parser.add_argument(
+        "--treasure-interval", type=float, default=0.0, help="Mean seconds between chests"
+    )
+    parser.add_argument("--verbose", action="store_true", help="Show the bot's logs")
+    parser.add_argument("--json", default=None, help="Write results to a JSON file")
+    args = parser.parse_args()
+
+    setup_logging(level=logging.INFO if args.verbose else logging.WARNING)
+
+    settings = GameSettings(treasure_interval=args.treasure_interval)
+    if args.captcha_chance is not None:
+        settings.captcha_chance = args.captcha_chance
+
+    result = simulate(
+        args.hours,
+        speed=args.speed,
+        settings=settings,
+        seed=args.seed,
+        captcha_accuracy=args.captcha_accuracy,
+        auto_level=args.auto_level,
+        profession=args.profession,
+    )
+    print(result.format())
+    if args.json:
+        Path(args.json).write_text(json.dumps(result.to_dict(), indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""Virtual time for running the bot faster than real time.
+
+``VirtualTimeLoop`` is an asyncio event loop whose clock only moves when
+the loop would otherwise wait: instead of blocking in ``select()`` until
+the next timer is due, it advances the ``VirtualClock`` straight to it. At
+``speed=0`` an hour of timers, task gaps and cooldowns runs in a moment;
+at ``speed=N`` the loop really waits ``1/N`` of each delay.
+
+While installed, the clock also replaces ``time.time()`` (task expiry,
+yield windows) and ``datetime.now()`` in the modules listed in
+``DATETIME_MODULES`` (yield rates, ``discord.ext.tasks`` loops), so
+wall-clock arithmetic agrees with the loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import importlib
+import selectors
+import sys
+import time
+import types
+from contextlib import ExitStack, contextmanager
+from typing import Any, Coroutine, Iterator, Optional, TypeVar
+from unittest import mock
+
+T = TypeVar("T")
+
+# Modules whose ``datetime.now()`` follows the virtual clock when installed
+DATETIME_MODULES = ("utils.logging", "discord.utils", "discord.ext.tasks")
+
+
+class VirtualClock:
+    """Monotonic and wall-clock time that advances on demand."""
+
+    def __init__(self, start: Optional[float] = None, speed: float = 0.0) -> None:
+        """Initialize the clock.
+
+        Args:
+            start: Initial wall-clock time (Unix seconds, now by default).
+            speed: Virtual seconds per real second (0 = as fast as possible).
+        """
+        self.speed = speed
+        self._start = time.time() if start is None else start
+        self._elapsed = 0.0
+
+    @property
+    def elapsed(self) -> float:
+        """Get the virtual seconds elapsed since the clock was created."""
+        return self._elapsed
+
+    def monotonic(self) -> float:
+        """Get the virtual monotonic time."""
+        return self._elapsed
+
+    def time(self) -> float:
+        """Get the virtual wall-clock time."""
+        return self._start + self._elapsed
+
+    def advance(self, seconds: float) -> None:
+        """Move the clock forward.
+
+        Args:
+            seconds: Virtual seconds to advance (negative values are ignored).
+        """
+        if seconds > 0:
+            self._elapsed += seconds
+
+    @contextmanager
+    def install(self) -> Iterator["VirtualClock"]:
+        """Make ``time.time()`` and ``datetime.now()`` virtual inside the block."""
+        virtual_datetime = self._datetime_class()
+        virtual_module: Any = types.ModuleType("datetime")
+        virtual_module.__dict__.update(vars(datetime))
+        virtual_module.datetime = virtual_datetime
+
+        with ExitStack() as stack:
+            stack.enter_context(mock.patch("time.time", self.time))
+            for name in DATETIME_MODULES:
+                module = sys.modules.get(name) or importlib.import_module(name)
+                current = getattr(module, "datetime", None)
+                if current is datetime:
+                    stack.enter_context(mock.patch.object(module, "datetime", virtual_module))
+                elif current is datetime.datetime:
+                    stack.enter_context(mock.patch.object(module, "datetime", virtual_datetime))
+            yield self
+
+    def _datetime_class(self) -> type:
+        """Build a ``datetime`` subclass whose ``now()`` reads this clock."""
+        clock = self
+
+        class VirtualDatetime(datetime.datetime):
+            @classmethod
+            def now(cls, tz: Optional[datetime.tzinfo] = None) -> "VirtualDatetime":
+                return cls.fromtimestamp(clock.time(), tz)
+
+            @classmethod
+            def utcnow(cls) -> "VirtualDatetime":
+                return cls.utcfromtimestamp(clock.time())
+
+        return VirtualDatetime
+
+
+class _VirtualSelector(selectors.DefaultSelector):
+    """Selector that advances the virtual clock instead of blocking."""
+
+    def __init__(self, clock: VirtualClock) -> None:
+        """Initialize the selector.
+
+        Args:
+            clock: Clock advanced while the loop waits.
+        """
+        super().__init__()
+        self._clock = clock
+
+    def select(self, timeout: Optional[float] = None) -> Any:
+        """Poll for I/O, then advance the clock by the time the loop would have waited."""
+        # Nothing scheduled: only real I/O or a worker thread can wake the loop
+        if timeout is None:
+            return super().select(None)
+
+        if self._clock.speed > 0:
+            start = time.perf_counter()
+            events = super().select(timeout / self._clock.speed)
+            waited = (time.perf_counter() - start) * self._clock.speed
+            self._clock.advance(timeout if not events else min(timeout, waited))
+            return events
+
+        events = super().select(0)
+        if not events:
+            self._clock.advance(timeout)
+        return events
+
+
+class VirtualTimeLoop(asyncio.SelectorEventLoop):
+    """Event loop driven by a VirtualClock."""
+
+    def __init__(self, clock: VirtualClock) -> None:
+        """Initialize the loop.
+
+        Args:
+            clock: Clock the loop reads and advances.
+        """
+        super().__init__(selector=_VirtualSelector(clock))
+        self.clock = clock
+
+    def time(self) -> float:
+        """Get the loop's (virtual) monotonic time."""
+        return self.clock.monotonic()
+
+
+def run(coro: Coroutine[Any, Any, T], clock: Optional[VirtualClock] = None) -> T:
+    """Run a coroutine on a fresh virtual-time loop.
+
+    Args:
+        coro: Coroutine to run.
+        clock: Clock to use (a new as-fast-as-possible clock by default).
+
+    Returns:
+        The coroutine's result.
+    """
+    clock = clock or VirtualClock()
+    loop = VirtualTimeLoop(clock)
+    try:
+        with clock.install():
+            return loop.run_until_complete(coro)
+    finally:
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
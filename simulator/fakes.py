@@ -0,0 +1,215 @@
+"""Minimal stand-ins for the discord.py objects the cogs touch.
+
+Only the attributes and coroutines the bot actually uses are modelled:
+message ids, authors, channels and guilds, embeds (title, description,
+author name, fields, image), and component rows of buttons and selects
+whose ``click()``/``choose()`` call back into the simulated game.
+"""
+
+from __future__ import annotations
+
+import itertools
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, List, Optional
+
+# Snowflake-like ids, unique within the process
+_ids = itertools.count(1_300_000_000_000_000_000)
+
+
+def next_id() -> int:
+    """Get a fresh snowflake-like id."""
+    return next(_ids)
+
+
+@dataclass(eq=False)
+class FakeUser:
+    """A Discord user."""
+
+    id: int
+    name: str
+    bot: bool = False
+
+    @property
+    def display_name(self) -> str:
+        """Get the display name (the user name)."""
+        return self.name
+
+    @property
+    def mention(self) -> str:
+        """Get the mention string of the user."""
+        return f"<@{self.id}>"
+
+
+@dataclass(eq=False)
+class FakeGuild:
+    """A Discord guild."""
+
+    id: int
+    name: str = "guild"
+
+
+@dataclass(eq=False)
+class FakeChannel:
+    """A text channel; messages sent to it go to ``on_send``."""
+
+    id: int
+    name: str = "channel"
+    guild: Optional[FakeGuild] = None
+    author: Optional[FakeUser] = None  # Author of messages sent through send()
+    on_send: Optional[Callable[["FakeMessage"], Awaitable[None]]] = None
+    history: List["FakeMessage"] = field(default_factory=list, repr=False)
+
+    async def send(self, content: str = "", **kwargs: Any) -> "FakeMessage":
+        """Send a message as ``author``.
+
+        Args:
+            content: Message text.
+            **kwargs: Ignored discord.py options.
+
+        Returns:
+            The sent message.
+        """
+        message = FakeMessage(
+            id=next_id(), channel=self, author=self.author, content=content, guild=self.guild
+        )
+        self.history.append(message)
+        if self.on_send is not None:
+            await self.on_send(message)
+        return message
+
+
+@dataclass
+class FakeEmbedAuthor:
+    """Author line of an embed."""
+
+    name: str = ""
+
+    def __str__(self) -> str:
+        return self.name
+
+
+@dataclass
+class FakeEmbedImage:
+    """Image of an embed."""
+
+    url: str = ""
+
+
+@dataclass
+class FakeEmbedField:
+    """One embed field."""
+
+    name: str
+    value: str
+    inline: bool = True
+
+
+@dataclass
+class FakeEmbed:
+    """A message embed."""
+
+    title: str = ""
+    description: str = ""
+    author: Optional[FakeEmbedAuthor] = None
+    fields: List[FakeEmbedField] = field(default_factory=list)
+    image: Optional[FakeEmbedImage] = None
+
+    def add_field(self, name: str, value: str, inline: bool = True) -> "FakeEmbed":
+        """Append a field.
+
+        Args:
+            name: Field name.
+            value: Field value.
+            inline: Whether the field is shown inline.
+
+        Returns:
+            The embed, for chaining.
+        """
+        self.fields.append(FakeEmbedField(name, value, inline))
+        return self
+
+
+@dataclass
+class FakeEmoji:
+    """A custom emoji."""
+
+    id: str
+    name: str = ""
+
+
+@dataclass(eq=False)
+class FakeButton:
+    """A button whose click is handled by the game."""
+
+    label: str = ""
+    emoji: Optional[FakeEmoji] = None
+    on_click: Optional[Callable[[], Awaitable[None]]] = field(default=None, repr=False)
+    disabled: bool = False
+
+    async def click(self) -> None:
+        """Click the button."""
+        if self.on_click is not None and not self.disabled:
+            await self.on_click()
+
+
+@dataclass
+class FakeSelectOption:
+    """One option of a select menu."""
+
+    label: str
+    value: str = ""
+
+
+@dataclass(eq=False)
+class FakeSelect:
+    """A select menu whose choice is handled by the game."""
+
+    options: List[FakeSelectOption] = field(default_factory=list)
+    on_choose: Optional[Callable[[FakeSelectOption], Awaitable[None]]] = field(
+        default=None, repr=False
+    )
+
+    async def choose(self, option: FakeSelectOption) -> None:
+        """Choose an option.
+
+        Args:
+            option: The option chosen.
+        """
+        if self.on_choose is not None:
+            await self.on_choose(option)
+
+
+@dataclass
+class FakeActionRow:
+    """A row of components."""
+
+    children: List[Any] = field(default_factory=list)
+
+
+@dataclass(eq=False)
+class FakeMessage:
+    """A message with optional embed and components."""
+
+    id: int
+    channel: FakeChannel
+    author: Optional[FakeUser]
+    content: str = ""
+    embeds: List[FakeEmbed] = field(default_factory=list)
+    components: List[FakeActionRow] = field(default_factory=list)
+    mentions: List[FakeUser] = field(default_factory=list)
+    guild: Optional[FakeGuild] = None
+    reference: Optional["FakeMessage"] = field(default=None, repr=False)
+    # Connection state; commands.Context reads it for messages from users
+    _state: Any = field(default=None, repr=False)
+
+    async def reply(self, content: str = "", **kwargs: Any) -> "FakeMessage":
+        """Reply in the message's channel.
+
+        Args:
+            content: Message text.
+            **kwargs: Ignored discord.py options.
+
+        Returns:
+            The sent message.
+        """
+        return await self.channel.send(content, **kwargs)
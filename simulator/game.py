@@ -0,0 +1,807 @@
+"""The Isekaid side of the game.
+
+``IsekaidGame`` answers the commands the bot sends (``$map``, ``$mine``,
+``$fish``, ``$forage``, ``$hired``, ``$sell``, ``$eat``, ``$verify`` and
+captcha answers) with embeds, buttons and edits shaped like the real bot's,
+and models the state behind them: battle energy, command cooldowns,
+profession and battle durations, emoji checks and image captchas, hired
+workers, equipment drops and treasure chest spawns.
+
+The game never talks to the bot directly. New messages and edits go to the
+``on_message``/``on_edit`` hooks (the simulation runner dispatches them as
+gateway events); button clicks and select choices call back into the game.
+All delays use the event loop clock, so the game runs at whatever speed the
+loop's clock does.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import random
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from bot.config import BATTLE_ZONES
+from cogs.verification import EMOJI_MAP, X_EMOJI_ID
+from simulator.fakes import (
+    FakeActionRow,
+    FakeButton,
+    FakeChannel,
+    FakeEmbed,
+    FakeEmbedAuthor,
+    FakeEmbedImage,
+    FakeEmoji,
+    FakeMessage,
+    FakeSelect,
+    FakeSelectOption,
+    FakeUser,
+    next_id,
+)
+from utils.helpers import ISEKAID_BOT_NAME
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+ISEKAID_USER_ID = 1_039_000_000_000_000_001
+
+CAPTCHA_URL = "https://captcha.sim.invalid/{id}.png"
+
+MONSTERS = ["Goblin", "Slime", "Wolf", "Skeleton", "Orc", "Harpy", "Golem", "Wraith"]
+EQUIP_GRADES = ["F", "E", "D", "C", "B", "A"]
+
+# Gold per sold equipment piece by grade
+EQUIP_PRICES = {"F": 150, "E": 400, "D": 1_200, "C": 4_000, "B": 12_000, "A": 40_000}
+
+
+@dataclass(frozen=True)
+class ProfessionSpec:
+    """Messages and loot of one profession."""
+
+    window_title: str
+    start_title: str
+    done_title: str  # Formatted with the item found
+    verb: str  # As in "You are already <verb>"
+    emoji: str  # EMOJI_MAP name of the emoji check
+    items: tuple
+
+
+PROFESSIONS: Dict[str, ProfessionSpec] = {
+    "mine": ProfessionSpec(
+        "Mining", "You started mining!", "Mining Complete!", "mining", "Mine",
+        ("Copper Ore", "Iron Ore", "Silver Ore", "Platinum"),
+    ),
+    "fish": ProfessionSpec(
+        "Fishing", "You cast your rod!", "You caught a {item}!", "fishing", "Fish",
+        ("Salmon", "Trout", "Carp", "Eel"),
+    ),
+    "forage": ProfessionSpec(
+        "Foraging", "You start foraging!", "You found a {item}!", "foraging", "Forage",
+        ("Herb", "Mushroom", "Berry", "Moonflower"),
+    ),
+}
+
+COMMAND_REGEX = re.compile(r"^\$(\w+)(?:\s+(.*))?$")
+
+
+@dataclass
+class GameSettings:
+    """Tunable rules of the simulated game."""
+
+    reply_delay: float = 0.4  # seconds before Isekaid answers a command or click
+    command_cooldown: float = 3.0  # seconds between uses of the same command
+    energy_max: int = 50
+    energy_per_battle: int = 1
+    energy_regen_seconds: float = 120.0  # seconds per regenerated energy point
+    battle_seconds: float = 15.0
+    floors_per_zone: int = 10
+    death_chance: float = 0.0  # per battle
+    drop_chance: float = 0.3  # equipment drop per battle
+    profession_seconds: float = 45.0
+    emoji_chance: float = 0.02  # per $map/profession command
+    captcha_chance: float = 0.005  # per $map/profession command
+    workers: int = 3  # hired workers ($hired pages)
+    worker_materials_per_hour: int = 12
+    worker_max_hours: int = 24
+    treasure_interval: float = 0.0  # mean seconds between chest spawns (0 = none)
+    treasure_window: float = 10.0  # seconds a chest can be claimed
+    noise_interval: float = 0.0  # mean seconds between other-channel messages (0 = none)
+
+
+@dataclass
+class GameStats:
+    """What happened during a simulation, from the game's side."""
+
+    commands: int = 0
+    cooldown_hits: int = 0
+    windows_opened: int = 0
+    battles_started: int = 0
+    battles_won: int = 0
+    defeats: int = 0
+    energy_denied: int = 0
+    professions_started: int = 0
+    professions_done: int = 0
+    emoji_checks: int = 0
+    emoji_passed: int = 0
+    captchas_shown: int = 0
+    captchas_solved: int = 0
+    captcha_failures: int = 0
+    hired_pages: int = 0
+    materials_collected: int = 0
+    equipment_sold: int = 0
+    gold_earned: int = 0
+    exp_earned: int = 0
+    meals: int = 0
+    treasures_spawned: int = 0
+    treasures_claimed: int = 0
+    noise_messages: int = 0
+    messages_sent: int = 0
+    edits: int = 0
+
+
+@dataclass
+class _Worker:
+    """A hired worker producing materials."""
+
+    name: str
+    collected_at: float  # Unix seconds
+
+
+@dataclass
+class _Captcha:
+    """A pending image captcha."""
+
+    code: str
+    url: str
+
+
+MessageHook = Callable[[FakeMessage], None]
+EditHook = Callable[[FakeMessage, FakeMessage], None]
+
+
+class IsekaidGame:
+    """Simulated Isekaid bot serving one player."""
+
+    def __init__(
+        self,
+        player: FakeUser,
+        channel: FakeChannel,
+        settings: Optional[GameSettings] = None,
+        treasure_channel: Optional[FakeChannel] = None,
+        noise_channel: Optional[FakeChannel] = None,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        """Initialize the game.
+
+        Args:
+            player: The player (the self-bot's user).
+            channel: Channel the player sends commands in.
+            settings: Game rules (defaults if None).
+            treasure_channel: Channel chests spawn in (in the treasure guild).
+            noise_channel: Channel where other players' battles show up.
+            rng: Random source (seed it for reproducible runs).
+        """
+        self.player = player
+        self.channel = channel
+        self.settings = settings or GameSettings()
+        self.treasure_channel = treasure_channel
+        self.noise_channel = noise_channel
+        self.rng = rng or random.Random()
+        self.user = FakeUser(ISEKAID_USER_ID, ISEKAID_BOT_NAME, bot=True)
+        self.stats = GameStats()
+
+        self.on_message: Optional[MessageHook] = None
+        self.on_edit: Optional[EditHook] = None
+
+        now = time.time()
+        self.energy = float(self.settings.energy_max)
+        self._energy_at = now
+        self.zone_index = 0
+        self.floor = 1
+        self.equipment: Counter[str] = Counter()
+        self.workers = [_Worker(f"Worker {i + 1}", now) for i in range(self.settings.workers)]
+
+        self._battle: Optional[asyncio.Task] = None
+        self._profession: Optional[asyncio.Task] = None
+        self._profession_kind = ""
+        self._captcha: Optional[_Captcha] = None
+        self._captchas: Dict[str, str] = {}  # Every captcha image shown, url -> code
+        self._last_used: Dict[str, float] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._background: List[asyncio.Task] = []
+
+    # Lifecycle
+
+    def start(self) -> None:
+        """Start the background spawners (treasure chests, noise)."""
+        if self.treasure_channel is not None and self.settings.treasure_interval > 0:
+            treasures = self._spawn_treasures(self.treasure_channel)
+            self._background.append(asyncio.create_task(treasures))
+        if self.noise_channel is not None and self.settings.noise_interval > 0:
+            noise = self._spawn_noise(self.noise_channel)
+            self._background.append(asyncio.create_task(noise))
+
+    async def stop(self) -> None:
+        """Cancel everything the game has scheduled."""
+        pending = [*self._background, *self._tasks]
+        for task in (self._battle, self._profession):
+            if task is not None:
+                pending.append(task)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        self._background.clear()
+        self._tasks.clear()
+
+    def captcha_code(self, url: str) -> Optional[str]:
+        """Get the code of a captcha image shown by the game.
+
+        Args:
+            url: Captcha image URL.
+
+        Returns:
+            The code, or None for an unknown image.
+        """
+        return self._captchas.get(url)
+
+    @property
+    def blocked(self) -> bool:
+        """Check if the player has a captcha to solve."""
+        return self._captcha is not None
+
+    # Inbound
+
+    async def receive(self, message: FakeMessage) -> None:
+        """Handle a message the player sent.
+
+        Args:
+            message: Message sent to one of the game's channels.
+        """
+        if message.channel is not self.channel or message.author is not self.player:
+            return
+        content = message.content.strip()
+        match = COMMAND_REGEX.match(content)
+        if match is None:
+            # Captcha answers are plain digits
+            if self._captcha is not None and content.isdigit():
+                self._later(self._answer_captcha, message, content)
+            return
+
+        command, args = match.group(1).lower(), (match.group(2) or "").strip()
+        handlers: Dict[str, Callable[..., Awaitable[None]]] = {
+            "map": self._cmd_map,
+            "mine": self._cmd_profession,
+            "fish": self._cmd_profession,
+            "forage": self._cmd_profession,
+            "hired": self._cmd_hired,
+            "sell": self._cmd_sell,
+            "eat": self._cmd_eat,
+            "verify": self._cmd_verify,
+        }
+        handler = handlers.get(command)
+        if handler is None:
+            return
+        self.stats.commands += 1
+        self._later(self._dispatch_command, handler, message, command, args)
+
+    async def _dispatch_command(
+        self,
+        handler: Callable[..., Awaitable[None]],
+        message: FakeMessage,
+        command: str,
+        args: str,
+    ) -> None:
+        """Apply the captcha lock and cooldowns, then run a command."""
+        if command != "verify":
+            if self._captcha is not None:
+                await self._send_to_player(
+                    message, "Verification", "Please complete the captcha before playing."
+                )
+                return
+            now = asyncio.get_running_loop().time()
+            last = self._last_used.get(command)
+            if last is not None and now - last < self.settings.command_cooldown:
+                self.stats.cooldown_hits += 1
+                remaining = self.settings.command_cooldown - (now - last)
+                self._send(message.channel, content=f"Slow down! Try again in {remaining:.1f}s.")
+                return
+            self._last_used[command] = now
+        await handler(message, command, args)
+
+    # Commands
+
+    async def _cmd_map(self, message: FakeMessage, command: str, args: str) -> None:
+        """Open the battle window."""
+        if self._battle is not None:
+            self._send_leave_prompt(
+                message.channel, "You are already in a battle", self._leave_battle
+            )
+            return
+        if await self._challenge(message, "Battle"):
+            return
+        self._send_battle_window(message.channel)
+
+    async def _cmd_profession(self, message: FakeMessage, command: str, args: str) -> None:
+        """Open a profession window."""
+        spec = PROFESSIONS[command]
+        if self._profession is not None:
+            verb = PROFESSIONS[self._profession_kind].verb
+            self._send_leave_prompt(
+                message.channel, f"You are already {verb}", self._leave_profession
+            )
+            return
+        if await self._challenge(message, spec.emoji):
+            return
+
+        self.stats.windows_opened += 1
+        window = self._message(
+            message.channel,
+            embed=FakeEmbed(spec.window_title, f"Select a {spec.verb} action"),
+        )
+        window.components = [
+            FakeActionRow([self._button("Start", self._start_profession, window, command)])
+        ]
+        self._publish(window)
+
+    async def _cmd_hired(self, message: FakeMessage, command: str, args: str) -> None:
+        """Show the first page of hired workers."""
+        if not self.workers:
+            embed = FakeEmbed("Hired Workers", "You have no hired workers.")
+            self._send(message.channel, embed=embed)
+            return
+        page = self._message(message.channel, embed=FakeEmbed("Hired Workers"))
+        self._render_worker(page, 0)
+        self._publish(page)
+
+    async def _cmd_sell(self, message: FakeMessage, command: str, args: str) -> None:
+        """Sell all equipment of a grade (``$sell equipment all <grade>``)."""
+        grade = args.split()[-1].upper() if args else ""
+        if grade not in EQUIP_PRICES:
+            self._send(message.channel, content="Usage: $sell equipment all <grade>")
+            return
+        count = self.equipment.pop(grade, 0)
+        gold = count * EQUIP_PRICES[grade]
+        self.stats.equipment_sold += count
+        self.stats.gold_earned += gold
+        self._send(
+            message.channel,
+            embed=FakeEmbed(
+                "Equipment Sold",
+                f"You sold {count} grade {grade} equipment.\nYou gained {gold:,} Gold",
+            ),
+        )
+
+    async def _cmd_eat(self, message: FakeMessage, command: str, args: str) -> None:
+        """Eat food for an EXP boost."""
+        self.stats.meals += 1
+        food = args or "food"
+        self._send(message.channel, content=f"You ate a {food}! EXP boost active for 3 hours.")
+
+    async def _cmd_verify(self, message: FakeMessage, command: str, args: str) -> None:
+        """Show the pending captcha again (or confirm there is none)."""
+        if self._captcha is None:
+            await self._send_to_player(message, "Verification", "You are already verified.")
+            return
+        self._send_captcha(message.channel)
+
+    # Battle
+
+    def _send_battle_window(self, channel: FakeChannel) -> None:
+        """Open a battle window with Start/Next Monster buttons and a zone select."""
+        self.stats.windows_opened += 1
+        window = self._message(channel, embed=self._battle_embed())
+        select = FakeSelect(
+            [FakeSelectOption(zone, str(index)) for index, zone in enumerate(BATTLE_ZONES)]
+        )
+
+        async def choose(option: FakeSelectOption) -> None:
+            self._later(self._change_zone, window, option)
+
+        select.on_choose = choose
+        window.components = [
+            FakeActionRow(
+                [
+                    self._button("Start Battle", self._start_battle, window),
+                    self._button("Auto", self._noop),
+                    self._button("Flee", self._noop),
+                    self._button("Next Monster", self._next_monster, window),
+                ]
+            ),
+            FakeActionRow([self._button("Inventory", self._noop)]),
+            FakeActionRow([select]),
+        ]
+        self._publish(window)
+
+    def _battle_embed(self) -> FakeEmbed:
+        """Build the battle window embed for the current zone and floor."""
+        zone = BATTLE_ZONES[self.zone_index]
+        return FakeEmbed(
+            f"Current Floor: {self.floor}",
+            f"Zone: {zone}\nEnergy: {int(self._current_energy())}/{self.settings.energy_max}",
+        )
+
+    async def _start_battle(self, window: FakeMessage) -> None:
+        """Start a battle on the current floor if there is energy for it."""
+        if self._battle is not None:
+            self._send_leave_prompt(
+                window.channel, "You are already in a battle", self._leave_battle
+            )
+            return
+        if self._current_energy() < self.settings.energy_per_battle:
+            self.stats.energy_denied += 1
+            embed = FakeEmbed("", "You don't have enough energy to battle!")
+            self._send(window.channel, embed=embed)
+            return
+        self.energy -= self.settings.energy_per_battle
+        self.stats.battles_started += 1
+        monster = self.rng.choice(MONSTERS)
+        self._send(window.channel, embed=FakeEmbed("BATTLE STARTED", f"Fighting {monster}"))
+        self._battle = asyncio.create_task(self._fight(window.channel, monster))
+
+    async def _fight(self, channel: FakeChannel, monster: str) -> None:
+        """Finish a battle after its duration."""
+        await asyncio.sleep(self.settings.battle_seconds)
+        self._battle = None
+        if self.rng.random() < self.settings.death_chance:
+            self.stats.defeats += 1
+            embed = FakeEmbed("Better Luck Next Time!", f"The {monster} defeated you")
+            self._send(channel, embed=embed)
+            return
+
+        level = self.zone_index * self.settings.floors_per_zone + self.floor
+        exp = 20 * level + self.rng.randint(0, 10)
+        gold = 8 * level + self.rng.randint(0, 5)
+        self.stats.battles_won += 1
+        self.stats.exp_earned += exp
+        self.stats.gold_earned += gold
+        embed = FakeEmbed(f"You Defeated A {monster}!", f"You gained {exp} EXP")
+        embed.add_field("EXP", f"+{exp:,}")
+        embed.add_field("Gold", f"+{gold:,}")
+        if self.rng.random() < self.settings.drop_chance:
+            grade = EQUIP_GRADES[min(self.zone_index // 2, len(EQUIP_GRADES) - 1)]
+            self.equipment[grade] += 1
+            embed.add_field(f"{grade} Equipment", "+1")
+        self._send(channel, embed=embed)
+
+    async def _next_monster(self, window: FakeMessage) -> None:
+        """Move up a floor and fight again."""
+        if self.floor >= self.settings.floors_per_zone:
+            content = "You are already at the final location of this area."
+            self._send(window.channel, content=content)
+            return
+        if self._battle is None:
+            self.floor += 1
+            self._edit(window, embeds=[self._battle_embed()])
+        await self._start_battle(window)
+
+    async def _change_zone(self, window: FakeMessage, option: FakeSelectOption) -> None:
+        """Travel to another zone."""
+        if option.label in BATTLE_ZONES:
+            self.zone_index = BATTLE_ZONES.index(option.label)
+            self.floor = 1
+            self._edit(window, embeds=[self._battle_embed()])
+
+    async def _leave_battle(self, prompt: FakeMessage) -> None:
+        """Abandon the current battle."""
+        if self._battle is not None:
+            self._battle.cancel()
+            self._battle = None
+        self._edit(prompt, content="You left the battle.", components=[])
+
+    def _current_energy(self) -> float:
+        """Regenerate energy up to now and return it."""
+        now = time.time()
+        regen = (now - self._energy_at) / self.settings.energy_regen_seconds
+        self.energy = min(float(self.settings.energy_max), self.energy + regen)
+        self._energy_at = now
+        return self.energy
+
+    # Professions
+
+    async def _start_profession(self, window: FakeMessage, kind: str) -> None:
+        """Start the profession of a window."""
+        if self._profession is not None:
+            return
+        spec = PROFESSIONS[kind]
+        self.stats.professions_started += 1
+        self._profession_kind = kind
+        embed = FakeEmbed(spec.start_title, "Come back when it's done.")
+        self._edit(window, embeds=[embed], components=[])
+        self._profession = asyncio.create_task(self._work(window, spec))
+
+    async def _work(self, window: FakeMessage, spec: ProfessionSpec) -> None:
+        """Finish a profession after its duration."""
+        await asyncio.sleep(self.settings.profession_seconds)
+        self._profession = None
+        item = self.rng.choice(spec.items)
+        quantity = self.rng.randint(1, 4)
+        self.stats.professions_done += 1
+        embed = FakeEmbed(spec.done_title.format(item=item), f"You got {quantity} {item}")
+        embed.add_field(item, f"+{quantity}")
+        self._edit(window, embeds=[embed])
+
+    async def _leave_profession(self, prompt: FakeMessage) -> None:
+        """Abandon the current profession."""
+        if self._profession is not None:
+            self._profession.cancel()
+            self._profession = None
+        verb = PROFESSIONS[self._profession_kind].verb
+        self._edit(prompt, content=f"You stopped {verb}.", components=[])
+
+    # Hired workers
+
+    def _render_worker(self, page: FakeMessage, index: int) -> None:
+        """Show one worker on a $hired page (past the last worker: end of list)."""
+        if index >= len(self.workers):
+            page.embeds = [FakeEmbed("Hired Workers", "There are no more workers to show.")]
+            page.components = []
+            return
+        self.stats.hired_pages += 1
+        worker = self.workers[index]
+        hours = self._worker_hours(worker)
+        produced = hours * self.settings.worker_materials_per_hour
+        page.embeds = [
+            FakeEmbed(
+                "Hired Workers",
+                f"{worker.name}\nTime elapsed: {hours} hours\nMaterials produced: {produced:,}",
+            )
+        ]
+        page.components = [
+            FakeActionRow(
+                [
+                    self._button("Previous Page", self._turn_page, page, index - 1),
+                    self._button("Next Page", self._turn_page, page, index + 1),
+                    self._button("Collect", self._collect, page, index),
+                ]
+            )
+        ]
+
+    def _worker_hours(self, worker: _Worker) -> int:
+        """Get the whole hours a worker has been producing."""
+        hours = int((time.time() - worker.collected_at) // 3600)
+        return min(hours, self.settings.worker_max_hours)
+
+    async def _turn_page(self, page: FakeMessage, index: int) -> None:
+        """Show another worker."""
+        before = copy.copy(page)
+        self._render_worker(page, max(index, 0))
+        self._emit_edit(before, page)
+
+    async def _collect(self, page: FakeMessage, index: int) -> None:
+        """Collect a worker's materials."""
+        worker = self.workers[index]
+        hours = self._worker_hours(worker)
+        self.stats.materials_collected += hours * self.settings.worker_materials_per_hour
+        # Partial hours carry over
+        worker.collected_at += hours * 3600
+        await self._turn_page(page, index)
+
+    # Verification
+
+    async def _challenge(self, message: FakeMessage, activity: str) -> bool:
+        """Roll for an image captcha or emoji check before a game command.
+
+        Returns:
+            True if the command was replaced by a challenge.
+        """
+        if self.rng.random() < self.settings.captcha_chance:
+            self._captcha = self._new_captcha()
+            self._send_captcha(message.channel)
+            return True
+        if self.rng.random() < self.settings.emoji_chance:
+            self._send_emoji_check(message.channel, activity)
+            return True
+        return False
+
+    def _new_captcha(self) -> _Captcha:
+        """Create a captcha with a fresh image."""
+        code = "".join(self.rng.choice("0123456789") for _ in range(self.rng.choice((4, 5))))
+        captcha = _Captcha(code, CAPTCHA_URL.format(id=next_id()))
+        self._captchas[captcha.url] = code
+        return captcha
+
+    def _send_captcha(self, channel: FakeChannel) -> None:
+        """Show the pending captcha image."""
+        assert self._captcha is not None
+        self.stats.captchas_shown += 1
+        embed = FakeEmbed(
+            "Verification",
+            "Please enter the captcha code from the image to verify.",
+            author=FakeEmbedAuthor(self.player.name),
+            image=FakeEmbedImage(self._captcha.url),
+        )
+        self._send(channel, embed=embed, mentions=[self.player])
+
+    async def _answer_captcha(self, message: FakeMessage, answer: str) -> None:
+        """Check a captcha answer; a wrong one replaces the captcha."""
+        if self._captcha is None:
+            return
+        if answer == self._captcha.code:
+            self._captcha = None
+            self.stats.captchas_solved += 1
+            await self._send_to_player(message, "Verification", "Successfully Verified.")
+            return
+        self.stats.captcha_failures += 1
+        self._captcha = self._new_captcha()
+        await self._send_to_player(message, "Verification", "Please Try doing $verify again.")
+
+    def _send_emoji_check(self, channel: FakeChannel, activity: str) -> None:
+        """Ask the player to pick the emoji of the activity they started."""
+        self.stats.emoji_checks += 1
+        answer_id = next(emoji_id for emoji_id, name in EMOJI_MAP.items() if name == activity)
+        answer = self.rng.randrange(4)
+        embed = FakeEmbed("Verification", "Choose the correct option...")
+        check = self._message(channel, embed=embed)
+        buttons = []
+        for index in range(4):
+            emoji_id = answer_id if index == answer else X_EMOJI_ID
+            button = self._button("", self._pick_emoji, check, index == answer)
+            button.emoji = FakeEmoji(emoji_id)
+            buttons.append(button)
+        check.components = [FakeActionRow(buttons)]
+        self._publish(check)
+
+    async def _pick_emoji(self, check: FakeMessage, correct: bool) -> None:
+        """Resolve an emoji check; a wrong pick locks the player behind a captcha."""
+        if not check.components:
+            return
+        if correct:
+            self.stats.emoji_passed += 1
+            embed = FakeEmbed("Verification", "Correct! You may continue.")
+            self._edit(check, embeds=[embed], components=[])
+            return
+        self._edit(check, embeds=[FakeEmbed("Verification", "Wrong answer.")], components=[])
+        self._captcha = self._new_captcha()
+        self._send_captcha(check.channel)
+
+    async def _send_to_player(self, message: FakeMessage, title: str, description: str) -> None:
+        """Send an embed addressed to the player (author line = their name)."""
+        embed = FakeEmbed(title, description, author=FakeEmbedAuthor(self.player.name))
+        self._send(message.channel, embed=embed, mentions=[self.player])
+
+    # Treasure and noise
+
+    async def _spawn_treasures(self, channel: FakeChannel) -> None:
+        """Spawn claimable chests in a channel at random intervals."""
+        while True:
+            await asyncio.sleep(self.rng.expovariate(1 / self.settings.treasure_interval))
+            self.stats.treasures_spawned += 1
+            chest = self._message(
+                channel,
+                embed=FakeEmbed("Chest Spawned!", "A treasure chest has appeared!"),
+            )
+            chest.components = [FakeActionRow([self._button("Claim", self._claim, chest)])]
+            self._publish(chest)
+            self._spawn(self._despawn(chest))
+
+    async def _claim(self, chest: FakeMessage) -> None:
+        """Give an unclaimed chest to the player."""
+        if not chest.components:
+            return
+        self.stats.treasures_claimed += 1
+        self._edit(
+            chest,
+            embeds=[FakeEmbed("Chest Claimed!", f"{self.player.name} claimed the chest!")],
+            components=[],
+        )
+
+    async def _despawn(self, chest: FakeMessage) -> None:
+        """Remove a chest nobody claimed in time."""
+        await asyncio.sleep(self.settings.treasure_window)
+        if chest.components:
+            embed = FakeEmbed("Chest Despawned", "Nobody claimed the chest.")
+            self._edit(chest, embeds=[embed], components=[])
+
+    async def _spawn_noise(self, channel: FakeChannel) -> None:
+        """Post other players' battle results in a channel."""
+        while True:
+            await asyncio.sleep(self.rng.expovariate(1 / self.settings.noise_interval))
+            self.stats.noise_messages += 1
+            monster = self.rng.choice(MONSTERS)
+            embed = FakeEmbed(f"You Defeated A {monster}!", "You gained 100 EXP")
+            embed.add_field("EXP", "+100")
+            embed.add_field("Gold", "+40")
+            self._send(channel, embed=embed)
+
+    # Messaging
+
+    def _message(
+        self,
+        channel: FakeChannel,
+        content: str = "",
+        embed: Optional[FakeEmbed] = None,
+        mentions: Optional[List[FakeUser]] = None,
+    ) -> FakeMessage:
+        """Create (but not publish) a message from Isekaid."""
+        return FakeMessage(
+            id=next_id(),
+            channel=channel,
+            author=self.user,
+            content=content,
+            embeds=[embed] if embed is not None else [],
+            mentions=list(mentions or []),
+            guild=channel.guild,
+        )
+
+    def _send(
+        self,
+        channel: FakeChannel,
+        content: str = "",
+        embed: Optional[FakeEmbed] = None,
+        **kwargs: Any,
+    ) -> FakeMessage:
+        """Create and publish a message from Isekaid."""
+        message = self._message(channel, content, embed, **kwargs)
+        self._publish(message)
+        return message
+
+    def _send_leave_prompt(
+        self,
+        channel: FakeChannel,
+        content: str,
+        leave: Callable[[FakeMessage], Awaitable[None]],
+    ) -> None:
+        """Publish an "already busy" notice with a Leave button."""
+        prompt = self._message(channel, content)
+        prompt.components = [FakeActionRow([self._button("Leave", leave, prompt)])]
+        self._publish(prompt)
+
+    def _publish(self, message: FakeMessage) -> None:
+        """Deliver a new message to the channel and the message hook."""
+        self.stats.messages_sent += 1
+        message.channel.history.append(message)
+        if self.on_message is not None:
+            self.on_message(message)
+
+    def _edit(self, message: FakeMessage, **changes: Any) -> None:
+        """Edit a message in place and deliver the edit."""
+        before = copy.copy(message)
+        for name, value in changes.items():
+            setattr(message, name, value)
+        self._emit_edit(before, message)
+
+    def _emit_edit(self, before: FakeMessage, after: FakeMessage) -> None:
+        """Deliver an edit to the edit hook."""
+        self.stats.edits += 1
+        if self.on_edit is not None:
+            self.on_edit(before, after)
+
+    def _button(
+        self,
+        label: str,
+        handler: Callable[..., Awaitable[None]],
+        *args: Any,
+    ) -> FakeButton:
+        """Create a button that runs a game handler after the reply delay."""
+
+        async def on_click() -> None:
+            self._later(handler, *args)
+
+        return FakeButton(label, on_click=on_click)
+
+    async def _noop(self, *args: Any) -> None:
+        """Handle a button the simulation does not model."""
+
+    def _later(self, handler: Callable[..., Awaitable[None]], *args: Any) -> None:
+        """Run a handler after the reply delay without blocking the caller."""
+
+        async def respond() -> None:
+            await asyncio.sleep(self.settings.reply_delay)
+            await handler(*args)
+
+        self._spawn(respond())
+
+    def _spawn(self, coro: Awaitable[None]) -> None:
+        """Run a coroutine in the background, logging failures."""
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+
+    def _task_done(self, task: asyncio.Task) -> None:
+        """Forget a finished background task, logging its failure."""
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Simulated game handler failed", exc_info=task.exception())
@@ -0,0 +1,354 @@
+"""Replay recorded Isekaid traffic through the bot.
+
+Feeds a recording made by ``utils.traffic.TrafficRecorder`` back through
+``ISeKaiZBot.on_message``/``on_message_edit`` and the cogs, with the
+original timing on a virtual-time loop: ``speed=1`` replays in real time,
+``speed=N`` N times faster and ``speed=0`` as fast as possible. Outbound
+actions (sends, button clicks, select choices) are stubbed and recorded, so
+two replays of the same recording with the same seed can be diffed to check
+a parser, router or scheduler change::
+
+    python -m simulator.replay traffic-20250101-120000.jsonl.gz --seed 1 \\
+        --actions actions.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import copy
+import json
+import logging
+import random
+import tempfile
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from main import ISeKaiZBot
+from simulator.clock import VirtualClock, run
+from simulator.fakes import (
+    FakeActionRow,
+    FakeButton,
+    FakeChannel,
+    FakeEmbed,
+    FakeEmbedAuthor,
+    FakeEmbedField,
+    FakeEmbedImage,
+    FakeEmoji,
+    FakeGuild,
+    FakeMessage,
+    FakeSelect,
+    FakeSelectOption,
+    FakeUser,
+    next_id,
+)
+from simulator.game import ISEKAID_USER_ID
+from simulator.runner import (
+    CHANNEL_ID,
+    GUILD_ID,
+    NOISE_CHANNEL_ID,
+    PLAYER_ID,
+    PLAYER_NAME,
+    TREASURE_CHANNEL_ID,
+    TREASURE_GUILD_ID,
+    SimCaptchaSolver,
+    build_config,
+    connect_bot,
+)
+from utils.helpers import ISEKAID_BOT_NAME
+from utils.logging import get_logger, setup_logging
+from utils.traffic import (
+    CHANNEL_GAME,
+    CHANNEL_TREASURE,
+    KIND_EDIT,
+    PLAYER_PLACEHOLDER,
+    TrafficEvent,
+    read_traffic,
+)
+
+logger = get_logger(__name__)
+
+# Seconds the bot keeps running after the last event (to act on it)
+DEFAULT_SETTLE = 10.0
+
+
+@dataclass
+class Action:
+    """Something the bot did in response to the traffic."""
+
+    offset_ms: int  # Since the replay started (virtual time)
+    kind: str  # "send", "click" or "choose"
+    detail: str  # Message text, button label or option label
+    message_id: int = 0  # Recorded id of the message clicked
+
+
+@dataclass
+class ReplayResult:
+    """Outcome of a replay."""
+
+    events: int
+    virtual_seconds: float
+    real_seconds: float
+    final_state: str
+    by_channel: Dict[str, int] = field(default_factory=dict)
+    actions: List[Action] = field(default_factory=list)
+
+    @property
+    def events_per_second(self) -> float:
+        """Get events replayed per real second."""
+        return self.events / self.real_seconds if self.real_seconds else 0.0
+
+    def action_counts(self) -> Dict[str, int]:
+        """Count actions by kind and detail (e.g. ``send $map``)."""
+        return dict(Counter(f"{a.kind} {a.detail}" for a in self.actions))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the result to plain data."""
+        return {**asdict(self), "events_per_second": self.events_per_second}
+
+    def format(self) -> str:
+        """Format the result as a short report."""
+        lines = [
+            (
+                f"replayed {self.events} events ({self.virtual_seconds / 60:.1f} min of traffic)"
+                f" in {self.real_seconds:.2f}s, {self.events_per_second:,.0f} events/s"
+            ),
+            f"final state: {self.final_state}",
+            "events by channel: "
+            + ", ".join(f"{name} {count}" for name, count in sorted(self.by_channel.items())),
+            f"actions ({len(self.actions)}):",
+        ]
+        counts = sorted(self.action_counts().items(), key=lambda item: -item[1])
+        lines.extend(f"  {count:>5}  {action}" for action, count in counts)
+        return "\n".join(lines)
+
+
+class Replay:
+    """Replays recorded traffic through a freshly built bot."""
+
+    def __init__(
+        self,
+        events: Iterable[TrafficEvent],
+        seed: Optional[int] = None,
+        settle: float = DEFAULT_SETTLE,
+        auto_level: bool = False,
+        **config: Any,
+    ) -> None:
+        """Initialize the replay.
+
+        Args:
+            events: Recorded events, in order.
+            seed: Seed for the bot's random delays.
+            settle: Seconds to keep running after the last event.
+            auto_level: Start with auto-level on.
+            **config: Config fields overriding the defaults (e.g. the
+                profession from the recording header).
+        """
+        self.events = events
+        self.seed = seed
+        self.settle = settle
+        self.auto_level = auto_level
+        self.config_overrides = config
+
+        self.user = FakeUser(PLAYER_ID, PLAYER_NAME)
+        self.isekaid = FakeUser(ISEKAID_USER_ID, ISEKAID_BOT_NAME, bot=True)
+        guild = FakeGuild(GUILD_ID)
+        self.channels = {
+            CHANNEL_GAME: FakeChannel(CHANNEL_ID, "isekaid", guild=guild, author=self.user),
+            CHANNEL_TREASURE: FakeChannel(
+                TREASURE_CHANNEL_ID, "treasure", guild=FakeGuild(TREASURE_GUILD_ID),
+                author=self.user,
+            ),
+        }
+        self.other_channel = FakeChannel(NOISE_CHANNEL_ID, "other", guild=guild, author=self.user)
+        self.actions: List[Action] = []
+        self._messages: Dict[int, FakeMessage] = {}
+        self._started = 0.0
+
+    async def run(self) -> ReplayResult:
+        """Replay all events.
+
+        Returns:
+            What the bot did.
+        """
+        if self.seed is not None:
+            random.seed(self.seed)
+        loop = asyncio.get_running_loop()
+        self._started, real_started = loop.time(), time.perf_counter()
+        for channel in (*self.channels.values(), self.other_channel):
+            channel.on_send = self._on_send
+
+        count = 0
+        by_channel: Counter[str] = Counter()
+        with tempfile.TemporaryDirectory(prefix="isekaiz-replay-") as state_dir:
+            overrides = {"treasure_hunter": True, **self.config_overrides}
+            config = build_config(state_dir, **overrides)
+            async with ISeKaiZBot(config) as bot:
+                solver = SimCaptchaSolver(None)
+                channel = self.channels[CHANNEL_GAME]
+                await connect_bot(bot, self.user, channel, solver, self.auto_level)
+                for event in self.events:
+                    delay = self._started + event.offset_ms / 1000 - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    self._dispatch(bot, event)
+                    count += 1
+                    by_channel[event.channel] += 1
+                    # Let the listeners run before the next event
+                    await asyncio.sleep(0)
+                await asyncio.sleep(self.settle)
+                final_state = bot.player.state.value
+
+        return ReplayResult(
+            events=count,
+            virtual_seconds=loop.time() - self._started,
+            real_seconds=time.perf_counter() - real_started,
+            final_state=final_state,
+            by_channel=dict(by_channel),
+            actions=list(self.actions),
+        )
+
+    def _dispatch(self, bot: ISeKaiZBot, event: TrafficEvent) -> None:
+        """Dispatch one recorded event as a gateway event."""
+        message = self._messages.get(event.message_id)
+        if event.kind == KIND_EDIT and message is not None:
+            before = copy.copy(message)
+            self._apply(message, event)
+            bot.dispatch("message_edit", before, message)
+            return
+
+        if message is None:
+            channel = self.channels.get(event.channel, self.other_channel)
+            message = FakeMessage(next_id(), channel, self.isekaid, guild=channel.guild)
+            self._messages[event.message_id] = message
+        self._apply(message, event)
+        if event.kind == KIND_EDIT:
+            # Edit of a message sent before the recording started
+            bot.dispatch("message_edit", copy.copy(message), message)
+        else:
+            bot.dispatch("message", message)
+
+    def _apply(self, message: FakeMessage, event: TrafficEvent) -> None:
+        """Set a message's content, embeds and components from an event."""
+        message.content = self._text(event.content)
+        message.mentions = [self.user] if event.mentions_player else []
+        message.embeds = [self._embed(data) for data in event.embeds]
+        message.components = [
+            FakeActionRow([self._component(event.message_id, item) for item in row])
+            for row in event.components
+        ]
+
+    def _text(self, text: str) -> str:
+        """Put the replay player's name back into recorded text."""
+        return text.replace(PLAYER_PLACEHOLDER, self.user.name) if text else ""
+
+    def _embed(self, data: Dict[str, Any]) -> FakeEmbed:
+        """Build an embed from its recorded form."""
+        return FakeEmbed(
+            title=self._text(data.get("t", "")),
+            description=self._text(data.get("d", "")),
+            author=FakeEmbedAuthor(self._text(data["a"])) if "a" in data else None,
+            fields=[
+                FakeEmbedField(self._text(name), self._text(value), inline)
+                for name, value, inline in data.get("f", [])
+            ],
+            image=FakeEmbedImage(data["i"]) if "i" in data else None,
+        )
+
+    def _component(self, message_id: int, item: Dict[str, Any]) -> Any:
+        """Build a stubbed button or select from its recorded form."""
+        if "o" in item:
+            select = FakeSelect([FakeSelectOption(label) for label in item["o"]])
+
+            async def choose(option: FakeSelectOption) -> None:
+                self._record("choose", option.label, message_id)
+
+            select.on_choose = choose
+            return select
+
+        label = item.get("l", "")
+
+        async def click() -> None:
+            self._record("click", label or item.get("e", ""), message_id)
+
+        emoji = FakeEmoji(item["e"]) if "e" in item else None
+        return FakeButton(label, emoji=emoji, on_click=click)
+
+    async def _on_send(self, message: FakeMessage) -> None:
+        """Record a message the bot sent."""
+        self._record("send", message.content)
+
+    def _record(self, kind: str, detail: str, message_id: int = 0) -> None:
+        """Record an outbound action."""
+        offset_ms = int((asyncio.get_running_loop().time() - self._started) * 1000)
+        self.actions.append(Action(offset_ms, kind, detail, message_id))
+
+
+def replay(
+    path: str | Path,
+    speed: float = 0.0,
+    **kwargs: Any,
+) -> ReplayResult:
+    """Replay a recording on a virtual-time event loop.
+
+    The recording's profession and battle settings are used unless
+    overridden.
+
+    Args:
+        path: Recording file.
+        speed: Recorded seconds per real second (0 = as fast as possible).
+        **kwargs: Replay arguments.
+
+    Returns:
+        What the bot did.
+    """
+    header, events = read_traffic(path)
+    if "profession" in header:
+        kwargs.setdefault("profession", header["profession"])
+    if "enableBattle" in header:
+        kwargs.setdefault("enable_battle", header["enableBattle"])
+    return run(Replay(events, **kwargs).run(), VirtualClock(speed=speed))
+
+
+def main() -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Replay recorded Isekaid traffic through the bot")
+    parser.add_argument("recording", help="Traffic recording (.jsonl.gz)")
+    parser.add_argument(
+        "--speed", type=float, default=0.0, help="Replay speed (1 = real time, 0 = max)"
+    )
+    parser.add_argument("--seed", type=int, default=None, help="Seed for the bot's random delays")
+    parser.add_argument(
+        "--settle", type=float, default=DEFAULT_SETTLE, help="Seconds run after the last event"
+    )
+    parser.add_argument("--auto-level", action="store_true", help="Start with auto-level on")
+    parser.add_argument("--actions", default=None, help="Write the bot's actions to a JSON file")
+    parser.add_argument("--json", default=None, help="Write the summary to a JSON file")
+    parser.add_argument("--verbose", action="store_true", help="Show the bot's logs")
+    args = parser.parse_args()
+
+    setup_logging(level=logging.INFO if args.verbose else logging.WARNING)
+
+    result = replay(
+        args.recording,
+        speed=args.speed,
+        seed=args.seed,
+        settle=args.settle,
+        auto_level=args.auto_level,
+    )
+    print(result.format())
+    if args.actions:
+        actions = [asdict(action) for action in result.actions]
+        Path(args.actions).write_text(json.dumps(actions, indent=1), encoding="utf-8")
+    if args.json:
+        summary = result.to_dict()
+        summary.pop("actions")
+        summary["action_counts"] = result.action_counts()
+        Path(args.json).write_text(json.dumps(summary, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+"""Run the real bot against the simulated game.
+
+``Simulation`` builds an ``ISeKaiZBot`` without logging in: the cogs,
+routines and controller are loaded as in ``setup_hook``, the bot's user and
+channel are fakes, and Isekaid's messages and edits are dispatched as the
+``message``/``message_edit`` gateway events discord.py would fire. What the
+bot sends (commands, captcha answers, clicks) goes straight to the game.
+
+The bot's own messages are not echoed back as events (Discord would), so
+``!`` commands are not exercised. Captchas are answered by
+``SimCaptchaSolver``, which reads the code from the game and gets it wrong
+at a configurable rate instead of running the model.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Optional, cast
+
+from bot.config import Config
+from bot.event_manager import BotState
+from main import ISeKaiZBot
+from simulator.clock import VirtualClock, run
+from simulator.fakes import FakeChannel, FakeGuild, FakeUser
+from simulator.game import GameSettings, IsekaidGame
+from utils.logging import get_logger
+
+if TYPE_CHECKING:
+    import discord
+
+logger = get_logger(__name__)
+
+PLAYER_ID = 1_100_000_000_000_000_001
+PLAYER_NAME = "SimPlayer"
+CHANNEL_ID = 1_200_000_000_000_000_001
+GUILD_ID = 1_200_000_000_000_000_002
+TREASURE_CHANNEL_ID = 1_200_000_000_000_000_003
+TREASURE_GUILD_ID = 1_200_000_000_000_000_004
+NOISE_CHANNEL_ID = 1_200_000_000_000_000_005
+
+
+class SimCaptchaSolver:
+    """Stand-in for CaptchaAI that answers the game's captchas."""
+
+    def __init__(
+        self,
+        game: Optional[IsekaidGame] = None,
+        accuracy: float = 0.95,
+        latency: float = 0.05,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        """Initialize the solver.
+
+        Args:
+            game: Game whose captcha codes are looked up (None answers
+                nothing, e.g. when replaying recorded traffic).
+            accuracy: Probability of a correct answer.
+            latency: Seconds per prediction.
+            rng: Random source.
+        """
+        self.game = game
+        self.accuracy = accuracy
+        self.latency = latency
+        self.rng = rng or random.Random()
+        self.predictions = 0
+        self.bad = 0
+        self.verified = 0
+
+    async def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Report the (imaginary) model as loaded."""
+        return True
+
+    async def predict(self, img_url: str) -> str:
+        """Answer a captcha image.
+
+        Args:
+            img_url: Captcha image URL.
+
+        Returns:
+            The code, or a wrong one ``1 - accuracy`` of the time.
+        """
+        await asyncio.sleep(self.latency)
+        self.predictions += 1
+        code = (self.game.captcha_code(img_url) if self.game else None) or ""
+        if code and self.rng.random() >= self.accuracy:
+            # Change one digit
+            index = self.rng.randrange(len(code))
+            digit = str((int(code[index]) + 1) % 10)
+            code = code[:index] + digit + code[index + 1:]
+        return code
+
+    def mark_bad(self, img_url: str) -> None:
+        """Count an answer the game rejected."""
+        self.bad += 1
+
+    def mark_verified(self, img_url: str) -> None:
+        """Count an answer the game accepted."""
+        self.verified += 1
+
+    async def close(self) -> None:
+        """Nothing to release."""
+
+
+@dataclass
+class SimulationResult:
+    """Outcome of a simulation run."""
+
+    virtual_seconds: float
+    real_seconds: float
+    final_state: str
+    game: Dict[str, int]
+    bot: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def speedup(self) -> float:
+        """Get virtual seconds simulated per real second."""
+        return self.virtual_seconds / self.real_seconds if self.real_seconds else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the result to plain data."""
+        return {**asdict(self), "speedup": self.speedup}
+
+    def format(self) -> str:
+        """Format the result as a short report."""
+        lines = [
+            (
+                f"simulated {self.virtual_seconds / 3600:.2f}h in {self.real_seconds:.2f}s "
+                f"({self.speedup:,.0f}x), final state: {self.final_state}"
+            ),
+            "game:",
+        ]
+        lines.extend(f"  {name}: {value}" for name, value in self.game.items() if value)
+        lines.append("bot:")
+        lines.extend(f"  {name}: {value}" for name, value in self.bot.items())
+        return "\n".join(lines)
+
+
+class Simulation:
+    """The bot and the simulated game wired together."""
+
+    def __init__(
+        self,
+        settings: Optional[GameSettings] = None,
+        seed: Optional[int] = None,
+        captcha_accuracy: float = 0.95,
+        auto_level: bool = False,
+        **config: Any,
+    ) -> None:
+        """Initialize the simulation.
+
+        Args:
+            settings: Game rules.
+            seed: Seed for the game and the bot's random delays.
+            captcha_accuracy: Share of captchas the solver gets right.
+            auto_level: Start with auto-level on.
+            **config: Config fields overriding the defaults (the channel,
+                state store and treasure guild are always the simulation's).
+        """
+        self.settings = settings or GameSettings()
+        self.seed = seed
+        self.captcha_accuracy = captcha_accuracy
+        self.auto_level = auto_level
+        self.config_overrides = config
+
+        self.user = FakeUser(PLAYER_ID, PLAYER_NAME)
+        guild = FakeGuild(GUILD_ID, "sim guild")
+        self.channel = FakeChannel(CHANNEL_ID, "isekaid", guild=guild, author=self.user)
+        self.treasure_channel = FakeChannel(
+            TREASURE_CHANNEL_ID, "treasure", guild=FakeGuild(TREASURE_GUILD_ID, "treasure guild"),
+            author=self.user,
+        )
+        self.noise_channel = FakeChannel(NOISE_CHANNEL_ID, "other", guild=guild, author=self.user)
+        self.game: Optional[IsekaidGame] = None
+        self.solver: Optional[SimCaptchaSolver] = None
+        self.bot: Optional[ISeKaiZBot] = None
+
+    async def run(self, seconds: float) -> SimulationResult:
+        """Play for a while.
+
+        Args:
+            seconds: Game seconds to simulate.
+
+        Returns:
+            What happened.
+        """
+        if self.seed is not None:
+            random.seed(self.seed)
+        rng = random.Random(self.seed)
+        loop = asyncio.get_running_loop()
+        started, real_started = loop.time(), time.perf_counter()
+
+        with tempfile.TemporaryDirectory(prefix="isekaiz-sim-") as state_dir:
+            game = IsekaidGame(
+                self.user,
+                self.channel,
+                self.settings,
+                treasure_channel=self.treasure_channel,
+                noise_channel=self.noise_channel,
+                rng=rng,
+            )
+            self.game = game
+            for channel in (self.channel, self.treasure_channel, self.noise_channel):
+                channel.on_send = game.receive
+
+            config = build_config(
+                state_dir, self.settings.treasure_interval > 0, **self.config_overrides
+            )
+            async with ISeKaiZBot(config) as bot:
+                self.bot = bot
+                game.on_message = lambda message: bot.dispatch("message", message)
+                game.on_edit = lambda before, after: bot.dispatch("message_edit", before, after)
+                solver = SimCaptchaSolver(game, self.captcha_accuracy, rng=rng)
+                self.solver = solver
+                await connect_bot(bot, self.user, self.channel, solver, self.auto_level)
+                game.start()
+                try:
+                    await asyncio.sleep(seconds)
+                finally:
+                    await game.stop()
+                result = SimulationResult(
+                    virtual_seconds=loop.time() - started,
+                    real_seconds=time.perf_counter() - real_started,
+                    final_state=bot.player.state.value,
+                    game=asdict(game.stats),
+                    bot=self._bot_stats(bot, solver),
+                )
+        return result
+
+    def _bot_stats(self, bot: ISeKaiZBot, solver: SimCaptchaSolver) -> Dict[str, Any]:
+        """Collect the bot-side numbers of a run."""
+        return {
+            "captcha_predictions": solver.predictions,
+            "captcha_rejected": solver.bad,
+            "items_per_hour": round(bot.item_logger.rates("1h")["items"], 1),
+            "gold_per_hour": round(bot.item_logger.rates("1h")["gold"]),
+            "queued_tasks": bot.controller.task_manager.queue_size,
+            "zone_index": bot.player.user_data.zone_index,
+        }
+
+
+def build_config(state_dir: str | Path, treasure_hunter: bool = False, **overrides: Any) -> Config:
+    """Build the bot configuration for an offline run.
+
+    Args:
+        state_dir: Directory for the run's state store.
+        treasure_hunter: Whether to claim chests in the treasure guild.
+        **overrides: Config fields overriding the defaults.
+
+    Returns:
+        Config pointing the bot at the simulated channels.
+    """
+    values: Dict[str, Any] = {"token": "", "profession": "mine", "journal_dir": ""}
+    values.update(overrides)
+    values.update(
+        channel_id=str(CHANNEL_ID),
+        state_store=str(Path(state_dir) / "state.db"),
+        treasure_guild=str(TREASURE_GUILD_ID),
+        treasure_hunter=treasure_hunter,
+    )
+    return Config(**values)
+
+
+async def connect_bot(
+    bot: ISeKaiZBot,
+    user: FakeUser,
+    channel: FakeChannel,
+    captcha_ai: Any,
+    auto_level: bool = False,
+) -> None:
+    """Do what login and setup_hook would, against fakes, and start playing.
+
+    Args:
+        bot: The bot (already set up for async use).
+        user: The bot's own user.
+        channel: The game channel.
+        captcha_ai: Captcha solver (normally a SimCaptchaSolver).
+        auto_level: Start with auto-level on.
+    """
+    # The fakes stand in for the discord.py objects login would create
+    bot._connection.user = cast("discord.ClientUser", user)
+    bot.player.username = user.name
+    bot.player.channel = cast("discord.TextChannel", channel)
+    bot.player.auto_level = auto_level
+    bot.captcha_ai = captcha_ai
+    if bot.recorder:
+        bot.recorder.set_player(user.name, user.id)
+
+    await bot._load_cogs()
+    await bot.controller.start()
+    # Lets the scheduled routines (food, retainer, selling) start
+    bot._ready.set()
+    bot.controller.update_state(BotState.INIT)
+
+
+def simulate(
+    hours: float,
+    speed: float = 0.0,
+    **kwargs: Any,
+) -> SimulationResult:
+    """Run a simulation on a virtual-time event loop.
+
+    Args:
+        hours: Game hours to simulate.
+        speed: Game seconds per real second (0 = as fast as possible).
+        **kwargs: Simulation arguments.
+
+    Returns:
+        What happened.
+    """
+    simulation = Simulation(**kwargs)
+    return run(simulation.run(hours * 3600), VirtualClock(speed=speed))
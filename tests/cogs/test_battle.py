@@ -81,6 +81,23 @@ class TestBattleCog:
         assert result is True
         battle_cog.bot.controller.refresh_timer.assert_called_with("map")
 
+    @pytest.mark.asyncio
+    async def test_battle_victory_records_gains(self, battle_cog, mock_message):
+        """Test that victory gains are written to the journal with the zone."""
+        from utils.helpers import EmbedData
+        from utils.journal import KIND_BATTLE
+
+        fields = [{"name": "EXP", "value": "+100"}, {"name": "Gold", "value": "+50"}]
+        data = EmbedData(title="You Defeated A Goblin!", fields=fields)
+        battle_cog.bot.player.user_data.zone_index = 1
+
+        await battle_cog._handle_battle_message(mock_message, data)
+
+        battle_cog.bot.journal.record_gains.assert_called_once_with(
+            KIND_BATTLE, "Myrkwood", [("EXP", 100)], 50
+        )
+        battle_cog.bot.item_logger.log_gains.assert_called_once_with([("EXP", 100)], 50)
+
     @pytest.mark.asyncio
     async def test_battle_defeat_updates_state(self, battle_cog, mock_message):
         """Test that defeat message updates state."""
@@ -132,3 +132,126 @@ class TestCommandsCog:
         # Check that reply contains status info
         call_args = mock_ctx.reply.call_args[0][0]
         assert "State:" in call_args
+
+    @pytest.mark.asyncio
+    async def test_yield_command_reports_rates(self, commands_cog, mock_ctx):
+        """Test that !yield replies with a row per rolling window."""
+        from utils.logging import ItemLogger
+
+        commands_cog.bot.item_logger = ItemLogger()
+        commands_cog.bot.item_logger.log_gains([("EXP", 100), ("Bone", 2)], gold=50)
+
+        await commands_cog.show_yield.callback(commands_cog, mock_ctx)
+
+        reply = mock_ctx.reply.call_args[0][0]
+        assert "5m" in reply and "1h" in reply and "24h" in reply
+
+    @pytest.mark.asyncio
+    async def test_loop_command_reports_lag(self, commands_cog, mock_ctx):
+        """Test that !loop replies with the loop monitor report."""
+        from utils.loop_monitor import LoopMonitor
+        from utils.metrics import MetricsRegistry
+
+        commands_cog.bot.loop_monitor = LoopMonitor(metrics=MetricsRegistry())
+
+        await commands_cog.show_loop_stats.callback(commands_cog, mock_ctx)
+
+        reply = mock_ctx.reply.call_args[0][0]
+        assert "lag: last=0.0ms" in reply
+        assert "stalls >100ms: 0" in reply
+
+    @pytest.mark.asyncio
+    async def test_trace_command_exports(self, commands_cog, mock_ctx, tmp_path, monkeypatch):
+        """Test that !trace writes the traces and lists recent ones."""
+        from utils.tracing import TRACER
+
+        monkeypatch.chdir(tmp_path)
+        TRACER.clear()
+        with TRACER.activate("555"):
+            TRACER.record("execute", 1.0, 1.2)
+
+        await commands_cog.export_traces.callback(commands_cog, mock_ctx)
+
+        reply = mock_ctx.reply.call_args[0][0]
+        assert "1 traces written to traces.json" in reply
+        assert "555: " in reply
+        assert (tmp_path / "traces.json").exists()
+
+    @pytest.mark.asyncio
+    async def test_profile_command_writes_profile(
+        self, commands_cog, mock_ctx, tmp_path, monkeypatch
+    ):
+        """Test that !profile samples, writes a file and lists top functions."""
+        import cogs.commands
+
+        monkeypatch.setattr(cogs.commands, "DEFAULT_PROFILE_DIR", str(tmp_path))
+        monkeypatch.setattr(cogs.commands, "MAX_PROFILE_SECONDS", 0.05)
+
+        await commands_cog.run_profiler.callback(commands_cog, mock_ctx, 10)
+
+        reply = mock_ctx.reply.call_args[0][0]
+        assert "samples over" in reply
+        assert len(list(tmp_path.glob("profile-*.collapsed"))) == 1
+
+    @pytest.mark.asyncio
+    async def test_memory_command_reports_sample(self, commands_cog, mock_ctx):
+        """Test that on-demand !memory traces from one call to the next only."""
+        import tracemalloc
+
+        from utils.memory import MemorySampler
+        from utils.metrics import MetricsRegistry
+
+        commands_cog.bot.config.memory_sample_minutes = 0
+        commands_cog.bot.memory = MemorySampler(
+            frames=1, counters={"queued_tasks": lambda: 2}, metrics=MetricsRegistry()
+        )
+        try:
+            await commands_cog.show_memory.callback(commands_cog, mock_ctx)
+            assert "Tracing memory" in mock_ctx.reply.call_args[0][0]
+            assert tracemalloc.is_tracing()
+
+            await commands_cog.show_memory.callback(commands_cog, mock_ctx)
+            assert not tracemalloc.is_tracing()
+        finally:
+            commands_cog.bot.memory.stop()
+
+        reply = mock_ctx.reply.call_args[0][0]
+        assert "traced:" in reply
+        assert "queued_tasks: 2" in reply
+
+    @pytest.mark.asyncio
+    async def test_memory_command_keeps_periodic_tracing(self, commands_cog, mock_ctx):
+        """Test that !memory reports at once and leaves tracing to the periodic sampler."""
+        import tracemalloc
+
+        from utils.memory import MemorySampler
+        from utils.metrics import MetricsRegistry
+
+        commands_cog.bot.config.memory_sample_minutes = 10
+        commands_cog.bot.memory = MemorySampler(frames=1, metrics=MetricsRegistry())
+        try:
+            await commands_cog.show_memory.callback(commands_cog, mock_ctx)
+            assert tracemalloc.is_tracing()
+        finally:
+            commands_cog.bot.memory.stop()
+
+        assert "traced:" in mock_ctx.reply.call_args[0][0]
+
+    @pytest.mark.asyncio
+    async def test_captcha_command_reports_metrics(self, commands_cog, mock_ctx):
+        """Test that !captcha replies with pipeline metrics."""
+        from services.captcha_cache import CaptchaCache
+        from utils.metrics import MetricsRegistry
+
+        metrics = MetricsRegistry()
+        metrics.histogram("captcha_download_ms").observe(120.0)
+        metrics.counter("captcha_empty_total").inc()
+        commands_cog.bot.captcha_ai.metrics = metrics
+        commands_cog.bot.captcha_ai.cache = CaptchaCache()
+        commands_cog.bot.captcha_ai.batcher = None
+
+        await commands_cog.show_captcha_stats.callback(commands_cog, mock_ctx)
+
+        reply = mock_ctx.reply.call_args[0][0]
+        assert "download_ms: n=1" in reply
+        assert "empty_total: 1" in reply
@@ -19,6 +19,7 @@ class TestVerificationCog:
         bot.controller = controller
         bot.captcha_ai = MagicMock()
         bot.captcha_ai.predict = AsyncMock(return_value="1234")
+        bot.captcha_ai.wait_ready = AsyncMock(return_value=True)
         return bot
 
     @pytest.fixture
@@ -137,3 +138,121 @@ class TestVerificationCog:
         result = await verification_cog._handle_verification(mock_message, data)
 
         assert result is False
+
+    @pytest.mark.asyncio
+    async def test_retry_marks_answer_bad(self, verification_cog, mock_message):
+        """Test that a failed verification marks the submitted answer bad."""
+        from utils.helpers import EmbedData
+
+        verification_cog.bot.player.username = "TestUser"
+        verification_cog.bot.player.verify_img = "http://example.com/captcha.png"
+
+        data = EmbedData(
+            desc="Please Try doing $verify again.",
+            emb_ref="TestUser",
+        )
+
+        verification_cog.bot.controller._verify_recursion = AsyncMock()
+
+        result = await verification_cog._handle_verification(mock_message, data)
+
+        assert result is True
+        verification_cog.bot.captcha_ai.mark_bad.assert_called_once_with(
+            "http://example.com/captcha.png"
+        )
+
+    @pytest.mark.asyncio
+    async def test_image_captcha_prefetches_answer(self, verification_cog, mock_message):
+        """Test that solving starts on arrival and the queued task only sends."""
+        import asyncio
+
+        verification_cog.bot.player.channel = MagicMock()
+        verification_cog.bot.player.channel.send = AsyncMock()
+        verification_cog.bot.controller.update_state = MagicMock()
+        verification_cog.bot.controller.add_task = MagicMock(return_value=True)
+
+        mock_embed = MagicMock()
+        mock_embed.image.url = "http://example.com/captcha.png"
+        mock_message.embeds = [mock_embed]
+
+        await verification_cog._handle_image_captcha(mock_message)
+        await asyncio.sleep(0)
+
+        # Solved before the queued task ran
+        verification_cog.bot.captcha_ai.predict.assert_awaited_once_with(
+            "http://example.com/captcha.png"
+        )
+
+        task = verification_cog.bot.controller.add_task.call_args[0][0]
+        await task.func()
+
+        verification_cog.bot.captcha_ai.predict.assert_awaited_once()
+        verification_cog.bot.player.channel.send.assert_awaited_once_with("1234")
+
+    @pytest.mark.asyncio
+    async def test_success_marks_answer_verified(self, verification_cog, mock_message):
+        """Test that a successful verification records the accepted answer."""
+        from utils.helpers import EmbedData
+
+        verification_cog.bot.player.username = "TestUser"
+        verification_cog.bot.player.verify_img = "http://example.com/captcha.png"
+        verification_cog.bot.controller.update_state = MagicMock()
+
+        data = EmbedData(desc="Successfully Verified.", emb_ref="TestUser")
+
+        await verification_cog._handle_verification(mock_message, data)
+
+        verification_cog.bot.captcha_ai.mark_verified.assert_called_once_with(
+            "http://example.com/captcha.png"
+        )
+
+    @pytest.mark.asyncio
+    async def test_dropped_prefetch_does_not_stop_dispatch(
+        self, verification_cog, mock_message
+    ):
+        """Test that cancelling the prefetch leaves the check loop running."""
+        import asyncio
+        import time
+
+        from bot.task_manager import Task
+
+        solving = asyncio.Event()
+
+        async def slow_predict(url):
+            solving.set()
+            await asyncio.sleep(3600)
+
+        verification_cog.bot.captcha_ai.predict = slow_predict
+        verification_cog.bot.player.channel = MagicMock()
+        verification_cog.bot.player.channel.send = AsyncMock()
+        controller = verification_cog.bot.controller
+        controller.update_state = MagicMock()
+        controller.add_task = MagicMock(return_value=True)
+        controller.task_manager._gap = controller.task_manager._bias = 0
+
+        mock_embed = MagicMock()
+        mock_embed.image.url = "http://example.com/captcha.png"
+        mock_message.embeds = [mock_embed]
+        await verification_cog._handle_image_captcha(mock_message)
+        controller.task_manager.add_task(controller.add_task.call_args[0][0])
+
+        check = asyncio.create_task(controller._check_loop())
+        try:
+            await asyncio.wait_for(solving.wait(), 1)
+            await asyncio.sleep(0)
+            verification_cog._drop_prefetch()
+
+            ran = asyncio.Event()
+
+            async def next_task():
+                ran.set()
+                return {}
+
+            controller.task_manager.add_task(
+                Task(func=next_task, expire_at=time.time() * 1000 + 60000, info="next")
+            )
+            await asyncio.wait_for(ran.wait(), 3)
+            assert not check.done()
+            verification_cog.bot.player.channel.send.assert_not_awaited()
+        finally:
+            check.cancel()
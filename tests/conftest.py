@@ -135,6 +135,20 @@ def mock_button() -> MagicMock:
     return button
 
 
+@pytest.fixture
+def captcha_png() -> bytes:
+    """Return a small encoded captcha-like PNG image."""
+    import io
+
+    from PIL import Image, ImageDraw
+
+    img = Image.new("RGB", (200, 80), (255, 255, 255))
+    ImageDraw.Draw(img).text((20, 30), "1234", fill=(0, 0, 0))
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
 @pytest.fixture
 def sample_embed_data() -> Dict[str, Any]:
     """Return sample embed data for various scenarios."""
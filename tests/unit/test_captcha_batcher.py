@@ -0,0 +1,139 @@
+"""Tests for services/captcha_batcher.py."""
+
+from __future__ import annotations
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from services.captcha_batcher import CaptchaBatcher
+
+
+def _make_input(value: float) -> np.ndarray:
+    """Create a [1, 3, 4, 4] input tensor filled with a value."""
+    return np.full((1, 3, 4, 4), value, dtype=np.float32)
+
+
+class TestCaptchaBatcher:
+    """Tests for CaptchaBatcher class."""
+
+    @pytest.mark.asyncio
+    async def test_single_request(self):
+        """Test that a lone request is served after the wait window."""
+        calls = []
+
+        def run(batch):
+            calls.append(batch.shape[0])
+            return batch.mean(axis=(2, 3))
+
+        batcher = CaptchaBatcher(run, max_batch=4, max_wait_ms=1)
+        output = await batcher.submit(_make_input(2.0))
+
+        assert calls == [1]
+        assert output.shape == (1, 3)
+        assert np.allclose(output, 2.0)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_batched(self):
+        """Test that concurrent requests share one inference run."""
+        calls = []
+
+        def run(batch):
+            calls.append(batch.shape[0])
+            return batch.mean(axis=(2, 3))
+
+        batcher = CaptchaBatcher(run, max_batch=8, max_wait_ms=20)
+        outputs = await asyncio.gather(
+            *(batcher.submit(_make_input(float(i))) for i in range(3))
+        )
+
+        assert calls == [3]
+        assert batcher.mean_batch_size == 3
+        for i, output in enumerate(outputs):
+            assert output.shape == (1, 3)
+            assert np.allclose(output, float(i))
+
+    @pytest.mark.asyncio
+    async def test_full_batch_flushes_immediately(self):
+        """Test that reaching max_batch splits requests into batches."""
+        calls = []
+
+        def run(batch):
+            calls.append(batch.shape[0])
+            return batch.mean(axis=(2, 3))
+
+        batcher = CaptchaBatcher(run, max_batch=2, max_wait_ms=20)
+        await asyncio.gather(*(batcher.submit(_make_input(1.0)) for i in range(5)))
+
+        assert sorted(calls) == [1, 2, 2]
+
+    @pytest.mark.asyncio
+    async def test_fixed_batch_model_falls_back(self):
+        """Test fallback to per-image runs when batching is rejected."""
+        calls = []
+
+        def run(batch):
+            if batch.shape[0] != 1:
+                raise ValueError("Got invalid dimensions for input")
+            calls.append(batch.shape[0])
+            return batch.mean(axis=(2, 3))
+
+        batcher = CaptchaBatcher(run, max_batch=8, max_wait_ms=20)
+        outputs = await asyncio.gather(
+            *(batcher.submit(_make_input(float(i))) for i in range(3))
+        )
+
+        assert calls == [1, 1, 1]
+        assert np.allclose(outputs[2], 2.0)
+
+    @pytest.mark.asyncio
+    async def test_inference_error_propagates(self):
+        """Test that inference errors reach every waiting caller."""
+
+        def run(batch):
+            raise RuntimeError("session broken")
+
+        batcher = CaptchaBatcher(run, max_batch=8, max_wait_ms=1)
+
+        with pytest.raises(RuntimeError, match="session broken"):
+            await batcher.submit(_make_input(1.0))
+
+    @pytest.mark.asyncio
+    async def test_transient_batch_error_keeps_batching(self):
+        """Test that only a batch-dimension error disables batching."""
+        sizes = []
+        failures = iter([RuntimeError("out of memory")])
+
+        def run(batch):
+            sizes.append(batch.shape[0])
+            if batch.shape[0] > 1:
+                error = next(failures, None)
+                if error is not None:
+                    raise error
+            return batch.mean(axis=(2, 3))
+
+        batcher = CaptchaBatcher(run, max_batch=8, max_wait_ms=20)
+        for _ in range(2):
+            await asyncio.gather(*(batcher.submit(_make_input(float(i))) for i in range(3)))
+
+        # First batch failed and ran per image, the second was batched again
+        assert sizes == [3, 1, 1, 1, 3]
+
+    @pytest.mark.asyncio
+    async def test_close_drains_pending_and_running(self):
+        """Test that close() runs queued requests and waits for batches."""
+
+        def run(batch):
+            return batch.mean(axis=(2, 3))
+
+        batcher = CaptchaBatcher(run, max_batch=2, max_wait_ms=10_000)
+        futures = [asyncio.ensure_future(batcher.submit(_make_input(float(i)))) for i in range(3)]
+        await asyncio.sleep(0)
+
+        await batcher.close()
+
+        assert all(future.done() for future in futures)
+        assert np.allclose(futures[2].result(), 2.0)
+        assert batcher.pending == 0
+        assert not batcher._running
@@ -0,0 +1,67 @@
+"""Tests for services/captcha_bench.py."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from services.captcha_bench import (
+    MISSING,
+    accuracy,
+    confusion_matrix,
+    load_dataset,
+    percentile,
+)
+
+
+class TestLoadDataset:
+    """Tests for load_dataset function."""
+
+    def test_labels_from_file_names(self, tmp_path: Path, captcha_png: bytes):
+        """Test that labels are taken from leading digits of the stem."""
+        (tmp_path / "0429.png").write_bytes(captcha_png)
+        (tmp_path / "1234_retry.png").write_bytes(captcha_png)
+        (tmp_path / "unlabelled.png").write_bytes(captcha_png)
+        (tmp_path / "notes.txt").write_text("not an image")
+
+        samples = load_dataset(tmp_path)
+
+        assert [s.label for s in samples] == ["0429", "1234"]
+
+    def test_limit(self, tmp_path: Path, captcha_png: bytes):
+        """Test limiting the number of samples."""
+        for label in ("1111", "2222", "3333"):
+            (tmp_path / f"{label}.png").write_bytes(captcha_png)
+
+        assert len(load_dataset(tmp_path, limit=2)) == 2
+
+
+class TestScoring:
+    """Tests for percentile and accuracy helpers."""
+
+    def test_percentile(self):
+        """Test interpolated percentiles."""
+        values = [1.0, 2.0, 3.0, 4.0]
+
+        assert percentile(values, 0) == 1.0
+        assert percentile(values, 50) == pytest.approx(2.5)
+        assert percentile(values, 100) == 4.0
+        assert percentile([], 50) == 0.0
+
+    def test_accuracy(self):
+        """Test digit and sequence accuracy."""
+        pairs = [("1234", "1234"), ("5678", "5608"), ("1111", "11")]
+
+        digit_acc, seq_acc = accuracy(pairs)
+
+        assert digit_acc == pytest.approx(9 / 12)
+        assert seq_acc == pytest.approx(1 / 3)
+
+    def test_confusion_matrix(self):
+        """Test confusion counts including missing digits."""
+        matrix = confusion_matrix([("17", "11"), ("7", "")])
+
+        assert matrix["1"]["1"] == 1
+        assert matrix["7"]["1"] == 1
+        assert matrix["7"][MISSING] == 1
@@ -0,0 +1,138 @@
+"""Tests for services/captcha_cache.py."""
+
+from __future__ import annotations
+
+import io
+from unittest.mock import AsyncMock
+
+import pytest
+from PIL import Image
+
+from services.captcha_cache import CaptchaCache, CaptchaResult, image_digest
+
+
+class TestImageDigest:
+    """Tests for image_digest function."""
+
+    def test_same_pixels_same_digest(self, captcha_png):
+        """Test that re-encoding an image keeps its digest."""
+        img = Image.open(io.BytesIO(captcha_png)).convert("RGB")
+        buffer = io.BytesIO()
+        img.save(buffer, format="BMP")
+        copy = Image.open(io.BytesIO(buffer.getvalue())).convert("RGB")
+
+        assert image_digest(img) == image_digest(copy)
+
+    def test_different_pixels_different_digest(self):
+        """Test that different images hash differently."""
+        black = Image.new("RGB", (10, 10), (0, 0, 0))
+        white = Image.new("RGB", (10, 10), (255, 255, 255))
+
+        assert image_digest(black) != image_digest(white)
+
+
+class TestCaptchaCache:
+    """Tests for CaptchaCache class."""
+
+    def test_hit_by_url(self):
+        """Test lookup by a known URL."""
+        cache = CaptchaCache()
+        cache.put("http://a", CaptchaResult("1234", [0.9] * 4, digest="d1"))
+
+        assert cache.get("http://a").text == "1234"
+        assert cache.hits == 1
+
+    def test_hit_by_digest(self):
+        """Test lookup of known pixels under a new URL."""
+        cache = CaptchaCache()
+        cache.put("http://a", CaptchaResult("1234", digest="d1"))
+
+        assert cache.get("http://b") is None
+        assert cache.get("http://b", "d1").text == "1234"
+        # The new URL is now an alias
+        assert cache.get("http://b").text == "1234"
+
+    def test_hit_rate(self):
+        """Test that only final lookups count as misses."""
+        cache = CaptchaCache()
+        cache.get("http://a")
+        cache.get("http://a", "d1")
+        cache.put("http://a", CaptchaResult("1234", digest="d1"))
+        cache.get("http://a")
+
+        assert cache.hits == 1
+        assert cache.misses == 1
+        assert cache.hit_rate == 0.5
+
+    def test_lru_eviction(self):
+        """Test that the least recently used image is evicted."""
+        cache = CaptchaCache(max_entries=2)
+        cache.put("http://a", CaptchaResult("1", digest="d1"))
+        cache.put("http://b", CaptchaResult("2", digest="d2"))
+        cache.get("http://a")
+        cache.put("http://c", CaptchaResult("3", digest="d3"))
+
+        assert len(cache) == 2
+        assert cache.get("http://b", "d2") is None
+        assert cache.get("http://a").text == "1"
+
+    def test_mark_bad(self):
+        """Test marking a rejected answer."""
+        cache = CaptchaCache()
+        cache.put("http://a", CaptchaResult("1234", digest="d1"))
+
+        assert cache.mark_bad("http://a") is True
+        assert cache.get("http://a").bad is True
+        assert cache.mark_bad("http://unknown") is False
+
+    def test_bad_flag_survives_put(self):
+        """Test that re-storing a rejected image keeps it marked bad."""
+        cache = CaptchaCache()
+        cache.put("http://a", CaptchaResult("1234", digest="d1"))
+        cache.mark_bad("http://a")
+        cache.put("http://b", CaptchaResult("1234", digest="d1"))
+
+        assert cache.get("http://b").bad is True
+
+
+class TestCaptchaAICache:
+    """Tests for CaptchaAI result caching."""
+
+    @pytest.fixture
+    def captcha_ai(self, tmp_path, captcha_png):
+        """Return a CaptchaAI with download and inference mocked."""
+        from services.captcha_service import CaptchaAI
+
+        ai = CaptchaAI(tmp_path / "missing.onnx", socket_path=tmp_path / "none.sock")
+        ai._download = AsyncMock(return_value=captcha_png)
+        ai._solve = AsyncMock(return_value=CaptchaResult("1234", [0.9] * 4))
+        return ai
+
+    @pytest.mark.asyncio
+    async def test_repeat_url_skips_download(self, captcha_ai):
+        """Test that a re-served URL is answered from the cache."""
+        assert await captcha_ai.predict("http://a") == "1234"
+        assert await captcha_ai.predict("http://a") == "1234"
+
+        captcha_ai._download.assert_awaited_once()
+        captcha_ai._solve.assert_awaited_once()
+        assert captcha_ai.cache.hit_rate == 0.5
+
+    @pytest.mark.asyncio
+    async def test_same_pixels_skip_inference(self, captcha_ai):
+        """Test that the same image under a new URL skips inference."""
+        await captcha_ai.predict("http://a")
+        result = await captcha_ai.predict_result("http://b")
+
+        assert result.text == "1234"
+        assert result.cached is True
+        captcha_ai._solve.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_bad_answer_not_resubmitted(self, captcha_ai):
+        """Test that a rejected answer is not returned again."""
+        await captcha_ai.predict("http://a")
+        assert captcha_ai.mark_bad("http://a") is True
+
+        assert await captcha_ai.predict("http://a") == ""
+        assert await captcha_ai.predict("http://b") == ""
@@ -0,0 +1,98 @@
+"""Tests for services/captcha_dataset.py."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from services.captcha_bench import load_dataset
+from services.captcha_cache import CaptchaResult
+from services.captcha_dataset import (
+    OUTCOME_RETRY,
+    OUTCOME_VERIFIED,
+    CaptchaDataset,
+    image_suffix,
+    is_dataset,
+    read_index,
+    verified_samples,
+)
+
+
+def _result(text: str, digest: str) -> CaptchaResult:
+    """Build a prediction with the given digest."""
+    return CaptchaResult(text=text, confidences=[0.9] * len(text), digest=digest)
+
+
+class TestCaptchaDataset:
+    """Tests for CaptchaDataset class."""
+
+    def test_add_deduplicates_by_digest(self, tmp_path: Path, captcha_png: bytes):
+        """Test that the same pixels are stored once."""
+        dataset = CaptchaDataset(tmp_path)
+
+        assert dataset.add("http://a", captcha_png, _result("1234", "d1")) is True
+        assert dataset.add("http://b", captcha_png, _result("1234", "d1")) is False
+
+        records = read_index(tmp_path)
+        assert list(records) == ["d1"]
+        assert Path(records["d1"]["path"]).read_bytes() == captcha_png
+        assert records["d1"]["file"].endswith(".png")
+
+    def test_outcomes_label_samples(self, tmp_path: Path, captcha_png: bytes):
+        """Test that only verified captchas become labelled samples."""
+        dataset = CaptchaDataset(tmp_path)
+        dataset.add("http://a", captcha_png, _result("1234", "d1"))
+        dataset.add("http://b", captcha_png, _result("5678", "d2"))
+
+        assert dataset.record_outcome("http://a", OUTCOME_VERIFIED) is True
+        assert dataset.record_outcome("http://b", OUTCOME_RETRY) is True
+        assert dataset.record_outcome("http://unknown", OUTCOME_VERIFIED) is False
+
+        assert [label for _, label in verified_samples(tmp_path)] == ["1234"]
+        assert read_index(tmp_path)["d2"]["outcome"] == OUTCOME_RETRY
+
+    def test_outcome_for_aliased_url(self, tmp_path: Path, captcha_png: bytes):
+        """Test that a re-served image gets the outcome of its new URL."""
+        dataset = CaptchaDataset(tmp_path)
+        dataset.add("http://a", captcha_png, _result("1234", "d1"))
+        dataset.add("http://b", captcha_png, _result("1234", "d1"))
+
+        assert dataset.record_outcome("http://b", OUTCOME_VERIFIED) is True
+
+    def test_rotation_keeps_budget(self, tmp_path: Path, captcha_png: bytes):
+        """Test that old segments are dropped once the budget is used."""
+        budget = len(captcha_png) * 4
+        dataset = CaptchaDataset(tmp_path, max_bytes=budget, max_segments=2)
+        for i in range(12):
+            dataset.add(f"http://{i}", captcha_png, _result("1234", f"d{i}"))
+
+        segments = [p for p in tmp_path.iterdir() if p.is_dir()]
+        assert len(segments) == 2
+        assert "d0" not in read_index(tmp_path)
+        assert "d11" in read_index(tmp_path)
+        assert len(dataset) == len(read_index(tmp_path))
+
+    def test_reload_from_disk(self, tmp_path: Path, captcha_png: bytes):
+        """Test that a restarted recorder still deduplicates."""
+        CaptchaDataset(tmp_path).add("http://a", captcha_png, _result("1234", "d1"))
+
+        dataset = CaptchaDataset(tmp_path)
+
+        assert len(dataset) == 1
+        assert dataset.add("http://a", captcha_png, _result("1234", "d1")) is False
+
+    def test_bench_loads_dataset(self, tmp_path: Path, captcha_png: bytes):
+        """Test that the offline benchmark reads verified captchas."""
+        dataset = CaptchaDataset(tmp_path)
+        dataset.add("http://a", captcha_png, _result("0429", "d1"))
+        dataset.record_outcome("http://a", OUTCOME_VERIFIED)
+
+        assert is_dataset(tmp_path)
+        assert [s.label for s in load_dataset(tmp_path)] == ["0429"]
+
+
+def test_image_suffix():
+    """Test format detection from file signatures."""
+    assert image_suffix(b"\x89PNG\r\n") == ".png"
+    assert image_suffix(b"\xff\xd8\xff\xe0") == ".jpg"
+    assert image_suffix(b"RIFF\x00\x00\x00\x00WEBP") == ".webp"
+    assert image_suffix(b"????") == ".img"
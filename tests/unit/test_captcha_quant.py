@@ -0,0 +1,125 @@
+"""Tests for services/captcha_quant.py."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from services import captcha_quant
+from services.captcha_quant import model_digest, report_path, select_model
+
+
+def _report(fp32_path: Path, int8_path: Path, drop: float) -> dict:
+    """Build a comparison report for the given model files and accuracy drop."""
+    return {
+        "fp32_model": str(fp32_path),
+        "int8_model": str(int8_path),
+        "fp32_sha256": model_digest(fp32_path),
+        "int8_sha256": model_digest(int8_path),
+        "fp32": {"digit_accuracy": 0.99, "sequence_accuracy": 0.95, "samples": 100},
+        "int8": {"digit_accuracy": 0.98, "sequence_accuracy": 0.95 - drop, "samples": 100},
+        "accuracy_drop": drop,
+    }
+
+
+class TestSelectModel:
+    """Tests for select_model function."""
+
+    @pytest.fixture
+    def int8_path(self, tmp_path: Path) -> Path:
+        """Return an (empty) INT8 model file."""
+        path = tmp_path / "captcha.int8.onnx"
+        path.write_bytes(b"int8")
+        return path
+
+    @pytest.fixture
+    def fp32_path(self, tmp_path: Path) -> Path:
+        """Return a (fake) FP32 model file."""
+        path = tmp_path / "fp32.onnx"
+        path.write_bytes(b"fp32")
+        return path
+
+    def test_no_int8_configured(self, tmp_path: Path):
+        """Test that FP32 is used without an INT8 model."""
+        assert select_model(tmp_path / "fp32.onnx") == tmp_path / "fp32.onnx"
+
+    def test_missing_int8_file(self, tmp_path: Path):
+        """Test falling back when the INT8 file does not exist."""
+        fp32 = tmp_path / "fp32.onnx"
+
+        assert select_model(fp32, tmp_path / "missing.onnx") == fp32
+
+    def test_missing_report(self, tmp_path: Path, int8_path: Path):
+        """Test that an unverified INT8 model is not used."""
+        fp32 = tmp_path / "fp32.onnx"
+
+        assert select_model(fp32, int8_path) == fp32
+
+    def test_report_within_threshold(self, fp32_path: Path, int8_path: Path):
+        """Test using INT8 when its saved report passes the gate."""
+        report_path(int8_path).write_text(json.dumps(_report(fp32_path, int8_path, 0.01)))
+
+        assert select_model(fp32_path, int8_path, max_drop=0.02) == int8_path
+
+    def test_report_over_threshold(self, fp32_path: Path, int8_path: Path):
+        """Test falling back when the accuracy drop is too large."""
+        report_path(int8_path).write_text(json.dumps(_report(fp32_path, int8_path, 0.05)))
+
+        assert select_model(fp32_path, int8_path, max_drop=0.02) == fp32_path
+
+    def test_stale_report(self, fp32_path: Path, int8_path: Path):
+        """Test that a report made for an older FP32 model is not trusted."""
+        report_path(int8_path).write_text(json.dumps(_report(fp32_path, int8_path, 0.0)))
+        fp32_path.write_bytes(b"retrained fp32")
+
+        assert select_model(fp32_path, int8_path) == fp32_path
+
+    @pytest.mark.parametrize("drop", [None, "n/a", [0.01]])
+    def test_malformed_report(self, fp32_path: Path, int8_path: Path, drop):
+        """Test falling back when the report has no usable accuracy drop."""
+        report = _report(fp32_path, int8_path, 0.0)
+        if drop is None:
+            del report["accuracy_drop"]
+        else:
+            report["accuracy_drop"] = drop
+        report_path(int8_path).write_text(json.dumps(report))
+
+        assert select_model(fp32_path, int8_path) == fp32_path
+
+    def test_live_evaluation(
+        self, tmp_path: Path, fp32_path: Path, int8_path: Path, monkeypatch
+    ):
+        """Test that an eval directory re-measures and saves the report."""
+        fp32 = fp32_path
+        accuracies = {str(fp32): 0.95, str(int8_path): 0.90}
+
+        def fake_evaluate(model_path, samples):
+            acc = accuracies[str(model_path)]
+            return {"digit_accuracy": acc, "sequence_accuracy": acc, "samples": len(samples)}
+
+        monkeypatch.setattr(captcha_quant, "load_dataset", lambda directory, limit: ["s"])
+        monkeypatch.setattr(captcha_quant, "evaluate_model", fake_evaluate)
+
+        assert select_model(fp32, int8_path, max_drop=0.1, eval_dir=tmp_path) == int8_path
+        assert select_model(fp32, int8_path, max_drop=0.02, eval_dir=tmp_path) == fp32
+
+        saved = json.loads(report_path(int8_path).read_text())
+        assert saved["accuracy_drop"] == pytest.approx(0.05)
+
+
+class TestQuantizeModel:
+    """Tests for quantize_model argument checks."""
+
+    def test_unknown_mode(self, tmp_path: Path):
+        """Test rejecting an unknown quantization mode."""
+        with pytest.raises(ValueError):
+            captcha_quant.quantize_model(tmp_path / "a.onnx", tmp_path / "b.onnx", mode="fp16")
+
+    def test_static_needs_calibration_dir(self, tmp_path: Path):
+        """Test that static quantization requires calibration images."""
+        pytest.importorskip("onnxruntime.quantization")
+
+        with pytest.raises(ValueError):
+            captcha_quant.quantize_model(tmp_path / "a.onnx", tmp_path / "b.onnx", mode="static")
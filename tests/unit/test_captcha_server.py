@@ -0,0 +1,222 @@
+"""Tests for services/captcha_server.py."""
+
+from __future__ import annotations
+
+import asyncio
+import socket
+import stat
+from unittest.mock import AsyncMock
+
+import pytest
+
+from services.captcha_cache import CaptchaResult
+from services.captcha_server import (
+    CaptchaClient,
+    CaptchaServer,
+    OP_PREDICT,
+    pack_frame,
+    pack_result,
+    read_frame,
+    unpack_result,
+)
+from utils.errors import CaptchaError
+
+
+class FakeEngine:
+    """Engine answering with the length of the image payload."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def predict_image(self, data: bytes) -> CaptchaResult:
+        self.calls.append(data)
+        if data == b"bad":
+            raise ValueError("cannot identify image file")
+        await asyncio.sleep(0)
+        return CaptchaResult(text=str(len(data)), confidences=[0.5])
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    """Return a short-lived socket path."""
+    return tmp_path / "captcha.sock"
+
+
+class TestFraming:
+    """Tests for frame encoding."""
+
+    @pytest.mark.asyncio
+    async def test_round_trip(self):
+        """Test that a packed frame decodes to the same values."""
+        reader = asyncio.StreamReader()
+        reader.feed_data(pack_frame(OP_PREDICT, 42, b"image"))
+
+        kind, request_id, payload = await read_frame(reader)
+
+        assert kind == OP_PREDICT
+        assert request_id == 42
+        assert payload == b"image"
+
+    def test_result_round_trip(self):
+        """Test that a prediction survives encoding."""
+        result = unpack_result(pack_result(CaptchaResult("0429", [0.9, 0.8, 0.75, 0.5])))
+
+        assert result.text == "0429"
+        assert result.confidences == pytest.approx([0.9, 0.8, 0.75, 0.5])
+        assert not result.ambiguous and not result.bad
+
+    def test_result_flags_round_trip(self):
+        """Test that ambiguous and rejected answers keep their flags."""
+        result = unpack_result(
+            pack_result(CaptchaResult("042", [0.9, 0.3, 0.8], ambiguous=True, bad=True))
+        )
+
+        assert result.text == "042"
+        assert result.ambiguous
+        assert result.bad
+
+    @pytest.mark.asyncio
+    async def test_bad_version_rejected(self):
+        """Test that frames from another protocol version are rejected."""
+        reader = asyncio.StreamReader()
+        reader.feed_data(b"\x09" + pack_frame(OP_PREDICT, 1)[1:])
+
+        with pytest.raises(CaptchaError):
+            await read_frame(reader)
+
+
+class TestCaptchaService:
+    """Tests for CaptchaServer and CaptchaClient together."""
+
+    @pytest.mark.asyncio
+    async def test_predict(self, socket_path):
+        """Test a prediction round trip over the socket."""
+        engine = FakeEngine()
+        server = CaptchaServer(engine, socket_path)
+        await server.start()
+        client = CaptchaClient(socket_path)
+
+        try:
+            await client.ping()
+            result = await client.predict(b"12345")
+        finally:
+            await client.close()
+            await server.close()
+
+        assert result.text == "5"
+        assert result.confidences == [0.5]
+        assert engine.calls == [b"12345"]
+        assert not socket_path.exists()
+
+    @pytest.mark.asyncio
+    async def test_stale_socket_replaced(self, socket_path):
+        """Test that a dead socket file is replaced and the new one is private."""
+        stale = socket.socket(socket.AF_UNIX)
+        stale.bind(str(socket_path))
+        stale.close()
+
+        server = CaptchaServer(FakeEngine(), socket_path)
+        await server.start()
+        try:
+            assert stat.S_IMODE(socket_path.stat().st_mode) == 0o600
+            client = CaptchaClient(socket_path)
+            await client.ping()
+            await client.close()
+        finally:
+            await server.close()
+
+    @pytest.mark.asyncio
+    async def test_live_socket_not_taken(self, socket_path):
+        """Test that a second daemon leaves a running one reachable."""
+        server = CaptchaServer(FakeEngine(), socket_path)
+        await server.start()
+        second = CaptchaServer(FakeEngine(), socket_path)
+        client = CaptchaClient(socket_path)
+
+        try:
+            with pytest.raises(CaptchaError, match="already running"):
+                await second.start()
+            await second.close()
+            await client.ping()
+        finally:
+            await client.close()
+            await server.close()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests(self, socket_path):
+        """Test that concurrent requests are matched to their responses."""
+        server = CaptchaServer(FakeEngine(), socket_path)
+        await server.start()
+        client = CaptchaClient(socket_path)
+
+        try:
+            results = await asyncio.gather(
+                *(client.predict(b"x" * n) for n in range(1, 6))
+            )
+        finally:
+            await client.close()
+            await server.close()
+
+        assert [r.text for r in results] == ["1", "2", "3", "4", "5"]
+
+    @pytest.mark.asyncio
+    async def test_engine_error_reported(self, socket_path):
+        """Test that engine failures come back as CaptchaError."""
+        server = CaptchaServer(FakeEngine(), socket_path)
+        await server.start()
+        client = CaptchaClient(socket_path)
+
+        try:
+            with pytest.raises(CaptchaError, match="cannot identify"):
+                await client.predict(b"bad")
+        finally:
+            await client.close()
+            await server.close()
+
+    @pytest.mark.asyncio
+    async def test_unreachable_service(self, socket_path):
+        """Test that a missing service raises ConnectionError."""
+        client = CaptchaClient(socket_path)
+
+        with pytest.raises(ConnectionError):
+            await client.predict(b"12345")
+
+
+class TestCaptchaAIFallback:
+    """Tests for CaptchaAI client mode."""
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_in_process(self, tmp_path, socket_path, captcha_png):
+        """Test that CaptchaAI uses local inference when the service is down."""
+        from services.captcha_service import CaptchaAI
+
+        ai = CaptchaAI(tmp_path / "missing.onnx", socket_path=socket_path)
+        ai._download = AsyncMock(return_value=captcha_png)
+        ai._solve = AsyncMock(return_value=CaptchaResult("4321", [0.9] * 4))
+
+        result = await ai.predict("http://example.com/captcha.png")
+
+        assert ai.uses_service is True
+        assert result == "4321"
+        ai._solve.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_uses_service_when_available(self, tmp_path, socket_path, captcha_png):
+        """Test that CaptchaAI delegates to a running service."""
+        from services.captcha_service import CaptchaAI
+
+        server = CaptchaServer(FakeEngine(), socket_path)
+        await server.start()
+
+        ai = CaptchaAI(tmp_path / "missing.onnx", socket_path=socket_path)
+        ai._download = AsyncMock(return_value=captcha_png)
+        ai._solve = AsyncMock()
+
+        try:
+            result = await ai.predict("http://example.com/captcha.png")
+        finally:
+            await ai.close()
+            await server.close()
+
+        assert result == str(len(captcha_png))
+        ai._solve.assert_not_called()
@@ -0,0 +1,220 @@
+"""Tests for services/captcha_service.py."""
+
+from __future__ import annotations
+
+import asyncio
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from services.captcha_service import CaptchaAI
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def test_import_defers_heavy_dependencies():
+    """Test that importing the services package loads no ML libraries."""
+    code = (
+        "import sys, services; "
+        "print(sorted(m for m in ('numpy', 'PIL', 'onnxruntime') if m in sys.modules))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+
+    assert output.strip() == "[]"
+
+
+class TestBackgroundLoading:
+    """Tests for CaptchaAI.load and wait_ready."""
+
+    @pytest.fixture
+    def captcha_ai(self, tmp_path):
+        """Return a CaptchaAI whose model has not been loaded."""
+        return CaptchaAI(tmp_path / "captcha.onnx", load_model=False)
+
+    @pytest.mark.asyncio
+    async def test_not_ready_before_load(self, captcha_ai):
+        """Test that wait_ready times out while nothing is loaded."""
+        assert captcha_ai.ready is False
+        assert await captcha_ai.wait_ready(timeout=0.01) is False
+
+    @pytest.mark.asyncio
+    async def test_waiters_woken_after_load(self, captcha_ai, monkeypatch):
+        """Test that a waiter is released once the model is loaded."""
+        calls = []
+
+        def fake_load():
+            calls.append(captcha_ai.model_path)
+            captcha_ai._session = object()
+
+        monkeypatch.setattr(captcha_ai, "_load_model", fake_load)
+
+        waiter = asyncio.create_task(captcha_ai.wait_ready())
+        await asyncio.gather(captcha_ai.load("int8.onnx"), captcha_ai.load())
+
+        assert await waiter is True
+        assert calls == [Path("int8.onnx")]
+
+    @pytest.mark.asyncio
+    async def test_failed_load_releases_waiters(self, captcha_ai):
+        """Test that a failed load wakes waiters with a negative answer."""
+        waiter = asyncio.create_task(captcha_ai.wait_ready())
+
+        with pytest.raises(FileNotFoundError):
+            await captcha_ai.load()
+
+        assert await waiter is False
+
+    @pytest.mark.asyncio
+    async def test_service_mode_is_ready(self, tmp_path):
+        """Test that a service-backed instance needs no local model."""
+        captcha_ai = CaptchaAI(tmp_path / "captcha.onnx", socket_path=tmp_path / "svc.sock")
+
+        assert await captcha_ai.wait_ready(timeout=0) is True
+
+
+class TestPipelineMetrics:
+    """Tests for CaptchaAI stage timings and counters."""
+
+    @pytest.fixture
+    def captcha_ai(self, tmp_path, captcha_png):
+        """Return a CaptchaAI with download and inference mocked."""
+        from unittest.mock import AsyncMock
+
+        from services.captcha_cache import CaptchaResult
+        from utils.metrics import MetricsRegistry
+
+        ai = CaptchaAI(tmp_path / "captcha.onnx", load_model=False, metrics=MetricsRegistry())
+        ai._download = AsyncMock(return_value=captcha_png)
+        ai._solve = AsyncMock(return_value=CaptchaResult("12", [0.9, 0.8]))
+        return ai
+
+    @pytest.mark.asyncio
+    async def test_stages_and_digits_recorded(self, captcha_ai):
+        """Test that download/decode timings and digit counts are kept."""
+        await captcha_ai.predict("http://a")
+
+        metrics = captcha_ai.metrics
+        assert metrics.histogram("captcha_download_ms").count == 1
+        assert metrics.histogram("captcha_decode_ms").count == 1
+        assert metrics.histogram("captcha_digits").bucket_counts[2] == 1
+        assert metrics.counter("captcha_empty_total").value == 0
+
+    @pytest.mark.asyncio
+    async def test_failure_counted(self, captcha_ai):
+        """Test that a failed download is counted."""
+        captcha_ai._download.side_effect = RuntimeError("HTTP 503")
+
+        assert await captcha_ai.predict("http://a") == ""
+        assert captcha_ai.metrics.counter("captcha_failures_total").value == 1
+        assert captcha_ai.metrics.histogram("captcha_total_ms").count == 1
+
+
+class TestAmbiguityHandling:
+    """Tests for confidence-aware decoding and retry passes."""
+
+    @pytest.fixture
+    def captcha_ai(self, tmp_path):
+        """Return a CaptchaAI without a model."""
+        from utils.metrics import MetricsRegistry
+
+        return CaptchaAI(tmp_path / "captcha.onnx", load_model=False, metrics=MetricsRegistry())
+
+    @staticmethod
+    def _detections(digits, confidences):
+        """Build NMS output for digits laid out left to right."""
+        import numpy as np
+
+        boxes = np.zeros(len(digits) * 4, dtype=np.float32)
+        for i in range(len(digits)):
+            boxes[i * 4] = i * 10
+        return (
+            np.array(confidences, dtype=np.float32),
+            np.array(digits, dtype=np.uint8),
+            boxes,
+        )
+
+    @staticmethod
+    def _output(scores):
+        """Build a [1, 14, N] model output whose boxes have the given top scores."""
+        import numpy as np
+
+        output = np.zeros((1, 14, max(1, len(scores))), dtype=np.float32)
+        for i, score in enumerate(scores):
+            output[0, 4, i] = score
+        return output
+
+    @pytest.mark.parametrize("retry_recovers, near_misses", [(False, 2), (True, 0)])
+    def test_near_misses_counted_once_at_kept_threshold(
+        self, captcha_ai, monkeypatch, retry_recovers, near_misses
+    ):
+        """Test that near misses are measured on the kept pass and recorded once."""
+
+        def fake_nms(output, iou_threshold=0.5, conf_threshold=0.25):
+            if retry_recovers and conf_threshold < captcha_ai.CONF_THRESHOLD:
+                return self._detections([1, 2, 3, 4], [0.9, 0.9, 0.9, 0.6])
+            return self._detections([1, 2, 3], [0.9] * 3)
+
+        monkeypatch.setattr(captcha_ai, "_nms", fake_nms)
+        # Two boxes between the near-miss floor (0.1) and the normal threshold;
+        # the relaxed threshold is the floor, so its pass has none
+        output = self._output([0.05, 0.15, 0.2, 0.3, 0.9])
+
+        result = captcha_ai._postprocess(output)
+        captcha_ai._record_result(result)
+
+        assert (result.text == "1234") is retry_recovers
+        assert result.near_misses == near_misses
+        assert captcha_ai.metrics.counter("captcha_below_threshold_total").value == near_misses
+
+    def test_confident_result_not_ambiguous(self, captcha_ai):
+        """Test that four strong digits are accepted."""
+        result = captcha_ai._decode_detections(*self._detections([1, 2, 3, 4], [0.9] * 4))
+
+        assert result.text == "1234"
+        assert result.confidences == pytest.approx([0.9] * 4)
+        assert result.ambiguous is False
+
+    @pytest.mark.parametrize(
+        "digits, confidences",
+        [
+            ([1, 2, 3], [0.9] * 3),  # missing digit
+            ([1, 2, 3, 4, 5], [0.9] * 5),  # extra detection
+            ([1, 2, 3, 4], [0.9, 0.3, 0.9, 0.9]),  # weak digit
+        ],
+    )
+    def test_ambiguous_results(self, captcha_ai, digits, confidences):
+        """Test that missing, extra or weak digits are flagged."""
+        result = captcha_ai._decode_detections(*self._detections(digits, confidences))
+
+        assert result.ambiguous is True
+
+    def test_missing_digit_retries_with_lower_threshold(self, captcha_ai, monkeypatch):
+        """Test that a relaxed confidence threshold can recover a digit."""
+        calls = []
+
+        def fake_nms(output, iou_threshold=0.5, conf_threshold=0.25):
+            calls.append((iou_threshold, conf_threshold))
+            if conf_threshold < captcha_ai.CONF_THRESHOLD:
+                return self._detections([1, 2, 3, 4], [0.9, 0.9, 0.9, 0.6])
+            return self._detections([1, 2, 3], [0.9] * 3)
+
+        monkeypatch.setattr(captcha_ai, "_nms", fake_nms)
+
+        result = captcha_ai._postprocess(self._output([]))
+
+        assert result.text == "1234"
+        assert calls[1] == (captcha_ai.IOU_THRESHOLD, captcha_ai.RELAXED_CONF_THRESHOLD)
+        assert captcha_ai.metrics.counter("captcha_resolved_total").value == 1
+
+    def test_worse_retry_is_discarded(self, captcha_ai):
+        """Test that the original result is kept if the retry is no better."""
+        from services.captcha_cache import CaptchaResult
+
+        result = CaptchaResult("123", [0.9] * 3, ambiguous=True)
+        retry = CaptchaResult("12", [0.9] * 2, ambiguous=True)
+
+        assert captcha_ai._pick(result, retry) is result
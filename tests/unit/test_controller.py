@@ -0,0 +1,40 @@
+"""Tests for bot/controller.py."""
+
+from __future__ import annotations
+
+import gc
+import weakref
+
+import pytest
+
+from bot.controller import STATE_METRIC, STATE_SECONDS_METRIC, Controller
+from bot.event_manager import BotState
+from bot.player import Player
+from utils.metrics import MetricsRegistry
+
+
+class TestControllerMetrics:
+    """Tests for the Controller state metrics."""
+
+    @pytest.fixture
+    def registry(self):
+        """Return an isolated metrics registry."""
+        return MetricsRegistry()
+
+    def test_state_gauges_sum_live_controllers(self, config, registry):
+        """Test that controllers sharing a registry all count, and only while alive."""
+        first = Controller(Player.create(channel_id="1"), config, metrics=registry)
+        second = Controller(Player.create(channel_id="2"), config, metrics=registry)
+        first._enter_state(BotState.RUNNING)
+        second._enter_state(BotState.RUNNING)
+
+        labels = {"state": BotState.RUNNING.value}
+        assert registry.gauge(STATE_METRIC, labels=labels).value == 2
+        assert registry.gauge(STATE_SECONDS_METRIC, labels=labels).value >= 0
+
+        ref = weakref.ref(second)
+        del second
+        gc.collect()
+
+        assert ref() is None
+        assert registry.gauge(STATE_METRIC, labels=labels).value == 1
@@ -0,0 +1,108 @@
+"""Tests for utils/journal.py."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from utils.journal import (
+    EXP_ITEM,
+    KIND_BATTLE,
+    KIND_SELL,
+    Journal,
+    JournalEvent,
+    compute_rates,
+    iter_events,
+    parse_gains,
+    segments,
+)
+
+
+def test_parse_gains():
+    """Test splitting embed fields into items and gold."""
+    fields = [
+        {"name": "EXP", "value": "+1,250"},
+        {"name": "Gold", "value": "+50"},
+        {"name": "Iron Ore", "value": "x3"},
+        {"name": "Gem", "value": "found"},
+    ]
+
+    items, gold = parse_gains(fields)
+
+    assert items == [(EXP_ITEM, 1250), ("Iron Ore", 3), ("Gem", 1)]
+    assert gold == 50
+
+
+def test_event_line_round_trip():
+    """Test that events survive serialization, including odd names."""
+    event = JournalEvent(100, "main", KIND_BATTLE, "Myrkwood", "Tab\tItem", 2, 30)
+
+    parsed = JournalEvent.from_line(event.to_line())
+
+    assert parsed == JournalEvent(100, "main", KIND_BATTLE, "Myrkwood", "Tab Item", 2, 30)
+    assert JournalEvent.from_line("100\tmain\tbatt") is None
+
+
+class TestJournal:
+    """Tests for Journal class."""
+
+    def test_buffers_until_flush(self, tmp_path: Path):
+        """Test that events are appended in batches."""
+        journal = Journal(tmp_path, "main", buffer_size=3, flush_interval=3600)
+
+        journal.record(KIND_SELL, gold=10)
+        journal.record(KIND_SELL, gold=20)
+        assert list(iter_events(tmp_path)) == []
+
+        journal.record(KIND_SELL, gold=30)
+        assert [e.gold for e in iter_events(tmp_path)] == [10, 20, 30]
+
+    def test_segment_rotation(self, tmp_path: Path):
+        """Test that a full segment is closed and reading spans segments."""
+        journal = Journal(tmp_path, "main", buffer_size=1, segment_bytes=40)
+        for i in range(6):
+            journal.record(KIND_SELL, gold=i)
+
+        assert len(segments(tmp_path)) > 1
+        assert [e.gold for e in iter_events(tmp_path)] == list(range(6))
+
+    def test_accounts_and_restart(self, tmp_path: Path):
+        """Test that accounts have separate segments and restarts append."""
+        Journal(tmp_path, "a", buffer_size=1).record(KIND_SELL, gold=1)
+        Journal(tmp_path, "b", buffer_size=1).record(KIND_SELL, gold=2)
+        Journal(tmp_path, "a", buffer_size=1).record(KIND_SELL, gold=3)
+
+        assert [e.gold for e in iter_events(tmp_path, account="a")] == [1, 3]
+        assert len(segments(tmp_path)) == 2
+
+    def test_record_gains(self, tmp_path: Path):
+        """Test that gold is counted once per gain message."""
+        journal = Journal(tmp_path, "main")
+        fields = [{"name": "EXP", "value": "+100"}, {"name": "Gold", "value": "+50"},
+                  {"name": "Bone", "value": "+2"}]
+
+        journal.record_gains(KIND_BATTLE, "Myrkwood", *parse_gains(fields))
+        journal.flush()
+
+        events = list(iter_events(tmp_path))
+        assert [(e.item, e.quantity) for e in events] == [(EXP_ITEM, 100), ("Bone", 2)]
+        assert sum(e.gold for e in events) == 50
+
+
+def test_compute_rates():
+    """Test hourly rates per zone."""
+    events = [
+        JournalEvent(0, "main", KIND_BATTLE, "Myrkwood", EXP_ITEM, 100, 50),
+        JournalEvent(3600, "main", KIND_BATTLE, "Myrkwood", "Bone", 4, 50),
+        JournalEvent(0, "main", KIND_SELL, "", "Equipment F", 0, 10),
+    ]
+
+    rates = {s.key: s for s in compute_rates(events, by="zone")}
+
+    assert rates["Myrkwood"].per_hour(rates["Myrkwood"].exp) == 100
+    assert rates["Myrkwood"].per_hour(rates["Myrkwood"].gold) == 100
+    assert rates["Myrkwood"].items == 4
+    assert rates["-"].gold == 10
+    with pytest.raises(ValueError):
+        compute_rates(events, by="ts")
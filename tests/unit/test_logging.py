@@ -0,0 +1,288 @@
+"""Tests for utils/logging.py."""
+
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import queue
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from utils.logging import (
+    DROP_NEW,
+    DROP_OLDEST,
+    BoundedQueueHandler,
+    ColoredFormatter,
+    CompressingRotatingFileHandler,
+    ContextFilter,
+    ItemLogger,
+    JsonFormatter,
+    RollingWindow,
+    SamplingFilter,
+    dropped_records,
+    log_context,
+    set_log_context,
+    setup_logging,
+    shutdown_logging,
+)
+
+
+@pytest.fixture
+def restore_root_logger():
+    """Restore the root logger's handlers and level after a test."""
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield root
+    shutdown_logging()
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+def _record(msg: str) -> logging.LogRecord:
+    """Build a log record."""
+    return logging.makeLogRecord({"msg": msg, "levelno": logging.INFO, "levelname": "INFO"})
+
+
+class TestBoundedQueueHandler:
+    """Tests for BoundedQueueHandler class."""
+
+    def test_drop_new(self):
+        """Test that incoming records are dropped when the queue is full."""
+        log_queue: queue.Queue = queue.Queue(maxsize=2)
+        handler = BoundedQueueHandler(log_queue, DROP_NEW)
+
+        for i in range(5):
+            handler.handle(_record(f"m{i}"))
+
+        assert handler.dropped == 3
+        assert [log_queue.get_nowait().msg for _ in range(2)] == ["m0", "m1"]
+
+    def test_drop_oldest(self):
+        """Test that the oldest records make room for new ones."""
+        log_queue: queue.Queue = queue.Queue(maxsize=2)
+        handler = BoundedQueueHandler(log_queue, DROP_OLDEST)
+
+        for i in range(5):
+            handler.handle(_record(f"m{i}"))
+
+        assert handler.dropped == 3
+        assert [log_queue.get_nowait().msg for _ in range(2)] == ["m3", "m4"]
+
+    def test_formats_lazily(self):
+        """Test that arguments are left for the listener to format."""
+        log_queue: queue.Queue = queue.Queue()
+        record = logging.makeLogRecord({"msg": "%d tasks", "args": (3,)})
+
+        BoundedQueueHandler(log_queue).handle(record)
+
+        queued = log_queue.get_nowait()
+        assert queued.args == (3,) and queued.getMessage() == "3 tasks"
+
+    def test_unknown_policy(self):
+        """Test that an invalid drop policy is rejected."""
+        with pytest.raises(ValueError):
+            BoundedQueueHandler(queue.Queue(), "drop_all")
+
+
+class TestSamplingFilter:
+    """Tests for SamplingFilter class."""
+
+    def test_limits_per_interval(self, monkeypatch):
+        """Test that repetitive messages are limited and then summarized."""
+        now = [0.0]
+        monkeypatch.setattr("utils.logging.time.monotonic", lambda: now[0])
+        sampler = SamplingFilter(("Checking task",), limit=2, interval=10)
+
+        def check(msg: str, *args) -> bool:
+            return sampler.filter(logging.makeLogRecord({"msg": msg, "args": args}))
+
+        assert [check("Checking task <%s>", i) for i in range(5)] == [True, True, False, False, False]
+        assert check("Battle finish") is True
+
+        now[0] = 11.0
+        record = logging.makeLogRecord({"msg": "Checking task <%s>", "args": ("x",)})
+        assert sampler.filter(record) is True
+        assert record.getMessage() == "Checking task <x> [3 similar messages suppressed]"
+
+    def test_same_record_same_decision(self):
+        """Test that a record is counted once across handlers."""
+        sampler = SamplingFilter(("Try add task",), limit=1)
+        first = logging.makeLogRecord({"msg": "Try add task"})
+        second = logging.makeLogRecord({"msg": "Try add task"})
+
+        assert sampler.filter(first) and sampler.filter(first)
+        assert not sampler.filter(second) and not sampler.filter(second)
+
+
+class TestQueueLogging:
+    """Tests for setup_logging() queue mode."""
+
+    def test_records_written_by_listener(self, restore_root_logger, tmp_path: Path):
+        """Test that queued records reach the file by shutdown."""
+        log_file = tmp_path / "bot.log"
+        setup_logging(log_file=log_file, use_colors=False, queue_size=100)
+
+        logging.getLogger("test").info("queued %s", "message")
+        shutdown_logging()
+
+        assert "queued message" in log_file.read_text()
+
+    def test_slow_handler_does_not_block(self, restore_root_logger):
+        """Test that logging returns while the writer is stuck."""
+        setup_logging(use_colors=False, queue_size=10)
+        release = threading.Event()
+
+        class StuckHandler(logging.Handler):
+            def emit(self, record):
+                release.wait(5)
+
+        from utils import logging as log_module
+
+        log_module._listener.handlers = (StuckHandler(),)
+
+        start = time.perf_counter()
+        for i in range(50):
+            logging.getLogger("test").warning("burst %d", i)
+        elapsed = time.perf_counter() - start
+        dropped = dropped_records()
+        release.set()
+
+        assert elapsed < 1.0
+        assert dropped >= 39
+
+
+def test_colored_formatter_keeps_record():
+    """Test that coloring does not leak into other handlers."""
+    record = _record("hello")
+
+    colored = ColoredFormatter("%(levelname)s %(message)s").format(record)
+
+    assert "\033[" in colored
+    assert record.levelname == "INFO"
+    assert logging.Formatter("%(levelname)s").format(record) == "INFO"
+
+
+class TestJsonFormatter:
+    """Tests for JsonFormatter and the logging context."""
+
+    def test_stable_keys_with_context(self):
+        """Test that context fields are captured where the record is created."""
+        set_log_context(account="main")
+        try:
+            with log_context(task_type="NewBattle"):
+                record = logging.makeLogRecord({"msg": "done %d", "args": (1,), "levelname": "INFO"})
+                ContextFilter().filter(record)
+        finally:
+            set_log_context(account=None)
+
+        entry = json.loads(JsonFormatter().format(record))
+
+        assert entry["msg"] == "done 1"
+        assert entry["account"] == "main"
+        assert entry["task_type"] == "NewBattle"
+        assert entry["state"] is None and entry["message_id"] is None
+        assert list(entry)[:4] == ["ts", "level", "logger", "msg"]
+
+    def test_extra_overrides_context(self):
+        """Test that explicit extra values win over the context."""
+        record = logging.makeLogRecord({"msg": "x", "message_id": 42})
+        with log_context(message_id=1):
+            ContextFilter().filter(record)
+
+        assert json.loads(JsonFormatter().format(record))["message_id"] == 42
+
+
+class TestCompressingRotatingFileHandler:
+    """Tests for CompressingRotatingFileHandler class."""
+
+    def test_size_rotation_compresses(self, tmp_path: Path):
+        """Test that full segments are rotated and gzipped."""
+        handler = CompressingRotatingFileHandler(tmp_path / "bot.log", max_bytes=100)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        for i in range(10):
+            handler.handle(_record(f"line {i:02d} " + "x" * 20))
+        handler.wait_compressed()
+
+        segments = handler.segments()
+        handler.close()
+
+        assert segments and all(p.suffix == ".gz" for p in segments)
+        text = "".join(gzip.decompress(p.read_bytes()).decode() for p in segments)
+        text += (tmp_path / "bot.log").read_text()
+        assert [line[:7] for line in text.splitlines()] == [f"line {i:02d}" for i in range(10)]
+
+    def test_time_rotation_and_backup_count(self, tmp_path: Path, monkeypatch):
+        """Test age-based rotation and pruning of old segments."""
+        now = [1000.0]
+        monkeypatch.setattr("utils.logging.time.time", lambda: now[0])
+        handler = CompressingRotatingFileHandler(
+            tmp_path / "bot.log", rotate_seconds=60, backup_count=2, compress=False
+        )
+        for i in range(5):
+            handler.handle(_record(f"m{i}"))
+            now[0] += 61
+        handler.close()
+
+        assert len(handler.segments()) == 2
+
+
+class TestRollingWindow:
+    """Tests for RollingWindow class."""
+
+    def test_old_buckets_expire(self):
+        """Test that amounts leave the window once older than its span."""
+        window = RollingWindow(span=60, buckets=6)
+
+        window.add(0, items=1, gold=10)
+        window.add(30, items=2)
+
+        assert window.totals(59) == {"items": 3, "gold": 10, "exp": 0}
+        assert window.totals(65) == {"items": 2, "gold": 0, "exp": 0}
+        assert window.totals(1000) == {"items": 0, "gold": 0, "exp": 0}
+
+    def test_snapshot_round_trip(self):
+        """Test that a restored window continues where it left off."""
+        window = RollingWindow(span=60, buckets=6)
+        window.add(10, exp=5)
+
+        restored = RollingWindow(span=60, buckets=6)
+        restored.restore(window.snapshot())
+
+        assert restored.totals(20)["exp"] == 5
+        assert restored.totals(200)["exp"] == 0
+
+
+class TestItemLogger:
+    """Tests for ItemLogger class."""
+
+    def test_rates_per_window(self, monkeypatch):
+        """Test hourly rates over covered time."""
+        now = [10_000.0]
+        monkeypatch.setattr("utils.logging.time.time", lambda: now[0])
+        item_logger = ItemLogger()
+        monkeypatch.setattr(ItemLogger, "runtime", property(lambda self: 1800.0))
+
+        item_logger.log_gains([("EXP", 100), ("Bone", 3)], gold=40)
+
+        assert item_logger.get_summary() == {"EXP": 100, "Bone": 3}
+        assert item_logger.rates("1h") == {"items": 6.0, "gold": 80.0, "exp": 200.0}
+        assert item_logger.rates("5m") == {"items": 36.0, "gold": 480.0, "exp": 1200.0}
+
+        now[0] += 400
+        assert item_logger.rates("5m")["gold"] == 0
+
+    def test_snapshot_survives_restart(self):
+        """Test that totals and windows are restored from a snapshot."""
+        item_logger = ItemLogger()
+        item_logger.log_gold(500)
+        item_logger.log_gain("Bone", 2)
+
+        restarted = ItemLogger()
+        restarted.restore(json.loads(json.dumps(item_logger.snapshot())))
+
+        assert restarted.get_summary() == {"Bone": 2}
+        assert restarted.rates("24h")["gold"] == item_logger.rates("24h")["gold"]
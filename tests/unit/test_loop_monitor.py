@@ -0,0 +1,79 @@
+"""Tests for utils/loop_monitor.py."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+
+from utils.loop_monitor import (
+    LAG_METRIC,
+    STALLS_METRIC,
+    LoopMonitor,
+    SlowCallback,
+    _innermost,
+)
+from utils.metrics import MetricsRegistry
+
+
+def block_the_loop(seconds: float) -> None:
+    """Synchronous work that holds the event loop."""
+    time.sleep(seconds)
+
+
+async def test_records_lag_and_stall_stack():
+    """Test that a blocking call is recorded with its stack."""
+    registry = MetricsRegistry()
+    monitor = LoopMonitor(interval=0.01, threshold_ms=30, metrics=registry)
+    monitor.start()
+    try:
+        await asyncio.sleep(0.03)
+        block_the_loop(0.15)
+        await asyncio.sleep(0.05)
+    finally:
+        await monitor.stop()
+
+    assert registry.histogram(LAG_METRIC).count >= 2
+    assert registry.counter(STALLS_METRIC).value >= 1
+    worst = monitor.worst_stalls[0]
+    assert worst.duration_ms >= 100
+    assert "block_the_loop" in worst.stack
+    assert "in block_the_loop" in monitor.format()
+
+
+async def test_debug_mode_collects_slow_callbacks():
+    """Test that asyncio slow-callback reports are collected."""
+    loop = asyncio.get_running_loop()
+    debug, slow_callback_duration = loop.get_debug(), loop.slow_callback_duration
+    monitor = LoopMonitor(interval=0.01, threshold_ms=20, debug=True, metrics=MetricsRegistry())
+    monitor.start()
+    try:
+        assert loop.get_debug()
+        logging.getLogger("asyncio").warning("Executing %s took %.3f seconds", "<Handle cb()>", 0.25)
+    finally:
+        await monitor.stop()
+
+    assert loop.get_debug() == debug
+    assert loop.slow_callback_duration == slow_callback_duration
+    assert monitor.worst_callbacks[0].duration_ms == 250
+    assert "<Handle cb()>" in monitor.format()
+
+
+def test_keeps_only_worst_offenders():
+    """Test that only the longest stalls are kept."""
+    monitor = LoopMonitor(max_offenders=2, metrics=MetricsRegistry())
+    for duration in (150.0, 900.0, 300.0):
+        monitor._keep(monitor._worst_stalls, SlowCallback(duration, 0.0))
+
+    assert [s.duration_ms for s in monitor.worst_stalls] == [900.0, 300.0]
+
+
+def test_innermost_frame():
+    """Test formatting the innermost frame of a stack."""
+    stack = (
+        '  File "/app/main.py", line 10, in run\n    go()\n'
+        '  File "/app/bot/persistence.py", line 42, in save\n    dump()\n'
+    )
+
+    assert _innermost(stack) == "persistence.py:42 in save"
+    assert _innermost("") == "unknown"
@@ -0,0 +1,71 @@
+"""Tests for utils/memory.py."""
+
+from __future__ import annotations
+
+import tracemalloc
+
+import pytest
+
+from utils.memory import MemorySampler, rss_bytes, type_counts
+from utils.metrics import MetricsRegistry
+
+
+@pytest.fixture
+def sampler():
+    """Return a sampler, stopping tracemalloc afterwards."""
+    queued = []
+    sampler = MemorySampler(
+        frames=1,
+        max_samples=2,
+        counters={"queued": lambda: len(queued), "broken": lambda: 1 / 0},
+        metrics=MetricsRegistry(),
+    )
+    sampler.queued = queued
+    yield sampler
+    sampler.stop()
+
+
+class TestMemorySampler:
+    """Tests for MemorySampler class."""
+
+    def test_growth_against_baseline(self, sampler):
+        """Test that growth sites and subsystem counts are diffed."""
+        sampler.start()
+        assert tracemalloc.is_tracing()
+
+        leak = [bytearray(1024) for _ in range(200)]
+        sampler.queued.extend(range(4))
+        sample = sampler.sample()
+
+        assert sample.counts["queued"] == 4
+        assert "broken" not in sample.counts
+        assert sample.traced_bytes > 200 * 1024
+        assert sampler.growth[0][0].startswith("test_memory.py:")
+        report = sampler.format()
+        assert "queued: 4 (+4)" in report
+        assert "top growth:" in report
+        del leak
+
+    def test_series_is_bounded(self, sampler):
+        """Test that only the most recent samples are kept."""
+        for _ in range(3):
+            sampler.sample()
+
+        assert len(sampler.samples) == 2
+        assert "series (traced MB):" in sampler.format()
+
+    def test_reset_baseline(self, sampler):
+        """Test that resetting the baseline clears the growth."""
+        sampler.queued.extend(range(2))
+        sampler.reset_baseline()
+        sampler.sample()
+
+        assert "queued: 2 (+0)" in sampler.format()
+
+
+def test_helpers():
+    """Test RSS and type count helpers."""
+    assert rss_bytes() > 0
+    counts = type_counts(limit=3)
+    assert len(counts) == 3
+    assert all(name.startswith("type:") for name in counts)
@@ -0,0 +1,156 @@
+"""Tests for utils/metrics.py."""
+
+from __future__ import annotations
+
+import pytest
+
+from utils.metrics import Counter, Gauge, Histogram, MetricsRegistry
+
+
+class TestHistogram:
+    """Tests for Histogram class."""
+
+    def test_summary_statistics(self):
+        """Test count, sum, min, max and mean."""
+        histogram = Histogram("h")
+        for value in (3.0, 7.0, 20.0):
+            histogram.observe(value)
+
+        assert histogram.count == 3
+        assert histogram.sum == 30.0
+        assert histogram.min == 3.0
+        assert histogram.max == 20.0
+        assert histogram.mean == 10.0
+
+    def test_percentile_within_bounds(self):
+        """Test that percentiles stay within the observed range."""
+        histogram = Histogram("h", buckets=(10, 100))
+        for value in range(1, 101):
+            histogram.observe(float(value))
+
+        assert histogram.percentile(0) >= 1.0
+        assert 10.0 <= histogram.percentile(50) <= 100.0
+        assert histogram.percentile(100) == pytest.approx(100.0)
+        assert Histogram("empty").percentile(50) == 0.0
+
+    def test_overflow_bucket(self):
+        """Test that values above the last bucket are kept."""
+        histogram = Histogram("h", buckets=(1, 2))
+        histogram.observe(50.0)
+
+        assert histogram.bucket_counts == [0, 0, 1]
+        assert histogram.percentile(95) == 50.0
+
+
+class TestMetricsRegistry:
+    """Tests for MetricsRegistry class."""
+
+    def test_get_or_create(self):
+        """Test that names map to a single metric."""
+        registry = MetricsRegistry()
+
+        assert registry.counter("c") is registry.counter("c")
+        assert isinstance(registry.counter("c"), Counter)
+        assert registry.histogram("h") is registry.histogram("h")
+
+    def test_timer(self):
+        """Test timing a block into a histogram."""
+        registry = MetricsRegistry()
+        with registry.timer("stage_ms"):
+            pass
+
+        assert registry.histogram("stage_ms").count == 1
+
+    def test_format_with_prefix(self):
+        """Test the text report filters and strips the prefix."""
+        registry = MetricsRegistry()
+        registry.counter("captcha_empty_total").inc(2)
+        registry.counter("other_total").inc()
+
+        report = registry.format("captcha_")
+
+        assert report == "empty_total: 2"
+        assert list(registry.snapshot("captcha_")) == ["captcha_empty_total"]
+
+    def test_labels_are_separate_metrics(self):
+        """Test that each label set gets its own metric."""
+        registry = MetricsRegistry()
+        registry.counter("tasks_total", labels={"task_type": "Verify"}).inc()
+        other = registry.counter("tasks_total", labels={"task_type": "Food"})
+
+        assert other.value == 0
+        assert other.key == 'tasks_total{task_type="Food"}'
+        assert registry.format() == 'tasks_total{task_type="Food"}: 0\ntasks_total{task_type="Verify"}: 1'
+
+
+class TestGauge:
+    """Tests for Gauge class."""
+
+    def test_set_inc_dec(self):
+        """Test setting and adjusting the value."""
+        gauge = Gauge("g")
+        gauge.set(5)
+        gauge.inc(2)
+        gauge.dec()
+
+        assert gauge.value == 6
+
+    def test_function(self):
+        """Test that a function is read when the gauge is reported."""
+        depth = [3]
+        gauge = Gauge("g")
+        gauge.set_function(lambda: depth[0])
+        depth[0] = 7
+
+        assert gauge.value == 7
+        assert gauge.snapshot() == {"type": "gauge", "value": 7.0}
+
+
+class TestExpose:
+    """Tests for the Prometheus exposition format."""
+
+    def test_counter_and_gauge(self):
+        """Test HELP/TYPE lines are written once per metric name."""
+        registry = MetricsRegistry()
+        registry.counter("rejected_total", "Rejected tasks", {"task_type": "Food"}).inc(2)
+        registry.counter("rejected_total", "Rejected tasks", {"task_type": "Inventory"})
+        registry.gauge("depth").set(3)
+
+        text = registry.expose()
+
+        assert text == (
+            "# TYPE depth gauge\n"
+            "depth 3\n"
+            "# HELP rejected_total Rejected tasks\n"
+            "# TYPE rejected_total counter\n"
+            'rejected_total{task_type="Food"} 2\n'
+            'rejected_total{task_type="Inventory"} 0\n'
+        )
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test histogram buckets, sum and count."""
+        registry = MetricsRegistry()
+        histogram = registry.histogram("wait_ms", buckets=(10, 100), labels={"task_type": "Verify"})
+        for value in (5.0, 50.0, 500.0):
+            histogram.observe(value)
+
+        lines = registry.expose().splitlines()
+
+        assert lines[1:] == [
+            'wait_ms_bucket{le="10",task_type="Verify"} 1',
+            'wait_ms_bucket{le="100",task_type="Verify"} 2',
+            'wait_ms_bucket{le="+Inf",task_type="Verify"} 3',
+            'wait_ms_sum{task_type="Verify"} 555',
+            'wait_ms_count{task_type="Verify"} 3',
+        ]
+
+    def test_failing_gauge_skipped(self):
+        """Test that a failing gauge function does not break the scrape."""
+        registry = MetricsRegistry()
+        registry.gauge("broken").set_function(lambda: 1 / 0)
+        registry.counter("ok_total").inc()
+
+        lines = registry.expose().splitlines()
+
+        assert "ok_total 1" in lines
+        assert not [line for line in lines if line.startswith("broken")]
@@ -0,0 +1,27 @@
+"""Tests for utils/metrics_server.py."""
+
+from __future__ import annotations
+
+import aiohttp
+
+from utils.metrics import MetricsRegistry
+from utils.metrics_server import MetricsServer
+
+
+async def test_serves_exposition_text():
+    """Test that /metrics serves the registry on localhost."""
+    registry = MetricsRegistry()
+    registry.counter("scrapes_total").inc(4)
+    server = MetricsServer(0, registry=registry)
+    await server.start()
+    try:
+        assert server.port != 0
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"http://127.0.0.1:{server.port}/metrics") as response:
+                body = await response.text()
+                content_type = response.headers["Content-Type"]
+    finally:
+        await server.close()
+
+    assert "scrapes_total 4" in body
+    assert content_type.startswith("text/plain; version=0.0.4")
@@ -0,0 +1,110 @@
+"""Tests for bot/persistence.py."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from bot.persistence import DebouncedWriter, atomic_write_json, atomic_write_text
+from bot.player import Player, UserData
+
+
+class TestAtomicWrite:
+    """Tests for atomic write helpers."""
+
+    def test_replaces_contents(self, tmp_path: Path):
+        """Test that the file holds the new contents and no temp files remain."""
+        path = tmp_path / "state.json"
+        path.write_text("old")
+
+        atomic_write_json(path, {"zone_index": 3})
+
+        assert json.loads(path.read_text()) == {"zone_index": 3}
+        assert [p.name for p in tmp_path.iterdir()] == ["state.json"]
+
+    def test_failure_keeps_old_file(self, tmp_path: Path, monkeypatch):
+        """Test that a failed write leaves the previous contents intact."""
+        path = tmp_path / "state.json"
+        path.write_text("old")
+
+        def broken_replace(src, dst):
+            raise OSError("disk full")
+
+        monkeypatch.setattr("bot.persistence.os.replace", broken_replace)
+
+        with pytest.raises(OSError):
+            atomic_write_text(path, "new")
+
+        assert path.read_text() == "old"
+        assert [p.name for p in tmp_path.iterdir()] == ["state.json"]
+
+
+class TestDebouncedWriter:
+    """Tests for DebouncedWriter class."""
+
+    @pytest.mark.asyncio
+    async def test_burst_collapsed_into_one_write(self, tmp_path: Path):
+        """Test that quick successive saves produce a single write."""
+        path = tmp_path / "state.json"
+        writer = DebouncedWriter.for_json(path, delay=60)
+
+        for zone in range(5):
+            writer.schedule({"zone_index": zone})
+        assert not path.exists()
+
+        await writer.flush()
+
+        assert json.loads(path.read_text()) == {"zone_index": 4}
+        assert writer.writes == 1
+        assert writer.scheduled == 5
+        assert writer.pending is False
+
+    @pytest.mark.asyncio
+    async def test_writes_after_delay(self, tmp_path: Path):
+        """Test that a save is written once the delay expires."""
+        import asyncio
+
+        path = tmp_path / "state.json"
+        writer = DebouncedWriter.for_json(path, delay=0.01)
+        writer.schedule({"zone_index": 1})
+
+        for _ in range(100):
+            if path.exists():
+                break
+            await asyncio.sleep(0.01)
+
+        assert json.loads(path.read_text()) == {"zone_index": 1}
+
+    def test_sync_without_event_loop(self, tmp_path: Path):
+        """Test that saves are written immediately outside the event loop."""
+        path = tmp_path / "state.json"
+
+        DebouncedWriter.for_json(path).schedule({"zone_index": 2})
+
+        assert json.loads(path.read_text()) == {"zone_index": 2}
+
+
+class TestUserDataPersistence:
+    """Tests for crash-safe user data handling."""
+
+    def test_corrupt_file_is_kept(self, tmp_path: Path):
+        """Test that a corrupt file is moved aside rather than overwritten."""
+        path = tmp_path / "user_data.json"
+        path.write_text('{"zone_index": 7')
+
+        assert UserData.load(path).zone_index == 0
+        assert not path.exists()
+        assert any(p.name.startswith("user_data.json.corrupt-") for p in tmp_path.iterdir())
+
+    @pytest.mark.asyncio
+    async def test_player_flush(self, tmp_path: Path):
+        """Test that a scheduled player save is written on flush."""
+        path = tmp_path / "user_data.json"
+        player = Player(user_data=UserData(zone_index=4))
+
+        player.save_user_data(path)
+        await player.flush_user_data()
+
+        assert UserData.load(path).zone_index == 4
@@ -0,0 +1,59 @@
+"""Tests for utils/profiler.py."""
+
+from __future__ import annotations
+
+import threading
+import time
+
+from utils.profiler import SamplingProfiler
+
+
+def busy_worker(stop: threading.Event) -> None:
+    """Burn CPU in a thread until stopped."""
+    while not stop.is_set():
+        sum(range(1000))
+
+
+class TestSamplingProfiler:
+    """Tests for SamplingProfiler class."""
+
+    def test_samples_other_threads(self, tmp_path):
+        """Test that work in another thread is sampled and written."""
+        stop = threading.Event()
+        worker = threading.Thread(target=busy_worker, args=(stop,), name="worker")
+        worker.start()
+        profiler = SamplingProfiler(interval=0.002)
+        profiler.start()
+        time.sleep(0.2)
+        profiler.stop()
+        stop.set()
+        worker.join()
+
+        functions = [frame for frame, _, _ in profiler.top(20)]
+        assert any(frame.startswith("busy_worker") for frame in functions)
+        assert not any("_sample_loop" in frame for frame in functions)
+
+        path = profiler.write_collapsed(tmp_path / "out" / "profile.collapsed")
+        line = next(l for l in path.read_text().splitlines() if "busy_worker" in l)
+        assert line.startswith("worker;")
+        assert int(line.rsplit(" ", 1)[1]) >= 1
+
+    def test_top_counts_cumulative_and_self(self):
+        """Test cumulative vs self time, counting recursion once."""
+        profiler = SamplingProfiler(interval=0.5)
+        profiler.samples[("main", "run", "parse", "parse")] = 2
+        profiler.samples[("main", "run")] = 1
+
+        top = profiler.top()
+
+        assert top[0] == ("run", 1.5, 0.5)
+        assert top[1] == ("parse", 1.0, 1.0)
+
+    async def test_profile_does_not_block_loop(self):
+        """Test profiling from a coroutine."""
+        profiler = SamplingProfiler(interval=0.005)
+        await profiler.profile(0.05)
+
+        assert not profiler.running
+        assert profiler.sample_count >= 1
+        assert "samples over" in profiler.format_top()
@@ -0,0 +1,285 @@
+"""Tests for the offline Isekaid simulator."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from typing import List, Tuple
+
+import pytest
+
+from simulator import GameSettings, IsekaidGame, VirtualClock, run, simulate
+from simulator.fakes import FakeChannel, FakeGuild, FakeMessage, FakeUser
+from utils.helpers import message_extractor
+
+
+class Recorder:
+    """A game wired to lists of the messages and edits it produces."""
+
+    def __init__(self, **settings) -> None:
+        self.player = FakeUser(1, "Tester")
+        self.channel = FakeChannel(10, guild=FakeGuild(100), author=self.player)
+        self.treasure = FakeChannel(20, guild=FakeGuild(200), author=self.player)
+        settings.setdefault("emoji_chance", 0.0)
+        settings.setdefault("captcha_chance", 0.0)
+        self.game = IsekaidGame(
+            self.player,
+            self.channel,
+            GameSettings(**settings),
+            treasure_channel=self.treasure,
+            rng=random.Random(1),
+        )
+        self.messages: List[FakeMessage] = []
+        self.edits: List[Tuple[FakeMessage, FakeMessage]] = []
+        self.game.on_message = self.messages.append
+        self.game.on_edit = lambda before, after: self.edits.append((before, after))
+        self.channel.on_send = self.game.receive
+
+    async def send(self, content: str, wait: float = 1.0) -> None:
+        await self.channel.send(content)
+        await asyncio.sleep(wait)
+
+    def titles(self) -> List[str]:
+        return [message_extractor(m).title for m in self.messages]
+
+
+class TestVirtualClock:
+    """Tests for the virtual-time event loop."""
+
+    def test_sleep_advances_clock_not_wall_time(self):
+        clock = VirtualClock(start=1_000_000.0)
+
+        async def nap():
+            await asyncio.sleep(3600)
+            return time.time()
+
+        started = time.perf_counter()
+        now = run(nap(), clock)
+
+        assert time.perf_counter() - started < 5
+        assert clock.elapsed == pytest.approx(3600)
+        assert now == pytest.approx(1_003_600.0)
+
+    def test_install_patches_datetime_in_listed_modules(self):
+        import utils.logging
+
+        clock = VirtualClock(start=0.0)
+        with clock.install():
+            clock.advance(90)
+            assert utils.logging.datetime.now().timestamp() == pytest.approx(90)
+        assert utils.logging.datetime.now().timestamp() > 1e9
+
+    def test_speed_runs_proportionally(self):
+        clock = VirtualClock(speed=100)
+        started = time.perf_counter()
+        run(asyncio.sleep(5), clock)
+        assert 0.04 <= time.perf_counter() - started < 2
+
+
+class TestIsekaidGame:
+    """Tests for the simulated game responses."""
+
+    def test_battle_window_and_victory(self):
+        async def scenario():
+            rec = Recorder(battle_seconds=10)
+            await rec.send("$map")
+            window = rec.messages[-1]
+            assert message_extractor(window).title == "Current Floor: 1"
+            assert len(window.components[0].children) == 4
+            assert window.components[2].children[0].options[0].label == "Start Zone"
+
+            await window.components[0].children[0].click()
+            await asyncio.sleep(1)
+            assert rec.titles()[-1] == "BATTLE STARTED"
+            await asyncio.sleep(10)
+            victory = message_extractor(rec.messages[-1])
+            assert victory.title.startswith("You Defeated A")
+            assert {f["name"] for f in victory.fields} >= {"EXP", "Gold"}
+            await rec.game.stop()
+            return rec
+
+        rec = run(scenario())
+        assert rec.game.stats.battles_won == 1
+
+    def test_energy_runs_out(self):
+        async def scenario():
+            rec = Recorder(energy_max=1, battle_seconds=1)
+            await rec.send("$map")
+            window = rec.messages[-1]
+            await window.components[0].children[0].click()
+            await asyncio.sleep(3)
+            await window.components[0].children[0].click()
+            await asyncio.sleep(1)
+            await rec.game.stop()
+            return rec
+
+        rec = run(scenario())
+        assert message_extractor(rec.messages[-1]).desc == "You don't have enough energy to battle!"
+        assert rec.game.stats.energy_denied == 1
+
+    def test_cooldown_and_busy_prompts(self):
+        async def scenario():
+            rec = Recorder(command_cooldown=5)
+            await rec.send("$mine", wait=0)
+            await rec.send("$mine")
+            window = rec.messages[0]
+            await window.components[0].children[0].click()
+            await asyncio.sleep(6)
+            await rec.send("$mine")
+            await rec.game.stop()
+            return rec
+
+        rec = run(scenario())
+        assert rec.game.stats.cooldown_hits == 1
+        assert rec.messages[-1].content == "You are already mining"
+        assert message_extractor(rec.edits[0][1]).title == "You started mining!"
+
+    def test_profession_completes_with_edit(self):
+        async def scenario():
+            rec = Recorder(profession_seconds=30)
+            await rec.send("$fish")
+            await rec.messages[-1].components[0].children[0].click()
+            await asyncio.sleep(31)
+            await rec.game.stop()
+            return rec
+
+        rec = run(scenario())
+        before, after = rec.edits[-1]
+        assert message_extractor(before).title == "You cast your rod!"
+        assert message_extractor(after).title.startswith("You caught a")
+
+    def test_captcha_lock_and_answers(self):
+        async def scenario():
+            rec = Recorder(captcha_chance=1.0)
+            await rec.send("$map")
+            captcha = rec.messages[-1]
+            data = message_extractor(captcha)
+            assert data.desc == "Please enter the captcha code from the image to verify."
+            assert data.emb_ref == "Tester"
+            code = rec.game.captcha_code(captcha.embeds[0].image.url)
+
+            await rec.send("$mine")
+            assert "Please complete the captcha" in message_extractor(rec.messages[-1]).desc
+            await rec.send("0" * (len(code) + 1))
+            assert message_extractor(rec.messages[-1]).desc == "Please Try doing $verify again."
+
+            await rec.send("$verify")
+            url = rec.messages[-1].embeds[0].image.url
+            assert url != captcha.embeds[0].image.url
+            await rec.send(rec.game.captcha_code(url))
+            assert message_extractor(rec.messages[-1]).desc == "Successfully Verified."
+            await rec.game.stop()
+            return rec
+
+        rec = run(scenario())
+        assert not rec.game.blocked
+        assert rec.game.stats.captcha_failures == 1
+
+    def test_emoji_check_marks_the_answer(self):
+        from cogs.verification import EMOJI_MAP, X_EMOJI_ID
+
+        async def scenario():
+            rec = Recorder(emoji_chance=1.0)
+            await rec.send("$forage")
+            await rec.game.stop()
+            return rec
+
+        rec = run(scenario())
+        buttons = rec.messages[-1].components[0].children
+        ids = [button.emoji.id for button in buttons]
+        assert ids.count(X_EMOJI_ID) == 3
+        assert [EMOJI_MAP[i] for i in ids if i != X_EMOJI_ID] == ["Forage"]
+
+    def test_hired_pages_and_collect(self):
+        async def scenario():
+            rec = Recorder(workers=2, worker_materials_per_hour=10)
+            await asyncio.sleep(2 * 3600 + 60)
+            await rec.send("$hired")
+            page = rec.messages[-1]
+            assert "Time elapsed: 2 hours\nMaterials produced: 20" in message_extractor(page).desc
+            await page.components[0].children[2].click()
+            await asyncio.sleep(1)
+            assert "Time elapsed: 0 hours" in message_extractor(page).desc
+            await page.components[0].children[1].click()
+            await asyncio.sleep(1)
+            await page.components[0].children[1].click()
+            await asyncio.sleep(1)
+            await rec.game.stop()
+            return rec
+
+        rec = run(scenario())
+        assert rec.game.stats.materials_collected == 20
+        assert not rec.messages[-1].components
+        assert "Time elapsed" not in message_extractor(rec.messages[-1]).desc
+
+    def test_sell_pays_for_dropped_equipment(self):
+        async def scenario():
+            rec = Recorder()
+            rec.game.equipment["E"] = 3
+            await rec.send("$sell equipment all E")
+            await rec.game.stop()
+            return rec
+
+        rec = run(scenario())
+        data = message_extractor(rec.messages[-1])
+        assert data.title == "Equipment Sold"
+        assert "You gained 1,200 Gold" in data.desc
+
+    def test_treasure_spawns_and_can_be_claimed_once(self):
+        async def scenario():
+            rec = Recorder(treasure_interval=60)
+            rec.game.start()
+            while not rec.messages:
+                await asyncio.sleep(5)
+            chest = rec.messages[0]
+            assert chest.channel is rec.treasure
+            assert message_extractor(chest).title == "Chest Spawned!"
+            await chest.components[0].children[0].click()
+            await asyncio.sleep(1)
+            await rec.game.stop()
+            return rec
+
+        rec = run(scenario())
+        assert rec.game.stats.treasures_claimed == 1
+        assert not rec.messages[0].components
+
+
+class TestSimulation:
+    """End-to-end runs of the real bot against the game."""
+
+    def test_bot_plays_the_game(self):
+        settings = GameSettings(captcha_chance=0.05, emoji_chance=0.05, treasure_interval=300)
+        result = simulate(1.0, settings=settings, seed=3, profession="mine")
+
+        game = result.game
+        assert result.final_state == "running"
+        assert result.virtual_seconds == pytest.approx(3600, abs=1)
+        assert game["battles_won"] > 0
+        assert game["professions_done"] > 0
+        assert game["hired_pages"] > 0
+        assert game["meals"] == 1
+        assert game["treasures_claimed"] > 0
+        assert game["captchas_shown"] == 0 or game["captchas_solved"] > 0
+        assert result.bot["gold_per_hour"] > 0
+
+
+class TestReplay:
+    """Record a simulated run, then replay it through a fresh bot."""
+
+    def test_recorded_traffic_replays_deterministically(self, tmp_path):
+        from simulator.replay import replay
+
+        settings = GameSettings(captcha_chance=0.0, emoji_chance=0.0, treasure_interval=0.0)
+        simulate(0.25, settings=settings, seed=5, profession="fish", record_dir=str(tmp_path))
+        (recording,) = tmp_path.glob("traffic-*.jsonl.gz")
+
+        first = replay(recording, seed=1)
+        second = replay(recording, seed=1)
+
+        assert first.events > 0
+        assert first.by_channel.get("g") == first.events
+        counts = first.action_counts()
+        assert counts.get("send $map", 0) > 0
+        assert any(action.startswith("click") for action in counts)
+        assert first.actions == second.actions
@@ -0,0 +1,127 @@
+"""Tests for bot/state_store.py."""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from bot.player import Player
+from bot.state_store import (
+    JsonStateStore,
+    SqliteStateStore,
+    migrate_legacy,
+    open_store,
+)
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def store(request, tmp_path: Path):
+    """Provide an empty store of each backend."""
+    if request.param == "json":
+        store = JsonStateStore(tmp_path / "state.json")
+    else:
+        store = SqliteStateStore(tmp_path / "state.db")
+    yield store
+    store.close()
+
+
+class TestStateStore:
+    """Tests shared by both backends."""
+
+    def test_load_missing(self, store):
+        """Test that an unknown key has no state."""
+        assert store.load("alice", "1") is None
+
+    def test_keys_are_isolated(self, store):
+        """Test that accounts and channels do not overwrite each other."""
+        store.save("alice", "1", {"zone_index": 1})
+        store.save("bob", "1", {"zone_index": 2})
+        store.save("alice", "2", {"zone_index": 3})
+        store.save("alice", "1", {"zone_index": 4})
+
+        assert store.load("alice", "1") == {"zone_index": 4}
+        assert store.load("bob", "1") == {"zone_index": 2}
+        assert sorted(store.keys()) == [("alice", "1"), ("alice", "2"), ("bob", "1")]
+
+    def test_second_handle_sees_writes(self, store):
+        """Test that another process's handle keeps both accounts."""
+        other = type(store)(store.path)
+        store.save("alice", "1", {"zone_index": 1})
+        other.save("bob", "1", {"zone_index": 2})
+
+        assert store.load("bob", "1") == {"zone_index": 2}
+        assert other.load("alice", "1") == {"zone_index": 1}
+        other.close()
+
+    async def test_writer_batches_accounts(self, store, monkeypatch):
+        """Test that pending saves of several accounts commit together."""
+        commits = []
+        save_many = store.save_many
+        monkeypatch.setattr(store, "save_many", lambda states: (commits.append(len(states)), save_many(states)))
+        store._writer = None
+
+        store.writer.schedule({("alice", "1"): {"zone_index": 1}})
+        store.writer.schedule({("bob", "1"): {"zone_index": 2}})
+        store.writer.schedule({("alice", "1"): {"zone_index": 3}})
+        await store.writer.flush()
+
+        assert commits == [2]
+        assert store.load("alice", "1") == {"zone_index": 3}
+        assert store.load("bob", "1") == {"zone_index": 2}
+
+
+def test_sqlite_uses_wal(tmp_path: Path):
+    """Test that the database is opened in WAL mode."""
+    SqliteStateStore(tmp_path / "state.db").close()
+
+    conn = sqlite3.connect(tmp_path / "state.db")
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    conn.close()
+
+
+def test_open_store_backend_and_sharing(tmp_path: Path):
+    """Test backend choice by suffix and one instance per path."""
+    assert isinstance(open_store(tmp_path / "a.db"), SqliteStateStore)
+    assert isinstance(open_store(tmp_path / "a.json"), JsonStateStore)
+    assert open_store(tmp_path / "a.db") is open_store(tmp_path / "a.db")
+
+
+def test_migrate_legacy(tmp_path: Path):
+    """Test that user_data.json is imported once and renamed."""
+    legacy = tmp_path / "user_data.json"
+    legacy.write_text(json.dumps({"last_eat_at": 5, "zone_index": 2}))
+    store = JsonStateStore(tmp_path / "state.json")
+
+    assert migrate_legacy(store, "alice", "1", legacy) == {"last_eat_at": 5, "zone_index": 2}
+    assert store.load("alice", "1")["zone_index"] == 2
+    assert not legacy.exists()
+    assert (tmp_path / "user_data.json.migrated").exists()
+    assert migrate_legacy(store, "bob", "1", legacy) is None
+
+
+class TestPlayerWithStore:
+    """Tests for Player persistence through a state store."""
+
+    def test_create_loads_from_store(self, tmp_path: Path):
+        """Test that the player's state comes from its account key."""
+        store = SqliteStateStore(tmp_path / "state.db")
+        store.save("alice", "1", {"last_eat_at": 7, "zone_index": 4})
+
+        player = Player.create("1", account="alice", store=store)
+
+        assert player.user_data.zone_index == 4
+        assert Player.create("1", account="bob", store=store).user_data.zone_index == 0
+
+    async def test_save_and_flush(self, tmp_path: Path):
+        """Test that saves reach the store after a flush."""
+        store = SqliteStateStore(tmp_path / "state.db")
+        player = Player.create("1", account="alice", store=store)
+        player.user_data.zone_index = 6
+
+        player.save_user_data()
+        await player.flush_user_data()
+
+        assert store.load("alice", "1")["zone_index"] == 6
@@ -3,11 +3,18 @@
 from __future__ import annotations
 
 import asyncio
+import gc
 import time
+import weakref
 
 import pytest
 
 from bot.task_manager import (
+    EXECUTE_METRIC,
+    EXPIRED_METRIC,
+    QUEUE_DEPTH_METRIC,
+    QUEUE_WAIT_METRIC,
+    REJECTED_METRIC,
     Task,
     TaskManager,
     TaskType,
@@ -15,6 +22,7 @@ from bot.task_manager import (
     get_default_rank,
     get_task_limit,
 )
+from utils.metrics import MetricsRegistry
 
 
 class TestTaskType:
@@ -317,3 +325,93 @@ class TestTaskManager:
 
         # High priority should execute first
         assert execution_order == ["high", "low"]
+
+
+class TestTaskManagerMetrics:
+    """Tests for the TaskManager queue metrics."""
+
+    @pytest.fixture
+    def registry(self):
+        """Return an isolated metrics registry."""
+        return MetricsRegistry()
+
+    @pytest.mark.asyncio
+    async def test_wait_execute_and_depth(self, registry):
+        """Test queue depth, wait and execution metrics per task type."""
+        manager = TaskManager(task_gap=0, task_bias=0, metrics=registry)
+
+        async def dummy():
+            return {}
+
+        manager.add_task(Task(func=dummy, expire_at=time.time() * 1000 + 60000, tag=TaskType.INV))
+        labels = {"task_type": TaskType.INV.value}
+        assert registry.gauge(QUEUE_DEPTH_METRIC, labels=labels).value == 1
+
+        await manager.check_and_execute()
+
+        assert registry.gauge(QUEUE_DEPTH_METRIC, labels=labels).value == 0
+        assert registry.histogram(QUEUE_WAIT_METRIC, labels=labels).count == 1
+        assert registry.histogram(EXECUTE_METRIC, labels=labels).count == 1
+
+    @pytest.mark.asyncio
+    async def test_expired_and_rejected_counted(self, registry):
+        """Test that expiries and limit rejections are counted."""
+        manager = TaskManager(task_gap=0, task_bias=0, metrics=registry)
+
+        async def dummy():
+            return {}
+
+        expired = Task(func=dummy, expire_at=time.time() * 1000 - 1000, tag=TaskType.FOOD)
+        manager.add_task(expired)
+        manager.add_task(Task(func=dummy, expire_at=time.time() * 1000, tag=TaskType.FOOD))
+        await manager.check_and_execute()
+
+        labels = {"task_type": TaskType.FOOD.value}
+        assert registry.counter(REJECTED_METRIC, labels=labels).value == 1
+        assert registry.counter(EXPIRED_METRIC, labels=labels).value == 1
+
+    def test_depth_sums_live_managers(self, registry):
+        """Test that managers sharing a registry all count, and only while alive."""
+        first = TaskManager(task_gap=0, task_bias=0, metrics=registry)
+        second = TaskManager(task_gap=0, task_bias=0, metrics=registry)
+
+        async def dummy():
+            return {}
+
+        for manager in (first, second):
+            manager.add_task(
+                Task(func=dummy, expire_at=time.time() * 1000 + 60000, tag=TaskType.INV)
+            )
+        labels = {"task_type": TaskType.INV.value}
+        assert registry.gauge(QUEUE_DEPTH_METRIC, labels=labels).value == 2
+
+        ref = weakref.ref(second)
+        del manager, second
+        gc.collect()
+
+        assert ref() is None
+        assert registry.gauge(QUEUE_DEPTH_METRIC, labels=labels).value == 1
+
+
+class TestTaskManagerTracing:
+    """Tests for tracing tasks back to their message."""
+
+    @pytest.mark.asyncio
+    async def test_task_spans_join_message_trace(self):
+        """Test that queue, wait and execute spans land in the task's trace."""
+        from utils.tracing import TRACER
+
+        manager = TaskManager(task_gap=0, task_bias=0, metrics=MetricsRegistry())
+
+        async def click():
+            return {}
+
+        with TRACER.activate("msg-1"):
+            task = Task(func=click, expire_at=time.time() * 1000 + 60000, info="click")
+        assert task.trace_id == "msg-1"
+
+        manager.add_task(task)
+        await manager.check_and_execute()
+
+        names = [span.name for span in TRACER.get("msg-1").spans]
+        assert names == ["queue", "bias_wait", "execute"]
@@ -0,0 +1,83 @@
+"""Tests for utils/tracing.py."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+from utils.tracing import Tracer, current_trace
+
+
+class TestTracer:
+    """Tests for Tracer class."""
+
+    def test_span_without_trace_is_noop(self):
+        """Test that spans outside a trace are not recorded."""
+        tracer = Tracer()
+        with tracer.span("parse"):
+            pass
+
+        assert tracer.traces() == []
+
+    def test_spans_join_active_trace(self):
+        """Test that spans are recorded under the active message id."""
+        tracer = Tracer()
+        with tracer.activate(42):
+            assert current_trace() == "42"
+            with tracer.span("parse", kind="battle"):
+                pass
+        assert current_trace() is None
+
+        trace = tracer.get(42)
+        assert [span.name for span in trace.spans] == ["parse"]
+        assert trace.spans[0].attrs == {"kind": "battle"}
+
+    async def test_tasks_inherit_trace(self):
+        """Test that tasks created inside a trace keep it after it is left."""
+        tracer = Tracer()
+
+        async def handler():
+            await asyncio.sleep(0)
+            with tracer.span("handler"):
+                pass
+
+        with tracer.activate("m1"):
+            task = asyncio.create_task(handler())
+        await task
+
+        assert [span.name for span in tracer.get("m1").spans] == ["handler"]
+
+    def test_ring_buffer_drops_oldest(self):
+        """Test that only the most recent traces are kept."""
+        tracer = Tracer(capacity=2)
+        for trace_id in ("a", "b", "c"):
+            with tracer.activate(trace_id):
+                pass
+
+        assert [trace.trace_id for trace in tracer.traces()] == ["b", "c"]
+        tracer.record("late", 0.0, 1.0, "a")
+        assert tracer.get("a") is None
+
+    def test_disabled(self):
+        """Test that a zero capacity disables tracing."""
+        tracer = Tracer(capacity=0)
+        with tracer.activate("m1"):
+            assert current_trace() is None
+
+        assert tracer.traces() == []
+
+    def test_export_chrome_format(self, tmp_path):
+        """Test exporting traces as Chrome trace events."""
+        tracer = Tracer()
+        with tracer.activate("m1"):
+            tracer.record("queue", 10.0, 10.5)
+
+        path = tmp_path / "traces.json"
+        assert tracer.export(path) == 1
+
+        events = json.loads(path.read_text())["traceEvents"]
+        assert events[0]["args"] == {"name": "message m1"}
+        assert events[1]["name"] == "queue"
+        assert events[1]["ts"] == 10_000_000
+        assert events[1]["dur"] == 500_000
+        assert "m1: " in tracer.format()
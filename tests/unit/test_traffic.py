@@ -0,0 +1,145 @@
+"""Tests for the Isekaid traffic recorder."""
+
+from __future__ import annotations
+
+import gzip
+import json
+
+import pytest
+
+from simulator.fakes import (
+    FakeActionRow,
+    FakeButton,
+    FakeChannel,
+    FakeEmbed,
+    FakeEmbedAuthor,
+    FakeEmbedImage,
+    FakeEmoji,
+    FakeGuild,
+    FakeMessage,
+    FakeSelect,
+    FakeSelectOption,
+    FakeUser,
+)
+from utils.traffic import (
+    CHANNEL_GAME,
+    CHANNEL_OTHER,
+    CHANNEL_TREASURE,
+    KIND_EDIT,
+    KIND_MESSAGE,
+    TrafficEvent,
+    TrafficRecorder,
+    read_traffic,
+)
+
+ISEKAID = FakeUser(1, "Isekaid", bot=True)
+PLAYER = FakeUser(42, "Hero")
+GAME = FakeChannel(100, guild=FakeGuild(1000))
+TREASURE = FakeChannel(200, guild=FakeGuild(2000))
+OTHER = FakeChannel(300, guild=FakeGuild(1000))
+
+
+def make_message(message_id=555, channel=GAME, author=ISEKAID, **kwargs) -> FakeMessage:
+    return FakeMessage(message_id, channel, author, guild=channel.guild, **kwargs)
+
+
+@pytest.fixture
+def recorder(tmp_path):
+    recorder = TrafficRecorder(tmp_path, "100", "2000", header={"profession": "fish"})
+    recorder.set_player("Hero", 42)
+    return recorder
+
+
+def read_all(recorder):
+    recorder.flush()
+    header, events = read_traffic(recorder.path)
+    return header, list(events)
+
+
+class TestTrafficRecorder:
+    """Tests for TrafficRecorder."""
+
+    def test_records_only_isekaid_messages(self, recorder):
+        recorder.record(KIND_MESSAGE, make_message(author=PLAYER, content="$map"))
+        recorder.record(KIND_MESSAGE, make_message(content="hello"))
+
+        header, events = read_all(recorder)
+        assert header["format"] == "isekaiz-traffic"
+        assert header["profession"] == "fish"
+        assert [e.content for e in events] == ["hello"]
+        assert recorder.recorded == 1
+
+    def test_anonymizes_ids_names_mentions_and_images(self, recorder):
+        embed = FakeEmbed(
+            "Verification",
+            "Hero, enter the code. <@42> <@!777>",
+            author=FakeEmbedAuthor("Hero"),
+            image=FakeEmbedImage("https://cdn.discordapp.com/attachments/1/2/captcha.png"),
+        )
+        embed.add_field("Hero", "+5")
+        message = make_message(987654321, embeds=[embed], mentions=[PLAYER])
+        recorder.record(KIND_MESSAGE, message)
+        recorder.record(KIND_EDIT, message)
+
+        _, events = read_all(recorder)
+        data = events[0].embeds[0]
+        assert data["d"] == "{player}, enter the code. <@{player}> <@0>"
+        assert data["a"] == "{player}"
+        assert data["i"] == "img:1"
+        assert data["f"] == [["{player}", "+5", True]]
+        assert events[0].mentions_player
+        assert [(e.kind, e.message_id) for e in events] == [(KIND_MESSAGE, 1), (KIND_EDIT, 1)]
+        raw = gzip.decompress(recorder.path.read_bytes()).decode()
+        assert "987654321" not in raw and "Hero" not in raw and "cdn.discord" not in raw
+
+    def test_classifies_channels(self, recorder):
+        for channel in (GAME, TREASURE, OTHER):
+            recorder.record(KIND_MESSAGE, make_message(channel=channel, content="x"))
+
+        _, events = read_all(recorder)
+        assert [e.channel for e in events] == [CHANNEL_GAME, CHANNEL_TREASURE, CHANNEL_OTHER]
+
+    def test_keeps_components(self, recorder):
+        buttons = [FakeButton("Start"), FakeButton("", emoji=FakeEmoji("1284730320133951592"))]
+        select = FakeSelect([FakeSelectOption("Start Zone"), FakeSelectOption("Myrkwood")])
+        message = make_message(components=[FakeActionRow(buttons), FakeActionRow([select])])
+        recorder.record(KIND_MESSAGE, message)
+
+        _, events = read_all(recorder)
+        assert events[0].components == [
+            [{"l": "Start"}, {"l": "", "e": "1284730320133951592"}],
+            [{"o": ["Start Zone", "Myrkwood"]}],
+        ]
+
+    def test_batches_are_appended_as_gzip_members(self, tmp_path):
+        recorder = TrafficRecorder(tmp_path, "100", buffer_size=3)
+        for i in range(7):
+            recorder.record(KIND_MESSAGE, make_message(i, content=f"m{i}"))
+        assert recorder.path.exists()  # Header + 2 events reached the buffer size
+
+        recorder.close()
+        _, events = read_traffic(recorder.path)
+        assert [e.content for e in events] == [f"m{i}" for i in range(7)]
+
+    def test_truncated_recording_keeps_complete_batches(self, tmp_path):
+        recorder = TrafficRecorder(tmp_path, "100", buffer_size=2)
+        for i in range(4):
+            recorder.record(KIND_MESSAGE, make_message(i, content=f"m{i}"))
+        recorder.close()
+        data = recorder.path.read_bytes()
+        recorder.path.write_bytes(data[:-10])
+
+        _, events = read_traffic(recorder.path)
+        assert [e.content for e in events][:3] == ["m0", "m1", "m2"]
+
+    def test_read_rejects_other_files(self, tmp_path):
+        path = tmp_path / "other.jsonl"
+        path.write_text(json.dumps({"hello": 1}) + "\n")
+        with pytest.raises(ValueError):
+            read_traffic(path)
+
+    def test_event_round_trip(self):
+        event = TrafficEvent(5, KIND_EDIT, 3, CHANNEL_GAME, content="c", mentions_player=True)
+        data = event.to_json()
+        assert "em" not in data and "co" not in data
+        assert TrafficEvent.from_json(data) == event
@@ -0,0 +1,381 @@
+"""Append-only journal of game outcomes.
+
+Battle and profession gains, equipment sales and retainer collections are
+recorded as typed events, one tab-separated line each::
+
+    <ts>\\t<account>\\t<kind>\\t<zone>\\t<item>\\t<quantity>\\t<gold>
+
+Events are buffered in memory and appended in batches to segment files
+(``journal-<account>-NNNNNN.tsv``); a segment is closed once it exceeds
+``segment_bytes``. Each account writes its own segments, so several bots
+can share a directory. Rates are computed by streaming the segments::
+
+    python -m utils.journal ./journal --account main --hours 24 --by zone
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from utils.logging import EXP_ITEM, get_logger
+
+logger = get_logger(__name__)
+
+# Event kinds
+KIND_BATTLE = "battle"
+KIND_PROFESSION = "profession"
+KIND_SELL = "sell"
+KIND_RETAINER = "retainer"
+
+SEGMENT_REGEX = re.compile(r"^journal-(.+)-(\d{6})\.tsv$")
+NUMBER_REGEX = re.compile(r"\d[\d,]*")
+
+GROUP_FIELDS = ("zone", "kind", "item", "account")
+
+
+@dataclass
+class JournalEvent:
+    """One recorded game outcome."""
+
+    ts: int
+    account: str
+    kind: str
+    zone: str = ""
+    item: str = ""
+    quantity: int = 0
+    gold: int = 0
+
+    def to_line(self) -> str:
+        """Serialize the event to a journal line."""
+        fields = (self.account, self.kind, self.zone, self.item)
+        text = "\t".join(_clean(f) for f in fields)
+        return f"{self.ts}\t{text}\t{self.quantity}\t{self.gold}\n"
+
+    @classmethod
+    def from_line(cls, line: str) -> Optional["JournalEvent"]:
+        """Parse a journal line.
+
+        Args:
+            line: Line as written by to_line().
+
+        Returns:
+            The event, or None if the line is malformed (e.g. torn by a crash).
+        """
+        parts = line.rstrip("\n").split("\t")
+        if len(parts) != 7:
+            return None
+        try:
+            return cls(
+                ts=int(parts[0]),
+                account=parts[1],
+                kind=parts[2],
+                zone=parts[3],
+                item=parts[4],
+                quantity=int(parts[5]),
+                gold=int(parts[6]),
+            )
+        except ValueError:
+            return None
+
+
+def _clean(value: str) -> str:
+    """Strip characters that would break the line format."""
+    return value.replace("\t", " ").replace("\n", " ").strip()
+
+
+def parse_number(text: str) -> int:
+    """Extract the first integer from text like "+1,250".
+
+    Args:
+        text: Text containing a number.
+
+    Returns:
+        The number, or 0 if there is none.
+    """
+    match = NUMBER_REGEX.search(text or "")
+    return int(match.group(0).replace(",", "")) if match else 0
+
+
+def parse_gains(fields: Iterable[Dict[str, Any]]) -> Tuple[List[Tuple[str, int]], int]:
+    """Split embed gain fields into items and gold.
+
+    Args:
+        fields: Embed fields like ``{"name": "Gold", "value": "+50"}``.
+
+    Returns:
+        Tuple of ([(item, quantity), ...], gold); experience is reported
+        as the EXP item.
+    """
+    items: List[Tuple[str, int]] = []
+    gold = 0
+    for field in fields:
+        name = str(field.get("name", "")).strip()
+        quantity = parse_number(str(field.get("value", "")))
+        if not name:
+            continue
+        if name.lower() == "gold":
+            gold += quantity
+        elif name.lower() in ("exp", "xp"):
+            items.append((EXP_ITEM, quantity))
+        else:
+            items.append((name, quantity or 1))
+    return items, gold
+
+
+class Journal:
+    """Buffered, rotating writer of journal events for one account."""
+
+    def __init__(
+        self,
+        directory: str | Path,
+        account: str,
+        buffer_size: int = 64,
+        flush_interval: float = 30.0,
+        segment_bytes: int = 16 * 1024 * 1024,
+    ) -> None:
+        """Initialize the journal, continuing the account's latest segment.
+
+        Args:
+            directory: Journal directory.
+            account: Account the events belong to.
+            buffer_size: Events buffered before they are appended.
+            flush_interval: Seconds after which buffered events are
+                appended on the next record.
+            segment_bytes: Size at which a new segment is started.
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.account = _clean(account)
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.segment_bytes = segment_bytes
+        self._buffer: List[str] = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+        own = [seg for seg in segments(self.directory) if _segment_account(seg) == self.account]
+        self._segment_id = _segment_number(own[-1]) if own else 1
+        self._segment_size = own[-1].stat().st_size if own else 0
+
+        # Statistics
+        self.recorded: int = 0
+
+    def record(
+        self,
+        kind: str,
+        zone: str = "",
+        item: str = "",
+        quantity: int = 0,
+        gold: int = 0,
+    ) -> None:
+        """Record one event.
+
+        Args:
+            kind: Event kind (KIND_BATTLE, KIND_SELL, ...).
+            zone: Battle zone or profession.
+            item: Item gained (EXP_ITEM for experience).
+            quantity: Number of items.
+            gold: Gold gained.
+        """
+        event = JournalEvent(int(time.time()), self.account, kind, zone, item, quantity, gold)
+        with self._lock:
+            self._buffer.append(event.to_line())
+            self.recorded += 1
+            due = time.monotonic() - self._last_flush >= self.flush_interval
+            if len(self._buffer) >= self.buffer_size or due:
+                self._flush_locked()
+
+    def record_gains(
+        self,
+        kind: str,
+        zone: str,
+        items: Sequence[Tuple[str, int]],
+        gold: int = 0,
+    ) -> None:
+        """Record the gains of one game message.
+
+        Args:
+            kind: Event kind.
+            zone: Battle zone or profession.
+            items: (item, quantity) pairs, as from parse_gains().
+            gold: Gold gained.
+        """
+        if not items:
+            self.record(kind, zone, gold=gold)
+            return
+        # Gold is attached to the first row so totals are not double-counted
+        for i, (item, quantity) in enumerate(items):
+            self.record(kind, zone, item, quantity, gold if i == 0 else 0)
+
+    def flush(self) -> None:
+        """Append buffered events to the current segment."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        """Append buffered events (lock held)."""
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        if self._segment_size >= self.segment_bytes:
+            self._segment_id += 1
+            self._segment_size = 0
+
+        data = "".join(self._buffer)
+        self._buffer.clear()
+        path = self.directory / f"journal-{self.account}-{self._segment_id:06d}.tsv"
+        try:
+            with path.open("a", encoding="utf-8") as f:
+                f.write(data)
+        except OSError as e:
+            logger.error(f"Error writing journal: {e}")
+            return
+        self._segment_size += len(data.encode("utf-8"))
+
+
+def _segment_account(path: Path) -> str:
+    """Get the account a segment belongs to."""
+    return SEGMENT_REGEX.match(path.name).group(1)
+
+
+def _segment_number(path: Path) -> int:
+    """Get the sequence number of a segment."""
+    return int(SEGMENT_REGEX.match(path.name).group(2))
+
+
+def segments(directory: str | Path) -> List[Path]:
+    """List journal segments, ordered by account and sequence.
+
+    Args:
+        directory: Journal directory.
+
+    Returns:
+        Segment paths.
+    """
+    directory = Path(directory)
+    if not directory.is_dir():
+        return []
+    found = [p for p in directory.iterdir() if SEGMENT_REGEX.match(p.name)]
+    return sorted(found, key=lambda p: (_segment_account(p), _segment_number(p)))
+
+
+def iter_events(
+    directory: str | Path,
+    account: Optional[str] = None,
+    since: Optional[int] = None,
+) -> Iterator[JournalEvent]:
+    """Stream events from the journal without loading it into memory.
+
+    Args:
+        directory: Journal directory.
+        account: Only read this account's segments.
+        since: Only yield events at or after this Unix timestamp.
+
+    Yields:
+        Events in file order.
+    """
+    for path in segments(directory):
+        if account is not None and _segment_account(path) != account:
+            continue
+        with path.open(encoding="utf-8") as f:
+            for line in f:
+                event = JournalEvent.from_line(line)
+                if event is None or (since is not None and event.ts < since):
+                    continue
+                yield event
+
+
+@dataclass
+class RateSummary:
+    """Totals and hourly rates of one group of events."""
+
+    key: str
+    events: int = 0
+    exp: int = 0
+    gold: int = 0
+    items: int = 0
+    first_ts: int = 0
+    last_ts: int = 0
+
+    @property
+    def hours(self) -> float:
+        """Get the time covered by the events (at least one minute)."""
+        return max(self.last_ts - self.first_ts, 60) / 3600
+
+    def per_hour(self, value: int) -> float:
+        """Convert a total into an hourly rate."""
+        return value / self.hours
+
+    def add(self, event: JournalEvent) -> None:
+        """Add an event to the totals."""
+        if not self.events:
+            self.first_ts = event.ts
+        self.events += 1
+        self.first_ts = min(self.first_ts, event.ts)
+        self.last_ts = max(self.last_ts, event.ts)
+        self.gold += event.gold
+        if event.item == EXP_ITEM:
+            self.exp += event.quantity
+        elif event.item:
+            self.items += event.quantity
+
+
+def compute_rates(events: Iterable[JournalEvent], by: str = "zone") -> List[RateSummary]:
+    """Aggregate events into per-group rates in a single pass.
+
+    Args:
+        events: Events to aggregate (may be a stream).
+        by: Event field to group by (zone, kind, item or account).
+
+    Returns:
+        Summaries sorted by gold per hour, highest first.
+
+    Raises:
+        ValueError: If the grouping field is unknown.
+    """
+    if by not in GROUP_FIELDS:
+        raise ValueError(f"Cannot group by {by!r}, expected one of {GROUP_FIELDS}")
+
+    groups: Dict[str, RateSummary] = {}
+    for event in events:
+        key = getattr(event, by) or "-"
+        summary = groups.get(key)
+        if summary is None:
+            summary = groups[key] = RateSummary(key)
+        summary.add(event)
+    return sorted(groups.values(), key=lambda s: s.per_hour(s.gold), reverse=True)
+
+
+def format_rates(summaries: List[RateSummary]) -> str:
+    """Format rate summaries as a table."""
+    lines = [f"{'group':<24} {'events':>8} {'hours':>7} {'exp/h':>10} {'gold/h':>10} {'items/h':>9}"]
+    for s in summaries:
+        lines.append(
+            f"{s.key[:24]:<24} {s.events:>8} {s.hours:>7.1f} {s.per_hour(s.exp):>10.0f} "
+            f"{s.per_hour(s.gold):>10.0f} {s.per_hour(s.items):>9.1f}"
+        )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="ISeKaiZ outcome journal rates")
+    parser.add_argument("directory", nargs="?", default="./journal", help="Journal directory")
+    parser.add_argument("--account", default=None, help="Only this account")
+    parser.add_argument("--hours", type=float, default=None, help="Only the last N hours")
+    parser.add_argument("--by", choices=GROUP_FIELDS, default="zone", help="Grouping field")
+    args = parser.parse_args()
+
+    since = int(time.time() - args.hours * 3600) if args.hours else None
+    events = iter_events(args.directory, args.account, since)
+    print(format_rates(compute_rates(events, args.by)))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,26 @@
 from __future__ import annotations
 
+import atexit
+import contextvars
+import copy
+import gzip
+import json
 import logging
+import logging.handlers
+import os
+import queue
+import shutil
 import sys
-from datetime import datetime
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from types import MappingProxyType
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from utils.metrics import REGISTRY
 
 # Default log format
 LOG_FORMAT = "%(asctime)s | %(levelname)-8s | %(name)s | %(message)s"
@@ -21,20 +37,393 @@ COLORS = {
 }
 
 
+# Queue drop policies when the logging queue is full
+DROP_NEW = "drop_new"        # discard the incoming record
+DROP_OLDEST = "drop_oldest"  # discard the oldest queued record
+DROP_POLICIES = (DROP_NEW, DROP_OLDEST)
+
+DROPPED_METRIC = "log_records_dropped"
+
+# Repetitive task queue messages limited by the sampling filter
+DEFAULT_SAMPLED_MESSAGES = (
+    "Try add task",
+    "Add task success",
+    "Checking task",
+    "Task completed",
+    "Delaying",
+)
+
+# Log file formats
+FORMAT_TEXT = "text"
+FORMAT_JSON = "json"
+
+# Context keys present on every JSON log line (null when unknown)
+CONTEXT_KEYS = ("account", "state", "task_type", "message_id")
+
+# Process-wide context (account, state) and per-task context (task_type,
+# message_id, inherited by asyncio tasks created while bound)
+_global_context: Dict[str, Any] = {}
+_task_context: contextvars.ContextVar[Mapping[str, Any]] = contextvars.ContextVar(
+    "log_context", default=MappingProxyType({})
+)
+
+# Background listener of the queue logging mode, if enabled
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional["BoundedQueueHandler"] = None
+
+
+def set_log_context(**fields: Any) -> None:
+    """Set process-wide context fields (e.g. account, state).
+
+    Args:
+        **fields: Context values; None removes a field.
+    """
+    for key, value in fields.items():
+        if value is None:
+            _global_context.pop(key, None)
+        else:
+            _global_context[key] = value
+
+
+@contextmanager
+def log_context(**fields: Any) -> Iterator[None]:
+    """Bind context fields (e.g. task_type, message_id) to the current task.
+
+    Asyncio tasks created inside the block inherit the fields.
+
+    Args:
+        **fields: Context values.
+    """
+    token = _task_context.set({**_task_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _task_context.reset(token)
+
+
+def bind_log_context(**fields: Any) -> None:
+    """Bind context fields to the current task until it ends.
+
+    Args:
+        **fields: Context values.
+    """
+    _task_context.set({**_task_context.get(), **fields})
+
+
+class ContextFilter(logging.Filter):
+    """Copies the logging context onto records where they are created.
+
+    Runs on the logging thread, so the context is captured even when the
+    record is formatted later by the queue listener. Values passed with
+    ``extra=`` take precedence.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Attach context fields to the record."""
+        context = {**_global_context, **_task_context.get()}
+        for key in CONTEXT_KEYS:
+            if not hasattr(record, key):
+                setattr(record, key, context.get(key))
+        return True
+
+
 class ColoredFormatter(logging.Formatter):
     """Formatter that adds colors to log levels for terminal output."""
 
     def format(self, record: logging.LogRecord) -> str:
         levelname = record.levelname
         if levelname in COLORS:
+            # Color a copy so other handlers see the plain level name
+            record = copy.copy(record)
             record.levelname = f"{COLORS[levelname]}{levelname}{COLORS['RESET']}"
         return super().format(record)
 
 
+class JsonFormatter(logging.Formatter):
+    """Formats records as single-line JSON objects with stable keys.
+
+    Every line has ``ts``, ``level``, ``logger``, ``msg`` and the context
+    keys (null when unknown); ``exc`` is added for exceptions.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Serialize a record."""
+        entry: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key in CONTEXT_KEYS:
+            entry[key] = getattr(record, key, None)
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+class CompressingRotatingFileHandler(logging.handlers.BaseRotatingHandler):
+    """File handler rotating by size and/or age, gzipping old segments.
+
+    Rotated segments are renamed to ``<file>.<UTC timestamp>`` and
+    compressed to ``.gz`` on a worker thread, so logging never waits for
+    compression.
+    """
+
+    def __init__(
+        self,
+        filename: str | Path,
+        max_bytes: int = 0,
+        rotate_seconds: float = 0,
+        backup_count: int = 0,
+        compress: bool = True,
+    ) -> None:
+        """Initialize the handler.
+
+        Args:
+            filename: Active log file.
+            max_bytes: Rotate once the file reaches this size (0 = never).
+            rotate_seconds: Rotate after this many seconds (0 = never).
+            backup_count: Rotated segments to keep (0 = keep all).
+            compress: Gzip rotated segments.
+        """
+        super().__init__(str(filename), "a", encoding="utf-8", delay=False)
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.backup_count = backup_count
+        self.compress = compress
+        self._rollover_at = time.time() + rotate_seconds if rotate_seconds else None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: List[Future] = []
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        """Check if the file must be rotated before writing a record."""
+        if self._rollover_at is not None and time.time() >= self._rollover_at:
+            return True
+        if self.max_bytes > 0 and self.stream is not None:
+            return self.stream.tell() >= self.max_bytes
+        return False
+
+    def doRollover(self) -> None:
+        """Rotate the file and hand the old segment to the compressor."""
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+
+        # Names sort chronologically, with a counter for the same second
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+        n = 0
+        target = f"{self.baseFilename}.{stamp}-{n:03d}"
+        while os.path.exists(target) or os.path.exists(target + ".gz"):
+            n += 1
+            target = f"{self.baseFilename}.{stamp}-{n:03d}"
+
+        if os.path.exists(self.baseFilename):
+            os.replace(self.baseFilename, target)
+            if self.compress:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(1, thread_name_prefix="log-gzip")
+                self._pending = [f for f in self._pending if not f.done()]
+                self._pending.append(self._executor.submit(self._compress, target))
+
+        self._prune()
+        if self.rotate_seconds:
+            self._rollover_at = time.time() + self.rotate_seconds
+        self.stream = self._open()
+
+    def segments(self) -> List[Path]:
+        """List rotated segments, oldest first."""
+        base = Path(self.baseFilename)
+        return sorted(base.parent.glob(base.name + ".*"))
+
+    def wait_compressed(self) -> None:
+        """Wait for pending compressions to finish."""
+        for future in self._pending:
+            future.result()
+        self._pending.clear()
+
+    def close(self) -> None:
+        """Close the file and finish pending compressions."""
+        super().close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    @staticmethod
+    def _compress(path: str) -> None:
+        """Gzip a rotated segment and remove the original."""
+        try:
+            with open(path, "rb") as src, gzip.open(path + ".gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.unlink(path)
+        except OSError as e:
+            sys.stderr.write(f"Log compression failed for {path}: {e}\n")
+
+    def _prune(self) -> None:
+        """Delete the oldest rotated segments beyond backup_count."""
+        if self.backup_count <= 0:
+            return
+        # A segment and its .gz being written count once
+        stems = sorted({str(p).removesuffix(".gz") for p in self.segments()})
+        for stem in stems[: -self.backup_count]:
+            for path in (stem, stem + ".gz"):
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that never blocks the logging thread.
+
+    Records are put on a bounded queue as-is; formatting and I/O happen on
+    the QueueListener thread. When the queue is full a record is dropped
+    according to the drop policy and counted.
+    """
+
+    def __init__(self, log_queue: queue.Queue, drop_policy: str = DROP_NEW) -> None:
+        """Initialize the handler.
+
+        Args:
+            log_queue: Bounded queue read by the listener.
+            drop_policy: DROP_NEW or DROP_OLDEST.
+
+        Raises:
+            ValueError: If the drop policy is unknown.
+        """
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy: {drop_policy}")
+        super().__init__(log_queue)
+        self._queue = log_queue  # ``self.queue`` is typed without get_nowait()
+        self.drop_policy = drop_policy
+        self.dropped: int = 0
+        self._dropped_metric = REGISTRY.counter(DROPPED_METRIC, "Log records dropped on a full queue")
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Pass the record through unformatted.
+
+        The message is formatted on the listener thread, so log arguments
+        must not be mutated after the call.
+        """
+        return copy.copy(record)
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """Queue a record, dropping one if the queue is full."""
+        try:
+            self._queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+
+        self.dropped += 1
+        self._dropped_metric.inc()
+        if self.drop_policy == DROP_OLDEST:
+            try:
+                self._queue.get_nowait()
+                self._queue.put_nowait(record)
+            except (queue.Empty, queue.Full):
+                pass
+
+
+class SamplingFilter(logging.Filter):
+    """Limits repetitive messages to a number per time interval.
+
+    Records whose message template starts with one of the prefixes are let
+    through at most ``limit`` times per ``interval`` seconds (per
+    template). The first record let through after suppression reports how
+    many were suppressed. Templates are matched before formatting, so use
+    %-style arguments for sampled messages.
+    """
+
+    def __init__(
+        self,
+        prefixes: Sequence[str] = DEFAULT_SAMPLED_MESSAGES,
+        limit: int = 10,
+        interval: float = 60.0,
+    ) -> None:
+        """Initialize the filter.
+
+        Args:
+            prefixes: Message template prefixes to sample.
+            limit: Records let through per interval and template.
+            interval: Length of a sampling window in seconds.
+        """
+        super().__init__()
+        self.prefixes = tuple(prefixes)
+        self.limit = limit
+        self.interval = interval
+        self._lock = threading.Lock()
+        # Template -> (window start, records seen, records suppressed)
+        self._windows: Dict[str, Tuple[float, int, int]] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Decide whether a record is emitted."""
+        decision = getattr(record, "_sampled", None)
+        if decision is not None:
+            return decision  # same record on another handler
+
+        template = record.msg if isinstance(record.msg, str) else ""
+        if not template.startswith(self.prefixes):
+            return True
+
+        now = time.monotonic()
+        with self._lock:
+            start, seen, suppressed = self._windows.get(template, (now, 0, 0))
+            if now - start >= self.interval:
+                start, seen = now, 0
+            seen += 1
+            decision = seen <= self.limit
+            if decision:
+                self._windows[template] = (start, seen, 0)
+            else:
+                self._windows[template] = (start, seen, suppressed + 1)
+
+        if decision and suppressed:
+            record.msg = f"{template} [%d similar messages suppressed]"
+            record.args = (*(record.args or ()), suppressed)
+        record._sampled = decision
+        return decision
+
+
+def shutdown_logging() -> None:
+    """Stop the background logging thread, writing out every queued record."""
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    _listener.stop()
+    dropped = _queue_handler.dropped if _queue_handler else 0
+    if dropped:
+        for handler in _listener.handlers:
+            handler.handle(
+                logging.makeLogRecord(
+                    {
+                        "name": __name__,
+                        "levelno": logging.WARNING,
+                        "levelname": "WARNING",
+                        "msg": f"{dropped} log records were dropped (logging queue full)",
+                    }
+                )
+            )
+    for handler in _listener.handlers:
+        if isinstance(handler, logging.FileHandler):
+            handler.close()
+    _listener = None
+    _queue_handler = None
+
+
 def setup_logging(
     level: int = logging.INFO,
     log_file: Optional[str | Path] = None,
     use_colors: bool = True,
+    queue_size: int = 0,
+    drop_policy: str = DROP_NEW,
+    sample_limit: int = 0,
+    sample_interval: float = 60.0,
+    log_format: str = FORMAT_TEXT,
+    max_bytes: int = 0,
+    rotate_seconds: float = 0,
+    backup_count: int = 0,
 ) -> None:
     """Configure logging for the bot.
 
@@ -42,32 +431,92 @@ def setup_logging(
         level: Logging level (e.g., logging.DEBUG, logging.INFO).
         log_file: Optional path to a log file.
         use_colors: Whether to use colored output in terminal.
+        queue_size: Write logs on a background thread through a queue of
+            this many records (0 = write synchronously).
+        drop_policy: What to drop when the queue is full (DROP_NEW or
+            DROP_OLDEST).
+        sample_limit: Let repetitive task queue messages through at most
+            this many times per ``sample_interval`` (0 = no sampling).
+        sample_interval: Sampling window in seconds.
+        log_format: Log file format, FORMAT_TEXT or FORMAT_JSON (JSON
+            lines with context keys).
+        max_bytes: Rotate the log file at this size (0 = never).
+        rotate_seconds: Rotate the log file at this age (0 = never);
+            rotated files are gzipped in the background.
+        backup_count: Rotated log files to keep (0 = keep all).
     """
+    global _listener, _queue_handler
+
     root_logger = logging.getLogger()
     root_logger.setLevel(level)
 
+    shutdown_logging()
+    for handler in root_logger.handlers:
+        if isinstance(handler, logging.FileHandler):
+            handler.close()
     root_logger.handlers.clear()
+    handlers: List[logging.Handler] = []
 
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(level)
 
+    console_formatter: logging.Formatter
     if use_colors and sys.stdout.isatty():
         console_formatter = ColoredFormatter(LOG_FORMAT, DATE_FORMAT)
     else:
         console_formatter = logging.Formatter(LOG_FORMAT, DATE_FORMAT)
 
     console_handler.setFormatter(console_formatter)
-    root_logger.addHandler(console_handler)
+    handlers.append(console_handler)
 
     # File handler (optional)
     if log_file:
         log_path = Path(log_file)
         log_path.parent.mkdir(parents=True, exist_ok=True)
 
-        file_handler = logging.FileHandler(log_path, encoding="utf-8")
+        if max_bytes > 0 or rotate_seconds > 0:
+            file_handler: logging.Handler = CompressingRotatingFileHandler(
+                log_path, max_bytes, rotate_seconds, backup_count
+            )
+        else:
+            file_handler = logging.FileHandler(log_path, encoding="utf-8")
         file_handler.setLevel(level)
-        file_handler.setFormatter(logging.Formatter(LOG_FORMAT, DATE_FORMAT))
-        root_logger.addHandler(file_handler)
+        if log_format == FORMAT_JSON:
+            file_handler.setFormatter(JsonFormatter())
+        else:
+            file_handler.setFormatter(logging.Formatter(LOG_FORMAT, DATE_FORMAT))
+        handlers.append(file_handler)
+
+    context = ContextFilter()
+    sampler = SamplingFilter(limit=sample_limit, interval=sample_interval) if sample_limit > 0 else None
+
+    if queue_size <= 0:
+        for handler in handlers:
+            if sampler:
+                handler.addFilter(sampler)
+            handler.addFilter(context)
+            root_logger.addHandler(handler)
+        return
+
+    # Queue mode: the logging call only enqueues; a listener thread
+    # formats and writes
+    _queue_handler = BoundedQueueHandler(queue.Queue(maxsize=queue_size), drop_policy)
+    if sampler:
+        _queue_handler.addFilter(sampler)
+    _queue_handler.addFilter(context)
+    _listener = logging.handlers.QueueListener(
+        _queue_handler.queue, *handlers, respect_handler_level=True
+    )
+    _listener.start()
+    root_logger.addHandler(_queue_handler)
+
+
+atexit.register(shutdown_logging)
+
+
+def dropped_records() -> int:
+    """Get the number of records dropped by the current logging queue."""
+    return _queue_handler.dropped if _queue_handler else 0
 
 
 def get_logger(name: str) -> logging.Logger:
@@ -82,23 +531,171 @@ def get_logger(name: str) -> logging.Logger:
     return logging.getLogger(name)
 
 
+# Item name used for experience gains
+EXP_ITEM = "EXP"
+
+# Quantities tracked by ItemLogger windows
+YIELD_METRICS = ("items", "gold", "exp")
+
+# Rolling windows: name -> (span in seconds, number of buckets)
+YIELD_WINDOWS: Dict[str, Tuple[int, int]] = {
+    "5m": (300, 60),
+    "1h": (3600, 60),
+    "24h": (86400, 96),
+}
+
+
+class RollingWindow:
+    """Sums of several quantities over a sliding time span.
+
+    The span is split into fixed-width buckets kept in a ring buffer;
+    buckets that fall out of the span are cleared as time advances, so an
+    update costs O(1) amortized and memory is constant.
+    """
+
+    def __init__(self, span: int, buckets: int, metrics: Sequence[str] = YIELD_METRICS) -> None:
+        """Initialize an empty window.
+
+        Args:
+            span: Window length in seconds.
+            buckets: Number of buckets (resolution = span / buckets).
+            metrics: Names of the summed quantities.
+        """
+        self.span = span
+        self.width = span / buckets
+        self.metrics = tuple(metrics)
+        self._buckets = [[0] * len(self.metrics) for _ in range(buckets)]
+        self._totals = [0] * len(self.metrics)
+        self._head: Optional[int] = None  # absolute index of the newest bucket
+
+    def add(self, now: float, **amounts: int) -> None:
+        """Add amounts at a point in time.
+
+        Args:
+            now: Unix timestamp.
+            **amounts: Amount per metric name.
+        """
+        bucket = self._advance(now)
+        for i, metric in enumerate(self.metrics):
+            amount = amounts.get(metric, 0)
+            if amount:
+                bucket[i] += amount
+                self._totals[i] += amount
+
+    def totals(self, now: float) -> Dict[str, int]:
+        """Get the sums over the window ending now.
+
+        Args:
+            now: Unix timestamp.
+
+        Returns:
+            Sum per metric.
+        """
+        self._advance(now)
+        return dict(zip(self.metrics, self._totals))
+
+    def _advance(self, now: float) -> List[int]:
+        """Move the head to now, clearing expired buckets."""
+        index = int(now // self.width)
+        size = len(self._buckets)
+        if self._head is None:
+            self._head = index
+        elif index > self._head:
+            for absolute in range(self._head + 1, min(index, self._head + size) + 1):
+                expired = self._buckets[absolute % size]
+                for i, value in enumerate(expired):
+                    self._totals[i] -= value
+                    expired[i] = 0
+            self._head = index
+        return self._buckets[self._head % size]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Serialize the window."""
+        return {"head": self._head, "buckets": [b[:] for b in self._buckets]}
+
+    def restore(self, data: Dict[str, Any]) -> None:
+        """Load a serialized window (ignored if its shape differs).
+
+        Args:
+            data: Output of snapshot().
+        """
+        buckets = data.get("buckets", [])
+        if len(buckets) != len(self._buckets) or any(len(b) != len(self.metrics) for b in buckets):
+            return
+        self._buckets = [list(b) for b in buckets]
+        self._totals = [sum(column) for column in zip(*self._buckets)]
+        self._head = data.get("head")
+
+
 class ItemLogger:
-    """Logger for tracking item gains and statistics."""
+    """Logger for tracking item gains and statistics.
+
+    Keeps totals since tracking started plus rolling windows (5m, 1h and
+    24h) of items, gold and exp, from which hourly yield rates are derived.
+    """
 
     def __init__(self) -> None:
         self._logger = get_logger("items")
         self._gains: dict[str, int] = {}
         self._start_time: datetime = datetime.now()
+        self._windows = {
+            name: RollingWindow(span, buckets) for name, (span, buckets) in YIELD_WINDOWS.items()
+        }
 
     def log_gain(self, item_name: str, quantity: int = 1) -> None:
         """Log an item gain.
 
         Args:
-            item_name: Name of the item gained.
+            item_name: Name of the item gained (EXP_ITEM counts as exp).
             quantity: Number of items gained.
         """
         self._gains[item_name] = self._gains.get(item_name, 0) + quantity
-        self._logger.info(f"+{quantity} {item_name}")
+        metric = "exp" if item_name == EXP_ITEM else "items"
+        self._add(**{metric: quantity})
+        self._logger.debug("+%d %s", quantity, item_name)
+
+    def log_gold(self, amount: int) -> None:
+        """Log gold gained.
+
+        Args:
+            amount: Gold gained.
+        """
+        if amount:
+            self._add(gold=amount)
+
+    def log_gains(self, items: Sequence[Tuple[str, int]], gold: int = 0) -> None:
+        """Log the gains of one game message.
+
+        Args:
+            items: (item name, quantity) pairs, as from journal.parse_gains().
+            gold: Gold gained.
+        """
+        for item_name, quantity in items:
+            self.log_gain(item_name, quantity)
+        self.log_gold(gold)
+
+    def _add(self, **amounts: int) -> None:
+        """Add amounts to every window."""
+        now = time.time()
+        for window in self._windows.values():
+            window.add(now, **amounts)
+
+    def rates(self, window: str = "1h") -> Dict[str, float]:
+        """Get hourly yield rates over a window.
+
+        A window that has not been covered yet (since tracking started) is
+        averaged over the covered time only.
+
+        Args:
+            window: Window name ("5m", "1h" or "24h").
+
+        Returns:
+            Items, gold and exp per hour.
+        """
+        rolling = self._windows[window]
+        covered = min(rolling.span, max(self.runtime, 60.0))
+        totals = rolling.totals(time.time())
+        return {metric: value * 3600 / covered for metric, value in totals.items()}
 
     def get_summary(self) -> dict[str, int]:
         """Get a summary of all item gains.
@@ -112,8 +709,37 @@ class ItemLogger:
         """Reset the item tracking."""
         self._gains.clear()
         self._start_time = datetime.now()
+        self._windows = {
+            name: RollingWindow(span, buckets) for name, (span, buckets) in YIELD_WINDOWS.items()
+        }
 
     @property
     def runtime(self) -> float:
         """Get runtime in seconds since tracking started."""
         return (datetime.now() - self._start_time).total_seconds()
+
+    @property
+    def item_count(self) -> int:
+        """Get the number of distinct items tracked."""
+        return len(self._gains)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Serialize totals and windows (for persisting across restarts)."""
+        return {
+            "start_time": self._start_time.timestamp(),
+            "gains": self._gains.copy(),
+            "windows": {name: w.snapshot() for name, w in self._windows.items()},
+        }
+
+    def restore(self, data: Dict[str, Any]) -> None:
+        """Load a snapshot taken by snapshot().
+
+        Args:
+            data: Serialized state.
+        """
+        self._gains = dict(data.get("gains", {}))
+        if "start_time" in data:
+            self._start_time = datetime.fromtimestamp(data["start_time"])
+        for name, window in data.get("windows", {}).items():
+            if name in self._windows:
+                self._windows[name].restore(window)
@@ -0,0 +1,267 @@
+"""Event loop lag monitor and slow-callback detector.
+
+Everything in the bot shares one asyncio loop, so synchronous work (model
+inference, JSON saves, logging) delays every other coroutine, including
+gateway heartbeats. The monitor measures this continuously:
+
+* A probe coroutine sleeps for ``interval`` and records how late it wakes
+  up (the scheduling lag).
+* A watchdog thread notices when the probe is overdue by more than
+  ``threshold_ms`` and captures the loop thread's stack while it is still
+  blocked, so each stall is recorded with the code that caused it.
+* Optionally, asyncio debug mode reports every callback that runs longer
+  than the threshold; those reports are collected too.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import logging
+import sys
+import threading
+import time
+import traceback
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from utils.logging import get_logger
+from utils.metrics import REGISTRY, MetricsRegistry
+
+logger = get_logger(__name__)
+
+DEFAULT_INTERVAL = 0.5  # seconds
+DEFAULT_THRESHOLD_MS = 100.0
+
+# Worst stalls and slow callbacks kept for reporting
+MAX_OFFENDERS = 5
+
+# Innermost frames kept from a captured stack
+STACK_LIMIT = 12
+
+# Metric names
+LAG_METRIC = "event_loop_lag_ms"
+MAX_LAG_METRIC = "event_loop_lag_max_ms"
+STALLS_METRIC = "event_loop_stalls_total"
+SLOW_CALLBACKS_METRIC = "event_loop_slow_callbacks_total"
+LAG_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+@dataclass(order=True)
+class SlowCallback:
+    """One stall of the event loop."""
+
+    duration_ms: float
+    ts: float = field(compare=False)  # Unix timestamp
+    description: str = field(default="", compare=False)
+    stack: str = field(default="", compare=False)
+
+
+class LoopMonitor:
+    """Measures event loop lag and records what blocked the loop."""
+
+    def __init__(
+        self,
+        interval: float = DEFAULT_INTERVAL,
+        threshold_ms: float = DEFAULT_THRESHOLD_MS,
+        debug: bool = False,
+        max_offenders: int = MAX_OFFENDERS,
+        metrics: Optional[MetricsRegistry] = None,
+    ) -> None:
+        """Initialize the monitor.
+
+        Args:
+            interval: Seconds between lag probes.
+            threshold_ms: Lag above which the loop counts as stalled.
+            debug: Enable asyncio debug mode to report slow callbacks (adds
+                overhead to every callback).
+            max_offenders: Worst stalls and slow callbacks kept.
+            metrics: Registry for lag metrics (the process-wide one by default).
+        """
+        self.interval = interval
+        self.threshold_ms = threshold_ms
+        self.debug = debug
+        self.max_offenders = max_offenders
+
+        registry = metrics or REGISTRY
+        self._lag = registry.histogram(LAG_METRIC, "Event loop wake-up lag", LAG_BUCKETS_MS)
+        registry.gauge(MAX_LAG_METRIC, "Largest event loop lag seen").set_function(
+            lambda: self.max_lag_ms
+        )
+        self._stalls = registry.counter(STALLS_METRIC, "Event loop stalls above the threshold")
+        self._slow_callbacks = registry.counter(
+            SLOW_CALLBACKS_METRIC, "Callbacks reported slow by asyncio debug mode"
+        )
+
+        self.last_lag_ms: float = 0.0
+        self.max_lag_ms: float = 0.0
+        self._worst_stalls: List[SlowCallback] = []
+        self._worst_callbacks: List[SlowCallback] = []
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._probe_task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+        self._deadline = 0.0  # Monotonic time the probe should have woken by
+        self._stall_stack = ""
+        self._filter: Optional[_SlowCallbackFilter] = None
+        # Loop debug flag and slow callback duration to restore on stop
+        self._saved_debug: Optional[Tuple[bool, float]] = None
+
+    @property
+    def running(self) -> bool:
+        """Check if the monitor is running."""
+        return self._probe_task is not None
+
+    @property
+    def worst_stalls(self) -> List[SlowCallback]:
+        """Get the longest stalls seen by the probe, longest first."""
+        return sorted(self._worst_stalls, reverse=True)
+
+    @property
+    def worst_callbacks(self) -> List[SlowCallback]:
+        """Get the slowest callbacks reported by asyncio, slowest first."""
+        return sorted(self._worst_callbacks, reverse=True)
+
+    def start(self) -> None:
+        """Start monitoring the running event loop."""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._deadline = time.monotonic() + self.interval
+        self._stopped.clear()
+        self._probe_task = asyncio.create_task(self._probe())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+        if self.debug:
+            self._saved_debug = (self._loop.get_debug(), self._loop.slow_callback_duration)
+            self._loop.set_debug(True)
+            self._loop.slow_callback_duration = self.threshold_ms / 1000
+            self._filter = _SlowCallbackFilter(self)
+            logging.getLogger("asyncio").addFilter(self._filter)
+
+    async def stop(self) -> None:
+        """Stop monitoring."""
+        self._stopped.set()
+        if self._probe_task:
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+            self._probe_task = None
+        if self._filter:
+            logging.getLogger("asyncio").removeFilter(self._filter)
+            self._filter = None
+        if self._saved_debug is not None and self._loop is not None:
+            debug, self._loop.slow_callback_duration = self._saved_debug
+            self._loop.set_debug(debug)
+            self._saved_debug = None
+        if self._watchdog:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+
+    def format(self) -> str:
+        """Format the lag statistics and worst offenders as a short report."""
+        p95 = self._lag.percentile(95)
+        lines = [
+            f"lag: last={self.last_lag_ms:.1f}ms p95={p95:.1f}ms max={self.max_lag_ms:.1f}ms",
+            f"stalls >{self.threshold_ms:.0f}ms: {self._stalls.value}",
+        ]
+        for stall in self.worst_stalls:
+            lines.append(f"  {stall.duration_ms:.0f}ms at {_innermost(stall.stack)}")
+        if self.debug:
+            lines.append(f"slow callbacks: {self._slow_callbacks.value}")
+            for callback in self.worst_callbacks:
+                lines.append(f"  {callback.duration_ms:.0f}ms {callback.description[:80]}")
+        return "\n".join(lines)
+
+    async def _probe(self) -> None:
+        """Measure wake-up lag until cancelled."""
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            self._deadline = time.monotonic() + self.interval
+            self._stall_stack = ""
+            await asyncio.sleep(self.interval)
+            lag_ms = max(0.0, loop.time() - start - self.interval) * 1000
+
+            self.last_lag_ms = lag_ms
+            self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+            self._lag.observe(lag_ms)
+            if lag_ms >= self.threshold_ms:
+                self._stalls.inc()
+                stall = SlowCallback(lag_ms, time.time(), stack=self._stall_stack)
+                self._keep(self._worst_stalls, stall)
+                logger.warning(
+                    "Event loop blocked for %.0fms at %s", lag_ms, _innermost(stall.stack)
+                )
+
+    def _watch(self) -> None:
+        """Capture the loop thread's stack while the probe is overdue."""
+        period = self.threshold_ms / 2000
+        frames = getattr(sys, "_current_frames", None)
+        while not self._stopped.wait(period):
+            overdue_ms = (time.monotonic() - self._deadline) * 1000
+            if overdue_ms < self.threshold_ms or self._stall_stack or frames is None:
+                continue
+            frame = frames().get(self._loop_thread_id)
+            if frame is not None:
+                stack = traceback.format_stack(frame, limit=STACK_LIMIT)
+                self._stall_stack = "".join(stack)
+
+    def _record_slow_callback(self, description: str, seconds: float) -> None:
+        """Record a slow callback reported by asyncio debug mode.
+
+        Args:
+            description: The callback, as formatted by asyncio.
+            seconds: Time the callback ran.
+        """
+        self._slow_callbacks.inc()
+        self._keep(self._worst_callbacks, SlowCallback(seconds * 1000, time.time(), description))
+
+    def _keep(self, heap: List[SlowCallback], item: SlowCallback) -> None:
+        """Add an offender, keeping only the worst ones."""
+        if len(heap) < self.max_offenders:
+            heapq.heappush(heap, item)
+        else:
+            heapq.heappushpop(heap, item)
+
+
+class _SlowCallbackFilter(logging.Filter):
+    """Collects asyncio's "Executing <handle> took N seconds" reports."""
+
+    def __init__(self, monitor: LoopMonitor) -> None:
+        """Initialize the filter.
+
+        Args:
+            monitor: Monitor receiving the reports.
+        """
+        super().__init__()
+        self.monitor = monitor
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Record slow callback reports and let every record through."""
+        if (
+            isinstance(record.msg, str)
+            and record.msg.startswith("Executing ")
+            and isinstance(record.args, tuple)
+            and len(record.args) == 2
+            and isinstance(record.args[1], (int, float))
+        ):
+            self.monitor._record_slow_callback(str(record.args[0]), float(record.args[1]))
+        return True
+
+
+def _innermost(stack: str) -> str:
+    """Get the innermost frame of a formatted stack as ``file:line in func``."""
+    for line in reversed(stack.splitlines()):
+        line = line.strip()
+        if line.startswith('File "'):
+            path, _, rest = line[6:].partition('", line ')
+            number, _, func = rest.partition(", in ")
+            return f"{path.rsplit('/', 1)[-1]}:{number} in {func}"
+    return "unknown"
@@ -0,0 +1,242 @@
+"""Memory footprint accounting with tracemalloc snapshot diffing.
+
+A ``MemorySampler`` starts tracemalloc, keeps the first snapshot as a
+baseline and, on every sample, records the traced and resident size, the
+object counts of the bot's subsystems (message cache, queued tasks, ...)
+and of the most common Python types. Samples form a bounded time series so
+steady growth is visible long before the process runs out of memory, and
+the snapshot diff against the baseline names the allocation sites that
+grew the most.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gc
+import os
+import time
+import tracemalloc
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from utils.logging import get_logger
+from utils.metrics import REGISTRY, MetricsRegistry
+
+logger = get_logger(__name__)
+
+DEFAULT_FRAMES = 5  # Stack frames kept per allocation
+DEFAULT_MAX_SAMPLES = 288  # 48 hours at one sample per 10 minutes
+
+# Python types whose instance counts are tracked per sample
+TYPE_COUNT_LIMIT = 10
+
+# Allocations made by the sampler itself are left out of the diff
+SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+)
+
+# Metric names
+TRACED_METRIC = "memory_traced_bytes"
+RSS_METRIC = "memory_rss_bytes"
+
+Growth = Tuple[str, int, int]  # (site, size diff in bytes, count diff)
+
+
+@dataclass
+class MemorySample:
+    """One point of the memory time series."""
+
+    ts: float  # Unix timestamp
+    traced_bytes: int
+    peak_bytes: int
+    rss_bytes: int
+    counts: Dict[str, int] = field(default_factory=dict)
+
+
+def rss_bytes() -> int:
+    """Get the resident set size of the process (0 if unknown)."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+
+        # Peak rather than current RSS, in KiB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == "Darwin" else peak * 1024
+    except (ImportError, OSError):
+        return 0
+
+
+def type_counts(limit: int = TYPE_COUNT_LIMIT) -> Dict[str, int]:
+    """Count live objects tracked by the garbage collector by type.
+
+    Args:
+        limit: Most common types returned.
+
+    Returns:
+        Mapping of ``type:<name>`` to instance count.
+    """
+    counts = Counter(type(obj).__name__ for obj in gc.get_objects())
+    return {f"type:{name}": count for name, count in counts.most_common(limit)}
+
+
+class MemorySampler:
+    """Periodically samples memory use and diffs it against a baseline."""
+
+    def __init__(
+        self,
+        interval: float = 600.0,
+        frames: int = DEFAULT_FRAMES,
+        max_samples: int = DEFAULT_MAX_SAMPLES,
+        counters: Optional[Dict[str, Callable[[], int]]] = None,
+        metrics: Optional[MetricsRegistry] = None,
+    ) -> None:
+        """Initialize the sampler.
+
+        Args:
+            interval: Seconds between background samples.
+            frames: Stack frames tracemalloc keeps per allocation.
+            max_samples: Samples kept in the time series.
+            counters: Subsystem object counts, as name -> function.
+            metrics: Registry for memory gauges (the process-wide one by default).
+        """
+        self.interval = interval
+        self.frames = frames
+        self.counters = dict(counters or {})
+        self.samples: Deque[MemorySample] = deque(maxlen=max_samples)
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._baseline_counts: Dict[str, int] = {}
+        self._growth: List[Growth] = []
+
+        registry = metrics or REGISTRY
+        registry.gauge(TRACED_METRIC, "Memory traced by tracemalloc").set_function(
+            lambda: self.samples[-1].traced_bytes if self.samples else 0
+        )
+        registry.gauge(RSS_METRIC, "Resident set size").set_function(rss_bytes)
+
+    @property
+    def growth(self) -> List[Growth]:
+        """Get the sites that grew most since the baseline (as of the last sample)."""
+        return list(self._growth)
+
+    @property
+    def tracing(self) -> bool:
+        """Check whether tracemalloc is running with a baseline taken."""
+        return self._baseline is not None and tracemalloc.is_tracing()
+
+    def start(self) -> None:
+        """Start tracemalloc and take the baseline snapshot."""
+        if self._baseline is None or not tracemalloc.is_tracing():
+            self.reset_baseline()
+
+    def stop(self) -> None:
+        """Stop tracemalloc (the time series is kept)."""
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._baseline = None
+
+    def reset_baseline(self) -> None:
+        """Diff future samples against the current memory state."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        self._baseline = self._snapshot()
+        self._baseline_counts = self._counts()
+
+    def sample(self, limit: int = 10) -> MemorySample:
+        """Take a sample and diff it against the baseline.
+
+        This walks every live object and allocation, so call it from a
+        worker thread when the event loop matters.
+
+        Args:
+            limit: Growth sites kept.
+
+        Returns:
+            The new sample (also appended to the time series).
+        """
+        self.start()
+        assert self._baseline is not None
+        snapshot = self._snapshot()
+        traced, peak = tracemalloc.get_traced_memory()
+        stats = snapshot.compare_to(self._baseline, "lineno")
+        self._growth = [
+            (_site(stat.traceback), stat.size_diff, stat.count_diff)
+            for stat in stats[:limit]
+            if stat.size_diff > 0
+        ]
+        sample = MemorySample(time.time(), traced, peak, rss_bytes(), self._counts())
+        self.samples.append(sample)
+        return sample
+
+    async def run(self) -> None:
+        """Sample every interval until cancelled."""
+        self.start()
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                sample = await asyncio.to_thread(self.sample)
+            except Exception as e:
+                logger.error(f"Memory sample failed: {e}")
+                continue
+            logger.info(
+                "Memory: %.1f MB traced, %.1f MB RSS",
+                sample.traced_bytes / 1e6,
+                sample.rss_bytes / 1e6,
+            )
+
+    def format(self, limit: int = 5) -> str:
+        """Format the latest sample, its growth sites and the series trend.
+
+        Args:
+            limit: Growth sites and series points shown.
+
+        Returns:
+            Multi-line report.
+        """
+        if not self.samples:
+            return "No memory samples yet"
+        latest = self.samples[-1]
+        lines = [
+            f"traced: {latest.traced_bytes / 1e6:.1f} MB (peak {latest.peak_bytes / 1e6:.1f} MB)",
+            f"rss: {latest.rss_bytes / 1e6:.1f} MB",
+            "objects (vs baseline):",
+        ]
+        for name, count in latest.counts.items():
+            diff = count - self._baseline_counts.get(name, 0)
+            lines.append(f"  {name}: {count} ({diff:+d})")
+        if self._growth:
+            lines.append("top growth:")
+            for site, size_diff, count_diff in self._growth[:limit]:
+                lines.append(f"  {size_diff / 1024:+.1f} KiB {count_diff:+d} blocks  {site}")
+        if len(self.samples) > 1:
+            lines.append("series (traced MB):")
+            points = list(self.samples)[-limit:]
+            lines.append("  " + " ".join(f"{s.traced_bytes / 1e6:.1f}" for s in points))
+        return "\n".join(lines)
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        """Take a tracemalloc snapshot without the sampler's own allocations."""
+        return tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+
+    def _counts(self) -> Dict[str, int]:
+        """Collect subsystem and type counts."""
+        counts: Dict[str, int] = {}
+        for name, counter in self.counters.items():
+            try:
+                counts[name] = int(counter())
+            except Exception as e:
+                logger.debug("Memory counter %s failed: %s", name, e)
+        counts.update(type_counts())
+        return counts
+
+
+def _site(traceback: tracemalloc.Traceback) -> str:
+    """Format the innermost frame of an allocation as ``file:line``."""
+    frame = traceback[0]
+    return f"{os.path.basename(frame.filename)}:{frame.lineno}"
@@ -0,0 +1,440 @@
+"""In-memory metrics (counters, gauges and histograms) for runtime reporting.
+
+Metrics may carry labels (``task_type="Verify"``); each label set is a
+separate metric in the registry. ``MetricsRegistry.expose()`` renders the
+Prometheus text exposition format served by ``utils.metrics_server``.
+"""
+
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+# Default histogram buckets, suited to millisecond latencies
+DEFAULT_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+Labels = Dict[str, str]
+
+
+def metric_key(name: str, labels: Optional[Labels] = None) -> str:
+    """Build the registry key of a metric.
+
+    Args:
+        name: Metric name.
+        labels: Optional label values.
+
+    Returns:
+        ``name`` or ``name{label="value",...}`` with labels sorted.
+    """
+    if not labels:
+        return name
+    pairs = ",".join(f'{k}="{_escape(str(v))}"' for k, v in sorted(labels.items()))
+    return f"{name}{{{pairs}}}"
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the exposition format."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    """Monotonically increasing count."""
+
+    def __init__(self, name: str, description: str = "", labels: Optional[Labels] = None) -> None:
+        """Initialize the counter.
+
+        Args:
+            name: Metric name.
+            description: Human readable description.
+            labels: Optional label values.
+        """
+        self.name = name
+        self.description = description
+        self.labels = dict(labels or {})
+        self.key = metric_key(name, labels)
+        self._value = 0
+        self._lock = threading.Lock()
+
+    @property
+    def value(self) -> int:
+        """Get the current count."""
+        return self._value
+
+    def inc(self, amount: int = 1) -> None:
+        """Increase the count.
+
+        Args:
+            amount: Amount to add.
+        """
+        with self._lock:
+            self._value += amount
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the counter state as a dict."""
+        return {"type": "counter", "value": self._value}
+
+
+class Gauge:
+    """Value that can go up and down.
+
+    The value is either set directly or read from a function when the
+    gauge is reported, so hot paths need not update it at all.
+    """
+
+    def __init__(self, name: str, description: str = "", labels: Optional[Labels] = None) -> None:
+        """Initialize the gauge.
+
+        Args:
+            name: Metric name.
+            description: Human readable description.
+            labels: Optional label values.
+        """
+        self.name = name
+        self.description = description
+        self.labels = dict(labels or {})
+        self.key = metric_key(name, labels)
+        self._value = 0.0
+        self._function: Optional[Callable[[], float]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def value(self) -> float:
+        """Get the current value."""
+        if self._function is not None:
+            return float(self._function())
+        return self._value
+
+    def set(self, value: float) -> None:
+        """Set the value.
+
+        Args:
+            value: New value.
+        """
+        self._value = value
+
+    def inc(self, amount: float = 1) -> None:
+        """Increase the value.
+
+        Args:
+            amount: Amount to add.
+        """
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        """Decrease the value.
+
+        Args:
+            amount: Amount to subtract.
+        """
+        self.inc(-amount)
+
+    def set_function(self, function: Optional[Callable[[], float]]) -> None:
+        """Read the value from a function when the gauge is reported.
+
+        Args:
+            function: Callable returning the current value (None to clear).
+        """
+        self._function = function
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the gauge state as a dict."""
+        return {"type": "gauge", "value": self.value}
+
+
+class Histogram:
+    """Distribution of observed values in fixed buckets.
+
+    Keeps bucket counts plus sum, min and max, so memory use is constant
+    however many values are observed. Percentiles are interpolated within
+    the bucket they fall in.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        description: str = "",
+        buckets: Sequence[float] = DEFAULT_BUCKETS_MS,
+        labels: Optional[Labels] = None,
+    ) -> None:
+        """Initialize the histogram.
+
+        Args:
+            name: Metric name.
+            description: Human readable description.
+            buckets: Sorted bucket upper bounds (an overflow bucket is added).
+            labels: Optional label values.
+        """
+        self.name = name
+        self.description = description
+        self.labels = dict(labels or {})
+        self.key = metric_key(name, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._min: Optional[float] = None
+        self._max: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def count(self) -> int:
+        """Get the number of observed values."""
+        return self._count
+
+    @property
+    def sum(self) -> float:
+        """Get the sum of observed values."""
+        return self._sum
+
+    @property
+    def min(self) -> float:
+        """Get the smallest observed value."""
+        return self._min if self._min is not None else 0.0
+
+    @property
+    def max(self) -> float:
+        """Get the largest observed value."""
+        return self._max if self._max is not None else 0.0
+
+    @property
+    def mean(self) -> float:
+        """Get the mean observed value."""
+        return self._sum / self._count if self._count else 0.0
+
+    @property
+    def bucket_counts(self) -> List[int]:
+        """Get the per-bucket counts (last entry is the overflow bucket)."""
+        return list(self._counts)
+
+    def observe(self, value: float) -> None:
+        """Record a value.
+
+        Args:
+            value: Observed value.
+        """
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._sum += value
+            self._min = value if self._min is None else min(self._min, value)
+            self._max = value if self._max is None else max(self._max, value)
+
+    def percentile(self, pct: float) -> float:
+        """Estimate a percentile of the observed values.
+
+        Args:
+            pct: Percentile between 0 and 100.
+
+        Returns:
+            Estimated value (0.0 if nothing was observed).
+        """
+        if not self._count:
+            return 0.0
+
+        low, high = self.min, self.max
+        rank = pct / 100 * self._count
+        seen = 0
+        for index, count in enumerate(self._counts):
+            if count and seen + count >= rank:
+                lower = max(self.buckets[index - 1], low) if index > 0 else low
+                upper = min(self.buckets[index], high) if index < len(self.buckets) else high
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return high
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the histogram state as a dict."""
+        return {
+            "type": "histogram",
+            "count": self._count,
+            "sum": self._sum,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.mean,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "buckets": dict(zip([*map(str, self.buckets), "+Inf"], self._counts)),
+        }
+
+
+Metric = Counter | Gauge | Histogram
+
+
+class MetricsRegistry:
+    """Named collection of counters, gauges and histograms."""
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, description: str = "", labels: Optional[Labels] = None) -> Counter:
+        """Get or create a counter.
+
+        Args:
+            name: Metric name.
+            description: Description used when the counter is created.
+            labels: Optional label values.
+
+        Returns:
+            The counter registered under ``name`` and ``labels``.
+        """
+        return self._get(metric_key(name, labels), lambda: Counter(name, description, labels))
+
+    def gauge(self, name: str, description: str = "", labels: Optional[Labels] = None) -> Gauge:
+        """Get or create a gauge.
+
+        Args:
+            name: Metric name.
+            description: Description used when the gauge is created.
+            labels: Optional label values.
+
+        Returns:
+            The gauge registered under ``name`` and ``labels``.
+        """
+        return self._get(metric_key(name, labels), lambda: Gauge(name, description, labels))
+
+    def histogram(
+        self,
+        name: str,
+        description: str = "",
+        buckets: Sequence[float] = DEFAULT_BUCKETS_MS,
+        labels: Optional[Labels] = None,
+    ) -> Histogram:
+        """Get or create a histogram.
+
+        Args:
+            name: Metric name.
+            description: Description used when the histogram is created.
+            buckets: Buckets used when the histogram is created.
+            labels: Optional label values.
+
+        Returns:
+            The histogram registered under ``name`` and ``labels``.
+        """
+        return self._get(
+            metric_key(name, labels), lambda: Histogram(name, description, buckets, labels)
+        )
+
+    @contextmanager
+    def timer(self, name: str, description: str = "") -> Iterator[None]:
+        """Time a block of code into a millisecond histogram.
+
+        Args:
+            name: Histogram name.
+            description: Description used when the histogram is created.
+        """
+        histogram = self.histogram(name, description)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            histogram.observe((time.perf_counter() - start) * 1000)
+
+    def metrics(self, prefix: str = "") -> List[Metric]:
+        """List registered metrics.
+
+        Args:
+            prefix: Only include metrics whose name starts with this.
+
+        Returns:
+            Metrics sorted by key.
+        """
+        return [self._metrics[key] for key in sorted(self._metrics) if key.startswith(prefix)]
+
+    def snapshot(self, prefix: str = "") -> Dict[str, Dict[str, Any]]:
+        """Get the state of all metrics as a dict.
+
+        Args:
+            prefix: Only include metrics whose name starts with this.
+
+        Returns:
+            Mapping of metric key to its snapshot.
+        """
+        return {metric.key: metric.snapshot() for metric in self.metrics(prefix)}
+
+    def format(self, prefix: str = "") -> str:
+        """Format metrics as a short text report.
+
+        Args:
+            prefix: Only include metrics whose name starts with this (the
+                prefix is stripped from displayed names).
+
+        Returns:
+            One line per metric.
+        """
+        lines = []
+        for metric in self.metrics(prefix):
+            name = metric.key[len(prefix) :]
+            if isinstance(metric, Counter):
+                lines.append(f"{name}: {metric.value}")
+            elif isinstance(metric, Gauge):
+                lines.append(f"{name}: {metric.value:g}")
+            elif metric.count:
+                lines.append(
+                    f"{name}: n={metric.count} mean={metric.mean:.1f} "
+                    f"p50={metric.percentile(50):.1f} p95={metric.percentile(95):.1f} "
+                    f"max={metric.max:.1f}"
+                )
+            else:
+                lines.append(f"{name}: n=0")
+        return "\n".join(lines)
+
+    def expose(self) -> str:
+        """Render all metrics in the Prometheus text exposition format.
+
+        Histogram buckets are reported cumulatively with ``le`` labels,
+        followed by ``_sum`` and ``_count`` series.
+
+        Returns:
+            Exposition text (newline terminated).
+        """
+        lines: List[str] = []
+        described = set()
+        for metric in sorted(self._metrics.values(), key=lambda m: (m.name, m.key)):
+            if metric.name not in described:
+                described.add(metric.name)
+                kind = {Counter: "counter", Gauge: "gauge"}.get(type(metric), "histogram")
+                if metric.description:
+                    lines.append(f"# HELP {metric.name} {metric.description}")
+                lines.append(f"# TYPE {metric.name} {kind}")
+
+            if isinstance(metric, Histogram):
+                cumulative = 0
+                bounds = [*(f"{b:g}" for b in metric.buckets), "+Inf"]
+                for bound, count in zip(bounds, metric.bucket_counts):
+                    cumulative += count
+                    key = metric_key(f"{metric.name}_bucket", {**metric.labels, "le": bound})
+                    lines.append(f"{key} {cumulative}")
+                lines.append(f"{metric_key(metric.name + '_sum', metric.labels)} {metric.sum:g}")
+                lines.append(f"{metric_key(metric.name + '_count', metric.labels)} {metric.count}")
+            else:
+                # A failing gauge function must not break the whole scrape
+                try:
+                    value = metric.value
+                except Exception:
+                    continue
+                lines.append(f"{metric.key} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """Remove all metrics."""
+        with self._lock:
+            self._metrics.clear()
+
+    def _get(self, key: str, factory) -> Any:
+        """Get a metric by key, creating it if missing."""
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.setdefault(key, factory())
+        return metric
+
+
+# Process-wide registry
+REGISTRY = MetricsRegistry()
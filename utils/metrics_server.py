@@ -0,0 +1,70 @@
+"""Local HTTP endpoint exposing metrics to Prometheus.
+
+Serves ``GET /metrics`` in the text exposition format, bound to localhost
+only. Enabled by setting ``metricsPort`` in the config; aiohttp is only
+imported when the server starts.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from utils.logging import get_logger
+from utils.metrics import REGISTRY, MetricsRegistry
+
+logger = get_logger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class MetricsServer:
+    """Minimal aiohttp server publishing a metrics registry."""
+
+    def __init__(
+        self,
+        port: int,
+        host: str = DEFAULT_HOST,
+        registry: Optional[MetricsRegistry] = None,
+    ) -> None:
+        """Initialize the server.
+
+        Args:
+            port: TCP port to listen on (0 picks a free port).
+            host: Interface to bind.
+            registry: Registry to expose (the process-wide one by default).
+        """
+        self.port = port
+        self.host = host
+        self.registry = registry or REGISTRY
+        self._runner: Any = None
+
+    async def start(self) -> None:
+        """Bind the port and start serving."""
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle_metrics)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        # Report the real port when an ephemeral one was requested
+        if self._runner.addresses:
+            self.port = self._runner.addresses[0][1]
+        logger.info(f"Metrics endpoint listening on http://{self.host}:{self.port}/metrics")
+
+    async def close(self) -> None:
+        """Stop serving."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle_metrics(self, request: Any) -> Any:
+        """Render the registry for a scrape."""
+        from aiohttp import web
+
+        return web.Response(
+            body=self.registry.expose().encode("utf-8"),
+            headers={"Content-Type": CONTENT_TYPE},
+        )
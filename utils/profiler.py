@@ -0,0 +1,187 @@
+"""In-process sampling profiler.
+
+A background thread periodically samples the Python stack of every other
+thread (the event loop, executor workers, the logging listener), so hot
+spots anywhere in the process show up without restarting the bot or
+attaching external tools. Samples where a thread is only waiting (selector
+polls, idle executor workers) are skipped.
+
+Results are written as collapsed stacks, one ``thread;outer;...;inner count``
+line per distinct stack, which flamegraph.pl, speedscope and Brendan Gregg's
+FlameGraph tools read directly.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+from typing import Dict, List, Optional, Tuple
+
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_INTERVAL = 0.01  # seconds between samples
+DEFAULT_PROFILE_DIR = "./profiles"
+
+# Innermost frames of threads that are waiting rather than working
+IDLE_FRAMES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("thread.py", "_worker"),
+    ("queue.py", "get"),
+}
+
+Stack = Tuple[str, ...]
+
+
+def _label(frame: FrameType) -> str:
+    """Format a frame as ``function (file:line)``."""
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Samples the stacks of all threads from a background thread."""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL) -> None:
+        """Initialize the profiler.
+
+        Args:
+            interval: Seconds between samples.
+        """
+        self.interval = interval
+        self.samples: Counter[Stack] = Counter()
+        self.sample_count = 0
+        self.duration = 0.0
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        """Check if the profiler is sampling."""
+        return self._thread is not None
+
+    def start(self) -> None:
+        """Start sampling."""
+        if self.running:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._sample_loop, name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling."""
+        if not self._thread:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+
+    async def profile(self, seconds: float) -> None:
+        """Sample for a while without blocking the event loop.
+
+        Args:
+            seconds: Time to sample for.
+        """
+        self.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            self.stop()
+
+    def top(self, limit: int = 10) -> List[Tuple[str, float, float]]:
+        """Get the functions with the most cumulative time.
+
+        Args:
+            limit: Functions returned.
+
+        Returns:
+            (function, cumulative seconds, self seconds) tuples, highest
+            cumulative time first.
+        """
+        cumulative: Counter[str] = Counter()
+        own: Counter[str] = Counter()
+        for stack, count in self.samples.items():
+            # Skip the thread name; count recursive functions once per stack
+            for frame in set(stack[1:]):
+                cumulative[frame] += count
+            own[stack[-1]] += count
+        return [
+            (frame, count * self.interval, own[frame] * self.interval)
+            for frame, count in cumulative.most_common(limit)
+        ]
+
+    def format_top(self, limit: int = 10) -> str:
+        """Format the top functions as a table.
+
+        Args:
+            limit: Functions shown.
+
+        Returns:
+            Table of cumulative and self time per function.
+        """
+        lines = [
+            f"{self.sample_count} samples over {self.duration:.1f}s",
+            f"{'cum s':>7} {'self s':>7}  function",
+        ]
+        for frame, cumulative, own in self.top(limit):
+            lines.append(f"{cumulative:>7.2f} {own:>7.2f}  {frame[:70]}")
+        return "\n".join(lines)
+
+    def write_collapsed(self, path: str | Path) -> Path:
+        """Write the samples as collapsed stacks.
+
+        Args:
+            path: Output file (parent directories are created).
+
+        Returns:
+            The written path.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        lines = [f"{';'.join(stack)} {count}\n" for stack, count in self.samples.most_common()]
+        path.write_text("".join(lines), encoding="utf-8")
+        return path
+
+    def _sample_loop(self) -> None:
+        """Take samples until stopped."""
+        own_id = threading.get_ident()
+        started = time.monotonic()
+        while not self._stopped.wait(self.interval):
+            names = {
+                thread.ident: thread.name
+                for thread in threading.enumerate()
+                if thread.ident is not None
+            }
+            self._sample(sys._current_frames(), names, own_id)
+        self.duration += time.monotonic() - started
+
+    def _sample(self, frames: Dict[int, FrameType], names: Dict[int, str], own_id: int) -> None:
+        """Record one sample of every thread but the profiler's.
+
+        Args:
+            frames: Innermost frame per thread id.
+            names: Thread name per thread id.
+            own_id: Id of the profiler thread.
+        """
+        self.sample_count += 1
+        for thread_id, innermost in frames.items():
+            if thread_id == own_id:
+                continue
+            code = innermost.f_code
+            if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                continue
+            stack: List[str] = []
+            frame: Optional[FrameType] = innermost
+            while frame is not None:
+                stack.append(_label(frame))
+                frame = frame.f_back
+            stack.append(names.get(thread_id, str(thread_id)))
+            self.samples[tuple(reversed(stack))] += 1
@@ -0,0 +1,236 @@
+"""Lightweight tracing from inbound Isekaid message to outbound action.
+
+A trace is keyed by the id of the message that caused it. The bot activates
+the trace while dispatching the message, and asyncio tasks created from
+there (cog listeners, timers) inherit it through a context variable. A
+``Task`` remembers the trace it was created in, so ``TaskManager`` can add
+the queue wait, gap/bias delays and the final Discord call to it::
+
+    with TRACER.activate(message.id):
+        ...
+        with TRACER.span("parse"):
+            ...
+
+Recent traces are kept in a bounded ring buffer and can be exported in the
+Chrome trace event format (chrome://tracing, Perfetto or speedscope), one
+row per message.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+DEFAULT_CAPACITY = 256
+
+_current_trace: ContextVar[Optional[str]] = ContextVar("trace_id", default=None)
+
+
+@dataclass
+class Span:
+    """One timed step of a trace."""
+
+    name: str
+    start: float  # Unix seconds
+    end: float
+    attrs: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration_ms(self) -> float:
+        """Get the span duration in milliseconds."""
+        return (self.end - self.start) * 1000
+
+
+@dataclass
+class Trace:
+    """Spans caused by one inbound message."""
+
+    trace_id: str
+    started: float  # Unix seconds
+    spans: List[Span] = field(default_factory=list)
+
+    @property
+    def duration_ms(self) -> float:
+        """Get the time from the message to the end of the last span."""
+        if not self.spans:
+            return 0.0
+        return (max(span.end for span in self.spans) - self.started) * 1000
+
+
+def current_trace() -> Optional[str]:
+    """Get the id of the trace active in the current task, if any."""
+    return _current_trace.get()
+
+
+class Tracer:
+    """Collects spans into a ring buffer of recent traces."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        """Initialize the tracer.
+
+        Args:
+            capacity: Traces kept; the oldest is dropped when a new one
+                starts (0 disables tracing).
+        """
+        self.capacity = capacity
+        self._traces: OrderedDict[str, Trace] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def activate(self, trace_id: Any) -> Iterator[None]:
+        """Make a trace current inside the block, starting it if new.
+
+        Asyncio tasks created inside the block inherit the trace.
+
+        Args:
+            trace_id: Trace id (a message id); None leaves tracing off.
+        """
+        if trace_id is None or self.capacity <= 0:
+            yield
+            return
+        trace_id = str(trace_id)
+        self._start(trace_id)
+        token = _current_trace.set(trace_id)
+        try:
+            yield
+        finally:
+            _current_trace.reset(token)
+
+    @contextmanager
+    def span(self, name: str, **attrs: Any) -> Iterator[None]:
+        """Time a block into the current trace (a no-op without one).
+
+        Args:
+            name: Span name.
+            **attrs: Extra values shown with the span.
+        """
+        trace_id = _current_trace.get()
+        if trace_id is None:
+            yield
+            return
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.time(), trace_id, **attrs)
+
+    def record(
+        self,
+        name: str,
+        start: float,
+        end: float,
+        trace_id: Optional[str] = None,
+        **attrs: Any,
+    ) -> None:
+        """Add a span measured elsewhere.
+
+        Args:
+            name: Span name.
+            start: Start as a Unix timestamp.
+            end: End as a Unix timestamp.
+            trace_id: Trace to add to (the current one by default).
+            **attrs: Extra values shown with the span.
+        """
+        trace_id = trace_id if trace_id is not None else _current_trace.get()
+        if trace_id is None:
+            return
+        with self._lock:
+            trace = self._traces.get(trace_id)
+            # Spans of traces already dropped from the buffer are discarded
+            if trace is not None:
+                trace.spans.append(Span(name, start, end, attrs))
+
+    def get(self, trace_id: Any) -> Optional[Trace]:
+        """Get a trace by id."""
+        return self._traces.get(str(trace_id))
+
+    def traces(self) -> List[Trace]:
+        """Get the buffered traces, oldest first."""
+        with self._lock:
+            return list(self._traces.values())
+
+    def clear(self) -> None:
+        """Drop all buffered traces."""
+        with self._lock:
+            self._traces.clear()
+
+    def to_chrome(self) -> Dict[str, Any]:
+        """Convert the buffered traces to the Chrome trace event format.
+
+        Returns:
+            Document with one thread (row) per trace.
+        """
+        events: List[Dict[str, Any]] = []
+        for tid, trace in enumerate(self.traces(), start=1):
+            events.append(
+                {
+                    "ph": "M",
+                    "name": "thread_name",
+                    "pid": 1,
+                    "tid": tid,
+                    "args": {"name": f"message {trace.trace_id}"},
+                }
+            )
+            for span in trace.spans:
+                events.append(
+                    {
+                        "ph": "X",
+                        "name": span.name,
+                        "cat": "isekaiz",
+                        "pid": 1,
+                        "tid": tid,
+                        "ts": round(span.start * 1e6),
+                        "dur": round((span.end - span.start) * 1e6),
+                        "args": {"trace_id": trace.trace_id, **span.attrs},
+                    }
+                )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, path: str | Path) -> int:
+        """Write the buffered traces as Chrome trace JSON.
+
+        Args:
+            path: Output file.
+
+        Returns:
+            Number of traces written.
+        """
+        document = self.to_chrome()
+        Path(path).write_text(json.dumps(document, default=str), encoding="utf-8")
+        return sum(1 for event in document["traceEvents"] if event["ph"] == "M")
+
+    def format(self, limit: int = 5) -> str:
+        """Format the most recent traces as a short report.
+
+        Args:
+            limit: Traces shown.
+
+        Returns:
+            One line per trace with its slowest spans.
+        """
+        lines = []
+        for trace in self.traces()[-limit:]:
+            slowest = sorted(trace.spans, key=lambda s: s.duration_ms, reverse=True)[:3]
+            steps = ", ".join(f"{s.name} {s.duration_ms:.0f}ms" for s in slowest)
+            lines.append(f"{trace.trace_id}: {trace.duration_ms:.0f}ms ({steps or 'no spans'})")
+        return "\n".join(lines)
+
+    def _start(self, trace_id: str) -> None:
+        """Start a trace unless it is already buffered."""
+        with self._lock:
+            if trace_id in self._traces:
+                return
+            self._traces[trace_id] = Trace(trace_id, time.time())
+            while len(self._traces) > self.capacity:
+                self._traces.popitem(last=False)
+
+
+# Process-wide tracer
+TRACER = Tracer()
@@ -0,0 +1,331 @@
+"""Recording of the Isekaid traffic the bot sees.
+
+``TrafficRecorder`` captures every Isekaid message and edit the bot
+receives, anonymized, so real traffic can be replayed offline (see
+``simulator.replay``). A recording is one gzipped JSON-lines file per run::
+
+    {"format": "isekaiz-traffic", "version": 1, "profession": "mine", ...}
+    {"t": 0, "k": "m", "id": 1, "ch": "g", "em": [{"t": "Current Floor: 3", ...}], ...}
+    {"t": 2410, "k": "e", "id": 1, "ch": "g", ...}
+
+``t`` is milliseconds since recording started, ``k`` is ``m`` (message) or
+``e`` (edit), and ``ch`` tells the game channel (``g``) from the treasure
+guild (``t``) and other channels (``o``). Events are buffered and appended
+in batches, each batch as its own gzip member.
+
+Anonymization: message ids are renumbered, channel and guild ids are reduced
+to the channel kind, the player's name becomes ``{player}``, user mentions
+become ``<@0>`` and image URLs are replaced by ``img:<n>``. Emoji ids,
+button labels and select options are kept because the cogs act on them.
+"""
+
+from __future__ import annotations
+
+import gzip
+import itertools
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING
+
+from utils.helpers import is_from_isekaid
+from utils.logging import get_logger
+
+if TYPE_CHECKING:
+    import discord
+
+logger = get_logger(__name__)
+
+FORMAT_NAME = "isekaiz-traffic"
+FORMAT_VERSION = 1
+
+# Event kinds
+KIND_MESSAGE = "m"
+KIND_EDIT = "e"
+
+# Channel kinds
+CHANNEL_GAME = "g"
+CHANNEL_TREASURE = "t"
+CHANNEL_OTHER = "o"
+
+# Placeholder for the player's name in recorded text
+PLAYER_PLACEHOLDER = "{player}"
+
+MENTION_REGEX = re.compile(r"<@!?\d+>")
+
+# Message ids remembered to renumber later edits consistently
+MAX_TRACKED_IDS = 10_000
+
+
+@dataclass
+class TrafficEvent:
+    """One recorded message or edit."""
+
+    offset_ms: int  # Since the recording started
+    kind: str  # KIND_MESSAGE or KIND_EDIT
+    message_id: int  # Renumbered; an edit has the id of its message
+    channel: str  # CHANNEL_GAME, CHANNEL_TREASURE or CHANNEL_OTHER
+    content: str = ""
+    embeds: List[Dict[str, Any]] = field(default_factory=list)
+    components: List[List[Dict[str, Any]]] = field(default_factory=list)
+    mentions_player: bool = False
+
+    def to_json(self) -> Dict[str, Any]:
+        """Convert to the compact on-disk form (empty values are left out)."""
+        data: Dict[str, Any] = {
+            "t": self.offset_ms,
+            "k": self.kind,
+            "id": self.message_id,
+            "ch": self.channel,
+        }
+        if self.content:
+            data["x"] = self.content
+        if self.embeds:
+            data["em"] = self.embeds
+        if self.components:
+            data["co"] = self.components
+        if self.mentions_player:
+            data["mp"] = 1
+        return data
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "TrafficEvent":
+        """Build an event from its on-disk form.
+
+        Args:
+            data: Dictionary produced by to_json().
+
+        Returns:
+            The event.
+        """
+        return cls(
+            offset_ms=int(data["t"]),
+            kind=data["k"],
+            message_id=int(data["id"]),
+            channel=data.get("ch", CHANNEL_OTHER),
+            content=data.get("x", ""),
+            embeds=data.get("em", []),
+            components=data.get("co", []),
+            mentions_player=bool(data.get("mp")),
+        )
+
+
+class TrafficRecorder:
+    """Buffered writer of anonymized Isekaid traffic."""
+
+    def __init__(
+        self,
+        directory: str | Path,
+        channel_id: str,
+        treasure_guild: str = "",
+        header: Optional[Dict[str, Any]] = None,
+        buffer_size: int = 256,
+        flush_interval: float = 30.0,
+    ) -> None:
+        """Initialize the recorder and start a new recording file.
+
+        Args:
+            directory: Directory recordings are written to.
+            channel_id: The bot's game channel.
+            treasure_guild: Guild treasure chests spawn in ("" = none).
+            header: Extra values for the header line (e.g. the profession).
+            buffer_size: Events buffered before they are appended.
+            flush_interval: Seconds after which buffered events are
+                appended on the next record.
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.channel_id = channel_id
+        self.treasure_guild = treasure_guild
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.path = self.directory / f"traffic-{time.strftime('%Y%m%d-%H%M%S')}.jsonl.gz"
+
+        self._player_name = ""
+        self._player_mention: Optional[re.Pattern] = None
+        self._started = time.time()
+        self._ids: OrderedDict[int, int] = OrderedDict()
+        self._next_id = itertools.count(1)
+        self._images: Dict[str, str] = {}
+        self._buffer: List[str] = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+        # Statistics
+        self.recorded: int = 0
+
+        first = {"format": FORMAT_NAME, "version": FORMAT_VERSION, **(header or {})}
+        self._buffer.append(json.dumps(first, separators=(",", ":")) + "\n")
+
+    def set_player(self, name: str, user_id: Any = None) -> None:
+        """Set the player whose name and mentions are anonymized.
+
+        Args:
+            name: The player's user name.
+            user_id: The player's user id.
+        """
+        self._player_name = name
+        self._player_mention = re.compile(rf"<@!?{user_id}>") if user_id is not None else None
+
+    def record(self, kind: str, message: "discord.Message") -> None:
+        """Record a message or edit if it comes from Isekaid.
+
+        Args:
+            kind: KIND_MESSAGE or KIND_EDIT.
+            message: The message (after the edit, for edits).
+        """
+        if not is_from_isekaid(message):
+            return
+        try:
+            event = self._event(kind, message)
+        except Exception as e:
+            logger.debug("Traffic record skipped: %s", e)
+            return
+        line = json.dumps(event.to_json(), separators=(",", ":"), ensure_ascii=False) + "\n"
+        with self._lock:
+            self._buffer.append(line)
+            self.recorded += 1
+            due = time.monotonic() - self._last_flush >= self.flush_interval
+            if len(self._buffer) >= self.buffer_size or due:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        """Append buffered events to the recording."""
+        with self._lock:
+            self._flush_locked()
+
+    def close(self) -> None:
+        """Flush the recording."""
+        self.flush()
+
+    def _flush_locked(self) -> None:
+        """Append buffered events as one gzip member (lock held)."""
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        data = "".join(self._buffer).encode("utf-8")
+        self._buffer.clear()
+        try:
+            with self.path.open("ab") as f:
+                f.write(gzip.compress(data))
+        except OSError as e:
+            logger.error(f"Error writing traffic recording: {e}")
+
+    def _event(self, kind: str, message: "discord.Message") -> TrafficEvent:
+        """Convert a message to an anonymized event."""
+        message_id = self._ids.get(message.id)
+        if message_id is None:
+            message_id = self._ids[message.id] = next(self._next_id)
+            if len(self._ids) > MAX_TRACKED_IDS:
+                self._ids.popitem(last=False)
+
+        mentions_player = any(
+            getattr(user, "name", None) == self._player_name for user in message.mentions
+        )
+        return TrafficEvent(
+            offset_ms=int((time.time() - self._started) * 1000),
+            kind=kind,
+            message_id=message_id,
+            channel=self._channel_kind(message),
+            content=self._text(message.content),
+            embeds=[self._embed(embed) for embed in message.embeds],
+            components=[self._row(row) for row in message.components],
+            mentions_player=mentions_player,
+        )
+
+    def _channel_kind(self, message: "discord.Message") -> str:
+        """Classify the channel of a message."""
+        if str(message.channel.id) == self.channel_id:
+            return CHANNEL_GAME
+        guild = message.guild
+        if self.treasure_guild and guild is not None and str(guild.id) == self.treasure_guild:
+            return CHANNEL_TREASURE
+        return CHANNEL_OTHER
+
+    def _text(self, text: Optional[str]) -> str:
+        """Anonymize a piece of message text."""
+        if not text:
+            return ""
+        if self._player_mention is not None:
+            text = self._player_mention.sub(f"<@{PLAYER_PLACEHOLDER}>", text)
+        text = MENTION_REGEX.sub("<@0>", text)
+        if self._player_name:
+            text = text.replace(self._player_name, PLAYER_PLACEHOLDER)
+        return text
+
+    def _embed(self, embed: Any) -> Dict[str, Any]:
+        """Convert an embed to its compact, anonymized form."""
+        data: Dict[str, Any] = {}
+        if embed.title:
+            data["t"] = self._text(embed.title)
+        if embed.description:
+            data["d"] = self._text(embed.description)
+        author = getattr(embed.author, "name", None) if embed.author else None
+        if author:
+            data["a"] = self._text(author)
+        url = getattr(embed.image, "url", None) if embed.image else None
+        if url:
+            data["i"] = self._images.setdefault(url, f"img:{len(self._images) + 1}")
+        if embed.fields:
+            data["f"] = [
+                [self._text(f.name), self._text(f.value), bool(f.inline)] for f in embed.fields
+            ]
+        return data
+
+    def _row(self, row: Any) -> List[Dict[str, Any]]:
+        """Convert an action row to its compact form."""
+        children = []
+        for child in getattr(row, "children", []):
+            options = getattr(child, "options", None)
+            if options is not None:
+                children.append({"o": [option.label for option in options]})
+                continue
+            item: Dict[str, Any] = {"l": getattr(child, "label", None) or ""}
+            emoji = getattr(child, "emoji", None)
+            if emoji is not None and getattr(emoji, "id", None):
+                item["e"] = str(emoji.id)
+            children.append(item)
+        return children
+
+
+def read_traffic(path: str | Path) -> Tuple[Dict[str, Any], Iterator[TrafficEvent]]:
+    """Open a recording.
+
+    Args:
+        path: Recording file (gzipped or plain JSON lines).
+
+    Returns:
+        (header, events) with the events streamed in file order; lines
+        torn by a crash are skipped.
+
+    Raises:
+        ValueError: If the file is not a traffic recording.
+    """
+    path = Path(path)
+    opener = gzip.open if path.suffix == ".gz" else open
+    f = opener(path, "rt", encoding="utf-8")
+    try:
+        header = json.loads(f.readline() or "{}")
+    except (ValueError, EOFError, OSError):
+        header = {}
+    if header.get("format") != FORMAT_NAME:
+        f.close()
+        raise ValueError(f"{path} is not a traffic recording")
+
+    def events() -> Iterator[TrafficEvent]:
+        with f:
+            try:
+                for line in f:
+                    try:
+                        yield TrafficEvent.from_json(json.loads(line))
+                    except (ValueError, KeyError):
+                        continue
+            except (EOFError, OSError) as e:
+                # A recording cut off mid-member (the bot was killed)
+                logger.warning(f"Traffic recording {path} is truncated: {e}")
+
+    return header, events()